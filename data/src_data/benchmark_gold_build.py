@@ -0,0 +1,114 @@
+"""
+Benchmark budowy Gold: gold_clean_data.sql (tabele z kluczami, CHECK, FK i indeksami
+przed INSERT) vs gold_clean_data_fast.sql (ładowanie do gołych tabel w gold_build,
+ograniczenia i indeksy po załadowaniu, ANALYZE, podmiana w jednej transakcji).
+
+Dla każdej skali silver.fact_sale jest powiększane do zadanej liczby wierszy
+(kopie istniejących transakcji z przesuniętym transaction_id), oba skrypty są
+uruchamiane na tych samych danych, a wynik porównywany: suma kontrolna wierszy
+gold.fact_sales i wymiarów oraz definicje ograniczeń i indeksów w schemacie gold.
+Na końcu kopie są usuwane, a Gold przebudowany gold_clean_data.sql i odtworzone to,
+co etap views w run_pipeline.py: widoki, agregaty gold.agg_* z triggerami i widok SCD2.
+
+UWAGA: skrypty przebudowują schemat gold - uruchamiaj na bazie testowej.
+
+    python benchmark_gold_build.py --rows 1000000 10000000
+"""
+import argparse
+import os
+
+from benchmark_sql_build import (
+    base_transaction_range, bench_scale, inflate_table, remove_copies, report, run_script, table_checksums,
+)
+from load_bronze import REPO_DIR, connect
+
+GOLD_DIR = os.path.join(REPO_DIR, "sql", "gold")
+SCRIPTS = {
+    "current": os.path.join(GOLD_DIR, "gold_clean_data.sql"),
+    "fast": os.path.join(GOLD_DIR, "gold_clean_data_fast.sql"),
+}
+# Po przywróceniu gold - te same pliki co etap views w run_pipeline.py
+VIEW_SCRIPTS = [
+    os.path.join(REPO_DIR, "sql", "view_results", "gold_view.sql"),
+    os.path.join(GOLD_DIR, "gold_sales_aggregates.sql"),
+    os.path.join(GOLD_DIR, "gold_fact_sales_skin_version.sql"),
+]
+
+SOURCE_TABLE = "silver.fact_sale"
+SOURCE_COLUMNS = ["player_key", "skin_key", "date_key", "price_rp", "quantity", "total_rp", "is_valid", "dq_issues"]
+# Usunięcie faktu z poprzedniego przebiegu poza pomiarem (obie ścieżki startują z pustym gold)
+RESET_SQL = "DROP TABLE IF EXISTS gold.fact_sales CASCADE"
+
+CHECKED_TABLES = {
+    "fact_sales": "sale_key, transaction_id, player_key, skin_key, date_key, price_rp, quantity, total_rp",
+    "dim_player": "player_key, player_id, region, account_created_date, player_segment, account_age_days",
+    "dim_skin": "skin_key, skin_id, champion_name, skin_name, rarity, price_rp, release_date",
+    "dim_date": "date_key, date, year, month, is_weekend",
+}
+# Ograniczenia i indeksy (z partycjami) - obie ścieżki mają dać ten sam schemat
+CATALOG_SQL = """
+SELECT MD5(STRING_AGG(item, E'\\n' ORDER BY item)), COUNT(*)
+FROM (
+    SELECT c.relname || ': ' || k.conname || ' ' || pg_get_constraintdef(k.oid) AS item
+    FROM pg_constraint k
+    JOIN pg_class c ON c.oid = k.conrelid
+    WHERE c.relnamespace = 'gold'::REGNAMESPACE
+      AND c.relname ~ '^(fact_sales|dim_player|dim_skin|dim_date)'
+    UNION ALL
+    SELECT indexdef
+    FROM pg_indexes
+    WHERE schemaname = 'gold'
+      AND tablename ~ '^(fact_sales|dim_player|dim_skin|dim_date)'
+) s
+"""
+
+
+def gold_checksums(conn):
+    checksums = table_checksums(conn, "gold", CHECKED_TABLES)
+    checksums["catalog"] = tuple(conn.execute(CATALOG_SQL).fetchone())
+    return checksums
+
+
+def summary(checksums):
+    return f"fact_sales: {checksums['fact_sales'][0]:,}, ograniczenia + indeksy: {checksums['catalog'][1]:,}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gold: gold_clean_data.sql vs fast build na powiększonym silver")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000],
+                        help="Rozmiary silver.fact_sale (rosnąco)")
+    parser.add_argument("--repeat", type=int, default=1, help="Ile przebiegów (liczy się najlepszy)")
+    parser.add_argument("--dsn", default=None, help="Connection string (zamiast zmiennych DB_*)")
+    args = parser.parse_args()
+
+    print("="*60)
+    print("BENCHMARK BUDOWY GOLD")
+    print("="*60)
+
+    all_same = True
+    with connect(args.dsn) as conn:
+        conn.autocommit = True
+        base_rows, base_max_id = base_transaction_range(conn, SOURCE_TABLE)
+        if not base_rows:
+            raise SystemExit("BŁĄD: silver.fact_sale jest puste - najpierw silver_clean_data.sql")
+        print(f"Bazowe silver.fact_sale: {base_rows:,} wierszy (transaction_id <= {base_max_id})")
+
+        try:
+            for target_rows in sorted(args.rows):
+                rows = inflate_table(conn, SOURCE_TABLE, SOURCE_COLUMNS, base_rows, base_max_id, target_rows)
+                results = bench_scale(conn, SCRIPTS, gold_checksums, args.repeat, RESET_SQL)
+                all_same &= report(SOURCE_TABLE, rows, results, summary)
+        finally:
+            print("\nPrzywracanie silver.fact_sale i Gold...")
+            remove_copies(conn, SOURCE_TABLE, base_max_id)
+            run_script(conn, SCRIPTS["current"], RESET_SQL)
+            for path in VIEW_SCRIPTS:
+                run_script(conn, path)
+            print("Gold, widoki, agregaty gold.agg_* i gold.fact_sales_skin_version odtworzone")
+
+    if not all_same:
+        raise SystemExit("BŁĄD: fast build daje inny gold niż gold_clean_data.sql")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Benchmark etapów Pythona w skalach jak w TPC: parse_skins_from_wiki.py, merge_skins.py
+i generate_player_sales.py.
+
+SF1 = dzisiejsze dane: 5 000 graczy i 20 000 transakcji (generate_player_sales.py
+--scale-factor SF mnoży oba) oraz skindata_raw.lua i ddragon_skins.csv z repo.
+Katalog skinów rośnie razem z SF (championy powielone pod kluczami "Aatrox 2", ...),
+ale najwyżej --catalog-cap razy - wymiar nie rośnie jak sprzedaż.
+
+Każdy etap działa jako osobny proces na kopii skryptów w katalogu roboczym (data/raw
+z repo nie jest ruszane). Mierzony jest od startu do końca procesu: czas, wiersze/s
+wyniku i szczytowe RSS (wait4 - największy proces w drzewie, także worker generatora).
+Wyniki trafiają do raportu JSON. Z --compare raport jest porównywany z zapisanym
+baseline: etap wolniejszy albo zużywający więcej pamięci niż baseline + --tolerance to
+regresja, a skrypt kończy się wtedy kodem 1. Spadek wierszy/s między kolejnymi SF
+jest zgłaszany jako ostrzeżenie o skalowaniu.
+
+    python benchmark_scale.py --scale-factors 1 10 100 --output sf_baseline.json
+    python benchmark_scale.py --scale-factors 1 10 100 --compare sf_baseline.json
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))   # data/src_data
+DATA_DIR = os.path.dirname(SRC_DIR)                     # data
+RAW_DIR = os.path.join(DATA_DIR, "raw")                 # data/raw
+REPO_DIR = os.path.dirname(DATA_DIR)
+
+REPORT_PATH = os.path.join(DATA_DIR, "cache", "benchmarks", "scale_report.json")
+
+CATALOG_CAP = 100          # Katalog skinów rośnie z SF najwyżej tyle razy
+TOLERANCE = 0.25           # +25% czasu / pamięci względem baseline = regresja
+MIN_SECONDS_DELTA = 0.5    # Różnice czasu poniżej tego to szum (SF1 trwa ~1s)
+MIN_RSS_DELTA_MB = 32.0    # Różnice pamięci poniżej tego to szum
+
+SEED = 42
+AS_OF = "2026-01-01"
+
+
+def count_rows(patterns):
+    """Liczba wierszy danych (bez nagłówka) w plikach CSV pasujących do wzorców."""
+    rows = 0
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            with open(path, "rb") as f:
+                lines = sum(block.count(b"\n") for block in iter(lambda: f.read(16 * 1024 * 1024), b""))
+            rows += max(lines - 1, 0)
+    return rows
+
+
+def inflate_ddragon(df, factor):
+    """
+    Kopie ddragon_skins.csv pasujące do inflate_lua: champion "Aatrox 2", skin
+    "Justicar Aatrox 2" (jak f"{skin} {champion}" w parserze Wiki), champion_id "Aatrox2".
+    """
+    import pandas as pd
+
+    copies = [df]
+    for i in range(2, factor + 1):
+        copy = df.copy()
+        copy["champion_id"] = copy["champion_id"] + str(i)
+        copy["champion_name"] = copy["champion_name"] + f" {i}"
+        named = copy["skin_name"] != "default"
+        copy.loc[named, "skin_name"] = copy.loc[named, "skin_name"] + f" {i}"
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def prepare_workspace(work_dir):
+    """Kopia skryptów w work_dir/data/src_data - ich RAW_DIR wskazuje wtedy work_dir/data/raw."""
+    src_dir = os.path.join(work_dir, "data", "src_data")
+    raw_dir = os.path.join(work_dir, "data", "raw")
+    os.makedirs(src_dir, exist_ok=True)
+    os.makedirs(raw_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(SRC_DIR, "*.py")):
+        shutil.copy2(path, src_dir)
+    return src_dir, raw_dir
+
+
+def write_inputs(raw_dir, catalog_factor):
+    """Wejścia parse / merge w skali katalogu; czyści wyniki poprzedniego SF (z rejestrem skin_id)."""
+    import pandas as pd
+    from benchmark_wiki_parser import inflate_lua
+
+    for path in glob.glob(os.path.join(raw_dir, "*")):
+        os.remove(path)
+
+    with open(os.path.join(RAW_DIR, "skindata_raw.lua"), encoding="utf-8") as f:
+        lua_content = f.read()
+    if catalog_factor > 1:
+        lua_content = inflate_lua(lua_content, catalog_factor)
+    with open(os.path.join(raw_dir, "skindata_raw.lua"), "w", encoding="utf-8") as f:
+        f.write(lua_content)
+
+    df_ddragon = pd.read_csv(os.path.join(RAW_DIR, "ddragon_skins.csv"))
+    inflate_ddragon(df_ddragon, catalog_factor).to_csv(os.path.join(raw_dir, "ddragon_skins.csv"), index=False)
+
+
+def prepare_inputs(raw_dir, catalog_factor):
+    """
+    write_inputs w osobnym procesie (spawn). Proces z Popen startuje ze szczytowym RSS
+    rodzica (vfork + exec), więc benchmark sam nie może puchnąć przy powielaniu Lua
+    ani importować pandas - zawyżyłby pomiar każdego etapu.
+    """
+    process = multiprocessing.get_context("spawn").Process(target=write_inputs, args=(raw_dir, catalog_factor))
+    process.start()
+    process.join()
+    if process.exitcode != 0:
+        raise SystemExit(f"BŁĄD: przygotowanie wejść (katalog x{catalog_factor}) zakończyło się kodem {process.exitcode}")
+
+
+def run_measured(command, cwd, log_path):
+    """Uruchamia proces; zwraca (sekundy, szczytowe RSS w MB albo None bez wait4)."""
+    with open(log_path, "w", encoding="utf-8") as log:
+        started = time.perf_counter()
+        process = subprocess.Popen(command, cwd=cwd, stdout=log, stderr=subprocess.STDOUT)
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            peak_rss_mb = usage.ru_maxrss / 1024   # Linux: KB
+        else:
+            process.wait()
+            peak_rss_mb = None
+        elapsed = time.perf_counter() - started
+
+    if process.returncode != 0:
+        with open(log_path, encoding="utf-8", errors="replace") as f:
+            tail = "".join(f.readlines()[-20:])
+        raise SystemExit(f"BŁĄD: {' '.join(command[1:])} zakończył się kodem {process.returncode}\n{tail}")
+    return elapsed, peak_rss_mb
+
+
+def stage_commands(scale_factor, workers):
+    """Etap -> (argumenty skryptu, pliki wyniku do policzenia wierszy)."""
+    shards = workers if scale_factor > 1 else 1
+    return {
+        "parse": (["parse_skins_from_wiki.py", "--no-cache"], ["wiki_skins_clean.csv"]),
+        "merge": (["merge_skins.py"], ["dim_skins_final.csv"]),
+        "generate": (["generate_player_sales.py", "--seed", str(SEED), "--as-of", AS_OF,
+                      "--scale-factor", str(scale_factor), "--shards", str(shards), "--workers", str(workers)],
+                     ["dim_player.csv", "fact_sales*.csv"]),
+    }
+
+
+def bench_scale_factor(scale_factor, src_dir, raw_dir, args):
+    catalog_factor = min(scale_factor, args.catalog_cap)
+    prepare_inputs(raw_dir, catalog_factor)
+    results = {"catalog_factor": catalog_factor, "stages": {}}
+
+    for stage, (command, outputs) in stage_commands(scale_factor, args.workers).items():
+        best = None
+        for _ in range(args.repeat):
+            log_path = os.path.join(args.work_dir, f"sf{scale_factor}_{stage}.log")
+            seconds, peak_rss_mb = run_measured([sys.executable] + command, src_dir, log_path)
+            if best is None or seconds < best[0]:
+                best = (seconds, peak_rss_mb)
+
+        seconds, peak_rss_mb = best
+        rows = count_rows([os.path.join(raw_dir, name) for name in outputs])
+        results["stages"][stage] = {
+            "wall_seconds": round(seconds, 3),
+            "rows": rows,
+            "rows_per_second": round(rows / seconds, 1),
+            "peak_rss_mb": None if peak_rss_mb is None else round(peak_rss_mb, 1),
+        }
+        rss = "-" if peak_rss_mb is None else f"{peak_rss_mb:,.0f} MB"
+        print(f"  {stage:9s}: {seconds:9.2f}s  {rows:>13,} wierszy  {rows / seconds:>12,.0f} wierszy/s  RSS {rss}")
+
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def scaling_warnings(results, tolerance):
+    """Spadek wierszy/s etapu między kolejnymi SF o więcej niż tolerancję (koszt rośnie ponadliniowo)."""
+    warnings = []
+    scale_factors = sorted(results, key=int)
+    for smaller, larger in zip(scale_factors, scale_factors[1:]):
+        for stage, current in results[larger]["stages"].items():
+            previous = results[smaller]["stages"].get(stage)
+            if previous and current["rows_per_second"] < previous["rows_per_second"] / (1 + tolerance):
+                warnings.append(
+                    f"{stage}: SF{smaller} -> SF{larger} przepustowość "
+                    f"{previous['rows_per_second']:,.0f} -> {current['rows_per_second']:,.0f} wierszy/s"
+                )
+    return warnings
+
+
+def compare_reports(current, baseline, tolerance):
+    """Regresje czasu i pamięci względem baseline (tylko SF i etapy obecne w obu raportach)."""
+    regressions = []
+    print(f"\nPorównanie z baseline ({baseline.get('created_at')}, commit {baseline.get('git_commit')}):")
+    for scale_factor, result in sorted(current["results"].items(), key=lambda item: int(item[0])):
+        base_result = baseline["results"].get(scale_factor)
+        if base_result is None:
+            continue
+        for stage, measured in result["stages"].items():
+            base = base_result["stages"].get(stage)
+            if base is None:
+                continue
+
+            ratio = measured["wall_seconds"] / base["wall_seconds"]
+            status = "OK"
+            if ratio > 1 + tolerance and measured["wall_seconds"] - base["wall_seconds"] > MIN_SECONDS_DELTA:
+                status = "REGRESJA czasu"
+            if measured["peak_rss_mb"] and base["peak_rss_mb"]:
+                rss_ratio = measured["peak_rss_mb"] / base["peak_rss_mb"]
+                if rss_ratio > 1 + tolerance and measured["peak_rss_mb"] - base["peak_rss_mb"] > MIN_RSS_DELTA_MB:
+                    status = "REGRESJA pamięci" if status == "OK" else "REGRESJA czasu i pamięci"
+            if status != "OK":
+                regressions.append(f"SF{scale_factor} {stage}: {status}")
+
+            print(f"  SF{scale_factor:<6s} {stage:9s}: {base['wall_seconds']:9.2f}s -> "
+                  f"{measured['wall_seconds']:9.2f}s ({ratio:5.2f}x)  {status}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="parse / merge / generate w skalach SF1..SF10000")
+    parser.add_argument("--scale-factors", type=int, nargs="+", default=[1, 10, 100],
+                        help="Skale (SF1 = 5 000 graczy i 20 000 transakcji)")
+    parser.add_argument("--catalog-cap", type=int, default=CATALOG_CAP,
+                        help="Najwyższe powielenie katalogu skinów (Lua / Data Dragon)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Procesy i shardy generatora (SF > 1)")
+    parser.add_argument("--repeat", type=int, default=1, help="Ile przebiegów (liczy się najlepszy)")
+    parser.add_argument("--output", default=REPORT_PATH, help="Raport JSON")
+    parser.add_argument("--compare", default=None, help="Raport baseline do porównania")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="Dopuszczalny wzrost czasu / pamięci (0.25 = +25%%)")
+    parser.add_argument("--work-dir", default=None,
+                        help="Katalog roboczy (duże SF potrzebują miejsca na fact_sales)")
+    args = parser.parse_args()
+
+    print("="*60)
+    print("BENCHMARK SKALI (SF)")
+    print("="*60)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    keep_work_dir = args.work_dir is not None
+    args.work_dir = args.work_dir or tempfile.mkdtemp(prefix="lol_dw_sf_")
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "workers": args.workers,
+        "results": {},
+    }
+
+    try:
+        src_dir, raw_dir = prepare_workspace(args.work_dir)
+        for scale_factor in sorted(args.scale_factors):
+            print(f"\nSF{scale_factor} (katalog x{min(scale_factor, args.catalog_cap)})")
+            report["results"][str(scale_factor)] = bench_scale_factor(scale_factor, src_dir, raw_dir, args)
+    finally:
+        if not keep_work_dir:
+            shutil.rmtree(args.work_dir, ignore_errors=True)
+
+    report["scaling_warnings"] = scaling_warnings(report["results"], args.tolerance)
+    if report["scaling_warnings"]:
+        print("\nUWAGA - przepustowość spada ze skalą:")
+        for warning in report["scaling_warnings"]:
+            print(f"  {warning}")
+
+    regressions = []
+    if baseline is not None:
+        regressions = compare_reports(report, baseline, args.tolerance)
+        report["compared_to"] = args.compare
+        report["regressions"] = regressions
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nRaport: {args.output}")
+
+    if regressions:
+        raise SystemExit("BŁĄD: regresje względem baseline:\n  " + "\n  ".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
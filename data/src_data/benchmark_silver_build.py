@@ -0,0 +1,83 @@
+"""
+Benchmark budowy Silver: silver_clean_data.sql (INSERT + 4 x UPDATE + kwarantanna)
+vs silver_clean_data_single_scan.sql (jeden INSERT ... SELECT po bronze).
+
+Dla każdej skali bronze.stg_sales jest powiększane do zadanej liczby wierszy
+(kopie istniejących transakcji z przesuniętym transaction_id), oba skrypty są
+uruchamiane na tych samych danych, a silver.fact_sale i fact_sale_quarantine
+porównywane sumą kontrolną (bez sale_key / quarantine_id / znaczników czasu).
+Na końcu kopie są usuwane, a Silver przebudowany zwykłym skryptem.
+
+UWAGA: skrypty przebudowują schemat silver - uruchamiaj na bazie testowej.
+
+    python benchmark_silver_build.py --rows 10000000 100000000
+"""
+import argparse
+import os
+
+from benchmark_sql_build import (
+    base_transaction_range, bench_scale, inflate_table, remove_copies, report, run_script, table_checksums,
+)
+from load_bronze import REPO_DIR, connect
+
+SILVER_DIR = os.path.join(REPO_DIR, "sql", "silver")
+SCRIPTS = {
+    "multi_pass": os.path.join(SILVER_DIR, "silver_clean_data.sql"),
+    "single_scan": os.path.join(SILVER_DIR, "silver_clean_data_single_scan.sql"),
+}
+
+SOURCE_TABLE = "bronze.stg_sales"
+SOURCE_COLUMNS = ["player_id", "skin_id", "purchase_date", "price_rp", "quantity", "loaded_at"]
+# Usunięcie wyniku poprzedniego przebiegu (po UPDATE-ach spuchniętego) poza pomiarem
+RESET_SQL = "DROP TABLE IF EXISTS silver.fact_sale, silver.fact_sale_quarantine CASCADE"
+
+CHECKED_TABLES = {
+    "fact_sale": "transaction_id, player_key, skin_key, date_key, price_rp, quantity, total_rp, is_valid, dq_issues",
+    "fact_sale_quarantine": "transaction_id, player_id, skin_id, purchase_date, price_rp, quantity, rejection_reason",
+}
+
+
+def silver_checksums(conn):
+    return table_checksums(conn, "silver", CHECKED_TABLES)
+
+
+def summary(checksums):
+    return f"fact_sale: {checksums['fact_sale'][0]:,}, kwarantanna: {checksums['fact_sale_quarantine'][0]:,}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Silver: multi-pass vs single-scan na powiększonym bronze")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000_000, 100_000_000],
+                        help="Rozmiary bronze.stg_sales (rosnąco)")
+    parser.add_argument("--repeat", type=int, default=1, help="Ile przebiegów (liczy się najlepszy)")
+    parser.add_argument("--dsn", default=None, help="Connection string (zamiast zmiennych DB_*)")
+    args = parser.parse_args()
+
+    print("="*60)
+    print("BENCHMARK BUDOWY SILVER")
+    print("="*60)
+
+    all_same = True
+    with connect(args.dsn) as conn:
+        conn.autocommit = True
+        base_rows, base_max_id = base_transaction_range(conn, SOURCE_TABLE)
+        if not base_rows:
+            raise SystemExit("BŁĄD: bronze.stg_sales jest puste - najpierw load_bronze.py")
+        print(f"Bazowe bronze.stg_sales: {base_rows:,} wierszy (transaction_id <= {base_max_id})")
+
+        try:
+            for target_rows in sorted(args.rows):
+                rows = inflate_table(conn, SOURCE_TABLE, SOURCE_COLUMNS, base_rows, base_max_id, target_rows)
+                results = bench_scale(conn, SCRIPTS, silver_checksums, args.repeat, RESET_SQL)
+                all_same &= report(SOURCE_TABLE, rows, results, summary)
+        finally:
+            print("\nPrzywracanie bronze.stg_sales i Silver...")
+            remove_copies(conn, SOURCE_TABLE, base_max_id)
+            run_script(conn, SCRIPTS["multi_pass"], RESET_SQL)
+
+    if not all_same:
+        raise SystemExit("BŁĄD: single_scan daje inne wiersze niż silver_clean_data.sql")
+
+
+if __name__ == "__main__":
+    main()
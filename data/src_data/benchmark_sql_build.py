@@ -0,0 +1,108 @@
+"""
+Wspólne części benchmarków budowy warstw w SQL (benchmark_silver_build.py,
+benchmark_gold_build.py): powiększanie tabeli wejściowej kopiami istniejących
+transakcji, pomiar dwóch skryptów na tych samych danych i sumy kontrolne wyników.
+
+Każdy benchmark podaje tylko swoją parę skryptów, tabelę wejściową, SQL czyszczący
+wynik przed pomiarem i tabele do porównania.
+"""
+import time
+
+from load_bronze import read_sql
+
+# Suma kontrolna niezależna od kolejności: COUNT + suma 60 bitów md5 każdego wiersza
+CHECKSUM_SQL = """
+SELECT COUNT(*), COALESCE(SUM(('x' || SUBSTR(MD5(t::TEXT), 1, 15))::BIT(60)::BIGINT), 0)
+FROM (SELECT {columns} FROM {schema}.{table}) t
+"""
+
+
+def base_transaction_range(conn, table):
+    """(liczba wierszy, max transaction_id) tabeli `table` przed powiększeniem."""
+    return conn.execute(f"SELECT COUNT(*), COALESCE(MAX(transaction_id), 0) FROM {table}").fetchone()
+
+
+def inflate_table(conn, table, columns, base_rows, base_max_id, target_rows):
+    """
+    Dokłada do `table` kopie bazowych wierszy (transaction_id + k * offset) aż do target_rows.
+    `columns` to kopiowane kolumny poza transaction_id. offset to najbliższa potęga 10
+    powyżej max transaction_id, więc id są unikalne i mieszczą się w INTEGER
+    (kwarantanna Silver i gold rzutują transaction_id::INTEGER).
+    """
+    current = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    missing = target_rows - current
+    if missing <= 0:
+        return current
+
+    offset = 10 ** len(str(int(base_max_id)))
+    first_copy = -(-(current - base_rows) // base_rows) + 1   # ostatnia kopia mogła być niepełna
+    last_copy = first_copy + (missing + base_rows - 1) // base_rows - 1
+    if (last_copy + 1) * offset > 2**31 - 1:
+        raise SystemExit(f"BŁĄD: {target_rows:,} wierszy nie zmieści transaction_id w INTEGER")
+
+    started = time.perf_counter()
+    conn.execute(f"""
+        INSERT INTO {table} (transaction_id, {", ".join(columns)})
+        SELECT s.transaction_id + g * %(offset)s::NUMERIC, {", ".join(f"s.{column}" for column in columns)}
+        FROM generate_series(%(first)s::INTEGER, %(last)s::INTEGER) g
+        CROSS JOIN (SELECT * FROM {table} WHERE transaction_id <= %(base_max)s) s
+        LIMIT %(missing)s
+    """, {"offset": offset, "first": first_copy, "last": last_copy,
+          "base_max": base_max_id, "missing": missing})
+    conn.execute(f"VACUUM ANALYZE {table}")
+    print(f"  {table}: +{missing:,} wierszy w {time.perf_counter() - started:.1f}s")
+    return target_rows
+
+
+def remove_copies(conn, table, base_max_id):
+    """Usuwa kopie dołożone przez inflate_table."""
+    conn.execute(f"DELETE FROM {table} WHERE transaction_id > %s", (base_max_id,))
+    conn.execute(f"VACUUM ANALYZE {table}")
+
+
+def run_script(conn, path, reset_sql=None):
+    """Czas wykonania skryptu; reset_sql (wynik poprzedniego przebiegu) i CHECKPOINT poza pomiarem."""
+    sql = read_sql(path)
+    if reset_sql:
+        conn.execute(reset_sql)
+    conn.execute("CHECKPOINT")
+    started = time.perf_counter()
+    conn.execute(sql)
+    return time.perf_counter() - started
+
+
+def table_checksums(conn, schema, tables):
+    """{tabela: (COUNT, suma md5)} dla tabel {nazwa: kolumny} w schemacie `schema`."""
+    return {
+        table: tuple(conn.execute(CHECKSUM_SQL.format(columns=columns, schema=schema, table=table)).fetchone())
+        for table, columns in tables.items()
+    }
+
+
+def bench_scale(conn, scripts, checksums, repeat, reset_sql=None):
+    """Najlepszy czas z `repeat` przebiegów każdego skryptu + checksums(conn) po ostatnim."""
+    results = {}
+    for name, path in scripts.items():
+        best = None
+        for _ in range(repeat):
+            elapsed = run_script(conn, path, reset_sql)
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = (best, checksums(conn))
+    return results
+
+
+def report(table, rows, results, summary):
+    """
+    Czasy i wiersze/s każdego skryptu, przyspieszenie drugiego względem pierwszego
+    i zgodność sum kontrolnych. summary(checksums) -> opis wyniku w nawiasie.
+    """
+    print(f"\n{table} = {rows:,} wierszy")
+    width = max(len(name) for name in results)
+    for name, (seconds, _) in results.items():
+        print(f"  {name:{width}s}: {seconds:9.2f}s  {rows / seconds:>12,.0f} wierszy/s")
+
+    (baseline_seconds, baseline), (candidate_seconds, candidate) = results.values()
+    same = baseline == candidate
+    print(f"  przyspieszenie: {baseline_seconds / candidate_seconds:.1f}x")
+    print(f"  wyniki identyczne: {'TAK' if same else 'NIE'} ({summary(candidate)})")
+    return same
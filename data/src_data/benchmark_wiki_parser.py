@@ -0,0 +1,100 @@
+"""
+Benchmark parsowania skindata_raw.lua: dawny parser regexowy vs tokenizer lua_table.
+
+Mierzy oba parsery na pliku z repo i na sztucznie powiększonym pliku
+(--inflate razy te same championy pod zmienionymi kluczami w jednym `return { }`)
+i sprawdza, czy tokenizer zwraca co najmniej te same skiny co regex.
+
+    python benchmark_wiki_parser.py --inflate 100 --repeat 3
+"""
+import argparse
+import gc
+import os
+import re
+import tempfile
+import time
+
+import lua_table
+from parse_skins_from_wiki import INPUT_LUA, parse_skins_lua, parse_skins_regex
+
+# Champion na najwyższym poziomie: dokładnie 2 spacje wcięcia
+CHAMPION_KEY = re.compile(r'^  \["([^"]+)"\] = \{', re.MULTILINE)
+
+
+def inflate_lua(lua_content, factor):
+    """Powiela championy `factor` razy (klucze "Aatrox", "Aatrox 2", ...) w jednej tabeli."""
+    start = lua_content.index("return {") + len("return {")
+    end = lua_content.rindex("}")
+    body = lua_content[start:end].rstrip().rstrip(",")
+
+    copies = [body]
+    for i in range(2, factor + 1):
+        copies.append(CHAMPION_KEY.sub(lambda m: f'  ["{m.group(1)} {i}"] = {{', body))
+    return "return {" + ",\n".join(copies) + "\n}\n"
+
+
+def time_parsers(path, repeat):
+    """Najlepszy czas z `repeat` przebiegów dla obu parserów. Zwraca {nazwa: (sekundy, skiny)}."""
+    def run_regex():
+        with open(path, "r", encoding="utf-8") as f:
+            return parse_skins_regex(f.read(), verbose=False)
+
+    def run_lua():
+        # Jak parse_skins_from_wiki.main(): drzewo w stałej generacji GC na czas parse_skins_lua
+        tree = lua_table.parse_file(path)
+        gc.freeze()
+        try:
+            return parse_skins_lua(tree, verbose=False)
+        finally:
+            gc.unfreeze()
+
+    results = {}
+    for name, run in [("regex", run_regex), ("lua_table", run_lua)]:
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            skins, _ = run()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = (best, skins)
+    return results
+
+
+def report(label, path, results):
+    size_mb = os.path.getsize(path) / 1024 / 1024
+    print(f"\n{label} ({size_mb:,.1f} MB)")
+    for name, (seconds, skins) in results.items():
+        print(f"  {name:10s}: {seconds:8.3f}s  {len(skins):>8,} skinów  {size_mb / seconds:8.1f} MB/s")
+
+    regex_names = {skin["skin_name"] for skin in results["regex"][1]}
+    lua_names = {skin["skin_name"] for skin in results["lua_table"][1]}
+    speedup = results["regex"][0] / results["lua_table"][0]
+    print(f"  przyspieszenie: {speedup:.1f}x")
+    print(f"  tylko regex: {len(regex_names - lua_names)}, tylko lua_table: {len(lua_names - regex_names)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regex vs lua_table na skindata_raw.lua")
+    parser.add_argument("--inflate", type=int, default=100, help="Ile razy powielić plik (0 = pomiń)")
+    parser.add_argument("--repeat", type=int, default=3, help="Ile przebiegów (liczy się najlepszy)")
+    args = parser.parse_args()
+
+    print("="*60)
+    print("BENCHMARK PARSERA SKINDATA.LUA")
+    print("="*60)
+
+    report("Plik z repo", INPUT_LUA, time_parsers(INPUT_LUA, args.repeat))
+
+    if args.inflate > 1:
+        with open(INPUT_LUA, "r", encoding="utf-8") as f:
+            inflated = inflate_lua(f.read(), args.inflate)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, f"skindata_x{args.inflate}.lua")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(inflated)
+            report(f"Plik x{args.inflate}", path, time_parsers(path, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
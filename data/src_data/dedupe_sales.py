@@ -0,0 +1,301 @@
+"""
+Deduplikacja fact_sales przed ładowaniem do bronze.
+
+generate_player_sales.py wstrzykuje 1% duplikatów: ta sama sprzedaż pod nowym transaction_id.
+Silver ich nie wykrywa, więc trafiały do gold.fact_sales i zawyżały przychód w widokach.
+Każdy wiersz dostaje 64-bitowy odcisk kolumn biznesowych (BUSINESS_COLUMNS, puste wartości
+też się liczą). Pierwsze wystąpienie (kolejność plików / shardów, potem wierszy) zostaje,
+kolejne idą do kwarantanny z rejection_reason = 'duplicate'.
+
+Tryby:
+  exact       - jeden przebieg, zbiór odcisków w pamięci (~70 B na unikalny wiersz) -
+                do kilkudziesięciu milionów wierszy.
+  partitioned - pamięć ograniczona niezależnie od liczby wierszy:
+                1. odciski + pozycje wierszy rozlane do --partitions plików wg odcisku,
+                2. każda partycja osobno -> pozycje duplikatów (~16 B x wiersze / partycje),
+                3. drugi odczyt plików i rozdział wierszy.
+                Kroki 1 i 3 idą równolegle po plikach / shardach, krok 2 po partycjach.
+Oba tryby dają ten sam wynik. Kolizja odcisków (fałszywy duplikat) przy 100 mln wierszy
+ma prawdopodobieństwo ~0,03%.
+
+Wynik jak w validate_sales.py: czyste pliki w data/deduped/<ta sama nazwa>, duplikaty
+w data/deduped/fact_sales_quarantine.csv, liczniki w dedupe_report.json.
+
+    python dedupe_sales.py
+    python dedupe_sales.py --mode partitioned --workers 8
+    python dedupe_sales.py --input-dir data/validated          # po validate_sales.py
+    python load_bronze.py --tables stg_sales stg_sales_quarantine --sales-dir data/deduped
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from load_bronze import find_raw_files
+from raw_writers import CsvChunkWriter, open_writers, raw_stem
+from stage_metrics import instrumented, record_input, record_output
+from validate_sales import QUARANTINE_COLUMNS, iter_sales_chunks
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))   # data/src_data
+DATA_DIR = os.path.dirname(SRC_DIR)                     # data
+RAW_DIR = os.path.join(DATA_DIR, "raw")                 # data/raw
+DEDUPED_DIR = os.path.join(DATA_DIR, "deduped")         # data/deduped
+
+MODES = ["exact", "partitioned"]
+PARTITIONS = 64
+DUPLICATE_REASON = "duplicate"
+
+# Sprzedaż = te kolumny; transaction_id duplikatu jest inny
+BUSINESS_COLUMNS = ["player_id", "skin_id", "purchase_date", "price_rp", "quantity"]
+
+# Pozycja wiersza = indeks pliku << ROW_BITS | numer wiersza w pliku (rośnie w kolejności przetwarzania)
+ROW_BITS = 40
+SPILL_DTYPE = np.dtype([("fingerprint", "<u8"), ("position", "<u8")])
+
+
+def fingerprints(df):
+    """Paczka -> uint64 odcisk kolumn biznesowych. CSV i Parquet dają te same odciski."""
+    key = pd.DataFrame({
+        column: (df[column].astype("string").fillna("") if column == "purchase_date"
+                 else pd.to_numeric(df[column], errors="coerce").astype(np.float64))
+        for column in BUSINESS_COLUMNS
+    })
+    return pd.util.hash_pandas_object(key, index=False).to_numpy()
+
+
+class ExactDeduper:
+    """Tryb exact: odciski wszystkich dotychczasowych wierszy w jednym zbiorze."""
+
+    def __init__(self):
+        self.seen = set()
+
+    def duplicates(self, chunk, first_row):
+        chunk_fingerprints = fingerprints(chunk)
+        mask = pd.Series(chunk_fingerprints).duplicated().to_numpy()   # wcześniej w tej paczce
+
+        values = chunk_fingerprints.tolist()
+        known = self.seen.intersection(values)                         # wcześniejsze paczki / pliki
+        if known:
+            mask = mask | np.isin(chunk_fingerprints, np.fromiter(known, dtype=np.uint64, count=len(known)))
+        self.seen.update(values)
+        return mask
+
+
+def route_file(task, duplicate_mask):
+    """
+    Jeden plik fact_sales -> czysty plik (tymczasowy) + część kwarantanny.
+    duplicate_mask(paczka, numer pierwszego wiersza) -> maska duplikatów.
+    Zwraca (ścieżka wejścia, wiersze, duplikaty).
+    """
+    input_path, clean_stem, output_format, quarantine_path = task
+    clean_writers = open_writers(clean_stem, "fact_sales", output_format)
+    quarantine_writer = CsvChunkWriter(quarantine_path)
+
+    rows = duplicates = 0
+    for chunk in iter_sales_chunks(input_path):
+        duplicate = duplicate_mask(chunk, rows)
+        for writer in clean_writers:
+            writer.write(chunk[~duplicate])
+        quarantine_writer.write(chunk[duplicate].assign(rejection_reason=DUPLICATE_REASON))
+        rows += len(chunk)
+        duplicates += int(duplicate.sum())
+
+    for writer in clean_writers:
+        writer.close()
+    quarantine_writer.close()
+    return input_path, rows, duplicates
+
+
+def spill_file(task):
+    """Tryb partitioned, krok 1: (odcisk, pozycja) wierszy pliku -> spill_dir/p<partycja>-f<plik>.bin."""
+    file_index, input_path, spill_dir, partitions = task
+    spill_files = {}
+    rows = 0
+    for chunk in iter_sales_chunks(input_path):
+        records = np.empty(len(chunk), dtype=SPILL_DTYPE)
+        records["fingerprint"] = fingerprints(chunk)
+        records["position"] = (file_index << ROW_BITS) + rows + np.arange(len(chunk), dtype=np.uint64)
+        rows += len(chunk)
+
+        partition = records["fingerprint"] % np.uint64(partitions)
+        order = np.argsort(partition, kind="stable")   # w partycji kolejność wierszy zostaje
+        bounds = np.searchsorted(partition[order], np.arange(partitions + 1))
+        for p in np.flatnonzero(np.diff(bounds)):
+            if p not in spill_files:
+                spill_files[p] = open(os.path.join(spill_dir, f"p{p:04d}-f{file_index:04d}.bin"), "wb")
+            records[order[bounds[p]:bounds[p + 1]]].tofile(spill_files[p])
+
+    for f in spill_files.values():
+        f.close()
+    return input_path, rows
+
+
+def partition_duplicates(task):
+    """Tryb partitioned, krok 2: pozycje duplikatów w jednej partycji (pliki po kolei = kolejność wierszy)."""
+    partition, spill_dir, num_files = task
+    paths = [os.path.join(spill_dir, f"p{partition:04d}-f{i:04d}.bin") for i in range(num_files)]
+    parts = [np.fromfile(path, dtype=SPILL_DTYPE) for path in paths if os.path.exists(path)]
+    if not parts:
+        return np.empty(0, dtype=np.uint64)
+
+    records = np.concatenate(parts)
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+    duplicate = pd.Series(records["fingerprint"]).duplicated().to_numpy()
+    return records["position"][duplicate]
+
+
+def route_partitioned(task):
+    """Tryb partitioned, krok 3: rozdział wierszy pliku wg posortowanych numerów duplikatów."""
+    route_task, duplicate_rows = task
+
+    def duplicate_mask(chunk, first_row):
+        mask = np.zeros(len(chunk), dtype=bool)
+        start, end = np.searchsorted(duplicate_rows, [first_row, first_row + len(chunk)])
+        mask[duplicate_rows[start:end] - first_row] = True
+        return mask
+
+    return route_file(route_task, duplicate_mask)
+
+
+def dedupe_exact(tasks):
+    deduper = ExactDeduper()
+    for task in tasks:
+        yield route_file(task, deduper.duplicates)
+
+
+def dedupe_partitioned(tasks, partitions, workers, spill_root):
+    spill_dir = tempfile.mkdtemp(prefix="tmp-spill-", dir=spill_root)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            spill_tasks = [(index, task[0], spill_dir, partitions) for index, task in enumerate(tasks)]
+            for input_path, rows in pool.map(spill_file, spill_tasks):
+                print(f"  krok 1: {os.path.basename(input_path)}: {rows:,} odcisków")
+
+            positions = np.concatenate(list(pool.map(
+                partition_duplicates, [(p, spill_dir, len(tasks)) for p in range(partitions)]
+            )) + [np.empty(0, dtype=np.uint64)])
+            positions.sort()
+            print(f"  krok 2: {partitions} partycji, duplikatów: {len(positions):,}")
+
+            file_index = positions >> np.uint64(ROW_BITS)
+            row_mask = np.uint64((1 << ROW_BITS) - 1)
+            route_tasks = [(task, (positions[file_index == index] & row_mask).astype(np.int64))
+                           for index, task in enumerate(tasks)]
+            yield from pool.map(route_partitioned, route_tasks)
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+
+@instrumented("dedupe")
+def main():
+    parser = argparse.ArgumentParser(description="Deduplikacja fact_sales przed COPY do bronze")
+    parser.add_argument("--mode", choices=MODES, default="exact",
+                        help="exact (zbiór w pamięci) albo partitioned (ograniczona pamięć)")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                        help="Które pliki deduplikować (czyste pliki mają ten sam format)")
+    parser.add_argument("--input-dir", default=RAW_DIR,
+                        help="Katalog z fact_sales* (np. data/validated po validate_sales.py)")
+    parser.add_argument("--output-dir", default=DEDUPED_DIR,
+                        help="Katalog na czyste pliki, kwarantannę i raport")
+    parser.add_argument("--partitions", type=int, default=PARTITIONS,
+                        help="Partycje odcisków w trybie partitioned (pamięć ~ 16 B x wiersze / partycje)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Procesy w trybie partitioned (pliki / shardy i partycje)")
+    args = parser.parse_args()
+
+    print("="*60)
+    print(f"DEDUPLIKACJA FACT_SALES (PRZED BRONZE, tryb {args.mode})")
+    print("="*60)
+
+    input_paths = find_raw_files("stg_sales", args.format, args.input_dir)
+    if not input_paths:
+        print(f"BŁĄD: Brak plików fact_sales*.{args.format} w {args.input_dir}")
+        exit(1)
+    print(f"Pliki: {len(input_paths)}, odcisk: {', '.join(BUSINESS_COLUMNS)}")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for old_file in glob.glob(os.path.join(args.output_dir, "fact_sales*")) + \
+            glob.glob(os.path.join(args.output_dir, "tmp-*")):
+        if os.path.isdir(old_file):
+            shutil.rmtree(old_file)
+        else:
+            os.remove(old_file)
+
+    # Czyste pliki najpierw jako tmp-<nazwa>, rename po przetworzeniu wszystkich
+    tasks = []
+    for index, input_path in enumerate(input_paths):
+        name = os.path.basename(raw_stem(input_path))
+        tasks.append((input_path,
+                      os.path.join(args.output_dir, f"tmp-{name}"),
+                      args.format,
+                      os.path.join(args.output_dir, f"tmp-quarantine-{index:04d}.csv")))
+
+    started = time.perf_counter()
+    if args.mode == "exact":
+        results = dedupe_exact(tasks)
+    else:
+        workers = max(1, min(args.workers, max(len(tasks), args.partitions)))
+        results = dedupe_partitioned(tasks, args.partitions, workers, args.output_dir)
+
+    rows = duplicates = 0
+    for input_path, file_rows, file_duplicates in results:
+        print(f"  {os.path.basename(input_path)}: {file_rows:,} wierszy, duplikaty {file_duplicates:,}")
+        record_input(input_path, rows=file_rows)
+        rows += file_rows
+        duplicates += file_duplicates
+    elapsed = time.perf_counter() - started
+
+    # Kwarantanna: części -> jeden plik
+    quarantine_path = os.path.join(args.output_dir, "fact_sales_quarantine.csv")
+    with open(quarantine_path, "w", newline="") as out:
+        out.write(",".join(QUARANTINE_COLUMNS) + "\n")
+        for _, _, _, part_path in tasks:
+            with open(part_path) as part:
+                next(part, None)  # nagłówek części
+                for line in part:
+                    out.write(line)
+            os.remove(part_path)
+
+    clean_paths = []
+    for _, clean_stem, output_format, _ in tasks:
+        tmp_path = f"{clean_stem}.{output_format}"
+        final_path = os.path.join(args.output_dir, os.path.basename(tmp_path)[len("tmp-"):])
+        os.replace(tmp_path, final_path)
+        clean_paths.append(final_path)
+    record_output(clean_paths + [quarantine_path], rows=rows - duplicates)
+
+    duplicate_pct = round(duplicates / rows * 100, 2) if rows else 0.0
+    report_path = os.path.join(args.output_dir, "dedupe_report.json")
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "mode": args.mode,
+            "partitions": args.partitions if args.mode == "partitioned" else None,
+            "business_columns": BUSINESS_COLUMNS,
+            "rows": rows,
+            "duplicates": duplicates,
+            "duplicate_pct": duplicate_pct,
+            "clean_rows": rows - duplicates,
+            "seconds": round(elapsed, 3),
+            "inputs": [os.path.basename(path) for path in input_paths],
+            "clean_files": [os.path.basename(path) for path in clean_paths],
+        }, f, indent=2)
+
+    print(f"\nWierszy: {rows:,} w {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} wierszy/s)")
+    print(f"Duplikaty: {duplicates:,} ({duplicate_pct:.2f}%)")
+    print(f"\n✓ Kwarantanna: {quarantine_path} (rejection_reason = {DUPLICATE_REASON})")
+    print(f"✓ Raport: {report_path}")
+    print(f"✓ Czyste pliki: {len(clean_paths)} w {args.output_dir}")
+    print("\nDalej: load_bronze.py --tables stg_sales stg_sales_quarantine --sales-dir data/deduped")
+
+
+if __name__ == "__main__":
+    main()
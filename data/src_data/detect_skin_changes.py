@@ -0,0 +1,160 @@
+"""
+Wykrywanie zmian w dim_skins_final między przebiegami (wejście dla SCD2 dim_skin).
+
+Dla każdego skina liczony jest row_hash = md5(price_rp|rarity|release_date|
+champion_name|skin_name) i porównywany z poprzednim snapshotem
+(data/raw/dim_skins_snapshot.csv: skin_id, row_hash). Do dim_skins_changes
+trafiają tylko różnice:
+  insert - nowy skin_id,
+  update - ten sam skin_id, inny row_hash,
+  retire - skin_id zniknął z dim_skins_final.
+Patch, który zmienia 20 skinów, daje 20 wierszy - sql/gold/gold_dim_skin_scd2.sql
+nakłada je na gold.dim_skin_history bez przebudowy całego wymiaru.
+
+Nowy snapshot trafia najpierw do dim_skins_snapshot.pending.csv. Dopiero
+`--commit` (po udanym gold_dim_skin_scd2.sql) zastępuje nim snapshot. Jeśli
+load albo SCD2 padnie, kolejny przebieg liczy różnice od ostatniego nałożonego
+stanu i ta sama delta wraca w dim_skins_changes (SCD2 jest idempotentny).
+"""
+import argparse
+import hashlib
+import os
+from datetime import date
+
+import pandas as pd
+
+from raw_writers import OUTPUT_FORMATS, raw_stem, write_frame
+from stage_metrics import instrumented, record_input, record_output
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))   # data/src_data
+DATA_DIR = os.path.dirname(SRC_DIR)                     # data
+RAW_DIR = os.path.join(DATA_DIR, "raw")                 # data/raw
+
+skins_path = os.path.join(RAW_DIR, "dim_skins_final.csv")
+snapshot_path = os.path.join(RAW_DIR, "dim_skins_snapshot.csv")
+pending_snapshot_path = os.path.join(RAW_DIR, "dim_skins_snapshot.pending.csv")
+changes_path = os.path.join(RAW_DIR, "dim_skins_changes.csv")
+
+HASH_COLUMNS = ['price_rp', 'rarity', 'release_date', 'champion_name', 'skin_name']
+SKIN_COLUMNS = ['skin_id', 'champion_name', 'skin_name', 'rarity', 'price_rp',
+                'release_date', 'champion_id', 'skin_num']
+CHANGE_COLUMNS = ['skin_id', 'change_type', 'effective_date', 'row_hash'] + SKIN_COLUMNS[1:]
+
+
+def row_hash(df):
+    """md5 z kolumn HASH_COLUMNS (puste -> ''), w SQL: md5(concat_ws('|', ..., COALESCE(release_date::text, ''), ...))."""
+    parts = df[HASH_COLUMNS].astype(object).where(df[HASH_COLUMNS].notna(), "").astype(str)
+    joined = parts.apply("|".join, axis=1)
+    return joined.map(lambda text: hashlib.md5(text.encode("utf-8")).hexdigest())
+
+
+def load_snapshot(path=snapshot_path):
+    if not os.path.exists(path):
+        return pd.DataFrame({'skin_id': pd.Series(dtype=int), 'row_hash': pd.Series(dtype=str)})
+    return pd.read_csv(path, dtype={'row_hash': str})
+
+
+def detect_changes(df_skins, df_snapshot, effective_date, full=False):
+    """
+    Bieżące skiny + poprzedni snapshot -> (changes, snapshot).
+    full=True: wszystkie bieżące skiny jako insert (ponowne zasilenie SCD2 od zera).
+    """
+    current = df_skins[SKIN_COLUMNS].copy()
+    current['row_hash'] = row_hash(current)
+
+    previous = df_snapshot.set_index('skin_id')['row_hash']
+    if full:
+        previous = previous.iloc[:0]
+
+    known = current['skin_id'].isin(previous.index)
+    changed = known & (current['row_hash'].to_numpy() != previous.reindex(current['skin_id']).to_numpy())
+
+    inserts = current[~known].assign(change_type='insert')
+    updates = current[changed].assign(change_type='update')
+    retired_ids = previous.index.difference(current['skin_id'])
+    retires = pd.DataFrame({'skin_id': retired_ids, 'row_hash': previous.loc[retired_ids].to_numpy(),
+                            'change_type': 'retire'})
+
+    changes = pd.concat([inserts, updates, retires], ignore_index=True)
+    changes['effective_date'] = effective_date
+    changes = changes.reindex(columns=CHANGE_COLUMNS).sort_values('skin_id').reset_index(drop=True)
+    for column in ['skin_id', 'price_rp', 'skin_num']:
+        changes[column] = changes[column].astype('Int64')  # retire ma puste kolumny - bez 520.0 w CSV
+
+    snapshot = current[['skin_id', 'row_hash']].sort_values('skin_id').reset_index(drop=True)
+    return changes, snapshot
+
+
+def write_snapshot(snapshot, path):
+    tmp_path = path + ".tmp"
+    snapshot.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def commit_snapshot(pending_path=pending_snapshot_path, path=snapshot_path):
+    """Oczekujący snapshot -> snapshot (delta nałożona). False, gdy nie ma czego zatwierdzać."""
+    if not os.path.exists(pending_path):
+        return False
+    os.replace(pending_path, path)
+    return True
+
+
+@instrumented("changes")
+def main():
+    parser = argparse.ArgumentParser(description="Row-hash diff dim_skins_final -> dim_skins_changes (SCD2)")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date.today(),
+                        help="Data obowiązywania zmian (valid_from nowych wersji), domyślnie dziś")
+    parser.add_argument("--full", action="store_true",
+                        help="Ignoruj snapshot - wszystkie skiny jako insert (zasilenie SCD2 od nowa)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="csv",
+                        help="Format pliku zmian: csv, parquet albo oba")
+    parser.add_argument("--commit", action="store_true",
+                        help="Po udanym gold_dim_skin_scd2.sql: oczekujący snapshot staje się snapshotem")
+    args = parser.parse_args()
+
+    if args.commit:
+        if commit_snapshot():
+            record_output([snapshot_path])
+            print(f"✓ Snapshot zatwierdzony: {snapshot_path}")
+        else:
+            print(f"Brak {pending_snapshot_path} - nic do zatwierdzenia")
+        return
+
+    print("="*60)
+    print("DETEKCJA ZMIAN DIM_SKIN (ROW HASH)")
+    print("="*60)
+
+    try:
+        df_skins = pd.read_csv(skins_path)
+    except FileNotFoundError:
+        print(f"BŁĄD: Nie znaleziono {skins_path} - najpierw merge_skins.py")
+        exit(1)
+
+    record_input(skins_path, rows=len(df_skins))
+    df_snapshot = load_snapshot()
+    if os.path.exists(snapshot_path):
+        record_input(snapshot_path, rows=len(df_snapshot))
+    print(f"Skiny bieżące: {len(df_skins)}, w poprzednim snapshocie: {len(df_snapshot)}")
+
+    changes, snapshot = detect_changes(df_skins, df_snapshot, args.as_of.isoformat(), args.full)
+
+    counts = changes['change_type'].value_counts()
+    print(f"\nZmiany na {args.as_of}:")
+    for change_type in ['insert', 'update', 'retire']:
+        print(f"  {change_type:7s}: {counts.get(change_type, 0):5d}")
+    print(f"  bez zmian: {len(df_skins) - counts.get('insert', 0) - counts.get('update', 0):5d}")
+
+    written_paths = write_frame(changes, raw_stem(changes_path), "dim_skins_changes", args.format)
+
+    # Snapshot czeka na nałożenie delty (--commit po gold_dim_skin_scd2.sql)
+    write_snapshot(snapshot, pending_snapshot_path)
+    record_output(written_paths + [pending_snapshot_path], rows=len(changes))
+
+    print(f"\n✓ Zapisano: {', '.join(written_paths)}")
+    print(f"✓ Oczekujący snapshot: {pending_snapshot_path}")
+    print("\nDalej: load_bronze.py --tables stg_skin_changes --truncate, "
+          "sql/gold/gold_dim_skin_scd2.sql, potem detect_skin_changes.py --commit")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+Gold bez PostgreSQL: gwiazda i widoki analityczne w DuckDB (w procesie, wielowątkowo).
+
+Pliki raw (CSV albo Parquet, także shardy fact_sales_part-NNNN) są czytane do
+bronze.stg_* w bazie DuckDB w pamięci. Silver i Gold są liczone tymi samymi regułami
+co silver_clean_data.sql i gold_clean_data.sql: tylko poprawne wiersze, cena naprawiana
+z dim_skin, klucze wymiarów w kolejności wierszy pliku (jak SERIAL). Potem
+sql/view_results/gold_view.sql jest wykonywany bez zmian, więc widoki mają tę samą
+definicję co w PostgreSQL.
+
+--check porównuje wszystkie widoki z gold.* w PostgreSQL (zbiory wierszy, kolejność
+przy remisach w ORDER BY bywa inna). Liczby porównywane z tolerancją CHECK_TOLERANCE:
+AVG i ROUND w DuckDB liczą na DOUBLE, w PostgreSQL na NUMERIC.
+
+Wymaga pakietu duckdb (pip install duckdb). PostgreSQL tylko dla --check.
+
+    python embedded_gold.py                                # wszystkie widoki, po 10 wierszy
+    python embedded_gold.py --view revenue_trends --limit 0
+    python embedded_gold.py --format parquet --export ../cache/embedded
+    python embedded_gold.py --sales-dir ../deduped --check # ten sam wynik co pipeline?
+"""
+import argparse
+import math
+import os
+import re
+import time
+from datetime import date
+from decimal import Decimal
+
+from load_bronze import REPO_DIR, connect, find_raw_files
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))   # data/src_data
+DATA_DIR = os.path.dirname(SRC_DIR)                     # data
+RAW_DIR = os.path.join(DATA_DIR, "raw")                 # data/raw
+
+VIEWS_SCRIPT = os.path.join(REPO_DIR, "sql", "view_results", "gold_view.sql")
+VIEW_PATTERN = re.compile(r"CREATE OR REPLACE VIEW gold\.(\w+)")
+
+CHECK_TOLERANCE = 0.01   # ROUND(..., 2) na DOUBLE może wypaść o 0.01 obok NUMERIC przy remisie
+
+# Kolumny bronze.stg_* jak w create_tables_for_raw_data.sql (NUMERIC -> DOUBLE, wartości są całkowite)
+BRONZE_COLUMNS = {
+    "stg_skins": {
+        "skin_id": "INTEGER", "champion_name": "VARCHAR", "skin_name": "VARCHAR",
+        "rarity": "VARCHAR", "price_rp": "INTEGER", "release_date": "DATE",
+        "champion_id": "VARCHAR", "skin_num": "INTEGER",
+    },
+    "stg_players": {
+        "player_id": "INTEGER", "region": "VARCHAR",
+        "account_created_date": "DATE", "player_segment": "VARCHAR",
+    },
+    "stg_sales": {
+        "transaction_id": "DOUBLE", "player_id": "DOUBLE", "skin_id": "DOUBLE",
+        "purchase_date": "VARCHAR", "price_rp": "DOUBLE", "quantity": "DOUBLE",
+    },
+}
+
+# silver_clean_data.sql + gold_clean_data.sql w jednym przebiegu (bez UPDATE - kolumny liczone od razu)
+BUILD_SQL = """
+CREATE TABLE silver.dim_date AS
+SELECT
+    CAST(strftime(d, '%Y%m%d') AS INTEGER) AS date_key,
+    d AS date,
+    year(d) AS year,
+    quarter(d) AS quarter,
+    month(d) AS month,
+    monthname(d) AS month_name,
+    week(d) AS week,
+    day(d) AS day_of_month,
+    dayofweek(d) AS day_of_week,
+    dayname(d) AS day_name,
+    dayofweek(d) IN (0, 6) AS is_weekend,
+    day(d) = 1 AS is_month_start,
+    d = last_day(d) AS is_month_end
+FROM (SELECT CAST(generate_series AS DATE) AS d
+      FROM generate_series(TIMESTAMP '2010-01-01', TIMESTAMP '2030-12-31', INTERVAL 1 DAY));
+
+CREATE TABLE silver.dim_skin AS
+SELECT
+    ROW_NUMBER() OVER (ORDER BY rowid) AS skin_key,
+    skin_id, TRIM(champion_name) AS champion_name, TRIM(skin_name) AS skin_name, rarity, price_rp,
+    release_date, champion_id, skin_num,
+    CASE
+        WHEN champion_name IS NULL OR TRIM(champion_name) = '' THEN FALSE
+        WHEN skin_name IS NULL OR TRIM(skin_name) = '' THEN FALSE
+        WHEN price_rp < 0 THEN FALSE
+        WHEN rarity NOT IN ('Default', 'Legacy', 'Epic', 'Legendary', 'Ultimate') THEN FALSE
+        ELSE TRUE
+    END AS is_valid
+FROM bronze.stg_skins
+WHERE skin_id IS NOT NULL;
+
+CREATE TABLE silver.dim_player AS
+SELECT
+    ROW_NUMBER() OVER (ORDER BY rowid) AS player_key,
+    player_id, UPPER(TRIM(region)) AS region, account_created_date,
+    LOWER(TRIM(player_segment)) AS player_segment,
+    CURRENT_DATE - account_created_date AS account_age_days,
+    CASE
+        WHEN player_id IS NULL THEN FALSE
+        WHEN region NOT IN ('EUW', 'EUNE', 'NA', 'KR') THEN FALSE
+        WHEN player_segment NOT IN ('casual', 'core', 'whale') THEN FALSE
+        WHEN account_created_date > CURRENT_DATE THEN FALSE
+        ELSE TRUE
+    END AS is_valid
+FROM bronze.stg_players
+WHERE player_id IS NOT NULL;
+
+CREATE TABLE silver.fact_sale AS
+WITH sale AS (
+    SELECT
+        sale.transaction_id,
+        p.player_key,
+        s.skin_key,
+        CASE
+            WHEN regexp_full_match(sale.purchase_date, '\\d{4}-\\d{2}-\\d{2}')
+            THEN CAST(strftime(CAST(sale.purchase_date AS DATE), '%Y%m%d') AS INTEGER)
+        END AS date_key,
+        -- Step 1 (price_fixed): brakująca cena z dim_skin
+        CASE
+            WHEN sale.price_rp IS NULL AND sale.quantity > 0 AND s.price_rp > 0 THEN s.price_rp
+            ELSE sale.price_rp
+        END AS price_rp,
+        sale.quantity
+    FROM bronze.stg_sales sale
+    LEFT JOIN silver.dim_player p ON CAST(sale.player_id AS INTEGER) = p.player_id
+    LEFT JOIN silver.dim_skin s ON CAST(sale.skin_id AS INTEGER) = s.skin_id
+    WHERE sale.transaction_id IS NOT NULL
+)
+SELECT
+    sale.*,
+    price_rp * quantity AS total_rp,
+    -- Step 4: is_valid
+    COALESCE(player_key IS NOT NULL
+             AND skin_key IS NOT NULL
+             AND price_rp > 0
+             AND quantity > 0
+             AND date_key IN (SELECT date_key FROM silver.dim_date), FALSE) AS is_valid
+FROM sale;
+
+CREATE TABLE gold.dim_date AS SELECT * FROM silver.dim_date;
+
+CREATE TABLE gold.dim_skin AS
+SELECT skin_key, skin_id, champion_name, skin_name, rarity, price_rp, release_date, champion_id, skin_num
+FROM silver.dim_skin
+WHERE is_valid;
+
+CREATE TABLE gold.dim_player AS
+SELECT player_key, player_id, region, account_created_date, player_segment, account_age_days
+FROM silver.dim_player
+WHERE is_valid;
+
+CREATE TABLE gold.fact_sales AS
+SELECT
+    ROW_NUMBER() OVER (ORDER BY date_key) AS sale_key,
+    CAST(transaction_id AS INTEGER) AS transaction_id,
+    player_key,
+    skin_key,
+    date_key,
+    CAST(price_rp AS INTEGER) AS price_rp,
+    CAST(quantity AS INTEGER) AS quantity,
+    CAST(total_rp AS INTEGER) AS total_rp
+FROM silver.fact_sale
+WHERE is_valid;
+"""
+
+
+def _duckdb():
+    try:
+        import duckdb
+    except ImportError:
+        raise SystemExit("BŁĄD: embedded_gold.py wymaga pakietu duckdb (pip install duckdb)")
+    return duckdb
+
+
+def sql_list(paths):
+    return "[" + ", ".join("'" + path.replace("'", "''") + "'" for path in paths) + "]"
+
+
+def bronze_source(table, paths, input_format):
+    """SELECT czytający pliki tabeli z typami kolumn bronze (CSV: typy narzucone, Parquet: CAST)."""
+    columns = BRONZE_COLUMNS[table]
+    if input_format == "parquet":
+        select = ", ".join(f"CAST({column} AS {kind}) AS {column}" for column, kind in columns.items())
+        return f"SELECT {select} FROM read_parquet({sql_list(paths)})"
+
+    # CSV ma też kolumny spoza bronze (skin_name_norm) - czytane jako VARCHAR i pomijane
+    types = ", ".join(f"'{column}': '{kind}'" for column, kind in columns.items())
+    select = ", ".join(columns)
+    return f"SELECT {select} FROM read_csv({sql_list(paths)}, header = true, types = {{{types}}})"
+
+
+def build_gold(con, input_format="csv", raw_dir=RAW_DIR, sales_dir=None):
+    """Pliki -> bronze.stg_* -> silver -> gold -> widoki gold_view.sql. Zwraca {tabela: wiersze}."""
+    for schema in ("bronze", "silver", "gold"):
+        con.execute(f"CREATE SCHEMA {schema}")
+
+    for table in BRONZE_COLUMNS:
+        table_dir = sales_dir if table == "stg_sales" and sales_dir else raw_dir
+        paths = find_raw_files(table, input_format, table_dir)
+        if not paths:
+            raise SystemExit(f"BŁĄD: brak plików {input_format} dla bronze.{table} w {table_dir}")
+        # CREATE TABLE AS zachowuje kolejność plików i wierszy (rowid = kolejność jak po COPY)
+        con.execute(f"CREATE TABLE bronze.{table} AS {bronze_source(table, paths, input_format)}")
+
+    con.execute(BUILD_SQL)
+    with open(VIEWS_SCRIPT, encoding="utf-8") as f:
+        con.execute(f.read())
+
+    tables = ["bronze.stg_sales", "silver.fact_sale", "gold.dim_skin", "gold.dim_player", "gold.fact_sales"]
+    return {table: con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables}
+
+
+def view_names():
+    with open(VIEWS_SCRIPT, encoding="utf-8") as f:
+        return VIEW_PATTERN.findall(f.read())
+
+
+def normalize(value):
+    """Wartość z DuckDB / psycopg -> porównywalna (Decimal i int -> float, daty -> ISO)."""
+    if isinstance(value, (Decimal, int)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def rows_match(left, right):
+    for a, b in zip(left, right):
+        if isinstance(a, float) and isinstance(b, float):
+            if not math.isclose(a, b, rel_tol=1e-9, abs_tol=CHECK_TOLERANCE):
+                return False
+        elif a != b:
+            return False
+    return len(left) == len(right)
+
+
+def compare_view(con, pg_conn, view):
+    """Widok DuckDB vs PostgreSQL -> lista różnic (pusta = te same wiersze)."""
+    duck_rows = sorted((tuple(normalize(v) for v in row) for row in con.execute(f"SELECT * FROM gold.{view}").fetchall()),
+                       key=repr)
+    pg_rows = sorted((tuple(normalize(v) for v in row) for row in pg_conn.execute(f"SELECT * FROM gold.{view}").fetchall()),
+                     key=repr)
+    if len(duck_rows) != len(pg_rows):
+        return [f"wiersze: DuckDB {len(duck_rows):,}, PostgreSQL {len(pg_rows):,}"]
+    return [f"DuckDB {a} != PostgreSQL {b}" for a, b in zip(duck_rows, pg_rows) if not rows_match(a, b)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gwiazda Gold i widoki analityczne w DuckDB (bez PostgreSQL)")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv", help="Które pliki raw czytać")
+    parser.add_argument("--raw-dir", default=RAW_DIR, help="Katalog z plikami raw")
+    parser.add_argument("--sales-dir", default=None,
+                        help="Osobny katalog dla fact_sales (np. data/deduped, jak w run_pipeline.py)")
+    parser.add_argument("--view", nargs="+", choices=view_names(), default=None,
+                        help="Które widoki pokazać (domyślnie wszystkie z gold_view.sql)")
+    parser.add_argument("--limit", type=int, default=10, help="Wierszy na widok (0 = bez wypisywania)")
+    parser.add_argument("--threads", type=int, default=os.cpu_count(), help="Wątki DuckDB")
+    parser.add_argument("--database", default=":memory:",
+                        help="Plik bazy DuckDB (domyślnie w pamięci; plik zostaje do dalszych zapytań)")
+    parser.add_argument("--export", default=None, help="Katalog na wyniki widoków (<widok>.<format eksportu>)")
+    parser.add_argument("--export-format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--check", action="store_true", help="Porównaj widoki z gold.* w PostgreSQL")
+    parser.add_argument("--dsn", default=None, help="Connection string dla --check (zamiast zmiennych DB_*)")
+    args = parser.parse_args()
+
+    duckdb = _duckdb()
+    if args.database != ":memory:" and os.path.exists(args.database):
+        os.remove(args.database)   # zawsze pełna przebudowa, jak gold_clean_data.sql
+    con = duckdb.connect(args.database)
+    con.execute(f"SET threads = {max(1, args.threads)}")
+
+    print("="*60)
+    print(f"GOLD W DUCKDB ({args.format}, wątki: {max(1, args.threads)})")
+    print("="*60)
+
+    started = time.perf_counter()
+    counts = build_gold(con, args.format, args.raw_dir, args.sales_dir)
+    print(f"Budowa: {time.perf_counter() - started:.2f}s")
+    for table, rows in counts.items():
+        print(f"  {table:20s} {rows:>12,}")
+
+    views = args.view or view_names()
+    if args.export:
+        os.makedirs(args.export, exist_ok=True)
+
+    for view in views:
+        started = time.perf_counter()
+        result = con.execute(f"SELECT * FROM gold.{view}").fetchdf()
+        print(f"\ngold.{view}: {len(result):,} wierszy w {time.perf_counter() - started:.3f}s")
+        if args.limit:
+            print(result.head(args.limit).to_string(index=False))
+        if args.export:
+            path = os.path.join(args.export, f"{view}.{args.export_format}")
+            options = "FORMAT parquet" if args.export_format == "parquet" else "HEADER"
+            con.execute(f"COPY (SELECT * FROM gold.{view}) TO '{path}' ({options})")
+            print(f"  -> {path}")
+
+    if not args.check:
+        return
+
+    print("\nPorównanie z PostgreSQL:")
+    failed = []
+    with connect(args.dsn) as pg_conn:
+        for view in view_names():
+            differences = compare_view(con, pg_conn, view)
+            if differences:
+                failed.append(view)
+                print(f"  ✗ gold.{view}: {len(differences)} różnic, np. {differences[0]}")
+            else:
+                print(f"  ✓ gold.{view}")
+
+    if failed:
+        print(f"\nBŁĄD: widoki różnią się od PostgreSQL: {', '.join(failed)}")
+        exit(1)
+    print("\n✓ Wszystkie widoki zgodne z PostgreSQL")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,16 @@
 import requests
 import pandas as pd
 import os
+import argparse
+import hashlib
+import json
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-print("FETCH DDRAGON SKINS")
+from stage_metrics import instrumented, record_input, record_output
 
 # ŚCIEŻKI – POPRAWIONE
 
@@ -12,49 +20,359 @@ DATA_DIR = os.path.dirname(SRC_DIR)                     # data
 RAW_DIR = os.path.join(DATA_DIR, "raw")                 # data/raw
 
 OUTPUT_PATH = os.path.join(RAW_DIR, "ddragon_skins.csv")
+CACHE_DIR = os.path.join(DATA_DIR, "cache", "ddragon")  # data/cache/ddragon
 
-# Upewnij się że katalog istnieje
-os.makedirs(RAW_DIR, exist_ok=True)
+# DATA DRAGON
+# Adres można podmienić (np. na lokalny stub z nagranymi odpowiedziami)
+DDRAGON_BASE_URL = os.environ.get("DDRAGON_BASE_URL", "https://ddragon.leagueoflegends.com")
 
-print("OUTPUT:", OUTPUT_PATH)
+CONCURRENCY = 16        # Maksymalna liczba równoległych zapytań
+REQUEST_TIMEOUT = 10    # Sekundy na jedno zapytanie (connect + read)
+MAX_RETRIES = 5         # Ponowienia przy błędach sieci / 429 / 5xx
+BACKOFF_FACTOR = 0.5    # 0.5s, 1s, 2s, 4s... między ponowieniami
 
-# DATA DRAGON
 
-print("\nPobieranie wersji Data Dragon...")
-version = requests.get(
-    "https://ddragon.leagueoflegends.com/api/versions.json"
-).json()[0]
+class DataDragonClient:
+    """
+    Klient Data Dragon: jedna sesja z pulą połączeń (keep-alive), timeout na
+    każde zapytanie i ponowienia z backoffem przy błędach sieci / 429 / 5xx.
+    """
+
+    def __init__(self, base_url=DDRAGON_BASE_URL, concurrency=CONCURRENCY, timeout=REQUEST_TIMEOUT,
+                 max_retries=MAX_RETRIES, backoff_factor=BACKOFF_FACTOR):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.bytes_downloaded = 0   # Treść odpowiedzi (metryki etapu), z wielu wątków
+        self._bytes_lock = threading.Lock()
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _count(self, response):
+        with self._bytes_lock:
+            self.bytes_downloaded += len(response.content)
+
+    def get_json(self, path):
+        response = self.session.get(f"{self.base_url}{path}", timeout=self.timeout)
+        response.raise_for_status()
+        self._count(response)
+        return response.json()
+
+    def get_json_conditional(self, path, validators=None):
+        """
+        GET z If-None-Match / If-Modified-Since.
+        Zwraca (json albo None przy 304, nowe walidatory {etag, last_modified}).
+        """
+        headers = {}
+        if validators and validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators and validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        response = self.session.get(f"{self.base_url}{path}", headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            return None, validators
+        response.raise_for_status()
+        self._count(response)
+        return response.json(), {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+
+    def version(self):
+        return self.get_json("/api/versions.json")[0]
+
+    def champion_ids(self, version):
+        return list(self.get_json(f"/cdn/{version}/data/en_US/champion.json")["data"])
+
+    def champion(self, version, champ_id):
+        return self.get_json(f"/cdn/{version}/data/en_US/champion/{champ_id}.json")["data"][champ_id]
+
+    def champion_full(self, version):
+        return self.get_json(f"/cdn/{version}/data/en_US/championFull.json")["data"]
+
 
-print("Wersja:", version)
+def payload_hash(champ_data):
+    """Hash payloadu championa bez pola "version" (zmienia się przy każdym patchu)."""
+    content = {key: value for key, value in champ_data.items() if key != "version"}
+    return hashlib.sha256(
+        json.dumps(content, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
 
-print("\nPobieranie listy championów...")
-champions = requests.get(
-    f"https://ddragon.leagueoflegends.com/cdn/{version}/data/en_US/champion.json"
-).json()["data"]
 
-rows = []
+class DDragonCache:
+    """
+    Cache na dysku: data/cache/ddragon/<wersja>/champion/<id>.json + index.json.
 
-print("\nPobieranie skinów...")
+    index.json trzyma dla każdego championa wersję, w której leży jego plik,
+    wersję, przy której był ostatnio sprawdzony, hash treści (payload_hash) oraz
+    ETag / Last-Modified z ostatniego pobrania. Każdy payload Data Dragon zawiera
+    numer wersji, więc między patchami ETag zawsze jest inny - zmiany wykrywa
+    hash, a plik niezmienionego championa zostaje w katalogu starszej wersji.
+    """
 
-for champ_id, champ in champions.items():
-    champ_data = requests.get(
-        f"https://ddragon.leagueoflegends.com/cdn/{version}/data/en_US/champion/{champ_id}.json"
-    ).json()["data"][champ_id]
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.index = {"version": None, "versions_validators": None, "champions": {}}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                self.index = json.load(f)
 
-    for skin in champ_data["skins"]:
-        rows.append({
+    def _path(self, version, name):
+        return os.path.join(self.cache_dir, version, f"{name}.json")
+
+    def load(self, version, name):
+        path = self._path(version, name)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self, version, name, payload):
+        path = self._path(version, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+
+    def champion_entry(self, champ_id):
+        return self.index["champions"].get(champ_id)
+
+    def load_champion(self, champ_id):
+        return self.load(self.index["champions"][champ_id]["version"], f"champion/{champ_id}")
+
+    def mark_unchanged(self, champ_id, version):
+        """304 przy --revalidate - plik i walidatory bez zmian."""
+        self.index["champions"][champ_id]["checked"] = version
+
+    def store_champion(self, champ_id, version, champ_data, validators=None):
+        """
+        Zapisuje payload championa sprawdzonego przy `version`.
+        Zwraca True, gdy treść jest nowa albo inna niż w cache - tylko wtedy plik
+        jest zapisywany; niezmieniony zostaje tam, gdzie leżał.
+        """
+        digest = payload_hash(champ_data)
+        entry = self.champion_entry(champ_id)
+        changed = entry is None or entry.get("hash") != digest
+        if changed:
+            self.save(version, f"champion/{champ_id}", champ_data)
+        self.index["champions"][champ_id] = {
+            "version": version if changed else entry["version"],
+            "checked": version,
+            "hash": digest,
+            # Walidatory dotyczą adresu wersji `version` (tylko dla --revalidate)
+            "etag": (validators or {}).get("etag"),
+            "last_modified": (validators or {}).get("last_modified"),
+        }
+        return changed
+
+    def commit(self, version, champion_ids):
+        """Zapisuje index (atomowo) i usuwa katalogi wersji, do których nic już nie należy."""
+        self.index["version"] = version
+        self.index["champions"] = {
+            champ_id: self.index["champions"][champ_id] for champ_id in champion_ids
+        }
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=1)
+        os.replace(tmp_path, self.index_path)
+
+        keep = {version} | {entry["version"] for entry in self.index["champions"].values()}
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if os.path.isdir(path) and name not in keep:
+                shutil.rmtree(path)
+
+
+def skin_rows(champ_id, champ_data):
+    return [
+        {
             "champion_id": champ_id,
             "champion_name": champ_data["name"],
             "skin_num": skin["num"],
             "skin_name": skin["name"]
-        })
+        }
+        for skin in champ_data["skins"]
+    ]
+
+
+def fetch_skins_concurrent(client, version, champion_ids, concurrency=CONCURRENCY):
+    """Jeden plik na championa, maksymalnie `concurrency` zapytań naraz (kolejność zachowana)."""
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        champions = pool.map(lambda champ_id: client.champion(version, champ_id), champion_ids)
+        rows = []
+        for champ_id, champ_data in zip(champion_ids, champions):
+            rows.extend(skin_rows(champ_id, champ_data))
+    return rows
+
+
+def fetch_skins_bulk(client, version):
+    """Wszystkie championy z jednego championFull.json zamiast N+1 zapytań."""
+    rows = []
+    for champ_id, champ_data in client.champion_full(version).items():
+        rows.extend(skin_rows(champ_id, champ_data))
+    return rows
+
+
+def fetch_version_cached(client, cache):
+    """versions.json warunkowo - przy 304 zostaje wersja z cache."""
+    versions, validators = client.get_json_conditional("/api/versions.json", cache.index["versions_validators"])
+    if versions is None:
+        return cache.index["version"]
+    cache.index["versions_validators"] = validators
+    return versions[0]
+
+
+def fetch_skins_cached(client, cache, version, concurrency=CONCURRENCY, bulk=False, revalidate=False):
+    """
+    Odświeża cache dla wersji i buduje wiersze skinów z cache.
+
+    Ta sama wersja co ostatnio = zero zapytań o championy (pliki wersji w Data
+    Dragon się nie zmieniają), chyba że --revalidate (zapytania warunkowe, 304).
+    Nowa wersja = jeden championFull.json; zapisywane są tylko championy, których
+    treść (payload_hash, bez pola "version") się zmieniła, i championy nowe.
+    Pusty cache bez --bulk = plik per champion, współbieżnie.
+    Zwraca (rows, counters) gdzie counters = {cached, unchanged, changed}.
+    """
+    counters = {"cached": 0, "unchanged": 0, "changed": 0}
+
+    champion_list = cache.load(version, "champion")
+    if champion_list is None:
+        champion_list = list(client.get_json(f"/cdn/{version}/data/en_US/champion.json")["data"])
+        cache.save(version, "champion", champion_list)
+
+    def checked_version(champ_id):
+        entry = cache.champion_entry(champ_id)
+        return entry.get("checked", entry["version"]) if entry else None
+
+    stale_ids = [
+        champ_id for champ_id in champion_list
+        if revalidate or checked_version(champ_id) != version
+    ]
+    counters["cached"] = len(champion_list) - len(stale_ids)
+
+    def record(changed):
+        counters["changed" if changed else "unchanged"] += 1
+
+    new_patch = any(
+        checked_version(champ_id) not in (None, version) for champ_id in stale_ids
+    )
+
+    if stale_ids and (bulk or new_patch):
+        # Jeden championFull.json na patch zamiast zapytania per champion
+        full_validators = cache.index.get("full_validators") or {}
+        full, validators = client.get_json_conditional(
+            f"/cdn/{version}/data/en_US/championFull.json",
+            full_validators if full_validators.get("version") == version else None
+        )
+        if full is None:
+            for champ_id in stale_ids:
+                cache.mark_unchanged(champ_id, version)
+                record(False)
+        else:
+            cache.index["full_validators"] = {"version": version, **validators}
+            for champ_id in stale_ids:
+                record(cache.store_champion(champ_id, version, full["data"][champ_id]))
+
+    elif stale_ids:
+        def refresh(champ_id):
+            entry = cache.champion_entry(champ_id)
+            payload, validators = client.get_json_conditional(
+                f"/cdn/{version}/data/en_US/champion/{champ_id}.json",
+                entry if checked_version(champ_id) == version else None
+            )
+            return champ_id, payload, validators
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for champ_id, payload, validators in pool.map(refresh, stale_ids):
+                if payload is None:
+                    cache.mark_unchanged(champ_id, version)
+                    record(False)
+                else:
+                    record(cache.store_champion(champ_id, version, payload["data"][champ_id], validators))
+
+    cache.commit(version, champion_list)
+
+    rows = []
+    for champ_id in champion_list:
+        rows.extend(skin_rows(champ_id, cache.load_champion(champ_id)))
+    return rows, counters
+
+
+@instrumented("fetch")
+def main():
+    parser = argparse.ArgumentParser(description="Pobieranie skinów z Data Dragon")
+    parser.add_argument("--bulk", action="store_true",
+                        help="Jeden championFull.json zamiast pliku per champion")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY,
+                        help="Maksymalna liczba równoległych zapytań")
+    parser.add_argument("--timeout", type=float, default=REQUEST_TIMEOUT,
+                        help="Timeout jednego zapytania w sekundach")
+    parser.add_argument("--base-url", default=DDRAGON_BASE_URL,
+                        help="Adres Data Dragon (np. lokalny stub do testów)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Pobierz wszystko od nowa, bez cache w data/cache/ddragon")
+    parser.add_argument("--revalidate", action="store_true",
+                        help="Sprawdź warunkowo (ETag) także championy z bieżącej wersji")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    args = parser.parse_args()
+
+    print("FETCH DDRAGON SKINS")
+
+    # Upewnij się że katalog istnieje
+    os.makedirs(RAW_DIR, exist_ok=True)
+
+    print("OUTPUT:", OUTPUT_PATH)
+
+    client = DataDragonClient(args.base_url, args.concurrency, args.timeout)
+
+    print("\nPobieranie wersji Data Dragon...")
+    if args.no_cache:
+        version = client.version()
+    else:
+        cache = DDragonCache(args.cache_dir)
+        version = fetch_version_cached(client, cache)
+
+    print("Wersja:", version)
+
+    if not args.no_cache:
+        print(f"\nOdświeżanie cache ({args.cache_dir})...")
+        rows, counters = fetch_skins_cached(
+            client, cache, version, args.concurrency, args.bulk, args.revalidate
+        )
+        print(f"  Z cache: {counters['cached']}, bez zmian: {counters['unchanged']}, "
+              f"zmienione / nowe: {counters['changed']}")
+    elif args.bulk:
+        print("\nPobieranie championFull.json...")
+        rows = fetch_skins_bulk(client, version)
+    else:
+        print("\nPobieranie listy championów...")
+        champion_ids = client.champion_ids(version)
+
+        print(f"\nPobieranie skinów ({len(champion_ids)} championów, {args.concurrency} naraz)...")
+        rows = fetch_skins_concurrent(client, version, champion_ids, args.concurrency)
+
+    df = pd.DataFrame(rows)
+
+    # ZAPIS
 
-df = pd.DataFrame(rows)
+    df.to_csv(OUTPUT_PATH, index=False)
+    record_input(bytes_read=client.bytes_downloaded)
+    record_output([OUTPUT_PATH], rows=len(df))
 
-# ZAPIS
+    print("ZAPIS ZAKOŃCZONY")
+    print(f"Plik: {OUTPUT_PATH}")
+    print(f"Liczba skinów: {len(df)}")
 
-df.to_csv(OUTPUT_PATH, index=False)
 
-print("ZAPIS ZAKOŃCZONY")
-print(f"Plik: {OUTPUT_PATH}")
-print(f"Liczba skinów: {len(df)}")
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,48 @@
 import pandas as pd
-import random
-from datetime import datetime, timedelta
+import numpy as np
+import argparse
+import glob
+from datetime import date, datetime
 import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from raw_writers import OUTPUT_FORMATS, open_writers, output_paths, raw_stem
+from stage_metrics import instrumented, record_input, record_output
 
 #USTAWIENIA
-NUM_PLAYERS = 5000
+NUM_PLAYERS = 5000        # SF1 (--scale-factor mnoży oba)
 NUM_TRANSACTIONS = 20000
 ERROR_RATE = 0.10  # 10% błędnych danych w transakcjach
+DUPLICATE_RATE = 0.01  # 1% duplikatów
+BATCH_SIZE = 1_000_000  # Ile wierszy losujemy i zapisujemy naraz (stała pamięć)
 
 REGIONS = ["EUW", "EUNE", "NA", "KR"]
 SEGMENTS = ["casual", "core", "whale"]
+SEGMENT_WEIGHTS = [0.6, 0.3, 0.1]
+
+# Wagi koszyków cenowych per segment: (tanie, średnie, drogie)
+# Każdy skin dostaje wagę swojego koszyka - tak jak dawne skin_pool = expensive * 7 + mid * 2 + cheap
+# Pierwszy koszyk w PRIMARY_BUCKET musi być niepusty, inaczej losujemy równo ze wszystkich skinów
+SEGMENT_BUCKET_WEIGHTS = {
+    "whale": (1, 2, 7),    # Whales preferują drogie skiny
+    "core": (2, 5, 3),     # Core preferują średnie i drogie
+    "casual": (5, 4, 1),   # Casual preferują tanie i średnie
+}
+PRIMARY_BUCKET = {"whale": 2, "core": 1, "casual": 0}
+
+ERROR_TYPES = [
+    'null_player_id',
+    'null_skin_id',
+    'null_price',
+    'negative_price',
+    'zero_quantity',
+    'invalid_player_id',
+    'invalid_skin_id',
+    'future_date',
+    'past_date'
+]
 
 #SCIEZKI
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -20,277 +53,589 @@ skins_path = os.path.join(DATA_RAW_DIR, "dim_skins_final.csv")
 dim_player_path = os.path.join(DATA_RAW_DIR, "dim_player.csv")
 fact_sales_path = os.path.join(DATA_RAW_DIR, "fact_sales.csv")
 
-print("="*60)
-print("GENEROWANIE GRACZY I TRANSAKCJI")
-print("="*60)
-
-#WCZYTAJ SKINY
-print("\nWczytywanie skinów z dim_skins_final.csv...")
-
-try:
-    dim_skin_df = pd.read_csv(skins_path)
-except FileNotFoundError:
-    print(f"BŁĄD: Nie znaleziono pliku {skins_path}")
-    print("Uruchom najpierw: python merge_final.py")
-    exit(1)
-
-print(f"Wczytano {len(dim_skin_df)} skinów")
-
-# Usuń default skiny (nie są sprzedawane)
-original_count = len(dim_skin_df)
-dim_skin_df = dim_skin_df[dim_skin_df["rarity"] != "Default"].copy()
-removed = original_count - len(dim_skin_df)
-print(f"Usunięto {removed} default skinów (nie są sprzedawane)")
-
-# Słownik skin_id -> price_rp
-skin_price_map = dict(zip(
-    dim_skin_df["skin_id"], 
-    dim_skin_df["price_rp"]
-))
-skin_ids = list(skin_price_map.keys())
-
-print(f"Dostępnych skinów do sprzedaży: {len(skin_ids)}")
-
-# Statystyki cenowe
-print("\nRozkład cen skinów:")
-price_stats = dim_skin_df.groupby('price_rp').size().sort_index()
-for price, count in price_stats.items():
-    print(f"  {price:4d} RP: {count:4d} skinów")
-
-#GENERUJ DIM_PLAYER
-print("GENEROWANIE GRACZY")
-
-players = []
-for i in range(1, NUM_PLAYERS + 1):
-    segment = random.choices(SEGMENTS, weights=[0.6, 0.3, 0.1])[0]
-    
+
+def price_buckets(prices):
+    """Koszyk cenowy skina: 0 = tani (<=750), 1 = średni (751-1350), 2 = drogi (>=1351)."""
+    return np.where(prices <= 750, 0, np.where(prices <= 1350, 1, 2))
+
+
+class SkinSamplingIndex:
+    """
+    Indeks losowania skinów po dacie premiery - jedna tablica wag na segment (kolejność jak SEGMENTS).
+
+    Skiny są posortowane po release_date, a tablice to skumulowane wagi koszyków
+    cenowych w tej kolejności. Dla daty zakupu searchsorted po datach premier daje
+    prefiks skinów już wydanych, a losowanie to drugie searchsorted w obrębie
+    prefiksu - O(log n) na transakcję, wektorowo na całej paczce dat.
+    Skin bez release_date jest dostępny zawsze (stoi na początku kolejności), więc
+    data sprzed pierwszej premiery losuje tylko spośród skinów bez daty. Gdy takich
+    nie ma, data jest przycinana do pierwszej premiery (skiny z tego dnia) - nigdy
+    nie losuje z całego katalogu, czyli skinów jeszcze niewydanych.
+    """
+
+    def __init__(self, skin_prices, skin_release_dates):
+        release = pd.to_datetime(pd.Series(skin_release_dates), errors="coerce").to_numpy(dtype="datetime64[D]")
+        release_days = release.astype(np.int64)
+        release_days[np.isnat(release)] = np.iinfo(np.int64).min
+        self.undated = int(np.isnat(release).sum())
+
+        self.order = np.argsort(release_days, kind="stable")
+        self.release_days = release_days[self.order]
+        # Najmniejszy prefiks: skiny bez daty albo (gdy ich brak) skiny z dnia pierwszej premiery
+        if self.undated or not len(self.release_days):
+            self.min_eligible = self.undated
+        else:
+            self.min_eligible = int(np.searchsorted(self.release_days, self.release_days[0], side="right"))
+
+        buckets = price_buckets(np.asarray(skin_prices)[self.order])
+        bucket_sizes = np.bincount(buckets, minlength=3)
+
+        self.tables = []
+        for segment in SEGMENTS:
+            if bucket_sizes[PRIMARY_BUCKET[segment]] > 0:
+                weights = np.asarray(SEGMENT_BUCKET_WEIGHTS[segment], dtype=np.float64)[buckets]
+            else:
+                # Edge case: brak skinów w preferowanym koszyku - wszystkie skiny po równo
+                weights = np.ones(len(buckets), dtype=np.float64)
+            self.tables.append(np.cumsum(weights))
+
+    def eligible(self, purchase_dates):
+        """Liczba skinów wydanych najpóźniej w dniu zakupu (co najmniej min_eligible)."""
+        count = np.searchsorted(self.release_days, purchase_dates.astype(np.int64), side="right")
+        return np.maximum(count, self.min_eligible)
+
+    def sample(self, rng, segment_code, purchase_dates):
+        """Losuje indeksy skinów (w kolejności wejściowej) dla paczki kodów segmentów i dat zakupu."""
+        eligible = self.eligible(purchase_dates)
+        skin_idx = np.empty(len(segment_code), dtype=np.int64)
+        for code, cdf in enumerate(self.tables):
+            mask = segment_code == code
+            totals = cdf[eligible[mask] - 1]
+            skin_idx[mask] = np.searchsorted(cdf, rng.random(int(mask.sum())) * totals, side="right")
+        return self.order[skin_idx]
+
+
+def generate_players(rng, num_players, today, first_player_id=1):
+    """Generuje paczkę dim_player wektorowo."""
+    segment_codes = rng.choice(len(SEGMENTS), size=num_players, p=SEGMENT_WEIGHTS)
+
     # Data utworzenia konta (ostatnie 5 lat)
-    account_age_days = random.randint(30, 1825)
-    
-    players.append({
-        "player_id": i,
-        "region": random.choice(REGIONS),
-        "account_created_date": (
-            datetime.now() - timedelta(days=account_age_days)
-        ).date(),
-        "player_segment": segment
+    account_age_days = rng.integers(30, 1826, size=num_players)
+
+    return pd.DataFrame({
+        "player_id": np.arange(first_player_id, first_player_id + num_players),
+        "region": np.asarray(REGIONS)[rng.integers(0, len(REGIONS), size=num_players)],
+        "account_created_date": today - account_age_days,
+        "player_segment": np.asarray(SEGMENTS)[segment_codes]
     })
 
-dim_player_df = pd.DataFrame(players)
-
-# Statystyki graczy
-print(f"\nWygenerowano {len(dim_player_df)} graczy")
-print("\nRozkład segmentów:")
-segment_counts = dim_player_df['player_segment'].value_counts()
-for segment, count in segment_counts.items():
-    pct = (count / len(dim_player_df)) * 100
-    print(f"  {segment:8s}: {count:5d} ({pct:5.1f}%)")
-
-print("\nRozkład regionów:")
-region_counts = dim_player_df['region'].value_counts()
-for region, count in region_counts.items():
-    pct = (count / len(dim_player_df)) * 100
-    print(f"  {region:4s}: {count:5d} ({pct:5.1f}%)")
-
-dim_player_df.to_csv(dim_player_path, index=False)
-print(f"\nZapisano: {dim_player_path}")
-
-#GENERUJ FACT_SALES
-
-print("GENEROWANIE TRANSAKCJI")
-
-# Segmentacja skinów po cenie dla różnych typów graczy
-cheap_skins = [sid for sid, price in skin_price_map.items() if price <= 750]
-mid_skins = [sid for sid, price in skin_price_map.items() if 751 <= price <= 1350]
-expensive_skins = [sid for sid, price in skin_price_map.items() if price >= 1351]
-
-print(f"\nSkiny tanie (<=750 RP): {len(cheap_skins)}")
-print(f"Skiny średnie (751-1350 RP): {len(mid_skins)}")
-print(f"Skiny drogie (>=1351 RP): {len(expensive_skins)}")
-
-transactions = []
-
-# Tracking błędów
-error_log = {
-    'null_player_id': 0,
-    'null_skin_id': 0,
-    'null_price': 0,
-    'negative_price': 0,
-    'zero_quantity': 0,
-    'invalid_player_id': 0,
-    'invalid_skin_id': 0,
-    'future_date': 0,
-    'past_date': 0
-}
 
-for t in range(1, NUM_TRANSACTIONS + 1):
-    player = random.choice(players)
-    segment = player["player_segment"]
-    
-    # Wybór skina na podstawie segmentu gracza
-    if segment == "whale":
-        # Whales preferują drogie skiny (70% drogie, 20% średnie, 10% tanie)
-        if expensive_skins:
-            skin_pool = (
-                expensive_skins * 7 +
-                (mid_skins * 2 if mid_skins else []) +
-                (cheap_skins * 1 if cheap_skins else [])
-            )
-        else:
-            skin_pool = skin_ids
-    elif segment == "core":
-        # Core preferują średnie i drogie (50% średnie, 30% drogie, 20% tanie)
-        if mid_skins:
-            skin_pool = (
-                mid_skins * 5 +
-                (expensive_skins * 3 if expensive_skins else []) +
-                (cheap_skins * 2 if cheap_skins else [])
-            )
-        else:
-            skin_pool = skin_ids
-    else:  # casual
-        # Casual preferują tanie i średnie (50% tanie, 40% średnie, 10% drogie)
-        if cheap_skins:
-            skin_pool = (
-                cheap_skins * 5 +
-                (mid_skins * 4 if mid_skins else []) +
-                (expensive_skins * 1 if expensive_skins else [])
-            )
-        else:
-            skin_pool = skin_ids
-    
-    # Jeśli pool jest pusty (edge case), użyj wszystkich skinów
-    if not skin_pool:
-        skin_pool = skin_ids
-    
-    skin_id = random.choice(skin_pool)
-    price_rp = skin_price_map[skin_id]
-    
+def iter_player_chunks(rng, num_players, today, chunk_size=BATCH_SIZE):
+    """Generator paczek dim_player po chunk_size graczy."""
+    for start in range(0, num_players, chunk_size):
+        size = min(chunk_size, num_players - start)
+        yield generate_players(rng, size, today, first_player_id=start + 1)
+
+
+def generate_transaction_batch(rng, first_transaction_id, size, player_ids, player_segment_codes,
+                               skin_ids, skin_prices, sampling_index, today):
+    """
+    Generuje paczkę transakcji jako kolumny NumPy.
+
+    Zwraca (kolumny, segment_code, error_counts). segment_code to segment gracza
+    lub -1, gdy player_id został zepsuty (NULL / nieistniejący).
+    """
+    player_idx = rng.integers(0, len(player_ids), size=size)
+    segment_code = player_segment_codes[player_idx]
+
     # Data zakupu (ostatni rok)
-    purchase_days_ago = random.randint(1, 365)
-    purchase_date = (datetime.now() - timedelta(days=purchase_days_ago)).date()
-    
-    quantity = 1
-    player_id = player["player_id"]
-    
+    purchase_date = today - rng.integers(1, 366, size=size)
+
     # WSTRZYKNIJ BŁĘDY (10% transakcji)
-    is_error = random.random() < ERROR_RATE
-    
-    if is_error:
-        error_type = random.choice([
-            'null_player_id',
-            'null_skin_id', 
-            'null_price',
-            'negative_price',
-            'zero_quantity',
-            'invalid_player_id',
-            'invalid_skin_id',
-            'future_date',
-            'past_date'
-        ])
-        
-        if error_type == 'null_player_id':
-            player_id = None
-            error_log['null_player_id'] += 1
-            
-        elif error_type == 'null_skin_id':
-            skin_id = None
-            error_log['null_skin_id'] += 1
-            
-        elif error_type == 'null_price':
-            price_rp = None
-            error_log['null_price'] += 1
-            
-        elif error_type == 'negative_price':
-            price_rp = random.randint(-1000, -1)
-            error_log['negative_price'] += 1
-            
-        elif error_type == 'zero_quantity':
-            quantity = 0
-            error_log['zero_quantity'] += 1
-            
-        elif error_type == 'invalid_player_id':
-            player_id = random.randint(10000, 99999)  # Nieistniejący
-            error_log['invalid_player_id'] += 1
-            
-        elif error_type == 'invalid_skin_id':
-            skin_id = random.randint(10000, 99999)  # Nieistniejący
-            error_log['invalid_skin_id'] += 1
-            
-        elif error_type == 'future_date':
-            purchase_date = (datetime.now() + timedelta(days=random.randint(1, 365))).date()
-            error_log['future_date'] += 1
-            
-        elif error_type == 'past_date':
-            purchase_date = (datetime.now() - timedelta(days=random.randint(3000, 5000))).date()
-            error_log['past_date'] += 1
-    
-    transactions.append({
-        "transaction_id": t,
+    error_code = np.full(size, -1, dtype=np.int8)
+    is_error = rng.random(size) < ERROR_RATE
+    error_code[is_error] = rng.integers(0, len(ERROR_TYPES), size=int(is_error.sum()))
+
+    def error_mask(error_type):
+        return error_code == ERROR_TYPES.index(error_type)
+
+    # Błędne daty przed wyborem skina - stara data zakupu też losuje tylko z wydanych wtedy skinów
+    mask = error_mask('future_date')
+    purchase_date[mask] = today + rng.integers(1, 366, size=int(mask.sum()))
+
+    mask = error_mask('past_date')
+    purchase_date[mask] = today - rng.integers(3000, 5001, size=int(mask.sum()))
+
+    # Wybór skina na podstawie segmentu gracza, tylko spośród wydanych przed datą zakupu
+    skin_idx = sampling_index.sample(rng, segment_code, purchase_date)
+
+    player_id = player_ids[player_idx].astype(np.float64)
+    skin_id = skin_ids[skin_idx].astype(np.float64)
+    price_rp = skin_prices[skin_idx].astype(np.float64)
+    quantity = np.ones(size, dtype=np.int64)
+
+    player_id[error_mask('null_player_id')] = np.nan
+    skin_id[error_mask('null_skin_id')] = np.nan
+    price_rp[error_mask('null_price')] = np.nan
+
+    mask = error_mask('negative_price')
+    price_rp[mask] = rng.integers(-1000, 0, size=int(mask.sum()))
+
+    quantity[error_mask('zero_quantity')] = 0
+
+    mask = error_mask('invalid_player_id')
+    player_id[mask] = rng.integers(10000, 100000, size=int(mask.sum()))  # Nieistniejący
+
+    mask = error_mask('invalid_skin_id')
+    skin_id[mask] = rng.integers(10000, 100000, size=int(mask.sum()))  # Nieistniejący
+
+    segment_code = np.where(
+        error_mask('null_player_id') | error_mask('invalid_player_id'), -1, segment_code
+    )
+    error_counts = np.bincount(error_code[is_error], minlength=len(ERROR_TYPES))
+
+    columns = {
+        "transaction_id": np.arange(first_transaction_id, first_transaction_id + size),
         "player_id": player_id,
         "skin_id": skin_id,
         "purchase_date": purchase_date,
         "price_rp": price_rp,
         "quantity": quantity
-    })
-
-# Dodaj 1% duplikatów
-num_duplicates = int(NUM_TRANSACTIONS * 0.01)
-duplicates = random.sample(transactions, num_duplicates)
-for dup in duplicates:
-    new_dup = dup.copy()
-    new_dup['transaction_id'] = len(transactions) + 1
-    transactions.append(new_dup)
-
-fact_sales_df = pd.DataFrame(transactions)
-
-# Statystyki transakcji
-print(f"\nWygenerowano {len(fact_sales_df)} transakcji")
-print(f"  - Czyste: {NUM_TRANSACTIONS - sum(error_log.values())}")
-print(f"  - Błędne: {sum(error_log.values())} ({sum(error_log.values())/len(fact_sales_df)*100:.1f}%)")
-
-if sum(error_log.values()) > 0:
-    print("\nRaport błędów:")
-    for error_type, count in sorted(error_log.items(), key=lambda x: x[1], reverse=True):
-        if count > 0:
-            print(f"  {error_type:20s}: {count:4d}")
-
-print("\nRozkład transakcji po segmentach:")
-sales_by_segment = fact_sales_df.merge(
-    dim_player_df[['player_id', 'player_segment']], 
-    on='player_id'
-)
-segment_sales = sales_by_segment['player_segment'].value_counts()
-for segment, count in segment_sales.items():
-    pct = (count / len(fact_sales_df)) * 100
-    print(f"  {segment:8s}: {count:5d} transakcji ({pct:5.1f}%)")
-
-print("\nTop 10 najczęściej kupowanych cen:")
-price_distribution = fact_sales_df['price_rp'].value_counts().sort_values(ascending=False).head(10)
-for price, count in price_distribution.items():
-    pct = (count / len(fact_sales_df)) * 100
-    price_label = "NULL" if pd.isna(price) else int(price)
-    print(f"  {price_label:>4} RP: {count:5d} transakcji ({pct:5.1f}%)")
-
-
-# Całkowity przychód
-total_revenue = fact_sales_df['price_rp'].sum()
-print(f"\nCałkowity przychód: {total_revenue:,} RP")
-print(f"Średnia wartość transakcji: {total_revenue / len(fact_sales_df):.2f} RP")
-
-# Przychód po segmentach
-print("\nPrzychód po segmentach graczy:")
-revenue_by_segment = sales_by_segment.groupby('player_segment')['price_rp'].agg(['sum', 'mean', 'count'])
-for segment in revenue_by_segment.index:
-    row = revenue_by_segment.loc[segment]
-    print(f"  {segment:8s}: {row['sum']:>10,.0f} RP ({row['count']:>5,.0f} transakcji, avg {row['mean']:>6.0f} RP)")
-
-fact_sales_df.to_csv(fact_sales_path, index=False)
-print(f"\nZapisano: {fact_sales_path}")
-
-# ================= PODSUMOWANIE =================
-print("PODSUMOWANIE")
-print(f"\nDIM_PLAYER: {len(dim_player_df)} graczy")
-print(f"DIM_SKIN: {len(dim_skin_df)} skinów (bez Default)")
-print(f"FACT_SALES: {len(fact_sales_df)} transakcji")
-print(f"\nPliki zapisane w: {DATA_RAW_DIR}")
\ No newline at end of file
+    }
+    return columns, segment_code, error_counts
+
+
+def iter_transaction_chunks(rng, num_transactions, player_ids, player_segment_codes,
+                            skin_ids, skin_prices, skin_release_dates, today, first_transaction_id=1,
+                            num_duplicates=None, chunk_size=BATCH_SIZE):
+    """
+    Generator paczek transakcji po chunk_size wierszy.
+
+    Dla każdej paczki zwraca (kolumny, segment_code, error_counts, dup_idx), gdzie
+    dup_idx to wiersze paczki do zduplikowania. Liczba duplikatów na paczkę jest
+    losowana hipergeometrycznie, więc razem to nadal równomierna próbka 1%
+    ze wszystkich transakcji - bez trzymania ich w pamięci.
+    """
+    sampling_index = SkinSamplingIndex(skin_prices, skin_release_dates)
+
+    chunk_sizes = [
+        min(chunk_size, num_transactions - start)
+        for start in range(0, num_transactions, chunk_size)
+    ]
+    if num_duplicates is None:
+        num_duplicates = int(num_transactions * DUPLICATE_RATE)
+    dup_counts = rng.multivariate_hypergeometric(chunk_sizes, num_duplicates)
+
+    for size, dup_count in zip(chunk_sizes, dup_counts):
+        columns, segment_code, error_counts = generate_transaction_batch(
+            rng, first_transaction_id, size, player_ids, player_segment_codes,
+            skin_ids, skin_prices, sampling_index, today
+        )
+        dup_idx = rng.choice(size, size=int(dup_count), replace=False)
+        yield columns, segment_code, error_counts, dup_idx
+        first_transaction_id += size
+
+
+class SalesStats:
+    """Statystyki transakcji liczone przyrostowo - pamięć nie rośnie z NUM_TRANSACTIONS."""
+
+    def __init__(self):
+        self.rows = 0
+        self.error_counts = np.zeros(len(ERROR_TYPES), dtype=np.int64)
+        self.segment_counts = np.zeros(len(SEGMENTS), dtype=np.int64)
+        self.segment_revenue = np.zeros(len(SEGMENTS), dtype=np.float64)
+        self.segment_priced = np.zeros(len(SEGMENTS), dtype=np.int64)
+        self.price_counts = {}
+        self.total_revenue = 0.0
+
+    @property
+    def error_log(self):
+        return dict(zip(ERROR_TYPES, self.error_counts.tolist()))
+
+    def update(self, price_rp, segment_code):
+        """Dolicza paczkę: ceny (NaN = NULL) i segment gracza (-1 = brak gracza)."""
+        has_price = ~np.isnan(price_rp)
+        has_segment = segment_code >= 0
+        priced = has_price & has_segment
+
+        self.rows += len(price_rp)
+        self.segment_counts += np.bincount(segment_code[has_segment], minlength=len(SEGMENTS))
+        self.segment_revenue += np.bincount(
+            segment_code[priced], weights=price_rp[priced], minlength=len(SEGMENTS)
+        )
+        self.segment_priced += np.bincount(segment_code[priced], minlength=len(SEGMENTS))
+        self.total_revenue += price_rp[has_price].sum()
+
+        prices, counts = np.unique(price_rp[has_price], return_counts=True)
+        for price, count in zip(prices.tolist(), counts.tolist()):
+            self.price_counts[price] = self.price_counts.get(price, 0) + count
+
+    def merge(self, other):
+        """Dolicza statystyki innej paczki / sharda."""
+        self.rows += other.rows
+        self.error_counts += other.error_counts
+        self.segment_counts += other.segment_counts
+        self.segment_revenue += other.segment_revenue
+        self.segment_priced += other.segment_priced
+        self.total_revenue += other.total_revenue
+        for price, count in other.price_counts.items():
+            self.price_counts[price] = self.price_counts.get(price, 0) + count
+
+    def report(self, num_transactions):
+        error_log = self.error_log
+
+        print(f"\nWygenerowano {self.rows} transakcji")
+        print(f"  - Czyste: {num_transactions - sum(error_log.values())}")
+        print(f"  - Błędne: {sum(error_log.values())} ({sum(error_log.values())/self.rows*100:.1f}%)")
+
+        if sum(error_log.values()) > 0:
+            print("\nRaport błędów:")
+            for error_type, count in sorted(error_log.items(), key=lambda x: x[1], reverse=True):
+                if count > 0:
+                    print(f"  {error_type:20s}: {count:4d}")
+
+        # Tylko transakcje z poprawnym graczem (jak dawny merge po player_id)
+        print("\nRozkład transakcji po segmentach:")
+        for code in np.argsort(-self.segment_counts, kind="stable"):
+            count = self.segment_counts[code]
+            if count > 0:
+                pct = (count / self.rows) * 100
+                print(f"  {SEGMENTS[code]:8s}: {count:5d} transakcji ({pct:5.1f}%)")
+
+        print("\nTop 10 najczęściej kupowanych cen:")
+        price_distribution = sorted(self.price_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+        for price, count in price_distribution:
+            pct = (count / self.rows) * 100
+            print(f"  {int(price):>4} RP: {count:5d} transakcji ({pct:5.1f}%)")
+
+        # Całkowity przychód
+        print(f"\nCałkowity przychód: {self.total_revenue:,} RP")
+        print(f"Średnia wartość transakcji: {self.total_revenue / self.rows:.2f} RP")
+
+        # Przychód po segmentach
+        print("\nPrzychód po segmentach graczy:")
+        for code, segment in enumerate(SEGMENTS):
+            count = self.segment_priced[code]
+            if count > 0:
+                revenue = self.segment_revenue[code]
+                print(f"  {segment:8s}: {revenue:>10,.0f} RP ({count:>5,.0f} transakcji, avg {revenue / count:>6.0f} RP)")
+
+
+def open_sinks(stem, name, output_format, copy_to_bronze=False):
+    """Writery plików raw + opcjonalnie COPY prosto do bronze (load_bronze.BronzeCopyWriter)."""
+    writers = open_writers(stem, name, output_format)
+    if copy_to_bronze:
+        from load_bronze import BRONZE_TABLES, BronzeCopyWriter
+        table = next(table for table, raw_name in BRONZE_TABLES.items() if raw_name == name)
+        writers.append(BronzeCopyWriter(table))
+    return writers
+
+
+def close_sinks(writers, exc=None):
+    """Zamyka writery; przy błędzie COPY do bronze jest przerywany (abort), a nie zatwierdzany."""
+    for writer in writers:
+        if exc is not None and hasattr(writer, "abort"):
+            writer.abort(exc)
+        else:
+            writer.close()
+
+
+def write_players(stem, chunks, num_players, output_format="csv", copy_to_bronze=False):
+    """
+    Zapisuje paczki dim_player do stem.csv / stem.parquet na bieżąco.
+
+    Zwraca (segment_codes, segment_counts, region_counts) - kody segmentów są
+    potrzebne do losowania transakcji, reszta to statystyki.
+    """
+    segment_codes = np.empty(num_players, dtype=np.int8)
+    segment_counts = np.zeros(len(SEGMENTS), dtype=np.int64)
+    region_counts = np.zeros(len(REGIONS), dtype=np.int64)
+
+    offset = 0
+    writers = open_sinks(stem, "dim_player", output_format, copy_to_bronze)
+    try:
+        for chunk_df in chunks:
+            for writer in writers:
+                writer.write(chunk_df)
+
+            codes = pd.Categorical(chunk_df["player_segment"], categories=SEGMENTS).codes
+            segment_codes[offset:offset + len(chunk_df)] = codes
+            segment_counts += np.bincount(codes, minlength=len(SEGMENTS))
+            region_counts += np.bincount(
+                pd.Categorical(chunk_df["region"], categories=REGIONS).codes, minlength=len(REGIONS)
+            )
+            offset += len(chunk_df)
+    except BaseException as exc:
+        close_sinks(writers, exc)
+        raise
+
+    close_sinks(writers)
+
+    return segment_codes, segment_counts, region_counts
+
+
+def write_fact_sales(stem, chunks, first_duplicate_id, stats, output_format="csv", copy_to_bronze=False):
+    """
+    Dopisuje paczki transakcji do stem.csv / stem.parquet na bieżąco i dolicza statystyki.
+
+    Duplikaty dostają kolejne transaction_id od first_duplicate_id (za wszystkimi
+    oryginalnymi transakcjami), więc trafiają do pliku tymczasowego i są
+    doklejane na końcu.
+    """
+    next_duplicate_id = first_duplicate_id
+    writers = open_sinks(stem, "fact_sales", output_format, copy_to_bronze)
+
+    try:
+        with tempfile.TemporaryFile(dir=os.path.dirname(stem)) as dup_out:
+            for columns, segment_code, error_counts, dup_idx in chunks:
+                chunk_df = pd.DataFrame(columns)
+                for writer in writers:
+                    writer.write(chunk_df)
+
+                stats.update(columns["price_rp"], segment_code)
+                stats.error_counts += error_counts
+
+                # Dodaj duplikaty (ta sama treść, nowy transaction_id)
+                if len(dup_idx) > 0:
+                    dup_df = chunk_df.iloc[dup_idx].copy()
+                    dup_df["transaction_id"] = np.arange(next_duplicate_id, next_duplicate_id + len(dup_idx))
+                    next_duplicate_id += len(dup_idx)
+                    pickle.dump(dup_df, dup_out)
+                    stats.update(dup_df["price_rp"].to_numpy(), segment_code[dup_idx])
+
+            dup_out.seek(0)
+            while True:
+                try:
+                    dup_df = pickle.load(dup_out)
+                except EOFError:
+                    break
+                for writer in writers:
+                    writer.write(dup_df)
+    except BaseException as exc:
+        close_sinks(writers, exc)
+        raise
+
+    close_sinks(writers)
+
+
+def shard_ranges(num_transactions, num_shards):
+    """Podział transaction_id na shardy: lista (pierwszy transaction_id, liczba transakcji)."""
+    base, extra = divmod(num_transactions, num_shards)
+    ranges = []
+    first_transaction_id = 1
+    for shard_index in range(num_shards):
+        size = base + (1 if shard_index < extra else 0)
+        ranges.append((first_transaction_id, size))
+        first_transaction_id += size
+    return ranges
+
+
+def shard_stem(shard_index):
+    return os.path.join(DATA_RAW_DIR, f"fact_sales_part-{shard_index:04d}")
+
+
+# Dane wspólne dla workerów puli (gracze, skiny, data) - ustawiane raz na proces
+_shard_context = {}
+
+
+def _init_shard_worker(context):
+    _shard_context.update(context)
+
+
+def generate_shard(task):
+    """Generuje jeden shard transakcji do własnego pliku i zwraca jego SalesStats."""
+    stem, seed_seq, first_transaction_id, num_transactions, num_duplicates, first_duplicate_id = task
+    context = _shard_context
+
+    rng = np.random.default_rng(seed_seq)
+    stats = SalesStats()
+    chunks = iter_transaction_chunks(
+        rng, num_transactions, context["player_ids"], context["player_segment_codes"],
+        context["skin_ids"], context["skin_prices"], context["skin_release_dates"], context["today"],
+        first_transaction_id=first_transaction_id,
+        num_duplicates=num_duplicates,
+        chunk_size=context["chunk_size"]
+    )
+    write_fact_sales(stem, chunks, first_duplicate_id, stats,
+                     context["output_format"], context["copy_to_bronze"])
+    return stats
+
+
+def generate_fact_sales(seed_seq, num_transactions, num_shards, workers, context):
+    """
+    Generuje fact_sales: jeden shard -> fact_sales.csv w tym procesie,
+    wiele shardów -> fact_sales_part-NNNN.csv w puli procesów
+    (albo .parquet, zależnie od output_format w context).
+
+    Każdy shard dostaje własny seed z seed_seq.spawn(), a podział duplikatów
+    między shardy jest losowany centralnie (hipergeometrycznie), więc rozkład
+    błędów i duplikatów jest taki sam jak w jednym procesie, a ten sam seed
+    i liczba shardów dają identyczne bajtowo pliki.
+    """
+    duplicates_seq, *shard_seqs = seed_seq.spawn(1 + num_shards)
+    ranges = shard_ranges(num_transactions, num_shards)
+
+    num_duplicates = int(num_transactions * DUPLICATE_RATE)
+    dup_counts = np.random.default_rng(duplicates_seq).multivariate_hypergeometric(
+        [size for _, size in ranges], num_duplicates
+    )
+    first_duplicate_ids = num_transactions + 1 + np.concatenate([[0], np.cumsum(dup_counts)[:-1]])
+
+    stems = [raw_stem(fact_sales_path)] if num_shards == 1 else [shard_stem(i) for i in range(num_shards)]
+    tasks = [
+        (stem, shard_seq, first_transaction_id, size, int(dup_count), int(first_duplicate_id))
+        for stem, shard_seq, (first_transaction_id, size), dup_count, first_duplicate_id
+        in zip(stems, shard_seqs, ranges, dup_counts, first_duplicate_ids)
+    ]
+
+    stats = SalesStats()
+    if num_shards == 1:
+        _init_shard_worker(context)
+        stats.merge(generate_shard(tasks[0]))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_shard_worker,
+                                 initargs=(context,)) as pool:
+            for shard_stats in pool.map(generate_shard, tasks):
+                stats.merge(shard_stats)
+    return stats
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generowanie graczy i transakcji")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Master seed (ten sam seed + liczba shardów = identyczne pliki)")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="Liczba shardów fact_sales_part-NNNN.csv (1 = fact_sales.csv)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Liczba procesów generujących shardy")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="csv",
+                        help="Format plików raw: csv, parquet (typowane kolumny) albo oba")
+    parser.add_argument("--copy-to-bronze", action="store_true",
+                        help="Ładuj graczy i transakcje od razu do bronze.stg_* przez COPY (każdy shard osobno)")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=None,
+                        help="Data odniesienia YYYY-MM-DD (domyślnie dziś)")
+    parser.add_argument("--scale-factor", type=int, default=1,
+                        help=f"SF: {NUM_PLAYERS} x SF graczy i {NUM_TRANSACTIONS} x SF transakcji")
+    return parser.parse_args()
+
+
+@instrumented("generate")
+def main():
+    print("="*60)
+    print("GENEROWANIE GRACZY I TRANSAKCJI")
+    print("="*60)
+
+    args = parse_args()
+    num_players = NUM_PLAYERS * args.scale_factor
+    num_transactions = NUM_TRANSACTIONS * args.scale_factor
+
+    # Seed: players i sprzedaż mają niezależne strumienie losowe
+    seed_seq = np.random.SeedSequence(args.seed)
+    players_seq, sales_seq = seed_seq.spawn(2)
+    rng = np.random.default_rng(players_seq)
+    today = np.datetime64(args.as_of or datetime.now().date(), "D")
+    print(f"Seed: {seed_seq.entropy}, shardy: {args.shards}, data: {today}, SF: {args.scale_factor}")
+
+    #WCZYTAJ SKINY
+    print("\nWczytywanie skinów z dim_skins_final.csv...")
+
+    try:
+        dim_skin_df = pd.read_csv(skins_path)
+    except FileNotFoundError:
+        print(f"BŁĄD: Nie znaleziono pliku {skins_path}")
+        print("Uruchom najpierw: python merge_skins.py")
+        exit(1)
+
+    print(f"Wczytano {len(dim_skin_df)} skinów")
+    record_input(skins_path, rows=len(dim_skin_df))
+
+    # Usuń default skiny (nie są sprzedawane)
+    original_count = len(dim_skin_df)
+    dim_skin_df = dim_skin_df[dim_skin_df["rarity"] != "Default"].copy()
+    removed = original_count - len(dim_skin_df)
+    print(f"Usunięto {removed} default skinów (nie są sprzedawane)")
+
+    skin_ids = dim_skin_df["skin_id"].to_numpy()
+    skin_prices = dim_skin_df["price_rp"].to_numpy()
+    skin_release_dates = dim_skin_df["release_date"].to_numpy()
+
+    print(f"Dostępnych skinów do sprzedaży: {len(skin_ids)}")
+
+    # Statystyki cenowe
+    print("\nRozkład cen skinów:")
+    price_stats = dim_skin_df.groupby('price_rp').size().sort_index()
+    for price, count in price_stats.items():
+        print(f"  {price:4d} RP: {count:4d} skinów")
+
+    #GENERUJ DIM_PLAYER (paczkami, zapis na bieżąco)
+    print("GENEROWANIE GRACZY")
+
+    player_segment_codes, segment_counts, region_counts = write_players(
+        raw_stem(dim_player_path), iter_player_chunks(rng, num_players, today), num_players,
+        args.format, args.copy_to_bronze
+    )
+
+    # Statystyki graczy
+    print(f"\nWygenerowano {num_players} graczy")
+    print("\nRozkład segmentów:")
+    for code in np.argsort(-segment_counts, kind="stable"):
+        pct = (segment_counts[code] / num_players) * 100
+        print(f"  {SEGMENTS[code]:8s}: {segment_counts[code]:5d} ({pct:5.1f}%)")
+
+    print("\nRozkład regionów:")
+    for code in np.argsort(-region_counts, kind="stable"):
+        pct = (region_counts[code] / num_players) * 100
+        print(f"  {REGIONS[code]:4s}: {region_counts[code]:5d} ({pct:5.1f}%)")
+
+    print(f"\nZapisano: {', '.join(output_paths(raw_stem(dim_player_path), args.format))}")
+    record_output(output_paths(raw_stem(dim_player_path), args.format), rows=num_players)
+
+    #GENERUJ FACT_SALES (paczkami, zapis na bieżąco)
+
+    print("GENEROWANIE TRANSAKCJI")
+
+    buckets = price_buckets(skin_prices)
+    print(f"\nSkiny tanie (<=750 RP): {(buckets == 0).sum()}")
+    print(f"Skiny średnie (751-1350 RP): {(buckets == 1).sum()}")
+    print(f"Skiny drogie (>=1351 RP): {(buckets == 2).sum()}")
+
+    # Skin sprzedawany dopiero od premiery (SkinSamplingIndex)
+    window_start = today - 365
+    unreleased = (pd.to_datetime(dim_skin_df["release_date"], errors="coerce") > pd.Timestamp(window_start)).sum()
+    print(f"Skiny z premierą po {window_start}: {unreleased} (sprzedawane dopiero od daty premiery)")
+
+    # Usuń shardy z poprzedniego uruchomienia (mogło być ich więcej)
+    for old_part in glob.glob(os.path.join(DATA_RAW_DIR, "fact_sales_part-*")):
+        os.remove(old_part)
+
+    context = {
+        "player_ids": np.arange(1, num_players + 1),
+        "player_segment_codes": player_segment_codes,
+        "skin_ids": skin_ids,
+        "skin_prices": skin_prices,
+        "skin_release_dates": skin_release_dates,
+        "today": today,
+        "chunk_size": BATCH_SIZE,
+        "output_format": args.format,
+        "copy_to_bronze": args.copy_to_bronze
+    }
+    stats = generate_fact_sales(sales_seq, num_transactions, args.shards, args.workers, context)
+
+    stats.report(num_transactions)
+    stems = [raw_stem(fact_sales_path)] if args.shards == 1 else [shard_stem(i) for i in range(args.shards)]
+    record_output([path for stem in stems for path in output_paths(stem, args.format)], rows=stats.rows)
+    if args.shards == 1:
+        print(f"\nZapisano: {', '.join(output_paths(raw_stem(fact_sales_path), args.format))}")
+    else:
+        print(f"\nZapisano {args.shards} shardów: {', '.join(output_paths(shard_stem(0), args.format))} ...")
+
+    # ================= PODSUMOWANIE =================
+    print("PODSUMOWANIE")
+    print(f"\nDIM_PLAYER: {num_players} graczy")
+    print(f"DIM_SKIN: {len(dim_skin_df)} skinów (bez Default)")
+    print(f"FACT_SALES: {stats.rows} transakcji")
+    print(f"\nPliki zapisane w: {DATA_RAW_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+Ładowanie plików raw do bronze.stg_* przez COPY FROM STDIN (zamiast importu w DataGrip).
+
+Każdy plik (albo shard fact_sales_part-NNNN) idzie osobnym COPY na własnym
+połączeniu, więc pliki ładują się równolegle. Dane są wysyłane blokami po
+COPY_BLOCK_SIZE bajtów - nic nie jest trzymane w pamięci w całości.
+
+Połączenie: zmienne DB_HOST / DB_PORT / DB_NAME / DB_USER / DB_PASSWORD
+(jak w .env.example, plik .env w katalogu repo jest wczytywany) albo --dsn.
+"""
+import argparse
+import glob
+import io
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from raw_writers import RAW_SCHEMAS
+from stage_metrics import instrumented, record_input, record_output
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))   # data/src_data
+DATA_DIR = os.path.dirname(SRC_DIR)                     # data
+RAW_DIR = os.path.join(DATA_DIR, "raw")                 # data/raw
+REPO_DIR = os.path.dirname(DATA_DIR)
+
+COPY_BLOCK_SIZE = 8 * 1024 * 1024  # 8 MB na jeden write() do COPY
+
+# \ir <plik> w skryptach SQL (psql: ścieżka względem pliku, który dołącza)
+SQL_INCLUDE = re.compile(r"^\\ir\s+(\S+)\s*$", re.MULTILINE)
+
+# Tabela bronze -> plik raw (nazwa schematu w RAW_SCHEMAS)
+BRONZE_TABLES = {
+    "stg_skins": "dim_skins_final",
+    "stg_players": "dim_player",
+    "stg_sales": "fact_sales",
+    "stg_sales_quarantine": "fact_sales_quarantine",
+    "stg_skin_changes": "dim_skins_changes",
+}
+
+# Tabele z katalogu sprzedaży (--sales-dir): czyste fact_sales i odrzucone przed bronze
+SALES_TABLES = ["stg_sales", "stg_sales_quarantine"]
+
+
+def _psycopg():
+    try:
+        import psycopg
+    except ImportError:
+        raise SystemExit("BŁĄD: ładowanie do PostgreSQL wymaga pakietu psycopg (pip install psycopg[binary])")
+    return psycopg
+
+
+def load_env_file(path=os.path.join(REPO_DIR, ".env")):
+    """Wczytuje KEY=VALUE z .env do os.environ (bez nadpisywania istniejących)."""
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#") and "=" in line:
+                key, value = line.split("=", 1)
+                os.environ.setdefault(key.strip(), value.strip())
+
+
+def connection_kwargs(dsn=None):
+    if dsn:
+        return {"conninfo": dsn}
+    load_env_file()
+    return {
+        "host": os.environ.get("DB_HOST", "localhost"),
+        "port": os.environ.get("DB_PORT", "5432"),
+        "dbname": os.environ.get("DB_NAME", "lol_dw"),
+        "user": os.environ.get("DB_USER", "postgres"),
+        "password": os.environ.get("DB_PASSWORD", ""),
+    }
+
+
+def connect(dsn=None):
+    return _psycopg().connect(**connection_kwargs(dsn))
+
+
+def sql_files(path):
+    """Plik SQL i pliki dołączone przez \\ir (rekurencyjnie) - do odcisków etapów."""
+    with open(path, encoding="utf-8") as f:
+        included = SQL_INCLUDE.findall(f.read())
+    files = [path]
+    for name in included:
+        files.extend(sql_files(os.path.join(os.path.dirname(path), name)))
+    return files
+
+
+def read_sql(path):
+    """Treść pliku SQL z rozwiniętymi \\ir - psycopg wykonuje czysty SQL, bez komend psql."""
+    with open(path, encoding="utf-8") as f:
+        sql = f.read()
+    return SQL_INCLUDE.sub(
+        lambda match: read_sql(os.path.join(os.path.dirname(path), match.group(1))), sql
+    )
+
+
+def copy_sql(table, header):
+    columns = ", ".join(column for column, _ in RAW_SCHEMAS[BRONZE_TABLES[table]])
+    return (
+        f"COPY bronze.{table} ({columns}) FROM STDIN "
+        f"WITH (FORMAT csv, HEADER {'true' if header else 'false'})"
+    )
+
+
+class BronzeCopyWriter:
+    """
+    Writer z interfejsem jak raw_writers (write(df) / close()), który zamiast
+    do pliku wysyła paczki DataFrame prosto do bronze.<table> przez COPY.
+    Pozwala generatorowi ładować dane bez pośrednich plików. Przy błędzie
+    abort(exc) (albo wyjście z bloku with z wyjątkiem) przerywa COPY i robi rollback.
+    """
+
+    def __init__(self, table, dsn=None):
+        self.path = f"bronze.{table}"
+        self.table = table
+        self.rows = 0
+        self.started = time.perf_counter()
+        self.conn = connect(dsn)
+        self.cursor = self.conn.cursor()
+        self.copy_context = self.cursor.copy(copy_sql(table, header=False))
+        self.copy = self.copy_context.__enter__()
+
+    def write(self, df):
+        buffer = io.StringIO()
+        df.to_csv(buffer, header=False, index=False)
+        self.copy.write(buffer.getvalue())
+        self.rows += len(df)
+
+    def abort(self, exc=None):
+        """Przerywa COPY (błąd przekazany do psycopg) i wycofuje transakcję - nic z paczek nie zostaje."""
+        try:
+            self.copy_context.__exit__(
+                type(exc) if exc else RuntimeError,
+                exc or RuntimeError("COPY przerwany"),
+                exc.__traceback__ if exc else None,
+            )
+        finally:
+            self.conn.rollback()
+            self.conn.close()
+        print(f"  bronze.{self.table}: COPY przerwany, wycofano {self.rows:,} wierszy")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is None:
+            self.close()
+        else:
+            self.abort(exc)
+
+    def close(self):
+        self.copy_context.__exit__(None, None, None)
+        self.conn.commit()
+        self.conn.close()
+        elapsed = time.perf_counter() - self.started
+        print(f"  bronze.{self.table}: {self.rows:,} wierszy w {elapsed:.2f}s "
+              f"({self.rows / max(elapsed, 1e-9):,.0f} wierszy/s)")
+
+
+def iter_csv_blocks(path):
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(COPY_BLOCK_SIZE)
+            if not block:
+                break
+            yield block
+
+
+def iter_parquet_blocks(path):
+    """Parquet -> bloki CSV bez nagłówka (batch po batchu)."""
+    try:
+        import pyarrow.csv as pa_csv
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("BŁĄD: ładowanie Parquet wymaga pakietu pyarrow (pip install pyarrow)")
+
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=256_000):
+        buffer = io.BytesIO()
+        pa_csv.write_csv(batch, buffer, pa_csv.WriteOptions(include_header=False))
+        yield buffer.getvalue()
+
+
+def copy_file(table, path, dsn=None):
+    """Jeden plik -> jeden COPY na osobnym połączeniu. Zwraca (table, path, rows, start, end)."""
+    is_parquet = path.endswith(".parquet")
+    blocks = iter_parquet_blocks(path) if is_parquet else iter_csv_blocks(path)
+
+    started = time.perf_counter()
+    with connect(dsn) as conn:
+        with conn.cursor() as cursor:
+            with cursor.copy(copy_sql(table, header=not is_parquet)) as copy:
+                for block in blocks:
+                    copy.write(block)
+            rows = cursor.rowcount
+    return table, path, rows, started, time.perf_counter()
+
+
+def find_raw_files(table, input_format="csv", raw_dir=RAW_DIR):
+    """
+    Pliki dla tabeli; dla stg_sales shardy fact_sales_part-NNNN mają pierwszeństwo.
+    Kwarantanna (dedupe_sales.py / validate_sales.py) jest zawsze w CSV.
+    """
+    name = BRONZE_TABLES[table]
+    if table == "stg_sales_quarantine":
+        input_format = "csv"
+    if table == "stg_sales":
+        shards = sorted(glob.glob(os.path.join(raw_dir, f"fact_sales_part-*.{input_format}")))
+        if shards:
+            return shards
+    path = os.path.join(raw_dir, f"{name}.{input_format}")
+    return [path] if os.path.exists(path) else []
+
+
+def load_bronze(tables, input_format="csv", jobs=4, truncate=False, dsn=None, raw_dir=RAW_DIR, sales_dir=None):
+    """
+    Ładuje pliki raw do bronze równolegle (jeden COPY na plik).
+    sales_dir: osobny katalog dla SALES_TABLES (np. data/deduped), reszta tabel z raw_dir.
+    Zwraca {table: (rows, seconds)} - seconds to czas od startu pierwszego do końca
+    ostatniego pliku tabeli.
+    """
+    tasks = []
+    for table in tables:
+        table_dir = sales_dir if table in SALES_TABLES and sales_dir else raw_dir
+        paths = find_raw_files(table, input_format, table_dir)
+        if not paths:
+            print(f"  UWAGA: brak plików {input_format} dla bronze.{table} - pomijam")
+        tasks.extend((table, path) for path in paths)
+
+    if truncate and tasks:
+        with connect(dsn) as conn:
+            for table in sorted({table for table, _ in tasks}):
+                conn.execute(f"TRUNCATE bronze.{table}")
+
+    spans = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(copy_file, table, path, dsn) for table, path in tasks]
+        for future in futures:
+            table, path, rows, started, finished = future.result()
+            print(f"  {os.path.basename(path)} -> bronze.{table}: {rows:,} wierszy ({finished - started:.2f}s)")
+            record_input(path, rows=rows)
+            total_rows, first_start, last_end = spans.get(table, (0, started, finished))
+            spans[table] = (total_rows + rows, min(first_start, started), max(last_end, finished))
+
+    return {table: (rows, end - start) for table, (rows, start, end) in spans.items()}
+
+
+@instrumented("load")
+def main():
+    parser = argparse.ArgumentParser(description="COPY plików raw do bronze.stg_*")
+    parser.add_argument("--tables", nargs="+", choices=list(BRONZE_TABLES), default=list(BRONZE_TABLES))
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                        help="Które pliki raw ładować")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(),
+                        help="Ile COPY naraz (pliki / shardy)")
+    parser.add_argument("--truncate", action="store_true", help="Wyczyść tabele bronze przed ładowaniem")
+    parser.add_argument("--raw-dir", default=RAW_DIR,
+                        help="Katalog z plikami (np. data/validated po validate_sales.py)")
+    parser.add_argument("--sales-dir", default=None,
+                        help="Osobny katalog dla stg_sales i stg_sales_quarantine (np. data/deduped po dedupe_sales.py)")
+    parser.add_argument("--dsn", default=None, help="Connection string (zamiast zmiennych DB_*)")
+    args = parser.parse_args()
+
+    print("="*60)
+    print("LOAD BRONZE (COPY FROM STDIN)")
+    print("="*60)
+
+    summary = load_bronze(args.tables, args.format, args.jobs, args.truncate, args.dsn, args.raw_dir,
+                          args.sales_dir)
+    record_output(rows=sum(rows for rows, _ in summary.values()))
+
+    print("\nPrzepustowość per tabela:")
+    for table, (rows, seconds) in summary.items():
+        print(f"  bronze.{table:12s}: {rows:>12,} wierszy w {seconds:7.2f}s "
+              f"({rows / max(seconds, 1e-9):>12,.0f} wierszy/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Jednoprzebiegowy tokenizer + parser literałów tabel Lua (format Module:SkinData z Wiki).
+
+Obsługuje to, co występuje w dumpie: `return { ... }`, klucze ["nazwa"] i nazwa =,
+stringi w cudzysłowach (z escape'ami), liczby, true/false/nil, zagnieżdżone
+tabele i listy {"a", "b"} oraz komentarze `--`.
+
+Tokenizer jest leniwy: bufor (bajty albo mmap) jest cięty na kawałki po ok.
+CHUNK_SIZE bajtów na granicy linii (string ani komentarz nie przechodzą przez
+koniec linii), a jeden skompilowany regex (findall) wyciąga z kawałka pary
+(klucz, wartość) - `["nazwa"] = "tekst"` to jedna para zamiast dwóch tokenów.
+W pamięci jest więc naraz tylko lista tokenów z jednego kawałka, a pętla parsera
+robi o połowę mniej obrotów. `,` i `;` (oraz `=` poza kluczem) są separatorami,
+a drzewo jest budowane na jawnym stosie (bez rekurencji).
+"""
+import gc
+import mmap
+import re
+
+CHUNK_SIZE = 256 * 1024
+
+# Kwantyfikatory zaborcze (*+, ++): bez odkładania punktów powrotu przy długich stringach
+_TOKEN = re.compile(rb"""
+    [\s=,;]*+                                       # separatory
+    (?:\["([^"\\]*+(?:\\.[^"\\]*+)*+)"\]\s*+=\s*+)?    # klucz ["..."] = (grupa 1)
+    (
+        "[^"\\]*+(?:\\.[^"\\]*+)*+"                  # string
+      | [{}]
+      | [A-Za-z_]\w*+(?:\s*+=(?!=))?                 # nazwa / true / false / nil / `nazwa =`
+      | -?\d++(?:\.\d+)?                            # liczba
+      | --[^\n]*+                                    # komentarz
+      | \S                                          # reszta -> LuaParseError
+    )
+""", re.VERBOSE)
+
+_ESCAPES = {b'n': '\n', b't': '\t', b'r': '\r', b'"': '"', b"'": "'", b'\\': '\\'}
+_ESCAPE = re.compile(rb'\\(.)', re.DOTALL)
+_CONSTANTS = {b'true': True, b'false': False, b'nil': None}
+
+# Bajty jako int: `int in bytes` to memchr, `bytes in bytes` jest kilka razy wolniejsze
+_BACKSLASH, _QUOTE, _OPEN, _CLOSE, _MINUS, _EQUALS, _DOT = b'\\"{}-=.'
+
+
+class LuaParseError(ValueError):
+    pass
+
+
+def _decode(raw):
+    """Bajty stringa z escape'ami -> str (bez escape'ów parser woła od razu .decode())."""
+    return _ESCAPE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(1).decode()).encode(), raw).decode('utf-8')
+
+
+def tokenize(buffer, chunk_size=CHUNK_SIZE):
+    """
+    Leniwie: kolejne listy par (klucz, token) - klucz to bajty spomiędzy `["` i `"]`
+    albo b'', token bez separatorów i białych znaków. Jedna lista na kawałek bufora.
+    """
+    start, size = 0, len(buffer)
+    while start < size:
+        end = _chunk_end(buffer, start + chunk_size)
+        yield _TOKEN.findall(buffer[start:end])
+        start = end
+
+
+def _chunk_end(buffer, pos):
+    """Koniec kawałka: pierwszy koniec linii od pos, który nie rozdziela `klucz =` od wartości."""
+    while True:
+        end = buffer.find(b"\n", pos)
+        if end < 0:
+            return len(buffer)
+        last = end
+        while last > pos and buffer[last - 1] in b" \t\r":
+            last -= 1
+        if buffer[last - 1] != _EQUALS:
+            return end + 1
+        pos = end + 1
+
+
+def _close_table(fields, items):
+    """{ ... } -> dict (klucze) albo list (same wartości); przy mieszanych pozycje dostają klucze 1..n."""
+    if not items:
+        return fields
+    if not fields:
+        return items
+    fields.update({i + 1: item for i, item in enumerate(items)})
+    return fields
+
+
+def parse(buffer):
+    """
+    Parsuje `[return] { ... }` z bufora bajtów / mmap i zwraca zbudowaną strukturę.
+    GC jest wyłączany na czas parsowania - drzewo to miliony nowych obiektów bez
+    cykli, a cykliczny GC przechodziłby po nich wielokrotnie. Po powrocie GC wraca
+    do poprzedniego stanu; gc.freeze() drzewa zostawiamy wywołującemu, który zna
+    czas życia procesu (parse_skins_from_wiki.main).
+    """
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _parse_tokens(tokenize(buffer))
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _parse_tokens(chunks):
+    stack = []
+    fields = items = key = None
+    result = None
+    done = False
+
+    for chunk in chunks:
+        for raw_key, token in chunk:
+            first = token[0]
+
+            if done:
+                if first == _MINUS and token[1:2] == b'-' and not raw_key:
+                    continue
+                raise LuaParseError(f"Nadmiarowe dane po tabeli: {token[:20]!r}")
+
+            if raw_key:
+                if fields is None:
+                    raise LuaParseError(f"Klucz {raw_key[:20]!r} poza tabelą")
+                key = _decode(raw_key) if _BACKSLASH in raw_key else raw_key.decode()
+            if first == _QUOTE:
+                value = token[1:-1]
+                value = _decode(value) if _BACKSLASH in value else value.decode()
+            elif first == _OPEN:
+                stack.append((fields, items, key))
+                fields, items, key = {}, [], None
+                continue
+            elif first == _CLOSE:
+                if raw_key:
+                    raise LuaParseError(f"Brak wartości dla klucza {raw_key[:20]!r}")
+                if not stack:
+                    raise LuaParseError("Nadmiarowe '}'")
+                value = _close_table(fields, items) if fields and items else items or fields
+                fields, items, key = stack.pop()
+                if fields is None:
+                    result, done = value, True
+                    continue
+            elif first == _MINUS and token[1:2] == b'-':
+                if raw_key:
+                    raise LuaParseError(f"Brak wartości dla klucza {raw_key[:20]!r}")
+                continue
+            elif first == _MINUS or 48 <= first <= 57:
+                value = float(token) if _DOT in token else int(token)
+            elif token in _CONSTANTS:
+                value = _CONSTANTS[token]
+            elif token[-1] == _EQUALS:
+                if fields is None or raw_key:
+                    raise LuaParseError(f"Nieoczekiwany klucz {token[:20]!r}")
+                key = token[:-1].rstrip().decode()
+                continue
+            elif token[:1].isalpha() or first == ord('_'):
+                if fields is None and token == b'return':
+                    continue
+                raise LuaParseError(f"Oczekiwano 'return' albo '{{', jest {token!r}")
+            else:
+                raise LuaParseError(f"Nieoczekiwany token {token[:20]!r}")
+
+            if fields is None:
+                raise LuaParseError(f"Wartość {token[:20]!r} poza tabelą")
+            if key is None:
+                items.append(value)
+            else:
+                fields[key] = value
+                key = None
+
+    if not done:
+        raise LuaParseError("Niezamknięta tabela" if stack else "Brak tabeli w danych")
+    return result
+
+
+def parse_file(path):
+    """Parsuje plik przez mmap (bez wczytywania kopii do pamięci)."""
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return parse(buffer)
@@ -2,10 +2,10 @@ import pandas as pd
 import re
 from datetime import datetime
 import os
+import argparse
 
-print("="*60)
-print("MERGE: Data Dragon + Wiki Prices (FIXED PATHS)")
-print("="*60)
+from raw_writers import OUTPUT_FORMATS, raw_stem, write_frame
+from stage_metrics import instrumented, record_input, record_output
 
 # ŚCIEŻKI - POPRAWIONE!
 # Skrypt jest tutaj: LOLDW/data/src_data/merge_skins.py
@@ -16,25 +16,11 @@ RAW_DIR = os.path.join(DATA_DIR, "raw")                  # LOLDW/data/raw/
 ddragon_path = os.path.join(RAW_DIR, "ddragon_skins.csv")
 wiki_path = os.path.join(RAW_DIR, "wiki_skins_clean.csv")
 output_path = os.path.join(RAW_DIR, "dim_skins_final.csv")
-
-print(f"\nŚcieżki:")
-print(f"  Data Dragon: {ddragon_path}")
-print(f"  Wiki: {wiki_path}")
-print(f"  Output: {output_path}")
-
-# Wczytaj pliki
-print("\n1. Wczytywanie Data Dragon skins...")
-try:
-    df_ddragon = pd.read_csv(ddragon_path)
-    print(f"   ✓ Wczytano {len(df_ddragon)} skinów z Data Dragon")
-except FileNotFoundError:
-    print(f"   BŁĄD: Nie znaleziono {ddragon_path}")
-    exit(1)
+audit_path = os.path.join(RAW_DIR, "skin_match_audit.csv")
+registry_path = os.path.join(RAW_DIR, "skin_id_registry.csv")
 
 # FILTRUJ tylko event-exclusive (NIE esportowe!)
-print("\n1a. Filtrowanie skinów event-exclusive...")
-
-exclude_keywords = [
+EXCLUDE_KEYWORDS = [
     'prestige',
     'victorious',
     'immortalized legend',
@@ -44,23 +30,10 @@ exclude_keywords = [
     'fright night',
 ]
 
-original_count = len(df_ddragon)
-mask_exclude = df_ddragon['skin_name'].str.lower().str.contains(
-    '|'.join(exclude_keywords), regex=True, na=False
-)
-df_ddragon = df_ddragon[~mask_exclude].copy()
+# Fuzzy fallback: minimalny wynik (0-100) i minimalna przewaga nad drugim kandydatem
+FUZZY_THRESHOLD = 85.0
+FUZZY_MARGIN = 10.0
 
-print(f"   Usunięto {original_count - len(df_ddragon)} skinów event-exclusive")
-print(f"   Pozostało {len(df_ddragon)} skinów (zachowano esportowe)")
-
-# Wiki
-print("\n2. Wczytywanie Wiki prices...")
-try:
-    df_wiki = pd.read_csv(wiki_path)
-    print(f"   ✓ Wczytano {len(df_wiki)} skinów z Wiki")
-except FileNotFoundError:
-    print(f"   BŁĄD: Nie znaleziono {wiki_path}")
-    exit(1)
 
 # Normalizacja nazw
 def normalize_name(name):
@@ -68,117 +41,407 @@ def normalize_name(name):
         return ""
     return re.sub(r'[^a-z0-9]', '', str(name).lower())
 
-print("\n3. Przygotowanie danych...")
-
-df_ddragon['skin_name_norm'] = df_ddragon['skin_name'].apply(normalize_name)
-
-mask_default = df_ddragon['skin_name'] == 'default'
-df_ddragon.loc[mask_default, 'skin_name_norm'] = (
-    df_ddragon.loc[mask_default, 'champion_name'].apply(normalize_name)
-)
-
-print(f"   Data Dragon: {len(df_ddragon)} skinów")
-print(f"   Wiki: {len(df_wiki)} skinów")
-
-# MERGE (z release_date!)
-print("\n4. Łączenie danych...")
-df_merged = df_ddragon.merge(
-    df_wiki[['skin_name_norm', 'price_rp', 'rarity', 'release_date']],
-    on='skin_name_norm',
-    how='left'
-)
-
-matched = df_merged['price_rp'].notna().sum()
-unmatched = df_merged['price_rp'].isna().sum()
-
-print("\n5. Wyniki matchowania:")
-print(f"   Dopasowane: {matched} ({matched/len(df_merged)*100:.1f}%)")
-print(f"   Niedopasowane: {unmatched} ({unmatched/len(df_merged)*100:.1f}%)")
-
-# Obsługa defaultów
-print("\n6. Obsługa niedopasowanych skinów...")
-
-# FIX: Default = 0 RP ZAWSZE
-mask_default = (df_merged['skin_num'] == 0) | (df_merged['skin_name'] == 'default')
-df_merged.loc[mask_default, 'rarity'] = 'Default'
-df_merged.loc[mask_default, 'price_rp'] = 0
-
-# Usuń resztę bez ceny
-mask_unmatched = df_merged['price_rp'].isna() & ~mask_default
-
-if mask_unmatched.sum() > 0:
-    print(f"   Usuwam {mask_unmatched.sum()} skinów bez dopasowanej ceny...")
-    examples = df_merged[mask_unmatched][['champion_name', 'skin_name']].head(5)
-    for _, row in examples.iterrows():
-        print(f"     - {row['champion_name']}: {row['skin_name']}")
-    df_merged = df_merged[~mask_unmatched].copy()
-
-print(f"   Pozostało {len(df_merged)} skinów")
-
-# Finalne porządki
-df_merged['price_rp'] = df_merged['price_rp'].astype(int)
-
-if 'skin_id' in df_merged.columns:
-    df_merged = df_merged.drop(columns=['skin_id'])
-
-df_merged.insert(0, 'skin_id', range(1, len(df_merged) + 1))
-
-# Użyj prawdziwej daty z Wiki
-df_merged['release_date'] = pd.to_datetime(
-    df_merged['release_date'], 
-    errors='coerce'
-).dt.date
-
-# Kolumny końcowe
-final_columns = [
-    'skin_id',
-    'champion_name',
-    'skin_name',
-    'rarity',
-    'price_rp',
-    'release_date',
-    'champion_id',
-    'skin_num',
-    'skin_name_norm'
-]
 
-df_final = df_merged[[c for c in final_columns if c in df_merged.columns]]
-
-# Statystyki
-print("\n" + "="*60)
-print("STATYSTYKI KOŃCOWE")
-print("="*60)
-print(f"Całkowita liczba skinów: {len(df_final)}")
-print(f"Liczba championów: {df_final['champion_name'].nunique()}")
-
-print("\nRozkład rarity:")
-for rarity, count in df_final['rarity'].value_counts().items():
-    pct = (count / len(df_final)) * 100
-    print(f"  {rarity:12s}: {count:4d} ({pct:5.1f}%)")
-
-print("\nRozkład cen:")
-for price in [0, 520, 750, 880, 975, 1350, 1820, 3250]:
-    count = (df_final['price_rp'] == price).sum()
-    if count > 0:
-        print(f"  {price:4d} RP: {count:4d}")
-
-# Daty
-has_date = df_final['release_date'].notna().sum()
-no_date = df_final['release_date'].isna().sum()
-print(f"\nRelease dates:")
-print(f"  Z datą: {has_date} ({has_date/len(df_final)*100:.1f}%)")
-print(f"  Bez daty: {no_date}")
-
-# Zapis
-df_final.to_csv(output_path, index=False)
-
-print(f"\n{'='*60}")
-print(f"✓ Zapisano: {output_path}")
-print(f"{'='*60}")
-
-print("\nPoprawki:")
-print("  ✓ Default skiny = 0 RP")
-print("  ✓ Release_date z Wiki")
-print("  ✓ Zachowano esportowe (T1, DRX)")
-print("  ✓ Usunięto event-exclusive")
-print("\nGOTOWE!")
\ No newline at end of file
+def _rapidfuzz():
+    try:
+        from rapidfuzz import fuzz, process, utils
+    except ImportError:
+        raise SystemExit("BŁĄD: fuzzy matching wymaga pakietu rapidfuzz (pip install rapidfuzz) albo --no-fuzzy")
+    return fuzz, process, utils
+
+
+def fuzzy_key(name, champion):
+    """
+    Nazwa do porównania bez słów z nazwy championa: Wiki skleja "{skin} {champion}",
+    a Data Dragon często ma championa w środku nazwy ("Braum Lionheart", "Count Kledula").
+    """
+    _, _, utils = _rapidfuzz()
+    tokens = utils.default_process(str(name)).split()
+    champion_tokens = set(utils.default_process(str(champion)).split())
+    kept = [token for token in tokens if token not in champion_tokens]
+    return " ".join(kept or tokens)
+
+
+def fuzzy_match(df_unmatched, df_candidates, threshold=FUZZY_THRESHOLD, margin=FUZZY_MARGIN):
+    """
+    Fuzzy dopasowanie niedopasowanych skinów Data Dragon do wolnych wierszy Wiki.
+
+    Kandydaci są blokowani po championie (porównania tylko w obrębie championa),
+    a każdy blok jest liczony jednym wywołaniem rapidfuzz.process.cdist - koszt
+    rośnie z sumą (skiny championa)^2, a nie z (wszystkie skiny)^2.
+    Akceptacja: wynik >= threshold, przewaga nad drugim kandydatem >= margin
+    i wiersz Wiki nie został wzięty przez lepiej dopasowany skin.
+
+    Zwraca (matches, audit): matches = {indeks df_unmatched: indeks df_candidates},
+    audit = DataFrame ze wszystkimi decyzjami (accepted / rejected + powód).
+    """
+    fuzz, process, _ = _rapidfuzz()
+
+    unmatched_block = df_unmatched['champion_name'].apply(normalize_name)
+    candidate_block = df_candidates['champion'].apply(normalize_name)
+    candidate_groups = {block: group.index for block, group in df_candidates.groupby(candidate_block)}
+
+    proposals = []
+    for block, group in df_unmatched.groupby(unmatched_block):
+        candidate_index = candidate_groups.get(block)
+        if candidate_index is None:
+            for idx, row in group.iterrows():
+                proposals.append((idx, None, 0.0, 0.0, 'no_candidates'))
+            continue
+
+        candidates = df_candidates.loc[candidate_index]
+        queries = [fuzzy_key(n, c) for n, c in zip(group['skin_name'], group['champion_name'])]
+        choices = [fuzzy_key(n, c) for n, c in zip(candidates['skin_name'], candidates['champion'])]
+        scores = process.cdist(queries, choices, scorer=fuzz.token_sort_ratio)
+
+        for row_scores, idx in zip(scores, group.index):
+            order = row_scores.argsort()[::-1]
+            best = float(row_scores[order[0]])
+            second = float(row_scores[order[1]]) if len(order) > 1 else 0.0
+            if best < threshold:
+                reason = 'below_threshold'
+            elif best - second < margin:
+                reason = 'ambiguous'
+            else:
+                reason = None
+            proposals.append((idx, candidate_index[order[0]], best, second, reason))
+
+    # Jeden wiersz Wiki -> co najwyżej jeden skin (wygrywa najwyższy wynik)
+    matches = {}
+    taken = set()
+    audit_rows = []
+    for idx, wiki_idx, best, second, reason in sorted(proposals, key=lambda p: -p[2]):
+        if reason is None and wiki_idx in taken:
+            reason = 'conflict'
+        if reason is None:
+            matches[idx] = wiki_idx
+            taken.add(wiki_idx)
+
+        audit_rows.append({
+            'champion_name': df_unmatched.at[idx, 'champion_name'],
+            'skin_num': df_unmatched.at[idx, 'skin_num'],
+            'skin_name': df_unmatched.at[idx, 'skin_name'],
+            'wiki_skin_name': df_candidates.at[wiki_idx, 'skin_name'] if wiki_idx is not None else None,
+            'score': round(best, 1),
+            'second_score': round(second, 1),
+            'decision': 'accepted' if reason is None else 'rejected',
+            'reason': reason,
+        })
+
+    audit = pd.DataFrame(audit_rows, columns=[
+        'champion_name', 'skin_num', 'skin_name', 'wiki_skin_name',
+        'score', 'second_score', 'decision', 'reason'
+    ])
+    audit = audit.sort_values(['decision', 'champion_name', 'skin_num']).reset_index(drop=True)
+    return matches, audit
+
+
+class SkinIdRegistry:
+    """
+    Trwały rejestr kluczy skin_id: data/raw/skin_id_registry.csv.
+
+    skin_id jest przypisany raz na zawsze do (champion_id, skin_num), z nazwą
+    znormalizowaną jako zapasowym kluczem (np. gdy Riot przenumeruje skina).
+    Nowe skiny dostają kolejne wolne id, a skiny, które zniknęły z merge, są
+    oznaczane datą retired_date zamiast przenumerowania pozostałych - stare
+    fact_sales i klucze silver/gold zostają poprawne.
+    Bez pliku rejestr startuje z istniejącego dim_skins_final.csv (te same id).
+    """
+
+    COLUMNS = ['skin_id', 'champion_id', 'skin_num', 'skin_name_norm',
+               'first_seen', 'last_seen', 'retired_date']
+    TEXT_COLUMNS = {column: str for column in ['champion_id', 'skin_name_norm', 'first_seen', 'last_seen', 'retired_date']}
+
+    def __init__(self, path=registry_path, bootstrap_path=output_path):
+        self.path = path
+        if os.path.exists(path):
+            self.df = pd.read_csv(path, dtype=self.TEXT_COLUMNS)
+        elif os.path.exists(bootstrap_path):
+            self.df = self._bootstrap(pd.read_csv(bootstrap_path))
+        else:
+            self.df = pd.DataFrame(columns=self.COLUMNS)
+
+    def _bootstrap(self, df_final):
+        today = datetime.now().date().isoformat()
+        df = df_final[['skin_id', 'champion_id', 'skin_num', 'skin_name_norm']].copy()
+        df['first_seen'] = today
+        df['last_seen'] = today
+        df['retired_date'] = None
+        return df[self.COLUMNS]
+
+    def assign(self, df_skins, today=None):
+        """
+        Zwraca Series skin_id dla df_skins (indeks jak df_skins) i aktualizuje rejestr.
+        Kolejność: (champion_id, skin_num) -> skin_name_norm -> nowe id.
+        """
+        today = today or datetime.now().date().isoformat()
+        registry = self.df
+        skin_ids = pd.Series(pd.NA, index=df_skins.index, dtype='Int64')
+
+        # 1. (champion_id, skin_num)
+        by_key = {
+            (champion_id, int(skin_num)): skin_id
+            for champion_id, skin_num, skin_id in zip(registry['champion_id'], registry['skin_num'], registry['skin_id'])
+        }
+        for idx, champion_id, skin_num in zip(df_skins.index, df_skins['champion_id'], df_skins['skin_num']):
+            skin_id = by_key.get((champion_id, int(skin_num)))
+            if skin_id is not None:
+                skin_ids.at[idx] = skin_id
+
+        # 2. nazwa znormalizowana (tylko id jeszcze niewzięte w tym przebiegu)
+        taken = set(skin_ids.dropna().astype(int))
+        by_name = {}
+        for skin_id, name in zip(registry['skin_id'], registry['skin_name_norm']):
+            if skin_id not in taken:
+                by_name.setdefault(name, skin_id)
+        renamed = 0
+        for idx in skin_ids.index[skin_ids.isna()]:
+            skin_id = by_name.pop(df_skins.at[idx, 'skin_name_norm'], None)
+            if skin_id is not None:
+                skin_ids.at[idx] = skin_id
+                renamed += 1
+
+        # 3. nowe skiny - kolejne wolne id
+        missing = skin_ids.index[skin_ids.isna()]
+        next_id = int(registry['skin_id'].max()) + 1 if len(registry) else 1
+        skin_ids.loc[missing] = range(next_id, next_id + len(missing))
+
+        # Aktualizacja rejestru
+        current = df_skins[['champion_id', 'skin_num', 'skin_name_norm']].copy()
+        current['skin_id'] = skin_ids.astype(int)
+        registry = registry.set_index('skin_id')
+        seen = registry.index.isin(current['skin_id'])
+
+        registry.loc[~seen & registry['retired_date'].isna(), 'retired_date'] = today
+        registry.loc[seen, 'last_seen'] = today
+        registry.loc[seen, 'retired_date'] = None
+        existing = current[current['skin_id'].isin(registry.index)].set_index('skin_id')
+        registry.loc[existing.index, ['champion_id', 'skin_num', 'skin_name_norm']] = existing
+
+        new_rows = current[~current['skin_id'].isin(registry.index)].set_index('skin_id')
+        new_rows['first_seen'] = today
+        new_rows['last_seen'] = today
+        new_rows['retired_date'] = None
+        registry = pd.concat([registry, new_rows]) if len(registry) else new_rows
+
+        self.df = registry.reset_index()[self.COLUMNS].sort_values('skin_id').reset_index(drop=True)
+        self.df['skin_num'] = self.df['skin_num'].astype(int)
+        self.stats = {
+            'kept': len(current) - len(missing) - renamed,
+            'renamed': renamed,
+            'new': len(missing),
+            'retired': int(self.df['retired_date'].notna().sum()),
+        }
+        return skin_ids.astype(int)
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        self.df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+
+
+@instrumented("merge")
+def main():
+    parser = argparse.ArgumentParser(description="Merge Data Dragon + Wiki -> dim_skins_final")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="csv",
+                        help="Format pliku wynikowego: csv, parquet (typowane kolumny) albo oba")
+    parser.add_argument("--fuzzy-threshold", type=float, default=FUZZY_THRESHOLD,
+                        help="Minimalny wynik fuzzy (0-100) dla skinów bez dokładnego dopasowania")
+    parser.add_argument("--fuzzy-margin", type=float, default=FUZZY_MARGIN,
+                        help="Minimalna przewaga najlepszego kandydata nad drugim")
+    parser.add_argument("--no-fuzzy", action="store_true",
+                        help="Tylko dokładne dopasowanie po skin_name_norm (jak dawniej)")
+    parser.add_argument("--audit", default=audit_path,
+                        help="Plik CSV z decyzjami fuzzy (zaakceptowane i odrzucone)")
+    parser.add_argument("--registry", default=registry_path,
+                        help="Rejestr stałych skin_id (champion_id, skin_num) -> skin_id")
+    args = parser.parse_args()
+
+    print("="*60)
+    print("MERGE: Data Dragon + Wiki Prices (FIXED PATHS)")
+    print("="*60)
+
+    print(f"\nŚcieżki:")
+    print(f"  Data Dragon: {ddragon_path}")
+    print(f"  Wiki: {wiki_path}")
+    print(f"  Output: {output_path}")
+
+    # Wczytaj pliki
+    print("\n1. Wczytywanie Data Dragon skins...")
+    try:
+        df_ddragon = pd.read_csv(ddragon_path)
+        print(f"   ✓ Wczytano {len(df_ddragon)} skinów z Data Dragon")
+        record_input(ddragon_path, rows=len(df_ddragon))
+    except FileNotFoundError:
+        print(f"   BŁĄD: Nie znaleziono {ddragon_path}")
+        exit(1)
+
+    # FILTRUJ tylko event-exclusive (NIE esportowe!)
+    print("\n1a. Filtrowanie skinów event-exclusive...")
+
+    original_count = len(df_ddragon)
+    mask_exclude = df_ddragon['skin_name'].str.lower().str.contains(
+        '|'.join(EXCLUDE_KEYWORDS), regex=True, na=False
+    )
+    df_ddragon = df_ddragon[~mask_exclude].copy()
+
+    print(f"   Usunięto {original_count - len(df_ddragon)} skinów event-exclusive")
+    print(f"   Pozostało {len(df_ddragon)} skinów (zachowano esportowe)")
+
+    # Wiki
+    print("\n2. Wczytywanie Wiki prices...")
+    try:
+        df_wiki = pd.read_csv(wiki_path)
+        print(f"   ✓ Wczytano {len(df_wiki)} skinów z Wiki")
+        record_input(wiki_path, rows=len(df_wiki))
+    except FileNotFoundError:
+        print(f"   BŁĄD: Nie znaleziono {wiki_path}")
+        exit(1)
+
+    print("\n3. Przygotowanie danych...")
+
+    df_ddragon['skin_name_norm'] = df_ddragon['skin_name'].apply(normalize_name)
+
+    mask_default = df_ddragon['skin_name'] == 'default'
+    df_ddragon.loc[mask_default, 'skin_name_norm'] = (
+        df_ddragon.loc[mask_default, 'champion_name'].apply(normalize_name)
+    )
+
+    print(f"   Data Dragon: {len(df_ddragon)} skinów")
+    print(f"   Wiki: {len(df_wiki)} skinów")
+
+    # MERGE (z release_date!)
+    print("\n4. Łączenie danych...")
+    df_merged = df_ddragon.merge(
+        df_wiki[['skin_name_norm', 'price_rp', 'rarity', 'release_date']],
+        on='skin_name_norm',
+        how='left'
+    )
+
+    matched = df_merged['price_rp'].notna().sum()
+    unmatched = df_merged['price_rp'].isna().sum()
+
+    print("\n5. Wyniki matchowania:")
+    print(f"   Dopasowane: {matched} ({matched/len(df_merged)*100:.1f}%)")
+    print(f"   Niedopasowane: {unmatched} ({unmatched/len(df_merged)*100:.1f}%)")
+
+    # FIX: Default = 0 RP ZAWSZE
+    mask_default = (df_merged['skin_num'] == 0) | (df_merged['skin_name'] == 'default')
+
+    # Fuzzy fallback dla niedopasowanych (bez defaultów)
+    if not args.no_fuzzy:
+        print(f"\n5a. Fuzzy matching (próg {args.fuzzy_threshold:g}, przewaga {args.fuzzy_margin:g})...")
+        mask_fuzzy = df_merged['price_rp'].isna() & ~mask_default
+        used_norms = set(df_merged.loc[df_merged['price_rp'].notna(), 'skin_name_norm'])
+        df_candidates = df_wiki[~df_wiki['skin_name_norm'].isin(used_norms)]
+
+        fuzzy_matches, audit = fuzzy_match(
+            df_merged[mask_fuzzy], df_candidates, args.fuzzy_threshold, args.fuzzy_margin
+        )
+        for idx, wiki_idx in fuzzy_matches.items():
+            for column in ['price_rp', 'rarity', 'release_date']:
+                df_merged.at[idx, column] = df_candidates.at[wiki_idx, column]
+
+        audit.to_csv(args.audit, index=False)
+        rejected = audit['decision'].eq('rejected')
+        print(f"   Zaakceptowane: {len(fuzzy_matches)}, odrzucone: {rejected.sum()}")
+        for reason, count in audit.loc[rejected, 'reason'].value_counts().items():
+            print(f"     - {reason}: {count}")
+        print(f"   Audyt: {args.audit}")
+
+    # Obsługa defaultów
+    print("\n6. Obsługa niedopasowanych skinów...")
+
+    df_merged.loc[mask_default, 'rarity'] = 'Default'
+    df_merged.loc[mask_default, 'price_rp'] = 0
+
+    # Usuń resztę bez ceny
+    mask_unmatched = df_merged['price_rp'].isna() & ~mask_default
+
+    if mask_unmatched.sum() > 0:
+        print(f"   Usuwam {mask_unmatched.sum()} skinów bez dopasowanej ceny...")
+        examples = df_merged[mask_unmatched][['champion_name', 'skin_name']].head(5)
+        for _, row in examples.iterrows():
+            print(f"     - {row['champion_name']}: {row['skin_name']}")
+        df_merged = df_merged[~mask_unmatched].copy()
+
+    print(f"   Pozostało {len(df_merged)} skinów")
+
+    # Finalne porządki
+    df_merged['price_rp'] = df_merged['price_rp'].astype(int)
+
+    if 'skin_id' in df_merged.columns:
+        df_merged = df_merged.drop(columns=['skin_id'])
+
+    # Stałe skin_id z rejestru (zamiast numeracji 1..n od nowa przy każdym patchu)
+    registry = SkinIdRegistry(args.registry)
+    df_merged.insert(0, 'skin_id', registry.assign(df_merged))
+    registry.save()
+    print(f"\n7. Rejestr skin_id: {registry.stats['kept']} bez zmian, "
+          f"{registry.stats['renamed']} po nazwie, {registry.stats['new']} nowych, "
+          f"{registry.stats['retired']} wycofanych")
+
+    # Użyj prawdziwej daty z Wiki
+    df_merged['release_date'] = pd.to_datetime(
+        df_merged['release_date'],
+        errors='coerce'
+    ).dt.date
+
+    # Kolumny końcowe
+    final_columns = [
+        'skin_id',
+        'champion_name',
+        'skin_name',
+        'rarity',
+        'price_rp',
+        'release_date',
+        'champion_id',
+        'skin_num',
+        'skin_name_norm'
+    ]
+
+    df_final = df_merged[[c for c in final_columns if c in df_merged.columns]]
+
+    # Statystyki
+    print("\n" + "="*60)
+    print("STATYSTYKI KOŃCOWE")
+    print("="*60)
+    print(f"Całkowita liczba skinów: {len(df_final)}")
+    print(f"Liczba championów: {df_final['champion_name'].nunique()}")
+
+    print("\nRozkład rarity:")
+    for rarity, count in df_final['rarity'].value_counts().items():
+        pct = (count / len(df_final)) * 100
+        print(f"  {rarity:12s}: {count:4d} ({pct:5.1f}%)")
+
+    print("\nRozkład cen:")
+    for price in [0, 520, 750, 880, 975, 1350, 1820, 3250]:
+        count = (df_final['price_rp'] == price).sum()
+        if count > 0:
+            print(f"  {price:4d} RP: {count:4d}")
+
+    # Daty
+    has_date = df_final['release_date'].notna().sum()
+    no_date = df_final['release_date'].isna().sum()
+    print(f"\nRelease dates:")
+    print(f"  Z datą: {has_date} ({has_date/len(df_final)*100:.1f}%)")
+    print(f"  Bez daty: {no_date}")
+
+    # Zapis
+    written_paths = write_frame(df_final, raw_stem(output_path), "dim_skins_final", args.format)
+    record_output(written_paths + [args.registry], rows=len(df_final))
+
+    print(f"\n{'='*60}")
+    print(f"✓ Zapisano: {', '.join(written_paths)}")
+    print(f"{'='*60}")
+
+    print("\nPoprawki:")
+    print("  ✓ Default skiny = 0 RP")
+    print("  ✓ Release_date z Wiki")
+    print("  ✓ Zachowano esportowe (T1, DRX)")
+    print("  ✓ Usunięto event-exclusive")
+    print("\nGOTOWE!")
+
+
+if __name__ == "__main__":
+    main()
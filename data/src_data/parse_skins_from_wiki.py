@@ -1,10 +1,16 @@
 import re
 import pandas as pd
 import os
+import argparse
+import gc
+import hashlib
+import inspect
+import json
+import time
 
-print("="*60)
-print("PARSOWANIE SKINDATA.LUA - POPRAWIONE")
-print("="*60)
+import lua_table
+from raw_writers import OUTPUT_FORMATS, output_paths, raw_stem, write_frame
+from stage_metrics import instrumented, record_input, record_output
 
 # ŚCIEŻKI - POPRAWIONE!
 # Skrypt jest tutaj: LOLDW/data/src_data/parse_skins_from_wiki.py
@@ -19,182 +25,234 @@ RAW_DIR = os.path.join(DATA_DIR, "raw")                  # LOLDW/data/raw/
 
 INPUT_LUA = os.path.join(RAW_DIR, "skindata_raw.lua")
 OUTPUT_CSV = os.path.join(RAW_DIR, "wiki_skins_clean.csv")
+CACHE_DIR = os.path.join(DATA_DIR, "cache", "wiki_parse")  # LOLDW/data/cache/wiki_parse/
 
-print(f"Szukam pliku: {INPUT_LUA}")
-
-# WCZYTAJ PLIK
-print("\nWczytywanie skindata_raw.lua...")
-try:
-    with open(INPUT_LUA, "r", encoding="utf-8") as f:
-        lua_content = f.read()
-except FileNotFoundError:
-    print(f"BŁĄD: Nie znaleziono pliku!")
-    print(f"Sprawdź czy plik istnieje: {INPUT_LUA}")
-    print(f"\nAktualny katalog: {os.getcwd()}")
-    print(f"Katalog skryptu: {SCRIPT_DIR}")
-    print(f"Katalog raw: {RAW_DIR}")
-    exit(1)
-
-print(f"Wczytano {len(lua_content):,} znaków")
-
-# PARSER
-skins = []
-champions_found = []
-
-champion_blocks = re.finditer(
-    r'\["([A-Z][^"]+)"\]\s*=\s*\{[^{]*\["id"\]\s*=\s*\d+[^{]*\["skins"\]\s*=\s*\{(.*?)\n\s{4}\}',
-    lua_content,
-    re.DOTALL
-)
-
-for champ_match in champion_blocks:
-    champion_name = champ_match.group(1)
-    skins_block = champ_match.group(2)
-    
-    champions_found.append(champion_name)
-    
-    if len(champions_found) <= 3:
-        print(f"\nPrzetwarzanie: {champion_name}")
-    
-    skin_entries = re.finditer(
-        r'\["([^"]+)"\]\s*=\s*\{([^}]*(?:\{[^}]*\}[^}]*)*)\}(?=\s*,?\s*(?:\["|$))',
-        skins_block
-    )
-    
-    for skin_match in skin_entries:
-        skin_name = skin_match.group(1)
-        skin_props = skin_match.group(2)
-        
-        if not re.search(r'\["id"\]\s*=\s*\d+', skin_props):
+# Podbić przy zmianie parsera, której nie widać w kodzie funkcji z rules_fingerprint()
+PARSER_VERSION = 2
+
+LEGACY_COSTS = [390, 520, 750, 790, 880, 975]
+
+
+def classify_rarity(cost, skin_name):
+    """Rarity na podstawie ceny w RP (cost == 0: Default dla Original, inaczej Special)."""
+    if cost == 0:
+        if skin_name == "Original":
+            return "Default"
+        return "Special"
+    elif cost in LEGACY_COSTS:
+        return "Legacy"
+    elif cost == 1350:
+        return "Epic"
+    elif cost == 1820:
+        return "Legendary"
+    elif cost >= 3250:
+        return "Ultimate"
+    return "Epic"
+
+
+def _contains_string(value, text):
+    if isinstance(value, str):
+        return value == text
+    if isinstance(value, dict):
+        return any(_contains_string(v, text) for v in value.values())
+    if isinstance(value, list):
+        return any(_contains_string(v, text) for v in value)
+    return False
+
+
+def parse_skins_lua(tree, verbose=True):
+    """
+    Skiny z drzewa champion -> ["skins"] -> skin -> właściwości (wynik lua_table.parse).
+    Zwraca (skins, champions_found).
+    """
+    skins = []
+    champions_found = []
+
+    for champion_name, champion in tree.items():
+        if not isinstance(champion, dict) or "id" not in champion or not isinstance(champion.get("skins"), dict):
             continue
-        
-        # Cost
-        cost_match = re.search(r'\["cost"\]\s*=\s*(\d+)', skin_props)
-        if cost_match:
-            cost = int(cost_match.group(1))
-        else:
-            if '"Special"' in skin_props or "'Special'" in skin_props:
-                cost = 0
-            else:
+
+        champions_found.append(champion_name)
+
+        if verbose and len(champions_found) <= 3:
+            print(f"\nPrzetwarzanie: {champion_name}")
+
+        for skin_name, skin_props in champion["skins"].items():
+            if not isinstance(skin_props, dict) or type(skin_props.get("id")) is not int:
                 continue
-        
-        # FIX: Default/Original = 0 RP
-        if skin_name == "Original":
-            cost = 0
-        
-        # Release date
-        release_match = re.search(r'\["release"\]\s*=\s*"([^"]+)"', skin_props)
-        release_date = release_match.group(1) if release_match else None
-        
-        # Rarity
-        if cost == 0:
+
+            # Cost
+            cost = skin_props.get("cost")
+            if type(cost) is not int:
+                if _contains_string(skin_props, "Special"):
+                    cost = 0
+                else:
+                    continue
+
+            # FIX: Default/Original = 0 RP
             if skin_name == "Original":
-                rarity = "Default"
+                cost = 0
+
+            # Release date
+            release_date = skin_props.get("release")
+            if not isinstance(release_date, str) or not release_date:
+                release_date = None
+
+            # Full name
+            if skin_name == "Original":
+                full_name = champion_name
             else:
-                rarity = "Special"
-        elif cost in [390, 520, 750, 790, 880, 975]:
-            rarity = "Legacy"
-        elif cost == 1350:
-            rarity = "Epic"
-        elif cost == 1820:
-            rarity = "Legendary"
-        elif cost >= 3250:
-            rarity = "Ultimate"
-        else:
-            rarity = "Epic"
-        
-        # Full name
-        if skin_name == "Original":
-            full_name = champion_name
-        else:
-            full_name = f"{skin_name} {champion_name}"
-        
-        skins.append({
-            'skin_name': full_name,
-            'price_rp': cost,
-            'rarity': rarity,
-            'champion': champion_name,
-            'release_date': release_date
-        })
-    
-    if len(champions_found) % 20 == 0:
-        print(f"  Przetworzone: {len(champions_found)} championów, {len(skins)} skinów...")
-
-print(f"\nZnaleziono {len(champions_found)} championów")
-print(f"Wyciągnięto {len(skins)} skinów")
-
-# Fallback parser jeśli za mało
-if len(skins) < 500:
-    print("\n⚠ Za mało skinów! Używam prostszego parsera...")
-    
+                full_name = f"{skin_name} {champion_name}"
+
+            skins.append({
+                'skin_name': full_name,
+                'price_rp': cost,
+                'rarity': classify_rarity(cost, skin_name),
+                'champion': champion_name,
+                'release_date': release_date
+            })
+
+        if verbose and len(champions_found) % 20 == 0:
+            print(f"  Przetworzone: {len(champions_found)} championów, {len(skins)} skinów...")
+
+    return skins, champions_found
+
+
+def parse_skins_regex(lua_content, verbose=True):
+    """
+    Dawny parser regexowy (z prostszym parserem zapasowym).
+    Zostaje dla --regex i do porównań w benchmark_wiki_parser.py. Zwraca (skins, champions_found).
+    """
     skins = []
-    all_cost_blocks = re.finditer(
-        r'\["([^"]+)"\]\s*=\s*\{[^}]*\["cost"\]\s*=\s*(\d+)',
-        lua_content
+    champions_found = []
+
+    champion_blocks = re.finditer(
+        r'\["([A-Z][^"]+)"\]\s*=\s*\{[^{]*\["id"\]\s*=\s*\d+[^{]*\["skins"\]\s*=\s*\{(.*?)\n\s{4}\}',
+        lua_content,
+        re.DOTALL
     )
-    
-    current_champion = None
-    
-    for match in all_cost_blocks:
-        name = match.group(1)
-        cost = int(match.group(2))
-        
-        if name[0].isupper() and ' ' not in name and len(name) > 2:
-            context_start = max(0, match.start() - 100)
-            context = lua_content[context_start:match.start()]
-            
-            if '"id"]' in context and '"skins"]' not in context:
-                current_champion = name
-        
-        # Rarity
-        if cost in [390, 520, 750, 790, 880, 975]:
-            rarity = "Legacy"
-        elif cost == 1350:
-            rarity = "Epic"
-        elif cost == 1820:
-            rarity = "Legendary"
-        elif cost >= 3250:
-            rarity = "Ultimate"
-        else:
-            rarity = "Epic"
-        
-        if name == "Original" and current_champion:
-            full_name = current_champion
-            champ = current_champion
-            cost = 0  # FIX
-            rarity = "Default"
-        elif current_champion and name != current_champion:
-            full_name = f"{name} {current_champion}"
-            champ = current_champion
-        else:
-            parts = name.split()
-            if len(parts) > 1:
-                champ = parts[-1]
-                full_name = name
-            else:
+
+    for champ_match in champion_blocks:
+        champion_name = champ_match.group(1)
+        skins_block = champ_match.group(2)
+
+        champions_found.append(champion_name)
+
+        if verbose and len(champions_found) <= 3:
+            print(f"\nPrzetwarzanie: {champion_name}")
+
+        skin_entries = re.finditer(
+            r'\["([^"]+)"\]\s*=\s*\{([^}]*(?:\{[^}]*\}[^}]*)*)\}(?=\s*,?\s*(?:\["|$))',
+            skins_block
+        )
+
+        for skin_match in skin_entries:
+            skin_name = skin_match.group(1)
+            skin_props = skin_match.group(2)
+
+            if not re.search(r'\["id"\]\s*=\s*\d+', skin_props):
                 continue
-        
-        skins.append({
-            'skin_name': full_name,
-            'price_rp': cost,
-            'rarity': rarity,
-            'champion': champ,
-            'release_date': None
-        })
-    
-    print(f"Prostszy parser znalazł: {len(skins)} skinów")
-
-# DataFrame
-df = pd.DataFrame(skins)
-original_len = len(df)
-df = df.drop_duplicates(subset=['skin_name'], keep='first')
-print(f"Usuniętch {original_len - len(df)} duplikatów")
-
-# Filtruj tylko Special (zachowaj Default!)
-df_filtered = df[df['rarity'] != 'Special']
-print(f"Usunięto {len(df) - len(df_filtered)} skinów Special (Prestige/Mythic)")
-print(f"Zachowano {len(df_filtered[df_filtered['rarity'] == 'Default'])} skinów Default")
-df = df_filtered
+
+            # Cost
+            cost_match = re.search(r'\["cost"\]\s*=\s*(\d+)', skin_props)
+            if cost_match:
+                cost = int(cost_match.group(1))
+            else:
+                if '"Special"' in skin_props or "'Special'" in skin_props:
+                    cost = 0
+                else:
+                    continue
+
+            # FIX: Default/Original = 0 RP
+            if skin_name == "Original":
+                cost = 0
+
+            # Release date
+            release_match = re.search(r'\["release"\]\s*=\s*"([^"]+)"', skin_props)
+            release_date = release_match.group(1) if release_match else None
+
+            # Full name
+            if skin_name == "Original":
+                full_name = champion_name
+            else:
+                full_name = f"{skin_name} {champion_name}"
+
+            skins.append({
+                'skin_name': full_name,
+                'price_rp': cost,
+                'rarity': classify_rarity(cost, skin_name),
+                'champion': champion_name,
+                'release_date': release_date
+            })
+
+        if verbose and len(champions_found) % 20 == 0:
+            print(f"  Przetworzone: {len(champions_found)} championów, {len(skins)} skinów...")
+
+    # Fallback parser jeśli za mało
+    if len(skins) < 500:
+        if verbose:
+            print("\n⚠ Za mało skinów! Używam prostszego parsera...")
+
+        skins = []
+        all_cost_blocks = re.finditer(
+            r'\["([^"]+)"\]\s*=\s*\{[^}]*\["cost"\]\s*=\s*(\d+)',
+            lua_content
+        )
+
+        current_champion = None
+
+        for match in all_cost_blocks:
+            name = match.group(1)
+            cost = int(match.group(2))
+
+            if name[0].isupper() and ' ' not in name and len(name) > 2:
+                context_start = max(0, match.start() - 100)
+                context = lua_content[context_start:match.start()]
+
+                if '"id"]' in context and '"skins"]' not in context:
+                    current_champion = name
+
+            # Rarity
+            if cost in LEGACY_COSTS:
+                rarity = "Legacy"
+            elif cost == 1350:
+                rarity = "Epic"
+            elif cost == 1820:
+                rarity = "Legendary"
+            elif cost >= 3250:
+                rarity = "Ultimate"
+            else:
+                rarity = "Epic"
+
+            if name == "Original" and current_champion:
+                full_name = current_champion
+                champ = current_champion
+                cost = 0  # FIX
+                rarity = "Default"
+            elif current_champion and name != current_champion:
+                full_name = f"{name} {current_champion}"
+                champ = current_champion
+            else:
+                parts = name.split()
+                if len(parts) > 1:
+                    champ = parts[-1]
+                    full_name = name
+                else:
+                    continue
+
+            skins.append({
+                'skin_name': full_name,
+                'price_rp': cost,
+                'rarity': rarity,
+                'champion': champ,
+                'release_date': None
+            })
+
+        if verbose:
+            print(f"Prostszy parser znalazł: {len(skins)} skinów")
+
+    return skins, champions_found
+
 
 # Normalizacja
 def normalize_name(name):
@@ -202,51 +260,224 @@ def normalize_name(name):
         return ""
     return re.sub(r'[^a-z0-9]', '', str(name).lower())
 
-df['skin_name_norm'] = df['skin_name'].apply(normalize_name)
-
-# Statystyki
-print("\n" + "="*60)
-print("STATYSTYKI")
-print("="*60)
-print(f"Całkowita liczba skinów: {len(df)}")
-print(f"Liczba championów: {df['champion'].nunique()}")
-
-print("\nRozkład rarity:")
-for rarity, count in df['rarity'].value_counts().items():
-    pct = (count / len(df)) * 100
-    print(f"  {rarity:12s}: {count:4d} ({pct:5.1f}%)")
-
-print("\nRozkład cen (top 15):")
-for price, count in df['price_rp'].value_counts().sort_index().head(15).items():
-    print(f"  {price:4d} RP: {count:4d}")
-
-# Release dates
-has_date = df['release_date'].notna().sum()
-no_date = df['release_date'].isna().sum()
-print(f"\nDaty wydania:")
-print(f"  Z datą: {has_date} ({has_date/len(df)*100:.1f}%)")
-print(f"  Bez daty: {no_date} ({no_date/len(df)*100:.1f}%)")
-
-# Zapisz
-df.to_csv(OUTPUT_CSV, index=False)
-
-print(f"\n{'='*60}")
-print(f"Zapisano: {OUTPUT_CSV}")
-print(f"{'='*60}")
-
-# Przykłady
-print("\nPrzykładowe skiny:")
-for rarity in ['Default', 'Legacy', 'Epic', 'Legendary', 'Ultimate']:
-    sample = df[df['rarity'] == rarity].head(2)
-    if len(sample) > 0:
-        print(f"\n{rarity}:")
-        for _, row in sample.iterrows():
-            date_str = f" ({row['release_date']})" if pd.notna(row['release_date']) else ""
-            print(f"  {row['skin_name']}: {row['price_rp']} RP{date_str}")
-
-print("\n" + "="*60)
-print("GOTOWE!")
-print("  ✓ Default skiny mają 0 RP")
-print("  ✓ Wyciągnięto release_date z Wiki")
-print("  ✓ Zachowano Default, usunięto Special")
-print("="*60)
\ No newline at end of file
+
+def build_wiki_table(skins, verbose=True):
+    """Lista skinów -> tabela wiki_skins_clean (bez duplikatów i Special, z skin_name_norm)."""
+    df = pd.DataFrame(skins)
+    original_len = len(df)
+    df = df.drop_duplicates(subset=['skin_name'], keep='first')
+    if verbose:
+        print(f"Usuniętch {original_len - len(df)} duplikatów")
+
+    # Filtruj tylko Special (zachowaj Default!)
+    df_filtered = df[df['rarity'] != 'Special']
+    if verbose:
+        print(f"Usunięto {len(df) - len(df_filtered)} skinów Special (Prestige/Mythic)")
+        print(f"Zachowano {len(df_filtered[df_filtered['rarity'] == 'Default'])} skinów Default")
+    df = df_filtered.copy()
+
+    df['skin_name_norm'] = df['skin_name'].apply(normalize_name)
+    return df
+
+
+def file_sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def rules_fingerprint():
+    """
+    Hash reguł parsowania: kod klasyfikacji rarity/ceny, parserów, normalizacji
+    i lua_table. Każda zmiana w nich unieważnia cache bez ręcznego czyszczenia.
+    """
+    digest = hashlib.sha256(f"{PARSER_VERSION}|{LEGACY_COSTS!r}".encode())
+    for obj in [classify_rarity, _contains_string, parse_skins_lua, parse_skins_regex,
+                build_wiki_table, normalize_name, lua_table]:
+        digest.update(inspect.getsource(obj).encode())
+    return digest.hexdigest()
+
+
+class WikiParseCache:
+    """
+    Cache sparsowanej tabeli wiki: data/cache/wiki_parse/<klucz>.pkl + index.json.
+
+    Klucz = hash(pliku .lua) + hash reguł (rules_fingerprint) + wybrany parser.
+    Tabela jest trzymana jako pickle DataFrame (wczytanie w milisekundach, typy
+    bez zmian). index.json pamięta też hashe zapisanych plików wynikowych, żeby
+    przy trafieniu nie przepisywać wiki_skins_clean.csv, jeśli się nie zmienił.
+    Trzymany jest tylko ostatni wpis.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.index = {"key": None, "outputs": {}}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                self.index = json.load(f)
+
+    @staticmethod
+    def make_key(input_path, parser_name):
+        parts = [file_sha256(input_path), rules_fingerprint(), parser_name]
+        return hashlib.sha256("|".join(parts).encode()).hexdigest()[:32]
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def load(self, key):
+        if self.index.get("key") != key or not os.path.exists(self._path(key)):
+            return None
+        return pd.read_pickle(self._path(key))
+
+    def save(self, key, df):
+        """Zapisuje tabelę (atomowo) i usuwa poprzednie wpisy."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self._path(key) + ".tmp"
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, self._path(key))
+        self.index = {"key": key, "rows": len(df), "outputs": {}}
+        self._write_index()
+
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".pkl") and name != f"{key}.pkl":
+                os.remove(os.path.join(self.cache_dir, name))
+
+    def outputs_current(self, key, paths):
+        """Czy pliki wynikowe istnieją i są dokładnie tymi zapisanymi z tego wpisu."""
+        if self.index.get("key") != key:
+            return False
+        outputs = self.index.get("outputs", {})
+        return all(
+            os.path.exists(path) and outputs.get(os.path.basename(path)) == file_sha256(path)
+            for path in paths
+        )
+
+    def record_outputs(self, key, paths):
+        if self.index.get("key") != key:
+            return
+        self.index["outputs"].update({os.path.basename(path): file_sha256(path) for path in paths})
+        self._write_index()
+
+    def _write_index(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=1)
+        os.replace(tmp_path, self.index_path)
+
+
+@instrumented("parse")
+def main():
+    parser = argparse.ArgumentParser(description="Parsowanie skindata_raw.lua -> wiki_skins_clean")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="csv",
+                        help="Format pliku wynikowego: csv, parquet (typowane kolumny) albo oba")
+    parser.add_argument("--regex", action="store_true",
+                        help="Użyj dawnego parsera regexowego zamiast tokenizera Lua")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Zawsze parsuj od nowa (bez data/cache/wiki_parse)")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    args = parser.parse_args()
+
+    print("="*60)
+    print("PARSOWANIE SKINDATA.LUA - POPRAWIONE")
+    print("="*60)
+
+    print(f"Szukam pliku: {INPUT_LUA}")
+
+    # WCZYTAJ + PARSER
+    print("\nWczytywanie skindata_raw.lua...")
+    if not os.path.exists(INPUT_LUA):
+        print(f"BŁĄD: Nie znaleziono pliku!")
+        print(f"Sprawdź czy plik istnieje: {INPUT_LUA}")
+        print(f"\nAktualny katalog: {os.getcwd()}")
+        print(f"Katalog skryptu: {SCRIPT_DIR}")
+        print(f"Katalog raw: {RAW_DIR}")
+        exit(1)
+
+    print(f"Wczytano {os.path.getsize(INPUT_LUA):,} bajtów")
+    record_input(INPUT_LUA)
+
+    started = time.perf_counter()
+    cache = None if args.no_cache else WikiParseCache(args.cache_dir)
+    cache_key = WikiParseCache.make_key(INPUT_LUA, "regex" if args.regex else "lua_table") if cache else None
+    df = cache.load(cache_key) if cache else None
+
+    if df is not None:
+        print(f"\n✓ Cache: plik i reguły bez zmian - tabela z {cache.cache_dir} "
+              f"({time.perf_counter() - started:.3f}s)")
+    else:
+        if args.regex:
+            with open(INPUT_LUA, "r", encoding="utf-8") as f:
+                skins, champions_found = parse_skins_regex(f.read())
+        else:
+            tree = lua_table.parse_file(INPUT_LUA)
+            # Drzewo do stałej generacji: GC nie skanuje go przy kolekcjach w parse_skins_lua
+            # (na pliku x100 ~1.3 s -> ~0.2 s). Skrypt kończy się zaraz po tym, więc bez gc.unfreeze().
+            gc.freeze()
+            skins, champions_found = parse_skins_lua(tree)
+
+        print(f"\nZnaleziono {len(champions_found)} championów")
+        print(f"Wyciągnięto {len(skins)} skinów")
+
+        # DataFrame
+        df = build_wiki_table(skins)
+        if cache:
+            cache.save(cache_key, df)
+        print(f"Parsowanie: {time.perf_counter() - started:.3f}s")
+
+    # Statystyki
+    print("\n" + "="*60)
+    print("STATYSTYKI")
+    print("="*60)
+    print(f"Całkowita liczba skinów: {len(df)}")
+    print(f"Liczba championów: {df['champion'].nunique()}")
+
+    print("\nRozkład rarity:")
+    for rarity, count in df['rarity'].value_counts().items():
+        pct = (count / len(df)) * 100
+        print(f"  {rarity:12s}: {count:4d} ({pct:5.1f}%)")
+
+    print("\nRozkład cen (top 15):")
+    for price, count in df['price_rp'].value_counts().sort_index().head(15).items():
+        print(f"  {price:4d} RP: {count:4d}")
+
+    # Release dates
+    has_date = df['release_date'].notna().sum()
+    no_date = df['release_date'].isna().sum()
+    print(f"\nDaty wydania:")
+    print(f"  Z datą: {has_date} ({has_date/len(df)*100:.1f}%)")
+    print(f"  Bez daty: {no_date} ({no_date/len(df)*100:.1f}%)")
+
+    # Zapisz (przy trafieniu w cache tylko jeśli pliki wynikowe się zmieniły / zniknęły)
+    stem = raw_stem(OUTPUT_CSV)
+    print(f"\n{'='*60}")
+    if cache and cache.outputs_current(cache_key, output_paths(stem, args.format)):
+        print(f"Bez zmian: {', '.join(output_paths(stem, args.format))}")
+        record_output(rows=len(df))
+    else:
+        written_paths = write_frame(df, stem, "wiki_skins_clean", args.format)
+        if cache:
+            cache.record_outputs(cache_key, written_paths)
+        record_output(written_paths, rows=len(df))
+        print(f"Zapisano: {', '.join(written_paths)}")
+    print(f"{'='*60}")
+
+    # Przykłady
+    print("\nPrzykładowe skiny:")
+    for rarity in ['Default', 'Legacy', 'Epic', 'Legendary', 'Ultimate']:
+        sample = df[df['rarity'] == rarity].head(2)
+        if len(sample) > 0:
+            print(f"\n{rarity}:")
+            for _, row in sample.iterrows():
+                date_str = f" ({row['release_date']})" if pd.notna(row['release_date']) else ""
+                print(f"  {row['skin_name']}: {row['price_rp']} RP{date_str}")
+
+    print("\n" + "="*60)
+    print("GOTOWE!")
+    print("  ✓ Default skiny mają 0 RP")
+    print("  ✓ Wyciągnięto release_date z Wiki")
+    print("  ✓ Zachowano Default, usunięto Special")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Zapis plików warstwy raw: CSV (jak dotąd) i/lub Parquet z typowanymi kolumnami.
+
+Parquet trzyma id jako nullable integer (bez 1026.0 w CSV), region/segment/rarity
+jako kolumny słownikowe, daty jako date32, a duże pliki są dzielone na row groupy
+po ROW_GROUP_SIZE wierszy, żeby czytelnicy mogli je czytać równolegle.
+pyarrow jest potrzebny tylko przy --format parquet/both.
+"""
+import os
+
+import pandas as pd
+
+OUTPUT_FORMATS = ["csv", "parquet", "both"]
+ROW_GROUP_SIZE = 1_000_000
+
+# Typy kolumn per plik raw: int32/int64, string, dictionary, date
+RAW_SCHEMAS = {
+    "fact_sales": [
+        ("transaction_id", "int64"),
+        ("player_id", "int64"),
+        ("skin_id", "int64"),
+        ("purchase_date", "date"),
+        ("price_rp", "int32"),
+        ("quantity", "int32"),
+    ],
+    "fact_sales_quarantine": [
+        ("transaction_id", "int64"),
+        ("player_id", "int64"),
+        ("skin_id", "int64"),
+        ("purchase_date", "date"),
+        ("price_rp", "int32"),
+        ("quantity", "int32"),
+        ("rejection_reason", "string"),
+    ],
+    "dim_player": [
+        ("player_id", "int64"),
+        ("region", "dictionary"),
+        ("account_created_date", "date"),
+        ("player_segment", "dictionary"),
+    ],
+    "dim_skins_final": [
+        ("skin_id", "int32"),
+        ("champion_name", "string"),
+        ("skin_name", "string"),
+        ("rarity", "dictionary"),
+        ("price_rp", "int32"),
+        ("release_date", "date"),
+        ("champion_id", "string"),
+        ("skin_num", "int32"),
+        ("skin_name_norm", "string"),
+    ],
+    "dim_skins_changes": [
+        ("skin_id", "int32"),
+        ("change_type", "dictionary"),
+        ("effective_date", "date"),
+        ("row_hash", "string"),
+        ("champion_name", "string"),
+        ("skin_name", "string"),
+        ("rarity", "dictionary"),
+        ("price_rp", "int32"),
+        ("release_date", "date"),
+        ("champion_id", "string"),
+        ("skin_num", "int32"),
+    ],
+    "wiki_skins_clean": [
+        ("skin_name", "string"),
+        ("price_rp", "int32"),
+        ("rarity", "dictionary"),
+        ("champion", "dictionary"),
+        ("release_date", "date"),
+        ("skin_name_norm", "string"),
+    ],
+}
+
+
+def output_extensions(output_format):
+    """'csv' / 'parquet' / 'both' -> lista rozszerzeń plików."""
+    if output_format == "both":
+        return ["csv", "parquet"]
+    return [output_format]
+
+
+def output_paths(stem, output_format):
+    """stem + format -> ['stem.csv', 'stem.parquet']"""
+    return [f"{stem}.{extension}" for extension in output_extensions(output_format)]
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("BŁĄD: zapis Parquet wymaga pakietu pyarrow (pip install pyarrow)")
+    return pa, pq
+
+
+def arrow_schema(name):
+    pa, _ = _pyarrow()
+    types = {
+        "int32": pa.int32(),
+        "int64": pa.int64(),
+        "string": pa.string(),
+        "dictionary": pa.dictionary(pa.int32(), pa.string()),
+        "date": pa.date32(),
+    }
+    return pa.schema([(column, types[kind]) for column, kind in RAW_SCHEMAS[name]])
+
+
+def to_arrow_table(df, name):
+    """DataFrame -> pyarrow.Table o typach z RAW_SCHEMAS (NaN/None -> null)."""
+    pa, _ = _pyarrow()
+    schema = arrow_schema(name)
+
+    arrays = []
+    for column, kind in RAW_SCHEMAS[name]:
+        values = df[column]
+        if kind.startswith("int"):
+            array = pa.array(pd.to_numeric(values, errors="coerce").astype("Int64"), type=pa.int64())
+            array = array.cast(schema.field(column).type)
+        elif kind == "date":
+            array = pa.array(pd.to_datetime(values, errors="coerce")).cast(pa.date32())
+        elif kind == "dictionary":
+            array = pa.array(values, type=pa.string(), from_pandas=True).dictionary_encode()
+        else:
+            array = pa.array(values, type=pa.string(), from_pandas=True)
+        arrays.append(array)
+
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+class CsvChunkWriter:
+    """Dopisuje kolejne paczki DataFrame do jednego CSV (nagłówek tylko raz)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "w", newline="")
+        self.header = True
+
+    def write(self, df):
+        df.to_csv(self.file, header=self.header, index=False)
+        self.header = False
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetChunkWriter:
+    """Dopisuje kolejne paczki DataFrame do jednego Parquet (paczka -> row groupy)."""
+
+    def __init__(self, path, name, row_group_size=ROW_GROUP_SIZE):
+        _, pq = _pyarrow()
+        self.path = path
+        self.name = name
+        self.row_group_size = row_group_size
+        self.writer = pq.ParquetWriter(path, arrow_schema(name), compression="zstd")
+
+    def write(self, df):
+        self.writer.write_table(to_arrow_table(df, self.name), row_group_size=self.row_group_size)
+
+    def close(self):
+        self.writer.close()
+
+
+def open_writers(stem, name, output_format):
+    """Otwiera writery dla stem.csv i/lub stem.parquet."""
+    writers = []
+    for path in output_paths(stem, output_format):
+        if path.endswith(".csv"):
+            writers.append(CsvChunkWriter(path))
+        else:
+            writers.append(ParquetChunkWriter(path, name))
+    return writers
+
+
+def write_frame(df, stem, name, output_format):
+    """Zapisuje cały DataFrame jako stem.csv i/lub stem.parquet. Zwraca ścieżki."""
+    writers = open_writers(stem, name, output_format)
+    for writer in writers:
+        writer.write(df)
+        writer.close()
+    return [writer.path for writer in writers]
+
+
+def raw_stem(path):
+    """data/raw/fact_sales.csv -> data/raw/fact_sales"""
+    return os.path.splitext(path)[0]
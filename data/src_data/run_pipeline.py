@@ -0,0 +1,546 @@
+"""
+Orkiestracja całego pipeline'u: fetch -> parse -> merge -> changes -> generate -> dedupe -> validate -> load
+-> silver -> gold -> scd2 -> views.
+
+Etapy tworzą DAG (pole "after" w pipeline_stages()), a niezależne etapy (fetch i parse)
+idą równolegle. Każdy etap dostaje odcisk wejść: sha256 kodu (skrypt / pliki SQL),
+argumentów, plików wejściowych i wyników etapów poprzedzających. Etap, którego odcisk
+się nie zmienił i którego pliki wyjściowe istnieją, jest pomijany. Odciski są w
+data/cache/pipeline/state.json. Plik jest haszowany ponownie tylko wtedy, gdy zmienił
+się jego rozmiar albo mtime.
+
+Wynik etapu plikowego to hash jego plików wyjściowych. Dzięki temu fetch, który
+przyniósł te same dane, nie uruchamia merge. Etapy bazodanowe (load, silver, gold,
+views) nie mają plików, więc każde ich uruchomienie unieważnia etapy zależne
+(gold kasuje widoki). Jeśli baza została wyczyszczona poza pipeline'em, użyj
+--force albo --from load.
+
+Logi etapów: data/cache/pipeline/logs/<etap>.log
+
+Metryki (stage_metrics.py): każdy skrypt i plik SQL przebiegu dopisuje linię JSON z czasem,
+CPU, pamięcią, wierszami i bajtami pod wspólnym run_id. Jeśli przebieg obejmował etap
+bazodanowy, linie trafiają też do silver.pipeline_run_log. --profile <etap> włącza
+profiler (cProfile albo --profiler sampling) dla jednego etapu Pythona.
+
+    python run_pipeline.py                     # wszystko, co się zmieniło
+    python run_pipeline.py --from silver       # silver, gold, views
+    python run_pipeline.py --until merge       # tylko skiny
+    python run_pipeline.py --offline --dry-run # plan bez Data Dragon i bez uruchamiania
+"""
+import argparse
+import glob
+import graphlib
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime
+
+from load_bronze import REPO_DIR, connect, connection_kwargs, read_sql, sql_files
+from stage_metrics import PROFILERS, StageRun, load_records, metrics_path, new_run_id, persist_records
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))   # data/src_data
+DATA_DIR = os.path.dirname(SRC_DIR)                     # data
+RAW_DIR = os.path.join(DATA_DIR, "raw")                 # data/raw
+DEDUPED_DIR = os.path.join(DATA_DIR, "deduped")         # data/deduped
+VALIDATED_DIR = os.path.join(DATA_DIR, "validated")     # data/validated
+SQL_DIR = os.path.join(REPO_DIR, "sql")
+
+PIPELINE_DIR = os.path.join(DATA_DIR, "cache", "pipeline")   # data/cache/pipeline
+STATE_PATH = os.path.join(PIPELINE_DIR, "state.json")
+LOG_DIR = os.path.join(PIPELINE_DIR, "logs")
+
+LOG_TAIL_LINES = 20   # Ile ostatnich linii logu pokazać, gdy etap padnie
+
+STAGE_NAMES = ["fetch", "parse", "merge", "changes", "generate", "dedupe", "validate", "load", "silver", "gold",
+               "scd2", "views"]
+PYTHON_STAGES = ["fetch", "parse", "merge", "changes", "generate", "dedupe", "validate", "load"]
+
+# Tabele czytane / zapisywane przez pliki SQL -> wiersze i bajty w metrykach kroku
+SQL_TABLES = {
+    "silver_clean_data.sql": (
+        ["bronze.stg_skins", "bronze.stg_players", "bronze.stg_sales", "bronze.stg_sales_quarantine"],
+        ["silver.dim_skin", "silver.dim_player", "silver.fact_sale", "silver.fact_sale_quarantine"],
+    ),
+    "gold_clean_data.sql": (
+        ["silver.dim_skin", "silver.dim_player", "silver.dim_date", "silver.fact_sale"],
+        ["gold.dim_skin", "gold.dim_player", "gold.dim_date", "gold.fact_sales"],
+    ),
+    "gold_dim_skin_scd2.sql": (
+        ["bronze.stg_skin_changes"],
+        ["gold.dim_skin_history"],
+    ),
+    "gold_sales_aggregates.sql": (
+        ["gold.fact_sales"],
+        ["gold.agg_month_player", "gold.agg_skin_player", "gold.agg_revenue_by_segment_month",
+         "gold.agg_top_selling_skins", "gold.agg_weekend_vs_weekday_sales",
+         "gold.agg_player_lifetime_value", "gold.agg_revenue_trends",
+         "gold.agg_month_player_hll", "gold.agg_skin_player_hll"],
+    ),
+}
+
+
+def raw(name):
+    return os.path.join(RAW_DIR, name)
+
+
+def pipeline_stages(args):
+    """
+    DAG etapów (klucze = STAGE_NAMES, w kolejności topologicznej). Pola:
+      after    - etapy, których wynik jest wejściem,
+      command  - skrypt z data/src_data + argumenty (uruchamiany jako osobny proces),
+      sql      - pliki SQL wykonywane po kolei (przed command),
+      code     - pliki, których zmiana unieważnia etap (command[0] i sql dochodzą same),
+      inputs   - pliki / wzorce glob spoza pipeline'u,
+      outputs  - pliki / wzorce glob; brak = etap bazodanowy,
+      volatile - wejście spoza repo (Data Dragon): uruchamiany zawsze, poza --offline.
+    """
+    # merge i generate czytają CSV poprzedniego etapu - przy parquet zapisujemy oba formaty
+    raw_format = "both" if args.format == "parquet" else "csv"
+    extensions = ["csv", "parquet"] if args.format == "parquet" else ["csv"]
+
+    generate_command = ["generate_player_sales.py", "--format", raw_format,
+                        "--shards", str(args.shards), "--workers", str(args.jobs)]
+    if args.seed is not None:
+        generate_command += ["--seed", str(args.seed)]
+    if args.as_of is not None:
+        generate_command += ["--as-of", args.as_of.isoformat()]
+
+    dedupe_command = ["dedupe_sales.py", "--mode", args.dedupe_mode, "--format", args.format,
+                      "--workers", str(args.jobs)]
+
+    # Bramka DQ na tym, co trafi do bronze: przekroczony próg = kod 1, load się nie uruchamia
+    validate_command = ["validate_sales.py", "--format", args.format, "--workers", str(args.jobs),
+                        "--input-dir", DEDUPED_DIR, "--report-only"]
+
+    # fact_sales i duplikaty (-> silver.fact_sale_quarantine) idą do bronze z data/deduped, słowniki
+    # i delta skinów dla SCD2 z data/raw
+    load_command = ["load_bronze.py", "--tables", "stg_skins", "stg_players", "stg_sales", "stg_sales_quarantine",
+                    "stg_skin_changes", "--format", args.format, "--jobs", str(args.jobs), "--truncate",
+                    "--sales-dir", DEDUPED_DIR]
+    if args.dsn:
+        load_command += ["--dsn", args.dsn]
+
+    return {
+        "fetch": {
+            "after": [],
+            "command": ["fetch_ddragon_skins.py"],
+            "outputs": [raw("ddragon_skins.csv")],
+            "volatile": True,
+        },
+        "parse": {
+            "after": [],
+            "command": ["parse_skins_from_wiki.py", "--format", raw_format],
+            "code": ["lua_table.py", "raw_writers.py"],
+            "inputs": [raw("skindata_raw.lua")],
+            "outputs": [raw(f"wiki_skins_clean.{ext}") for ext in extensions],
+        },
+        "merge": {
+            "after": ["fetch", "parse"],
+            "command": ["merge_skins.py", "--format", raw_format],
+            "code": ["raw_writers.py"],
+            "inputs": [raw("skin_id_registry.csv")],
+            "outputs": [raw(f"dim_skins_final.{ext}") for ext in extensions] + [raw("skin_id_registry.csv")],
+        },
+        # Snapshot (stan nałożony na gold.dim_skin_history) nie jest wejściem: przesuwa go etap scd2
+        "changes": {
+            "after": ["merge"],
+            "command": ["detect_skin_changes.py", "--format", raw_format],
+            "code": ["raw_writers.py"],
+            "outputs": [raw(f"dim_skins_changes.{ext}") for ext in extensions],
+        },
+        "generate": {
+            "after": ["merge"],
+            "command": generate_command,
+            "code": ["raw_writers.py"],
+            "outputs": [raw(f"dim_player.{ext}") for ext in extensions]
+                       + [raw(f"fact_sales*.{ext}") for ext in extensions],
+        },
+        "dedupe": {
+            "after": ["generate"],
+            "command": dedupe_command,
+            "code": ["load_bronze.py", "raw_writers.py", "validate_sales.py"],
+            "outputs": [os.path.join(DEDUPED_DIR, f"fact_sales*.{args.format}"),
+                        os.path.join(DEDUPED_DIR, "fact_sales_quarantine.csv")],
+        },
+        "validate": {
+            "after": ["merge", "generate", "dedupe"],
+            "command": validate_command,
+            "code": ["load_bronze.py", "raw_writers.py"],
+            "outputs": [os.path.join(VALIDATED_DIR, "dq_report.json")],
+        },
+        "load": {
+            "after": ["merge", "changes", "generate", "dedupe", "validate"],
+            "sql": [os.path.join(SQL_DIR, "bronze", "create_tables_for_raw_data.sql")],
+            "command": load_command,
+            "code": ["raw_writers.py"],
+        },
+        "silver": {
+            "after": ["load"],
+            "sql": [os.path.join(SQL_DIR, "silver", "silver_clean_data.sql")],
+        },
+        "gold": {
+            "after": ["silver"],
+            "sql": [os.path.join(SQL_DIR, "gold", "gold_clean_data.sql")],
+        },
+        # Delta z bronze.stg_skin_changes -> gold.dim_skin_history, potem zatwierdzenie snapshotu
+        "scd2": {
+            "after": ["load", "gold"],
+            "sql": [os.path.join(SQL_DIR, "gold", "gold_dim_skin_scd2.sql")],
+            "command": ["detect_skin_changes.py", "--commit"],
+        },
+        # Po scd2: oba etapy odtwarzają gold.fact_sales_skin_version, nie równolegle
+        "views": {
+            "after": ["gold", "scd2"],
+            "sql": [os.path.join(SQL_DIR, "view_results", "gold_view.sql"),
+                    os.path.join(SQL_DIR, "gold", "gold_sales_aggregates.sql"),
+                    os.path.join(SQL_DIR, "gold", "gold_fact_sales_skin_version.sql")],
+        },
+    }
+
+
+def select_stages(stages, first=None, last=None):
+    """Etapy między --from i --until (włącznie): potomkowie `first` przecięci z przodkami `last`."""
+    selected = set(stages)
+    if first:
+        descendants = {first}
+        for name, stage in stages.items():   # kolejność topologiczna
+            if descendants.intersection(stage["after"]):
+                descendants.add(name)
+        selected &= descendants
+    if last:
+        ancestors = {last}
+        for name in reversed(list(stages)):
+            if name in ancestors:
+                ancestors.update(stages[name]["after"])
+        selected &= ancestors
+    if not selected:
+        raise SystemExit(f"BŁĄD: --from {first} nie poprzedza --until {last}")
+    return [name for name in stages if name in selected]
+
+
+class FileHashes:
+    """sha256 plików z pamięcią (rozmiar, mtime_ns) -> hash między przebiegami."""
+
+    def __init__(self, known):
+        self.known = known
+
+    def sha256(self, path):
+        stat = os.stat(path)
+        key = os.path.relpath(path, REPO_DIR)
+        cached = self.known.get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(block)
+        self.known[key] = [stat.st_size, stat.st_mtime_ns, sha.hexdigest()]
+        return sha.hexdigest()
+
+    def patterns(self, patterns):
+        """{ścieżka względna: hash} dla wszystkich plików pasujących do wzorców (brak pliku = None)."""
+        hashes = {}
+        for pattern in patterns:
+            paths = sorted(glob.glob(pattern))
+            if not paths:
+                hashes[os.path.relpath(pattern, REPO_DIR)] = None
+            for path in paths:
+                hashes[os.path.relpath(path, REPO_DIR)] = self.sha256(path)
+        return hashes
+
+
+def digest(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def database_target(dsn):
+    """Baza docelowa w odcisku etapów SQL (bez hasła) - inna baza = etapy do powtórki."""
+    kwargs = connection_kwargs(dsn)
+    return {key: value for key, value in kwargs.items() if key != "password"}
+
+
+def stage_code(stage):
+    code = [os.path.join(SRC_DIR, name) for name in stage.get("code", [])]
+    if "command" in stage:
+        code.append(os.path.join(SRC_DIR, stage["command"][0]))
+    return code + [included for path in stage.get("sql", []) for included in sql_files(path)]
+
+
+def input_fingerprint(name, stage, results, hashes, database):
+    payload = {
+        "stage": name,
+        "command": stage.get("command", []),
+        "code": hashes.patterns(stage_code(stage)),
+        "inputs": hashes.patterns(stage.get("inputs", [])),
+        "after": {dep: results[dep] for dep in stage["after"]},
+    }
+    if not stage.get("outputs"):
+        payload["database"] = database
+    return digest(payload)
+
+
+def outputs_exist(stage):
+    return all(glob.glob(pattern) for pattern in stage.get("outputs", []))
+
+
+def stage_result(stage, fingerprint, hashes):
+    """Wynik etapu dla zależnych: hash plików wyjściowych albo (baza) odcisk + chwila uruchomienia."""
+    if stage.get("outputs"):
+        return digest(hashes.patterns(stage["outputs"]))
+    return digest([fingerprint, time.time_ns()])
+
+
+def skip_reason(name, stage, fingerprint, state, args):
+    """None = etap trzeba uruchomić, inaczej powód pominięcia."""
+    if stage.get("volatile"):
+        if args.offline and outputs_exist(stage):
+            return "--offline"
+        return None
+    if args.force or args.profile == name:
+        return None
+    previous = state["stages"].get(name)
+    if previous and previous["fingerprint"] == fingerprint and outputs_exist(stage):
+        return "bez zmian"
+    return None
+
+
+def table_stats(conn, tables):
+    """(wiersze, bajty z indeksami i partycjami) istniejących tabel."""
+    rows = size = 0
+    for table in tables:
+        if conn.execute("SELECT TO_REGCLASS(%s)", (table,)).fetchone()[0] is None:
+            continue
+        rows += conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        size += conn.execute("SELECT SUM(pg_total_relation_size(oid))::BIGINT FROM pg_class "
+                             "WHERE oid = %(t)s::REGCLASS OR oid IN (SELECT relid FROM pg_partition_tree(%(t)s))",
+                             {"t": table}).fetchone()[0]
+    return rows, size
+
+
+def run_sql_step(name, path, conn):
+    """Jeden plik SQL jako krok etapu w metrykach (wiersze i bajty tabel z SQL_TABLES poza pomiarem)."""
+    reads, writes = SQL_TABLES.get(os.path.basename(path), ([], []))
+    sql = read_sql(path)
+
+    rows_in, bytes_read = table_stats(conn, reads) if reads else (None, 0)
+    with StageRun(name, os.path.basename(path), kind="sql", profile=False) as run:
+        conn.execute(sql)
+        run.stop_clock()
+        run.rows_in, run.bytes_read = rows_in, bytes_read
+        if writes:
+            run.rows_out, run.bytes_written = table_stats(conn, writes)
+
+
+def run_stage(name, stage, dsn):
+    """Wykonuje etap (SQL, potem skrypt) z wyjściem do logu; zwraca czas w sekundach."""
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_path = os.path.join(LOG_DIR, f"{name}.log")
+    started = time.perf_counter()
+
+    with open(log_path, "w", encoding="utf-8") as log:
+        for path in stage.get("sql", []):
+            log.write(f"-- {os.path.relpath(path, REPO_DIR)}\n")
+            log.flush()
+            with connect(dsn) as conn:
+                conn.autocommit = True
+                conn.add_notice_handler(lambda notice: log.write(f"NOTICE: {notice.message_primary}\n"))
+                run_sql_step(name, path, conn)
+
+        if "command" in stage:
+            log.write(f"$ python {' '.join(stage['command'])}\n")
+            log.flush()
+            command = [sys.executable, os.path.join(SRC_DIR, stage["command"][0])] + stage["command"][1:]
+            completed = subprocess.run(command, cwd=SRC_DIR, stdout=log, stderr=subprocess.STDOUT)
+            if completed.returncode != 0:
+                raise RuntimeError(f"{stage['command'][0]} zakończył się kodem {completed.returncode}")
+
+    return time.perf_counter() - started
+
+
+def log_tail(name, lines=LOG_TAIL_LINES):
+    log_path = os.path.join(LOG_DIR, f"{name}.log")
+    if not os.path.exists(log_path):
+        return ""
+    with open(log_path, encoding="utf-8", errors="replace") as f:
+        return "".join(f.readlines()[-lines:])
+
+
+def load_state():
+    if os.path.exists(STATE_PATH):
+        with open(STATE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    return {"files": {}, "stages": {}}
+
+
+def save_state(state):
+    os.makedirs(PIPELINE_DIR, exist_ok=True)
+    tmp_path = STATE_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, STATE_PATH)
+
+
+def run_pipeline(stages, selected, state, args):
+    """
+    Uruchamia wybrane etapy w kolejności DAG, niezależne równolegle (do args.jobs naraz).
+    Zwraca listę (etap, status, sekundy) i nazwę etapu, który padł (albo None).
+    """
+    hashes = FileHashes(state["files"])
+    database = database_target(args.dsn)
+    # Etapy spoza --from/--until: wynik z poprzedniego przebiegu
+    results = {name: state["stages"].get(name, {}).get("result") for name in stages if name not in selected}
+
+    sorter = graphlib.TopologicalSorter({name: [dep for dep in stages[name]["after"] if dep in selected]
+                                         for name in selected})
+    sorter.prepare()
+    summary, failed, running = [], None, {}
+
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        while sorter.is_active() and failed is None:
+            for name in sorter.get_ready():
+                stage = stages[name]
+                fingerprint = input_fingerprint(name, stage, results, hashes, database)
+                reason = skip_reason(name, stage, fingerprint, state, args)
+
+                if reason is not None:
+                    results[name] = state["stages"].get(name, {}).get("result") or \
+                        stage_result(stage, fingerprint, hashes)
+                    summary.append((name, f"pominięty ({reason})", 0.0))
+                    print(f"[{name}] pominięty ({reason})")
+                    sorter.done(name)
+                elif args.dry_run:
+                    results[name] = f"dry-run:{name}"
+                    summary.append((name, "do uruchomienia", 0.0))
+                    print(f"[{name}] do uruchomienia")
+                    sorter.done(name)
+                else:
+                    print(f"[{name}] start")
+                    running[pool.submit(run_stage, name, stage, args.dsn)] = name
+
+            if not running:
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                stage = stages[name]
+                try:
+                    seconds = future.result()
+                except Exception as error:
+                    failed = name
+                    summary.append((name, "BŁĄD", 0.0))
+                    print(f"[{name}] BŁĄD: {error}")
+                    print(log_tail(name), end="")
+                    continue
+
+                # Odcisk po uruchomieniu: etap mógł zmienić własne wejście (rejestr skin_id w merge)
+                fingerprint = input_fingerprint(name, stage, results, hashes, database)
+                results[name] = stage_result(stage, fingerprint, hashes)
+                state["stages"][name] = {
+                    "fingerprint": fingerprint,
+                    "result": results[name],
+                    "finished_at": datetime.now().isoformat(timespec="seconds"),
+                    "seconds": round(seconds, 2),
+                }
+                save_state(state)
+                summary.append((name, "OK", seconds))
+                print(f"[{name}] OK ({seconds:.1f}s)")
+                sorter.done(name)
+
+        # Po błędzie: dokończ to, co już biegnie, nic nowego nie startuje
+        for future in running:
+            try:
+                future.result()
+            except Exception:
+                pass
+
+    return summary, failed
+
+
+def persist_metrics(run_id, stages, summary, dsn):
+    """Linie metryk przebiegu -> silver.pipeline_run_log, jeśli przebieg dotknął bazy."""
+    records = load_records(run_id)
+    if not records:
+        return
+    ran_database = any(status in ("OK", "BŁĄD") and not stages[name].get("outputs")
+                       for name, status, _ in summary)
+    if not ran_database:
+        print(f"\nMetryki: {len(records)} kroków w {metrics_path()} (do bazy: python stage_metrics.py --persist)")
+        return
+    try:
+        with connect(dsn) as conn:
+            persist_records(conn, records)
+    except Exception as error:
+        print(f"\nUWAGA: metryki nie trafiły do silver.pipeline_run_log ({error}) - zostają w {metrics_path()}")
+        return
+    print(f"\nMetryki: {len(records)} kroków -> silver.pipeline_run_log (run_id {run_id})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline LoL DW: etapy z pomijaniem niezmienionych")
+    parser.add_argument("--from", dest="first", choices=STAGE_NAMES, default=None,
+                        help="Pierwszy etap (i wszystko, co od niego zależy)")
+    parser.add_argument("--until", dest="last", choices=STAGE_NAMES, default=None,
+                        help="Ostatni etap (i wszystko, czego potrzebuje)")
+    parser.add_argument("--force", action="store_true", help="Uruchom wybrane etapy mimo braku zmian")
+    parser.add_argument("--offline", action="store_true",
+                        help="Nie pobieraj Data Dragon - użyj istniejącego ddragon_skins.csv")
+    parser.add_argument("--dry-run", action="store_true", help="Pokaż plan bez uruchamiania")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(),
+                        help="Ile etapów naraz; też --workers generatora i --jobs loadera")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                        help="Format plików raw ładowanych do bronze")
+    parser.add_argument("--seed", type=int, default=None, help="Seed generatora (część odcisku)")
+    parser.add_argument("--shards", type=int, default=1, help="Shardy fact_sales generatora")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=None,
+                        help="Data 'dzisiaj' dla generatora (YYYY-MM-DD)")
+    parser.add_argument("--dedupe-mode", choices=["exact", "partitioned"], default="exact",
+                        help="Tryb dedupe_sales.py (partitioned = ograniczona pamięć)")
+    parser.add_argument("--dsn", default=None, help="Connection string (zamiast zmiennych DB_*)")
+    parser.add_argument("--profile", choices=PYTHON_STAGES, default=None,
+                        help="Profiluj jeden etap Pythona (uruchamiany mimo braku zmian)")
+    parser.add_argument("--profiler", choices=PROFILERS, default="cprofile",
+                        help="cprofile (.prof) albo sampling (próbki stosu, .folded)")
+    args = parser.parse_args()
+
+    stages = pipeline_stages(args)
+    selected = select_stages(stages, args.first, args.last)
+
+    # Wspólny run_id i profiler dla procesów etapów (zmienne środowiskowe dziedziczą skrypty)
+    run_id = new_run_id()
+    os.environ["PIPELINE_RUN_ID"] = run_id
+    if args.profile:
+        os.environ["PIPELINE_PROFILE"] = args.profile
+        os.environ["PIPELINE_PROFILER"] = args.profiler
+
+    print("="*60)
+    print("PIPELINE")
+    print("="*60)
+    print(f"Etapy: {' -> '.join(selected)} (równolegle do {args.jobs}), run_id {run_id}\n")
+
+    state = load_state()
+    started = time.perf_counter()
+    summary, failed = run_pipeline(stages, selected, state, args)
+    if not args.dry_run:
+        save_state(state)
+
+    print("\nPodsumowanie:")
+    for name, status, seconds in summary:
+        timing = f"{seconds:8.1f}s" if seconds else " " * 9
+        print(f"  {name:9s} {timing}  {status}")
+    print(f"Razem: {time.perf_counter() - started:.1f}s")
+
+    if not args.dry_run:
+        persist_metrics(run_id, stages, summary, args.dsn)
+
+    if failed:
+        raise SystemExit(f"BŁĄD: etap {failed} nie powiódł się (log: {os.path.join(LOG_DIR, failed + '.log')})")
+
+
+if __name__ == "__main__":
+    main()
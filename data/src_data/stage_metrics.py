@@ -0,0 +1,362 @@
+"""
+Metryki etapów pipeline'u: czas (wall i CPU), szczytowa pamięć, wiersze i bajty
+na wejściu / wyjściu. Każdy pomiar to jedna linia JSON w data/cache/metrics/stage_runs.jsonl
+(albo w pliku z PIPELINE_METRICS). Linie są zapisywane do silver.pipeline_run_log,
+kluczem jest run_id + etap + krok.
+
+Skrypty z data/src_data oznaczają main() dekoratorem @instrumented("parse"), a w środku
+zgłaszają record_input() / record_output(). run_pipeline.py mierzy tak samo pliki SQL,
+ustawia wspólny PIPELINE_RUN_ID dla wszystkich etapów i po przebiegu zapisuje linie
+do bazy. Skrypt uruchomiony sam dostaje własny run_id. Linie z przebiegu bez bazy
+wgrywa potem:
+
+    python stage_metrics.py --persist
+
+Zmienne środowiskowe:
+    PIPELINE_RUN_ID     - wspólny identyfikator przebiegu
+    PIPELINE_METRICS    - plik JSON lines (domyślnie METRICS_PATH)
+    PIPELINE_PROFILE    - nazwa etapu do profilowania (np. merge)
+    PIPELINE_PROFILER   - cprofile (domyślnie, .prof dla pstats / snakeviz)
+                          albo sampling (próbki stosu co 5 ms, .folded dla flamegraph / speedscope)
+    PIPELINE_TRACEMALLOC=1 - szczyt pamięci obiektów Pythona (tracemalloc, wolniej)
+"""
+import argparse
+import cProfile
+import functools
+import io
+import json
+import os
+import platform
+import pstats
+import signal
+import sys
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:   # Windows - bez szczytowego RSS
+    resource = None
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))   # data/src_data
+DATA_DIR = os.path.dirname(SRC_DIR)                     # data
+REPO_DIR = os.path.dirname(DATA_DIR)
+
+METRICS_DIR = os.path.join(DATA_DIR, "cache", "metrics")   # data/cache/metrics
+METRICS_PATH = os.path.join(METRICS_DIR, "stage_runs.jsonl")
+PROFILE_DIR = os.path.join(METRICS_DIR, "profiles")
+RUN_LOG_SQL = os.path.join(REPO_DIR, "sql", "silver", "pipeline_run_log.sql")
+
+PROFILERS = ["cprofile", "sampling"]
+SAMPLING_INTERVAL = 0.005   # Sekundy CPU między próbkami stosu
+PROFILE_TOP = 15            # Ile funkcji pokazać w logu etapu
+
+RECORD_FIELDS = [
+    "run_id", "stage", "step", "kind", "status", "started_at", "finished_at",
+    "wall_seconds", "cpu_seconds", "peak_rss_mb", "peak_traced_mb",
+    "rows_in", "rows_out", "bytes_read", "bytes_written", "profile_path", "error", "host",
+]
+
+_run_id = None
+_active = None   # StageRun mierzony w tym procesie (record_input / record_output)
+
+
+def current_run_id():
+    """PIPELINE_RUN_ID albo (skrypt uruchomiony sam) nowy id, wspólny dla całego procesu."""
+    global _run_id
+    if _run_id is None:
+        _run_id = os.environ.get("PIPELINE_RUN_ID") or new_run_id()
+    return _run_id
+
+
+def new_run_id():
+    return f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+
+def metrics_path():
+    return os.environ.get("PIPELINE_METRICS", METRICS_PATH)
+
+
+def peak_rss_mb():
+    """Szczytowe RSS tego procesu i zakończonych procesów potomnych (workery generatora)."""
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)   # macOS: bajty, Linux: KB
+
+
+def cpu_seconds():
+    """CPU tego procesu + zakończonych procesów potomnych."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def file_size(path):
+    return os.path.getsize(path) if path and os.path.exists(path) else 0
+
+
+class SamplingProfiler:
+    """
+    Próbkowanie stosu głównego wątku sygnałem SIGPROF co `interval` sekund CPU.
+    Wynik w formacie "folded" (ramka;ramka;... liczba) - dla flamegraph.pl / speedscope.
+    """
+
+    def __init__(self, interval=SAMPLING_INTERVAL):
+        if not hasattr(signal, "setitimer"):
+            raise SystemExit("BŁĄD: profiler sampling wymaga setitimer (Linux / macOS) - użyj cprofile")
+        self.interval = interval
+        self.stacks = Counter()
+
+    def _sample(self, signum, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        self.stacks[";".join(reversed(stack))] += 1
+
+    def enable(self):
+        self.previous = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def disable(self):
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self.previous)
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def summary(self, top=PROFILE_TOP):
+        """Funkcje z największą liczbą próbek (włącznie z wywołanymi)."""
+        inclusive = Counter()
+        for stack, count in self.stacks.items():
+            for frame in set(stack.split(";")):
+                inclusive[frame] += count
+        total = sum(self.stacks.values()) or 1
+        lines = [f"{count:8d} próbek {count / total * 100:5.1f}%  {frame}"
+                 for frame, count in inclusive.most_common(top)]
+        return "\n".join(lines) + "\n"
+
+
+class CProfileProfiler(cProfile.Profile):
+    def save(self, path):
+        self.dump_stats(path)
+
+    def summary(self, top=PROFILE_TOP):
+        out = io.StringIO()
+        pstats.Stats(self, stream=out).sort_stats("cumulative").print_stats(top)
+        return out.getvalue()
+
+
+def make_profiler(stage):
+    """Profiler, jeśli PIPELINE_PROFILE wskazuje ten etap, inaczej None."""
+    if os.environ.get("PIPELINE_PROFILE") != stage:
+        return None
+    kind = os.environ.get("PIPELINE_PROFILER", "cprofile")
+    if kind not in PROFILERS:
+        raise SystemExit(f"BŁĄD: PIPELINE_PROFILER={kind} - dostępne: {', '.join(PROFILERS)}")
+    return SamplingProfiler() if kind == "sampling" else CProfileProfiler()
+
+
+class StageRun:
+    """
+    Pomiar jednego kroku etapu (skrypt albo plik SQL) - context manager.
+    Po wyjściu (także przy wyjątku / SystemExit) dopisuje linię JSON do metrics_path().
+    """
+
+    def __init__(self, stage, step, kind="python", profile=True):
+        self.stage = stage
+        self.step = step
+        self.kind = kind
+        self.rows_in = None
+        self.rows_out = None
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.profiler = make_profiler(stage) if profile else None
+        self.stopped = None
+        self.record = None
+
+    def __enter__(self):
+        global _active
+        if self.kind == "python":   # SQL mierzy run_pipeline.py w wątkach - bez globalnego _active
+            self.previous, _active = _active, self
+        self.trace_memory = os.environ.get("PIPELINE_TRACEMALLOC") == "1" and not tracemalloc.is_tracing()
+        if self.trace_memory:
+            tracemalloc.start()
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.cpu_started = cpu_seconds()
+        if self.profiler:
+            self.profiler.enable()
+        return self
+
+    def stop_clock(self):
+        """Koniec mierzonego czasu przed wyjściem z bloku (np. liczenie wierszy wyniku poza pomiarem)."""
+        if self.stopped is None:
+            self.stopped = (time.perf_counter() - self.started, cpu_seconds() - self.cpu_started)
+
+    def __exit__(self, exc_type, exc, traceback):
+        global _active
+        if self.profiler:
+            self.profiler.disable()
+        self.stop_clock()
+        wall, cpu = self.stopped
+        if self.kind == "python":
+            _active = self.previous
+
+        peak_traced = None
+        if self.trace_memory:
+            peak_traced = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+
+        failed = exc_type is not None and not (exc_type is SystemExit and exc.code in (None, 0))
+        self.record = {
+            "run_id": current_run_id(),
+            "stage": self.stage,
+            "step": self.step,
+            "kind": self.kind,
+            "status": "error" if failed else "ok",
+            "started_at": self.started_at.isoformat(timespec="milliseconds"),
+            "finished_at": datetime.now().isoformat(timespec="milliseconds"),
+            "wall_seconds": round(wall, 3),
+            "cpu_seconds": round(cpu, 3) if self.kind == "python" else None,
+            "peak_rss_mb": round(peak_rss_mb(), 1) if self.kind == "python" and resource else None,
+            "peak_traced_mb": round(peak_traced, 1) if peak_traced is not None else None,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "bytes_read": self.bytes_read or None,
+            "bytes_written": self.bytes_written or None,
+            "profile_path": self._save_profile(),
+            "error": f"{exc_type.__name__}: {exc}" if failed else None,
+            "host": platform.node(),
+        }
+        write_record(self.record)
+        if self.kind == "python":
+            print(format_record(self.record))
+        return False
+
+    def _save_profile(self):
+        if not self.profiler:
+            return None
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        extension = "folded" if isinstance(self.profiler, SamplingProfiler) else "prof"
+        path = os.path.join(PROFILE_DIR, f"{current_run_id()}-{self.stage}.{extension}")
+        self.profiler.save(path)
+        print(f"\nProfil etapu {self.stage}: {path}")
+        print(self.profiler.summary(), end="")
+        return path
+
+    def add_input(self, path=None, rows=None, bytes_read=None):
+        self.bytes_read += bytes_read if bytes_read is not None else file_size(path)
+        if rows is not None:
+            self.rows_in = (self.rows_in or 0) + rows
+
+    def add_output(self, paths=(), rows=None):
+        self.bytes_written += sum(file_size(path) for path in paths)
+        if rows is not None:
+            self.rows_out = (self.rows_out or 0) + rows
+
+
+def instrumented(stage):
+    """Dekorator main() skryptu: cały przebieg mierzony jako krok <plik skryptu> etapu `stage`."""
+    def decorate(main):
+        step = os.path.basename(main.__code__.co_filename)
+
+        @functools.wraps(main)
+        def wrapper(*args, **kwargs):
+            with StageRun(stage, step):
+                return main(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def record_input(path=None, rows=None, bytes_read=None):
+    """Wejście bieżącego etapu: plik (bajty z rozmiaru), wiersze albo bajty z sieci. Bez pomiaru - nic."""
+    if _active is not None:
+        _active.add_input(path, rows, bytes_read)
+
+
+def record_output(paths=(), rows=None):
+    """Wyjście bieżącego etapu: zapisane pliki (bajty z rozmiaru) i wiersze."""
+    if _active is not None:
+        _active.add_output(paths, rows)
+
+
+def write_record(record):
+    """Jedna linia JSON jednym write() (O_APPEND) - równoległe etapy nie przeplatają linii."""
+    path = metrics_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line)
+
+
+def format_record(record):
+    parts = [f"{record['wall_seconds']:.2f}s"]
+    if record["cpu_seconds"] is not None:
+        parts.append(f"CPU {record['cpu_seconds']:.2f}s")
+    if record["peak_rss_mb"] is not None:
+        parts.append(f"RSS {record['peak_rss_mb']:,.0f} MB")
+    if record["rows_in"] is not None or record["rows_out"] is not None:
+        parts.append(f"wiersze {record['rows_in'] or 0:,} -> {record['rows_out'] or 0:,}")
+    if record["bytes_read"] or record["bytes_written"]:
+        parts.append(f"bajty {record['bytes_read'] or 0:,} -> {record['bytes_written'] or 0:,}")
+    return f"\nMetryki [{record['stage']}/{record['step']}] {record['status']}: {', '.join(parts)}"
+
+
+def load_records(run_id=None, path=None):
+    """Linie z pliku metryk (opcjonalnie tylko jednego przebiegu)."""
+    path = path or metrics_path()
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return [record for record in records if run_id is None or record["run_id"] == run_id]
+
+
+def persist_records(conn, records):
+    """Zakłada silver.pipeline_run_log (jeśli trzeba) i dopisuje linie; istniejące klucze są pomijane."""
+    with open(RUN_LOG_SQL, encoding="utf-8") as f:
+        conn.execute(f.read())
+    columns = ", ".join(RECORD_FIELDS)
+    placeholders = ", ".join(f"%({field})s" for field in RECORD_FIELDS)
+    with conn.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO silver.pipeline_run_log ({columns}) VALUES ({placeholders}) "
+            f"ON CONFLICT (run_id, stage, step) DO NOTHING",
+            [{field: record.get(field) for field in RECORD_FIELDS} for record in records],
+        )
+    conn.commit()
+    return len(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Metryki etapów: JSON lines -> silver.pipeline_run_log")
+    parser.add_argument("--persist", action="store_true", help="Zapisz linie z pliku metryk w bazie")
+    parser.add_argument("--run-id", default=None, help="Tylko jeden przebieg")
+    parser.add_argument("--metrics", default=None, help="Plik JSON lines (domyślnie PIPELINE_METRICS / METRICS_PATH)")
+    parser.add_argument("--dsn", default=None, help="Connection string (zamiast zmiennych DB_*)")
+    args = parser.parse_args()
+
+    records = load_records(args.run_id, args.metrics)
+    print(f"Linie metryk: {len(records)} ({args.metrics or metrics_path()})")
+    for record in records[-20:]:
+        print(f"  {record['run_id']}  {record['stage']:9s} {record['step']:32s} "
+              f"{record['wall_seconds']:9.2f}s  {record['status']}")
+
+    if args.persist and records:
+        from load_bronze import connect
+
+        with connect(args.dsn) as conn:
+            persist_records(conn, records)
+        print("Zapisano w silver.pipeline_run_log (istniejące run_id / etap / krok pominięte)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""
+Walidacja fact_sales przed ładowaniem do bronze (te same reguły co silver_clean_data.sql).
+
+Każdy plik fact_sales (albo shard fact_sales_part-NNNN) jest sprawdzany w osobnym
+procesie, paczkami po CHUNK_SIZE wierszy, maskami na całych kolumnach:
+  missing_player   - player_id pusty albo spoza dim_player.csv
+  missing_skin     - skin_id pusty albo spoza dim_skins_final.csv
+  invalid_price    - cena pusta (i nienaprawialna z dim_skin) albo <= 0
+  invalid_quantity - ilość pusta albo <= 0
+  invalid_date     - purchase_date poza zakresem dim_date (2010-01-01 .. 2030-12-31)
+Brakującą cenę Silver uzupełnia z dim_skin (price_fixed), więc taki wiersz jest poprawny.
+
+Poprawne wiersze trafiają bez zmian do data/validated/<ta sama nazwa pliku>,
+odrzucone do data/validated/fact_sales_quarantine.csv z rejection_reason.
+Jeśli którakolwiek reguła przekracza próg (domyślnie 5%) albo suma odrzuconych
+(total_invalid) przekracza własny próg (domyślnie 15% - generator psuje ~10% wierszy,
+z czego odrzucanych jest ~6.5%), batch jest odrzucany: czyste pliki nie powstają,
+zostaje kwarantanna i raport, kod wyjścia 1.
+
+--report-only sprawdza tylko progi i zapisuje raport (bez czystych plików i
+kwarantanny). Tak działa etap validate w run_pipeline.py: bramka na plikach z
+data/deduped przed load - odrzucone wiersze i tak trafiają do kwarantanny w Silver.
+
+    python validate_sales.py --workers 8
+    python load_bronze.py --tables stg_sales --raw-dir data/validated
+    python validate_sales.py --input-dir data/deduped --report-only   # jak w run_pipeline.py
+"""
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from load_bronze import find_raw_files
+from raw_writers import CsvChunkWriter, open_writers, raw_stem
+from stage_metrics import instrumented, record_input, record_output
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))   # data/src_data
+DATA_DIR = os.path.dirname(SRC_DIR)                     # data
+RAW_DIR = os.path.join(DATA_DIR, "raw")                 # data/raw
+VALIDATED_DIR = os.path.join(DATA_DIR, "validated")     # data/validated
+
+dim_player_path = os.path.join(RAW_DIR, "dim_player.csv")
+skins_path = os.path.join(RAW_DIR, "dim_skins_final.csv")
+
+CHUNK_SIZE = 1_000_000
+THRESHOLD_PCT = 5.0          # pojedyncza reguła
+TOTAL_THRESHOLD_PCT = 15.0   # total_invalid (suma reguł)
+
+# Zakres silver.dim_date
+DIM_DATE_START = np.datetime64("2010-01-01")
+DIM_DATE_END = np.datetime64("2030-12-31")
+
+# Kolejność jak w data_quality_log
+RULES = ["missing_player", "missing_skin", "invalid_price", "invalid_quantity", "invalid_date", "total_invalid"]
+
+SALES_COLUMNS = ["transaction_id", "player_id", "skin_id", "purchase_date", "price_rp", "quantity"]
+QUARANTINE_COLUMNS = SALES_COLUMNS + ["rejection_reason"]
+
+
+def _numeric(values):
+    """Kolumna -> float64 z NaN zamiast pustych (1026.0 z CSV, Int64 z Parquet)."""
+    return pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def validate_chunk(df, player_ids, skin_index, skin_prices):
+    """
+    Paczka fact_sales -> (maska poprawnych wierszy, Series z rejection_reason, {reguła: liczba}).
+    player_ids - tablica id graczy, skin_index/skin_prices - id skinów (pd.Index) i ich ceny (do price_fixed).
+    """
+    transaction_id = _numeric(df["transaction_id"])
+    player_id = _numeric(df["player_id"])
+    skin_id = _numeric(df["skin_id"])
+    price = _numeric(df["price_rp"])
+    quantity = _numeric(df["quantity"])
+    purchase_date = pd.to_datetime(df["purchase_date"], format="%Y-%m-%d", errors="coerce").to_numpy()
+
+    player_ok = np.isin(player_id, player_ids)
+    skin_position = skin_index.get_indexer(skin_id)
+    skin_ok = skin_position >= 0
+    skin_price = np.where(skin_ok, skin_prices[skin_position], np.nan)
+
+    # price_fixed: Silver bierze cenę z dim_skin, gdy jej brak, a ilość > 0
+    price_fixed = np.isnan(price) & (quantity > 0) & (skin_price > 0)
+    price = np.where(price_fixed, skin_price, price)
+
+    masks = {
+        "missing_player": ~player_ok,
+        "missing_skin": ~skin_ok,
+        "invalid_price": ~(price > 0),
+        "invalid_quantity": ~(quantity > 0),
+        "invalid_date": ~((purchase_date >= DIM_DATE_START) & (purchase_date <= DIM_DATE_END)),
+    }
+    missing_transaction = np.isnan(transaction_id)
+    invalid = missing_transaction | np.logical_or.reduce(list(masks.values()))
+    masks["total_invalid"] = invalid
+
+    # rejection_reason tylko dla odrzuconych - słownik dq_issues z Silver
+    issues = [
+        ("missing_transaction_id", missing_transaction),
+        ("missing_player", masks["missing_player"]),
+        ("missing_skin", masks["missing_skin"]),
+        ("missing_price", np.isnan(price)),
+        ("negative_price", price < 0),
+        ("zero_price", price == 0),
+        ("missing_quantity", np.isnan(quantity)),
+        ("invalid_quantity", quantity <= 0),
+        ("invalid_date", masks["invalid_date"]),
+    ]
+    reasons = pd.Series("", index=df.index[invalid], dtype=object)
+    for issue, mask in issues:
+        flagged = mask[invalid]
+        if flagged.any():
+            reasons[flagged] = reasons[flagged] + issue + ","
+    reasons = reasons.str.rstrip(",")
+
+    counts = {rule: int(mask.sum()) for rule, mask in masks.items()}
+    counts["price_fixed"] = int((price_fixed & ~invalid).sum())
+    return ~invalid, reasons, counts
+
+
+def iter_sales_chunks(path, chunk_size=CHUNK_SIZE):
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("BŁĄD: walidacja Parquet wymaga pakietu pyarrow (pip install pyarrow)")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size, dtype={"purchase_date": str})
+
+
+# Zbiory referencyjne - ustawiane raz na proces puli
+_reference = {}
+
+
+def _init_validate_worker(reference):
+    _reference.update(reference)
+
+
+def validate_file(task):
+    """
+    Jeden plik fact_sales -> czysty plik (tymczasowy) + część kwarantanny.
+    Bez clean_stem (--report-only) tylko liczy. Zwraca (ścieżka wejścia, wiersze, {reguła: liczba}).
+    """
+    input_path, clean_stem, output_format, quarantine_path = task
+    clean_writers = open_writers(clean_stem, "fact_sales", output_format) if clean_stem else []
+    quarantine_writer = CsvChunkWriter(quarantine_path) if clean_stem else None
+
+    rows = 0
+    totals = dict.fromkeys(RULES + ["price_fixed"], 0)
+    for chunk in iter_sales_chunks(input_path):
+        valid, reasons, counts = validate_chunk(
+            chunk, _reference["player_ids"], _reference["skin_index"], _reference["skin_prices"]
+        )
+        for writer in clean_writers:
+            writer.write(chunk[valid])
+        if quarantine_writer:
+            quarantine_writer.write(chunk[~valid].assign(rejection_reason=reasons))
+
+        rows += len(chunk)
+        for rule, count in counts.items():
+            totals[rule] += count
+
+    for writer in clean_writers:
+        writer.close()
+    if quarantine_writer:
+        quarantine_writer.close()
+    return input_path, rows, totals
+
+
+def load_reference():
+    """id graczy i skinów (z cenami) - to, co Silver ma w dim_player / dim_skin."""
+    players = pd.read_csv(dim_player_path, usecols=["player_id"])
+    skins = pd.read_csv(skins_path, usecols=["skin_id", "price_rp"]).dropna(subset=["skin_id"])
+    skins = skins.drop_duplicates("skin_id")
+    return {
+        "player_ids": players["player_id"].dropna().to_numpy(dtype=np.float64),
+        "skin_index": pd.Index(skins["skin_id"].to_numpy(dtype=np.float64)),
+        "skin_prices": skins["price_rp"].to_numpy(dtype=np.float64),
+    }
+
+
+def build_report(rows, totals, threshold, total_threshold=TOTAL_THRESHOLD_PCT):
+    """Reguły z progiem `threshold`, total_invalid (suma reguł) z własnym `total_threshold`."""
+    checks = []
+    for rule in RULES:
+        limit = total_threshold if rule == "total_invalid" else threshold
+        pct = round(totals[rule] / rows * 100, 2) if rows else 0.0
+        checks.append({"issue_type": rule, "issue_count": totals[rule], "issue_pct": pct,
+                       "threshold_pct": limit, "alert_triggered": pct > limit})
+    return checks
+
+
+@instrumented("validate")
+def main():
+    parser = argparse.ArgumentParser(description="Walidacja fact_sales przed COPY do bronze")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                        help="Które pliki raw walidować (czyste pliki mają ten sam format)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Liczba procesów (jeden plik / shard na proces)")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD_PCT,
+                        help="Próg alertu pojedynczej reguły w %% - przekroczenie odrzuca cały batch")
+    parser.add_argument("--total-threshold", type=float, default=TOTAL_THRESHOLD_PCT,
+                        help="Próg dla total_invalid (wszystkie odrzucone wiersze) w %%")
+    parser.add_argument("--input-dir", default=RAW_DIR,
+                        help="Katalog z fact_sales* (np. data/deduped po dedupe_sales.py)")
+    parser.add_argument("--output-dir", default=VALIDATED_DIR,
+                        help="Katalog na czyste pliki, kwarantannę i raport")
+    parser.add_argument("--report-only", action="store_true",
+                        help="Tylko progi i dq_report.json, bez czystych plików i kwarantanny")
+    args = parser.parse_args()
+
+    print("="*60)
+    print("WALIDACJA FACT_SALES (PRZED BRONZE)")
+    print("="*60)
+
+    input_paths = find_raw_files("stg_sales", args.format, args.input_dir)
+    if not input_paths:
+        print(f"BŁĄD: Brak plików fact_sales*.{args.format} w {args.input_dir}")
+        exit(1)
+
+    try:
+        reference = load_reference()
+    except FileNotFoundError as e:
+        print(f"BŁĄD: Nie znaleziono {e.filename} - najpierw merge_skins.py i generate_player_sales.py")
+        exit(1)
+    record_input(dim_player_path, rows=len(reference["player_ids"]))
+    record_input(skins_path, rows=len(reference["skin_index"]))
+    print(f"Pliki: {len(input_paths)}, gracze: {len(reference['player_ids'])}, "
+          f"skiny: {len(reference['skin_index'])}")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for old_file in glob.glob(os.path.join(args.output_dir, "fact_sales*")) + \
+            glob.glob(os.path.join(args.output_dir, "tmp-*")):
+        os.remove(old_file)
+
+    # Czyste pliki najpierw jako *.tmp-<nazwa>, rename dopiero po sprawdzeniu progów
+    tasks = []
+    for index, input_path in enumerate(input_paths):
+        if args.report_only:
+            tasks.append((input_path, None, args.format, None))
+            continue
+        name = os.path.basename(raw_stem(input_path))
+        tasks.append((input_path,
+                      os.path.join(args.output_dir, f"tmp-{name}"),
+                      args.format,
+                      os.path.join(args.output_dir, f"tmp-quarantine-{index:04d}.csv")))
+
+    started = time.perf_counter()
+    rows = 0
+    totals = dict.fromkeys(RULES + ["price_fixed"], 0)
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(tasks))),
+                             initializer=_init_validate_worker, initargs=(reference,)) as pool:
+        for input_path, file_rows, counts in pool.map(validate_file, tasks):
+            print(f"  {os.path.basename(input_path)}: {file_rows:,} wierszy, "
+                  f"odrzucone {counts['total_invalid']:,}")
+            record_input(input_path, rows=file_rows)
+            rows += file_rows
+            for rule, count in counts.items():
+                totals[rule] += count
+    elapsed = time.perf_counter() - started
+
+    # Kwarantanna: części z procesów -> jeden plik
+    quarantine_path = os.path.join(args.output_dir, "fact_sales_quarantine.csv")
+    if not args.report_only:
+        with open(quarantine_path, "w", newline="") as out:
+            out.write(",".join(QUARANTINE_COLUMNS) + "\n")
+            for _, _, _, part_path in tasks:
+                with open(part_path) as part:
+                    next(part, None)  # nagłówek części
+                    for line in part:
+                        out.write(line)
+                os.remove(part_path)
+
+    checks = build_report(rows, totals, args.threshold, args.total_threshold)
+    rejected = any(check["alert_triggered"] for check in checks)
+
+    print(f"\nWierszy: {rows:,} w {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} wierszy/s)")
+    print(f"Cena uzupełniona z dim_skin (price_fixed): {totals['price_fixed']:,}")
+    print(f"\n{'Check':18s} {'Count':>10s} {'% Error':>8s}  Status")
+    for check in checks:
+        status = "ALERT!" if check["alert_triggered"] else "✓ OK"
+        print(f"{check['issue_type']:18s} {check['issue_count']:>10,} {check['issue_pct']:>8.2f}  {status}")
+
+    clean_paths = []
+    for _, clean_stem, output_format, _ in tasks:
+        if clean_stem is None:
+            continue
+        tmp_path = f"{clean_stem}.{output_format}"
+        if rejected:
+            os.remove(tmp_path)
+        else:
+            final_path = os.path.join(args.output_dir, os.path.basename(tmp_path)[len("tmp-"):])
+            os.replace(tmp_path, final_path)
+            clean_paths.append(final_path)
+
+    report_path = os.path.join(args.output_dir, "dq_report.json")
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "status": "rejected" if rejected else "accepted",
+            "rows": rows,
+            "valid_rows": rows - totals["total_invalid"],
+            "price_fixed": totals["price_fixed"],
+            "threshold_pct": args.threshold,
+            "total_threshold_pct": args.total_threshold,
+            "checks": checks,
+            "inputs": [os.path.basename(path) for path in input_paths],
+            "clean_files": [os.path.basename(path) for path in clean_paths],
+        }, f, indent=2)
+
+    # Wiersze na wyjściu: poprawne wiersze przyjętego batcha (odrzucony batch nie przepuszcza nic)
+    written_paths = clean_paths + ([] if args.report_only else [quarantine_path]) + [report_path]
+    record_output(written_paths, rows=0 if rejected else rows - totals["total_invalid"])
+
+    if not args.report_only:
+        print(f"\n✓ Kwarantanna: {quarantine_path} ({totals['total_invalid']:,} wierszy)")
+    print(f"✓ Raport: {report_path}")
+    if rejected:
+        print(f"\nBATCH ODRZUCONY: próg {args.threshold}% (reguła) / {args.total_threshold}% (total_invalid) "
+              f"przekroczony - nic nie trafi do bronze")
+        exit(1)
+    if args.report_only:
+        print("\n✓ Batch przyjęty (--report-only: bez czystych plików)")
+        return
+    print(f"✓ Czyste pliki: {len(clean_paths)} w {args.output_dir}")
+    print("\nDalej: load_bronze.py --tables stg_sales --raw-dir data/validated")
+
+
+if __name__ == "__main__":
+    main()
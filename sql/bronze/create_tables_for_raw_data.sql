@@ -53,6 +53,51 @@ CREATE TABLE bronze.stg_sales (
 
 COMMENT ON TABLE bronze.stg_sales IS 'Raw sales with intentional errors (10%) for DQ testing';
 
+-- Watermark dla silver_incremental_load.sql (tylko wiersze nowsze niż ostatni przebieg)
+CREATE INDEX idx_stg_sales_loaded_at ON bronze.stg_sales(loaded_at);
+
+-- 4. STAGING SALES QUARANTINE (duplikaty z dedupe_sales.py -> silver.fact_sale_quarantine)
+DROP TABLE IF EXISTS bronze.stg_sales_quarantine CASCADE;
+
+CREATE TABLE bronze.stg_sales_quarantine (
+    transaction_id NUMERIC,
+    player_id NUMERIC,
+    skin_id NUMERIC,
+    purchase_date TEXT,
+    price_rp NUMERIC,
+    quantity NUMERIC,
+    rejection_reason VARCHAR(200),   -- duplicate (dedupe_sales.py) albo reguły DQ (validate_sales.py)
+    
+    -- Metadata
+    loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE bronze.stg_sales_quarantine IS 'Sales rejected before bronze (fact_sales_quarantine.csv), copied to silver.fact_sale_quarantine';
+
+CREATE INDEX idx_stg_sales_quarantine_loaded_at ON bronze.stg_sales_quarantine(loaded_at);
+
+-- 5. STAGING SKIN CHANGES (delta z detect_skin_changes.py -> SCD2)
+DROP TABLE IF EXISTS bronze.stg_skin_changes CASCADE;
+
+CREATE TABLE bronze.stg_skin_changes (
+    skin_id INTEGER,
+    change_type VARCHAR(10),      -- insert / update / retire
+    effective_date DATE,
+    row_hash CHAR(32),            -- md5(price_rp|rarity|release_date|champion_name|skin_name)
+    champion_name VARCHAR(100),
+    skin_name VARCHAR(200),
+    rarity VARCHAR(50),
+    price_rp INTEGER,
+    release_date DATE,
+    champion_id VARCHAR(100),
+    skin_num INTEGER,
+
+    -- Metadata
+    loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE bronze.stg_skin_changes IS 'Row-hash delta of dim_skins_final (only inserted/changed/retired skins)';
+
 -- ================================================================
 -- VERIFICATION
 -- ================================================================
@@ -62,7 +107,11 @@ SELECT 'stg_skins' as table_name, COUNT(*) as row_count FROM bronze.stg_skins
 UNION ALL
 SELECT 'stg_players', COUNT(*) FROM bronze.stg_players
 UNION ALL
-SELECT 'stg_sales', COUNT(*) FROM bronze.stg_sales;
+SELECT 'stg_sales', COUNT(*) FROM bronze.stg_sales
+UNION ALL
+SELECT 'stg_sales_quarantine', COUNT(*) FROM bronze.stg_sales_quarantine
+UNION ALL
+SELECT 'stg_skin_changes', COUNT(*) FROM bronze.stg_skin_changes;
 
 -- Expected:
 -- stg_skins   : ~1600-1700 (with Default skins, esports skins)
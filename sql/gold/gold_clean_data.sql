@@ -90,10 +90,10 @@ SELECT
 FROM silver.dim_player
 WHERE is_valid = TRUE;
 
--- FACT_SALES - Transakcje (tylko valid)
+-- FACT_SALES - Transakcje (tylko valid), partycje miesięczne po date_key
 
 CREATE TABLE gold.fact_sales (
-    sale_key SERIAL PRIMARY KEY,
+    sale_key SERIAL,
     transaction_id INTEGER,
     player_key INTEGER NOT NULL,
     skin_key INTEGER NOT NULL,
@@ -103,6 +103,9 @@ CREATE TABLE gold.fact_sales (
     total_rp INTEGER NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     
+    -- Klucz partycji musi być w kluczu głównym
+    PRIMARY KEY (sale_key, date_key),
+    
     CONSTRAINT chk_quantity_positive CHECK (quantity > 0),
     CONSTRAINT chk_price_positive_fact CHECK (price_rp > 0),
     CONSTRAINT chk_total_calculation CHECK (total_rp = price_rp * quantity),
@@ -111,17 +114,252 @@ CREATE TABLE gold.fact_sales (
     CONSTRAINT fk_player FOREIGN KEY (player_key) REFERENCES gold.dim_player(player_key),
     CONSTRAINT fk_skin FOREIGN KEY (skin_key) REFERENCES gold.dim_skin(skin_key),
     CONSTRAINT fk_date FOREIGN KEY (date_key) REFERENCES gold.dim_date(date_key)
-);
+) PARTITION BY RANGE (date_key);
 
-COMMENT ON TABLE gold.fact_sales IS 'Fakty sprzedaży - tylko zwalidowane';
+COMMENT ON TABLE gold.fact_sales IS 'Fakty sprzedaży - tylko zwalidowane, partycja = miesiąc (gold.fact_sales_YYYYMM)';
 
--- Indeksy dla wydajności
+-- Indeksy dla wydajności (zakładane automatycznie na każdej partycji)
 CREATE INDEX idx_fact_sales_player ON gold.fact_sales(player_key);
 CREATE INDEX idx_fact_sales_skin ON gold.fact_sales(skin_key);
-CREATE INDEX idx_fact_sales_date ON gold.fact_sales(date_key);
-CREATE INDEX idx_fact_sales_date_player ON gold.fact_sales(date_key, player_key);
+-- Dane w partycji ładowane po dacie -> BRIN zamiast B-tree na date_key
+CREATE INDEX idx_fact_sales_date_brin ON gold.fact_sales USING BRIN (date_key);
 
--- Załaduj tylko valid
+-- PARTYCJE - zakładanie, stage, attach / detach
+
+-- Granice miesiąca jako date_key: [pierwszy dzień, pierwszy dzień następnego)
+CREATE OR REPLACE FUNCTION gold.fact_sales_month_bounds(month_start DATE, OUT lower_key INTEGER, OUT upper_key INTEGER)
+LANGUAGE sql
+IMMUTABLE
+AS $fn$
+    SELECT TO_CHAR(DATE_TRUNC('month', month_start), 'YYYYMMDD')::INTEGER,
+           TO_CHAR(DATE_TRUNC('month', month_start) + INTERVAL '1 month', 'YYYYMMDD')::INTEGER;
+$fn$;
+
+-- Czy target_schema.partition_name jest partycją target_schema.fact_sales (pg_inherits, nie sama nazwa:
+-- odpięte archiwum to zwykła tabela)
+CREATE OR REPLACE FUNCTION gold.fact_sales_partition_exists(partition_name TEXT, target_schema TEXT DEFAULT 'gold')
+RETURNS BOOLEAN
+LANGUAGE sql
+STABLE
+AS $fn$
+    SELECT EXISTS (
+        SELECT 1
+        FROM pg_inherits
+        WHERE inhparent = TO_REGCLASS(quote_ident(target_schema) || '.fact_sales')
+          AND inhrelid = TO_REGCLASS(quote_ident(target_schema) || '.' || quote_ident(partition_name))
+    );
+$fn$;
+
+-- Zakłada brakujące partycje dla zakresu date_key (loader woła to przed INSERT); zwraca liczbę nowych.
+-- target_schema: schemat z tabelą fact_sales (gold_clean_data_fast.sql buduje w gold_build)
+CREATE OR REPLACE FUNCTION gold.create_fact_sales_partitions(from_key INTEGER, to_key INTEGER, target_schema TEXT DEFAULT 'gold')
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $fn$
+DECLARE
+    month_start DATE;
+    bounds RECORD;
+    partition_name TEXT;
+    created INTEGER := 0;
+BEGIN
+    FOR month_start IN
+        SELECT GENERATE_SERIES(
+            DATE_TRUNC('month', TO_DATE(from_key::TEXT, 'YYYYMMDD')),
+            DATE_TRUNC('month', TO_DATE(to_key::TEXT, 'YYYYMMDD')),
+            INTERVAL '1 month'
+        )::DATE
+    LOOP
+        partition_name := 'fact_sales_' || TO_CHAR(month_start, 'YYYYMM');
+        CONTINUE WHEN gold.fact_sales_partition_exists(partition_name, target_schema);
+        IF TO_REGCLASS(quote_ident(target_schema) || '.' || partition_name) IS NOT NULL THEN
+            RAISE EXCEPTION 'Tabela %.% nie jest partycją %.fact_sales (archiwum sprzed _archive?) - zmień nazwę albo DROP',
+                target_schema, partition_name, target_schema;
+        END IF;
+        
+        bounds := gold.fact_sales_month_bounds(month_start);
+        EXECUTE format(
+            'CREATE TABLE %I.%I PARTITION OF %I.fact_sales FOR VALUES FROM (%s) TO (%s)',
+            target_schema, partition_name, target_schema, bounds.lower_key, bounds.upper_key
+        );
+        created := created + 1;
+    END LOOP;
+    
+    RETURN created;
+END;
+$fn$;
+
+-- Ścieżka INSERT dla kolejnych batchy (fakt nie ma partycji DEFAULT - wiersz z miesiąca bez partycji
+-- to błąd "no partition of relation"): zakłada partycje miesięcy z batcha, potem jeden INSERT ... SELECT,
+-- więc trigger agregatów (gold_sales_aggregates.sql) widzi cały batch jako jedno polecenie.
+-- batch: tabela / widok / tabela tymczasowa z kolumnami transaction_id, player_key, skin_key, date_key,
+-- price_rp, quantity, total_rp. Zwraca liczbę wstawionych wierszy.
+CREATE OR REPLACE FUNCTION gold.insert_fact_sales(batch REGCLASS)
+RETURNS BIGINT
+LANGUAGE plpgsql
+AS $fn$
+DECLARE
+    month_key INTEGER;
+    inserted BIGINT;
+BEGIN
+    -- Dwa loadery naraz nie zakładają tej samej partycji
+    PERFORM pg_advisory_xact_lock(hashtext('gold.fact_sales partitions'));
+    
+    FOR month_key IN
+        EXECUTE format('SELECT DISTINCT date_key / 100 * 100 + 1 FROM %s WHERE date_key IS NOT NULL', batch)
+    LOOP
+        PERFORM gold.create_fact_sales_partitions(month_key, month_key);
+    END LOOP;
+    
+    EXECUTE format(
+        'INSERT INTO gold.fact_sales (transaction_id, player_key, skin_key, date_key, price_rp, quantity, total_rp) '
+        'SELECT transaction_id, player_key, skin_key, date_key, price_rp, quantity, total_rp '
+        'FROM %s ORDER BY date_key, transaction_id',
+        batch
+    );
+    GET DIAGNOSTICS inserted = ROW_COUNT;
+    RETURN inserted;
+END;
+$fn$;
+
+-- Zmiana nazwy tabeli miesiąca razem z jej indeksami (fact_sales_YYYYMM_pkey, ..._player_key_idx ...):
+-- archiwum ze starymi nazwami indeksów blokowałoby SET SCHEMA nowej partycji w gold_clean_data_fast.sql
+CREATE OR REPLACE FUNCTION gold.rename_fact_sales_month(old_name TEXT, new_name TEXT)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $fn$
+DECLARE
+    index_name TEXT;
+BEGIN
+    EXECUTE format('ALTER TABLE gold.%I RENAME TO %I', old_name, new_name);
+    
+    FOR index_name IN
+        SELECT c.relname
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE i.indrelid = TO_REGCLASS('gold.' || quote_ident(new_name))
+          AND LEFT(c.relname, LENGTH(old_name) + 1) = old_name || '_'
+    LOOP
+        EXECUTE format('ALTER INDEX gold.%I RENAME TO %I',
+                       index_name, new_name || SUBSTR(index_name, LENGTH(old_name) + 1));
+    END LOOP;
+END;
+$fn$;
+
+-- Pusta tabela gold.fact_sales_YYYYMM_stage do załadowania jednego miesiąca poza faktem:
+-- te same kolumny, domyślne wartości (sale_key z sekwencji faktu) i CHECK, bez FK i indeksów
+CREATE OR REPLACE FUNCTION gold.create_fact_sales_stage(month_start DATE)
+RETURNS TEXT
+LANGUAGE plpgsql
+AS $fn$
+DECLARE
+    bounds RECORD := gold.fact_sales_month_bounds(month_start);
+    stage_name TEXT := 'fact_sales_' || TO_CHAR(month_start, 'YYYYMM') || '_stage';
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE gold.%I (LIKE gold.fact_sales INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+        stage_name
+    );
+    -- Ten sam zakres co partycja: ATTACH nie musi wtedy skanować tabeli
+    EXECUTE format(
+        'ALTER TABLE gold.%I ADD CONSTRAINT chk_stage_month CHECK (date_key >= %s AND date_key < %s)',
+        stage_name, bounds.lower_key, bounds.upper_key
+    );
+    
+    RETURN 'gold.' || stage_name;
+END;
+$fn$;
+
+-- Podpina załadowany stage jako partycję miesiąca (jedno polecenie); FK sprawdzane tylko na nim,
+-- tabele gold.agg_* (gold_sales_aggregates.sql) dostają ten miesiąc jako deltę.
+-- Bez stage podpina z powrotem archiwum gold.fact_sales_YYYYMM_archive (gold.detach_fact_sales_month).
+CREATE OR REPLACE FUNCTION gold.attach_fact_sales_month(month_start DATE)
+RETURNS BIGINT
+LANGUAGE plpgsql
+AS $fn$
+DECLARE
+    bounds RECORD := gold.fact_sales_month_bounds(month_start);
+    partition_name TEXT := 'fact_sales_' || TO_CHAR(month_start, 'YYYYMM');
+    source_name TEXT := partition_name || '_stage';
+    statement TEXT;
+    attached_rows BIGINT;
+BEGIN
+    IF gold.fact_sales_partition_exists(partition_name) THEN
+        RAISE EXCEPTION 'Partycja gold.% już istnieje (najpierw gold.detach_fact_sales_month)', partition_name;
+    END IF;
+    IF TO_REGCLASS('gold.' || partition_name) IS NOT NULL THEN
+        RAISE EXCEPTION 'Tabela gold.% nie jest partycją gold.fact_sales - zmień nazwę albo DROP', partition_name;
+    END IF;
+    IF TO_REGCLASS('gold.' || source_name) IS NULL THEN
+        source_name := partition_name || '_archive';
+        IF TO_REGCLASS('gold.' || source_name) IS NULL THEN
+            RAISE EXCEPTION 'Brak tabeli gold.%_stage (gold.create_fact_sales_stage) ani gold.%',
+                partition_name, source_name;
+        END IF;
+        -- Jak przy stage: z CHECK na zakres ATTACH nie skanuje tabeli drugi raz
+        EXECUTE format(
+            'ALTER TABLE gold.%I ADD CONSTRAINT chk_stage_month CHECK (date_key >= %s AND date_key < %s)',
+            source_name, bounds.lower_key, bounds.upper_key
+        );
+    END IF;
+    
+    PERFORM gold.rename_fact_sales_month(source_name, partition_name);
+    EXECUTE format(
+        'ALTER TABLE gold.fact_sales ATTACH PARTITION gold.%I FOR VALUES FROM (%s) TO (%s)',
+        partition_name, bounds.lower_key, bounds.upper_key
+    );
+    EXECUTE format('ALTER TABLE gold.%I DROP CONSTRAINT chk_stage_month', partition_name);
+    EXECUTE format('ANALYZE gold.%I', partition_name);
+    
+    IF TO_REGCLASS('gold.agg_revenue_trends') IS NOT NULL THEN
+        FOR statement IN SELECT gold.sales_delta_statements('gold.' || quote_ident(partition_name)) LOOP
+            EXECUTE statement;
+        END LOOP;
+    END IF;
+    
+    EXECUTE format('SELECT COUNT(*) FROM gold.%I', partition_name) INTO attached_rows;
+    RETURN attached_rows;
+END;
+$fn$;
+
+-- Odpina miesiąc: zostaje osobną tabelą gold.fact_sales_YYYYMM_archive (do zrzutu / DROP albo z powrotem
+-- przez gold.attach_fact_sales_month). Inna nazwa niż partycja, więc kolejny INSERT / przebudowa gold
+-- może założyć partycję tego miesiąca od nowa.
+CREATE OR REPLACE FUNCTION gold.detach_fact_sales_month(month_start DATE)
+RETURNS TEXT
+LANGUAGE plpgsql
+AS $fn$
+DECLARE
+    partition_name TEXT := 'fact_sales_' || TO_CHAR(month_start, 'YYYYMM');
+    archive_name TEXT := partition_name || '_archive';
+BEGIN
+    IF NOT gold.fact_sales_partition_exists(partition_name) THEN
+        RAISE EXCEPTION 'Brak partycji gold.%', partition_name;
+    END IF;
+    IF TO_REGCLASS('gold.' || archive_name) IS NOT NULL THEN
+        RAISE EXCEPTION 'Archiwum gold.% już istnieje - zrzuć je i DROP albo zmień nazwę', archive_name;
+    END IF;
+    
+    EXECUTE format('ALTER TABLE gold.fact_sales DETACH PARTITION gold.%I', partition_name);
+    PERFORM gold.rename_fact_sales_month(partition_name, archive_name);
+    
+    -- Odjęcie miesiąca psułoby COUNT(DISTINCT) -> pełne przeliczenie agregatów
+    IF TO_REGCLASS('gold.agg_revenue_trends') IS NOT NULL THEN
+        PERFORM gold.refresh_sales_aggregates();
+    END IF;
+    
+    RETURN 'gold.' || archive_name;
+END;
+$fn$;
+
+-- Partycje tylko dla miesięcy, w których są transakcje (bez pustych tabel w lukach)
+SELECT SUM(gold.create_fact_sales_partitions(month_key, month_key)) AS partitions_created
+FROM (
+    SELECT DISTINCT date_key / 100 * 100 + 1 AS month_key
+    FROM silver.fact_sale
+    WHERE is_valid = TRUE
+) months;
+
+-- Załaduj tylko valid (po dacie - każda partycja fizycznie posortowana pod BRIN)
 INSERT INTO gold.fact_sales (
     transaction_id, player_key, skin_key, date_key,
     price_rp, quantity, total_rp
@@ -135,4 +373,5 @@ SELECT
     quantity::INTEGER,
     total_rp::INTEGER
 FROM silver.fact_sale
-WHERE is_valid = TRUE;
\ No newline at end of file
+WHERE is_valid = TRUE
+ORDER BY date_key, transaction_id;
\ No newline at end of file
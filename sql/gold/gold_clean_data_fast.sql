@@ -0,0 +1,258 @@
+-- GOLD LAYER (FAST BUILD) - ta sama gwiazda co gold_clean_data.sql, budowana obok w schemacie gold_build
+--
+-- 1. Tabele bez kluczy, CHECK, FK i indeksów -> INSERT ... SELECT ze Silver bez kontroli per wiersz
+-- 2. Klucze główne, UNIQUE, CHECK, FK i indeksy zakładane po załadowaniu (każde sprawdzane jednym skanem)
+-- 3. ANALYZE
+-- 4. Podmiana w jednej transakcji: stare tabele gold znikają, nowe wchodzą na ich miejsce, widoki
+--    ze schematu gold i triggery gold.fact_sales są odtwarzane, gold.agg_* przeliczane.
+--    Czytelnicy widzą stary albo nowy gold, nigdy w połowie budowy.
+--
+-- Funkcje partycji (gold.create_fact_sales_partitions itd.) pochodzą z gold_clean_data.sql -
+-- uruchom go raz na nowej bazie.
+
+DO $$
+BEGIN
+    IF TO_REGPROCEDURE('gold.create_fact_sales_partitions(integer, integer, text)') IS NULL THEN
+        RAISE EXCEPTION 'Brak gold.create_fact_sales_partitions - uruchom raz gold_clean_data.sql';
+    END IF;
+END $$;
+
+DROP SCHEMA IF EXISTS gold_build CASCADE;
+CREATE SCHEMA gold_build;
+
+-- DIM_DATE - Kalendarz
+
+CREATE TABLE gold_build.dim_date (
+    date_key INTEGER NOT NULL,
+    date DATE NOT NULL,
+    year INTEGER NOT NULL,
+    quarter INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    month_name VARCHAR(20) NOT NULL,
+    week INTEGER NOT NULL,
+    day_of_month INTEGER NOT NULL,
+    day_of_week INTEGER NOT NULL,
+    day_name VARCHAR(20) NOT NULL,
+    is_weekend BOOLEAN NOT NULL,
+    is_month_start BOOLEAN NOT NULL,
+    is_month_end BOOLEAN NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE gold_build.dim_date IS 'Kalendarz 2010-2030';
+
+INSERT INTO gold_build.dim_date
+SELECT * FROM silver.dim_date;
+
+ALTER TABLE gold_build.dim_date
+    ADD PRIMARY KEY (date_key),
+    ADD UNIQUE (date);
+
+-- DIM_SKIN - Skiny (tylko valid)
+
+CREATE TABLE gold_build.dim_skin (
+    skin_key SERIAL,
+    skin_id INTEGER NOT NULL,
+    champion_name VARCHAR(100) NOT NULL,
+    skin_name VARCHAR(200) NOT NULL,
+    rarity VARCHAR(50) NOT NULL,
+    price_rp INTEGER NOT NULL,
+    release_date DATE,
+    champion_id VARCHAR(100),
+    skin_num INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE gold_build.dim_skin IS 'Wymiar skinów - tylko zwalidowane';
+
+INSERT INTO gold_build.dim_skin (
+    skin_key, skin_id, champion_name, skin_name, rarity,
+    price_rp, release_date, champion_id, skin_num
+)
+SELECT
+    skin_key, skin_id, champion_name, skin_name, rarity,
+    price_rp, release_date, champion_id, skin_num
+FROM silver.dim_skin
+WHERE is_valid = TRUE;
+
+ALTER TABLE gold_build.dim_skin
+    ADD PRIMARY KEY (skin_key),
+    ADD UNIQUE (skin_id),
+    ADD CONSTRAINT chk_price_positive CHECK (price_rp >= 0),
+    ADD CONSTRAINT chk_rarity_valid CHECK (rarity IN ('Default', 'Legacy', 'Epic', 'Legendary', 'Ultimate'));
+
+-- DIM_PLAYER - Gracze (tylko valid)
+
+CREATE TABLE gold_build.dim_player (
+    player_key SERIAL,
+    player_id INTEGER NOT NULL,
+    region VARCHAR(10) NOT NULL,
+    account_created_date DATE NOT NULL,
+    player_segment VARCHAR(20) NOT NULL,
+    account_age_days INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE gold_build.dim_player IS 'Wymiar graczy - tylko zwalidowani';
+
+INSERT INTO gold_build.dim_player (
+    player_key, player_id, region, account_created_date,
+    player_segment, account_age_days
+)
+SELECT
+    player_key, player_id, region, account_created_date,
+    player_segment, account_age_days
+FROM silver.dim_player
+WHERE is_valid = TRUE;
+
+ALTER TABLE gold_build.dim_player
+    ADD PRIMARY KEY (player_key),
+    ADD UNIQUE (player_id),
+    ADD CONSTRAINT chk_region_valid CHECK (region IN ('EUW', 'EUNE', 'NA', 'KR')),
+    ADD CONSTRAINT chk_segment_valid CHECK (player_segment IN ('casual', 'core', 'whale'));
+
+-- FACT_SALES - Transakcje (tylko valid), partycje miesięczne po date_key
+
+CREATE TABLE gold_build.fact_sales (
+    sale_key SERIAL,
+    transaction_id INTEGER,
+    player_key INTEGER NOT NULL,
+    skin_key INTEGER NOT NULL,
+    date_key INTEGER NOT NULL,
+    price_rp INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    total_rp INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) PARTITION BY RANGE (date_key);
+
+COMMENT ON TABLE gold_build.fact_sales IS 'Fakty sprzedaży - tylko zwalidowane, partycja = miesiąc (gold.fact_sales_YYYYMM)';
+
+SELECT SUM(gold.create_fact_sales_partitions(month_key, month_key, 'gold_build')) AS partitions_created
+FROM (
+    SELECT DISTINCT date_key / 100 * 100 + 1 AS month_key
+    FROM silver.fact_sale
+    WHERE is_valid = TRUE
+) months;
+
+-- Załaduj tylko valid (po dacie - każda partycja fizycznie posortowana pod BRIN)
+INSERT INTO gold_build.fact_sales (
+    transaction_id, player_key, skin_key, date_key,
+    price_rp, quantity, total_rp
+)
+SELECT
+    transaction_id::INTEGER,
+    player_key,
+    skin_key,
+    date_key,
+    price_rp::INTEGER,
+    quantity::INTEGER,
+    total_rp::INTEGER
+FROM silver.fact_sale
+WHERE is_valid = TRUE
+ORDER BY date_key, transaction_id;
+
+-- Ograniczenia po załadowaniu: CHECK jednym skanem każdej partycji, FK jednym zapytaniem
+-- anti-join na partycję zamiast wyszukiwania w wymiarze dla każdego wiersza
+-- (PostgreSQL nie pozwala na FK NOT VALID na tabeli partycjonowanej, więc bez NOT VALID + VALIDATE)
+ALTER TABLE gold_build.fact_sales
+    ADD PRIMARY KEY (sale_key, date_key),
+    ADD CONSTRAINT chk_quantity_positive CHECK (quantity > 0),
+    ADD CONSTRAINT chk_price_positive_fact CHECK (price_rp > 0),
+    ADD CONSTRAINT chk_total_calculation CHECK (total_rp = price_rp * quantity),
+    ADD CONSTRAINT fk_player FOREIGN KEY (player_key) REFERENCES gold_build.dim_player(player_key),
+    ADD CONSTRAINT fk_skin FOREIGN KEY (skin_key) REFERENCES gold_build.dim_skin(skin_key),
+    ADD CONSTRAINT fk_date FOREIGN KEY (date_key) REFERENCES gold_build.dim_date(date_key);
+
+-- Indeksy dla wydajności (budowane raz na gotowych danych)
+CREATE INDEX idx_fact_sales_player ON gold_build.fact_sales(player_key);
+CREATE INDEX idx_fact_sales_skin ON gold_build.fact_sales(skin_key);
+CREATE INDEX idx_fact_sales_date_brin ON gold_build.fact_sales USING BRIN (date_key);
+
+-- Statystyki dla planera przed pierwszym zapytaniem
+ANALYZE gold_build.dim_date;
+ANALYZE gold_build.dim_skin;
+ANALYZE gold_build.dim_player;
+ANALYZE gold_build.fact_sales;
+
+-- PODMIANA - jedna transakcja
+
+BEGIN;
+
+-- pg_get_viewdef / pg_get_triggerdef zwracają wtedy nazwy ze schematem
+SET LOCAL search_path = pg_catalog;
+
+DO $swap$
+DECLARE
+    view_row RECORD;
+    trigger_defs TEXT[] := '{}';
+    trigger_def TEXT;
+    partition_name TEXT;
+BEGIN
+    -- Widoki gold (DROP ... CASCADE usunie te zależne od starych tabel) w kolejności utworzenia
+    CREATE TEMP TABLE carried_views ON COMMIT DROP AS
+    SELECT c.oid, c.relname, RTRIM(pg_get_viewdef(c.oid), ';') AS definition,
+           obj_description(c.oid, 'pg_class') AS description
+    FROM pg_class c
+    WHERE c.relnamespace = 'gold'::REGNAMESPACE
+      AND c.relkind = 'v';
+
+    -- Triggery faktu (np. gold_sales_aggregates.sql)
+    IF TO_REGCLASS('gold.fact_sales') IS NOT NULL THEN
+        SELECT COALESCE(ARRAY_AGG(pg_get_triggerdef(t.oid) ORDER BY t.oid), '{}')
+        INTO trigger_defs
+        FROM pg_trigger t
+        WHERE t.tgrelid = 'gold.fact_sales'::REGCLASS
+          AND NOT t.tgisinternal;
+    END IF;
+
+    -- Zwykła tabela pod nazwą nowej partycji (archiwum sprzed _archive) zablokowałaby SET SCHEMA
+    SELECT c.relname INTO partition_name
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'gold_build.fact_sales'::REGCLASS
+      AND TO_REGCLASS('gold.' || quote_ident(c.relname)) IS NOT NULL
+      AND NOT gold.fact_sales_partition_exists(c.relname)
+    LIMIT 1;
+    IF partition_name IS NOT NULL THEN
+        RAISE EXCEPTION 'Tabela gold.% nie jest partycją gold.fact_sales - zmień nazwę albo DROP', partition_name;
+    END IF;
+
+    DROP TABLE IF EXISTS gold.fact_sales, gold.dim_player, gold.dim_skin, gold.dim_date CASCADE;
+
+    -- SET SCHEMA przenosi też indeksy, ograniczenia i sekwencje SERIAL
+    ALTER TABLE gold_build.dim_date SET SCHEMA gold;
+    ALTER TABLE gold_build.dim_skin SET SCHEMA gold;
+    ALTER TABLE gold_build.dim_player SET SCHEMA gold;
+    FOR partition_name IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'gold_build.fact_sales'::REGCLASS
+    LOOP
+        EXECUTE format('ALTER TABLE gold_build.%I SET SCHEMA gold', partition_name);
+    END LOOP;
+    ALTER TABLE gold_build.fact_sales SET SCHEMA gold;
+
+    FOR view_row IN SELECT * FROM carried_views ORDER BY oid LOOP
+        EXECUTE format('CREATE OR REPLACE VIEW gold.%I AS %s', view_row.relname, view_row.definition);
+        IF view_row.description IS NOT NULL THEN
+            EXECUTE format('COMMENT ON VIEW gold.%I IS %L', view_row.relname, view_row.description);
+        END IF;
+    END LOOP;
+
+    FOREACH trigger_def IN ARRAY trigger_defs LOOP
+        EXECUTE trigger_def;
+    END LOOP;
+
+    -- Agregaty utrzymywane triggerami -> przeliczenie na nowym fakcie
+    IF CARDINALITY(trigger_defs) > 0 AND TO_REGPROCEDURE('gold.refresh_sales_aggregates()') IS NOT NULL THEN
+        PERFORM gold.refresh_sales_aggregates();
+    END IF;
+
+    RAISE NOTICE 'Podmiana gold: % widoków, % triggerów odtworzonych',
+        (SELECT COUNT(*) FROM carried_views), CARDINALITY(trigger_defs);
+END $swap$;
+
+DROP SCHEMA gold_build;
+
+COMMIT;
@@ -0,0 +1,184 @@
+-- GOLD DIM_SKIN_HISTORY - SCD Type 2 zasilany deltą z bronze.stg_skin_changes
+--
+-- Kolejność: merge_skins.py -> detect_skin_changes.py -> load_bronze.py --tables stg_skin_changes --truncate
+-- -> ten skrypt -> detect_skin_changes.py --commit (snapshot przesuwa się dopiero po nałożeniu). Tabela NIE jest kasowana przez gold_clean_data.sql (historia zostaje między przebiegami).
+-- Skrypt jest idempotentny: ponowne nałożenie tej samej delty nic nie zmienia.
+
+-- TABELA HISTORII
+
+CREATE TABLE IF NOT EXISTS gold.dim_skin_history (
+    skin_version_key SERIAL PRIMARY KEY,
+    skin_id INTEGER NOT NULL,
+    champion_name VARCHAR(100) NOT NULL,
+    skin_name VARCHAR(200) NOT NULL,
+    rarity VARCHAR(50) NOT NULL,
+    price_rp INTEGER NOT NULL,
+    release_date DATE,
+    champion_id VARCHAR(100),
+    skin_num INTEGER,
+    row_hash CHAR(32) NOT NULL,
+    valid_from DATE NOT NULL,
+    valid_to DATE NOT NULL DEFAULT DATE '9999-12-31',
+    is_current BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT chk_history_price CHECK (price_rp >= 0),
+    CONSTRAINT chk_history_rarity CHECK (rarity IN ('Default', 'Legacy', 'Epic', 'Legendary', 'Ultimate')),
+    CONSTRAINT chk_history_validity CHECK (valid_to >= valid_from)
+);
+
+COMMENT ON TABLE gold.dim_skin_history IS 'Wymiar skinów SCD2 - wersja na każdą zmianę ceny/rarity/nazwy/daty';
+
+-- Jedna bieżąca wersja na skin + wyszukiwanie wersji po dacie zakupu
+CREATE UNIQUE INDEX IF NOT EXISTS idx_skin_history_current
+    ON gold.dim_skin_history(skin_id) WHERE is_current;
+CREATE INDEX IF NOT EXISTS idx_skin_history_validity
+    ON gold.dim_skin_history(skin_id, valid_from, valid_to);
+
+-- DELTA (tylko poprawne wiersze - te same reguły co silver.dim_skin)
+
+BEGIN;
+
+CREATE TEMP TABLE scd2_changes ON COMMIT DROP AS
+SELECT
+    skin_id, change_type, effective_date, row_hash,
+    TRIM(champion_name) AS champion_name, TRIM(skin_name) AS skin_name,
+    rarity, price_rp, release_date, champion_id, skin_num
+FROM bronze.stg_skin_changes
+WHERE skin_id IS NOT NULL
+  AND effective_date IS NOT NULL
+  AND (
+      change_type = 'retire'
+      OR (
+          change_type IN ('insert', 'update')
+          AND NULLIF(TRIM(champion_name), '') IS NOT NULL
+          AND NULLIF(TRIM(skin_name), '') IS NOT NULL
+          AND price_rp >= 0
+          AND rarity IN ('Default', 'Legacy', 'Epic', 'Legendary', 'Ultimate')
+      )
+  );
+
+-- Step 1: Zmiana w dniu startu bieżącej wersji -> poprawka w miejscu (bez wersji o zerowej długości)
+UPDATE gold.dim_skin_history h
+SET
+    champion_name = c.champion_name,
+    skin_name = c.skin_name,
+    rarity = c.rarity,
+    price_rp = c.price_rp,
+    release_date = c.release_date,
+    champion_id = c.champion_id,
+    skin_num = c.skin_num,
+    row_hash = c.row_hash,
+    updated_at = CURRENT_TIMESTAMP
+FROM scd2_changes c
+WHERE h.skin_id = c.skin_id
+  AND h.is_current
+  AND c.change_type IN ('insert', 'update')
+  AND c.effective_date = h.valid_from
+  AND c.row_hash <> h.row_hash;
+
+-- Step 2: Retire w dniu startu bieżącej wersji -> ta wersja nie obowiązywała ani dnia, więc znika.
+-- Poprzednia wersja jest już zamknięta na effective_date - 1, skin nie ma bieżącej wersji.
+DELETE FROM gold.dim_skin_history h
+USING scd2_changes c
+WHERE h.skin_id = c.skin_id
+  AND h.is_current
+  AND c.change_type = 'retire'
+  AND c.effective_date = h.valid_from;
+
+-- Step 3: Zamknij bieżącą wersję (zmieniony hash albo retire); starsze delty są ignorowane
+UPDATE gold.dim_skin_history h
+SET
+    valid_to = c.effective_date - 1,
+    is_current = FALSE,
+    updated_at = CURRENT_TIMESTAMP
+FROM scd2_changes c
+WHERE h.skin_id = c.skin_id
+  AND h.is_current
+  AND c.effective_date > h.valid_from
+  AND (c.change_type = 'retire' OR c.row_hash <> h.row_hash);
+
+-- Step 4: Nowa wersja dla insert/update bez bieżącej wersji.
+-- Pierwsza wersja skina obowiązuje od 1900-01-01, żeby historyczne fakty miały do czego się podpiąć.
+INSERT INTO gold.dim_skin_history (
+    skin_id, champion_name, skin_name, rarity, price_rp,
+    release_date, champion_id, skin_num, row_hash, valid_from
+)
+SELECT
+    c.skin_id, c.champion_name, c.skin_name, c.rarity, c.price_rp,
+    c.release_date, c.champion_id, c.skin_num, c.row_hash,
+    CASE
+        WHEN EXISTS (SELECT 1 FROM gold.dim_skin_history h WHERE h.skin_id = c.skin_id)
+        THEN c.effective_date
+        ELSE DATE '1900-01-01'
+    END
+FROM scd2_changes c
+WHERE c.change_type IN ('insert', 'update')
+  AND NOT EXISTS (
+      SELECT 1 FROM gold.dim_skin_history h
+      WHERE h.skin_id = c.skin_id
+        AND (h.is_current OR h.valid_from >= c.effective_date)
+  );
+
+COMMIT;
+
+-- FAKTY -> WERSJA SKINA Z DNIA ZAKUPU (ten sam plik odtwarza widok w etapie views po przebudowie gold)
+
+-- >>> gold_fact_sales_skin_version.sql (wklejony 1:1, zgodność sprawdza tests/test_sql_inlined.py)
+-- GOLD FACT_SALES_SKIN_VERSION - fakty z wersją skina (SCD2) obowiązującą w dniu zakupu
+--
+-- gold_clean_data.sql kasuje gold.fact_sales z CASCADE, co usuwa też ten widok, a gold.dim_skin_history
+-- zostaje. Dlatego widok jest odtwarzany w etapie views (run_pipeline.py) po każdej przebudowie gold
+-- oraz na końcu gold_dim_skin_scd2.sql (wklejony tam 1:1). Bez tabeli historii (SCD2 jeszcze nie uruchomione) nic nie robi.
+
+DO $$
+BEGIN
+    IF TO_REGCLASS('gold.dim_skin_history') IS NULL THEN
+        RAISE NOTICE 'Brak gold.dim_skin_history - pomijam gold.fact_sales_skin_version';
+        RETURN;
+    END IF;
+
+    CREATE OR REPLACE VIEW gold.fact_sales_skin_version AS
+    SELECT
+        f.sale_key,
+        f.transaction_id,
+        f.player_key,
+        f.skin_key,
+        f.date_key,
+        f.price_rp,
+        f.quantity,
+        f.total_rp,
+        h.skin_version_key,
+        h.price_rp AS version_price_rp,
+        h.rarity AS version_rarity,
+        h.valid_from,
+        h.valid_to
+    FROM gold.fact_sales f
+    JOIN gold.dim_skin s ON f.skin_key = s.skin_key
+    JOIN gold.dim_date d ON f.date_key = d.date_key
+    LEFT JOIN gold.dim_skin_history h
+        ON h.skin_id = s.skin_id
+       AND d.date BETWEEN h.valid_from AND h.valid_to;
+
+    COMMENT ON VIEW gold.fact_sales_skin_version IS 'Fakty z wersją skina (SCD2) obowiązującą w dniu zakupu';
+END
+$$;
+-- <<< gold_fact_sales_skin_version.sql
+
+-- RAPORT
+
+SELECT
+    change_type,
+    COUNT(*) AS delta_rows
+FROM bronze.stg_skin_changes
+GROUP BY change_type
+ORDER BY change_type;
+
+SELECT
+    COUNT(*) AS versions,
+    COUNT(*) FILTER (WHERE is_current) AS current_versions,
+    COUNT(*) FILTER (WHERE NOT is_current) AS closed_versions,
+    COUNT(DISTINCT skin_id) FILTER (WHERE NOT is_current
+        AND skin_id NOT IN (SELECT skin_id FROM gold.dim_skin_history WHERE is_current)) AS retired_skins
+FROM gold.dim_skin_history;
@@ -0,0 +1,38 @@
+-- GOLD FACT_SALES_SKIN_VERSION - fakty z wersją skina (SCD2) obowiązującą w dniu zakupu
+--
+-- gold_clean_data.sql kasuje gold.fact_sales z CASCADE, co usuwa też ten widok, a gold.dim_skin_history
+-- zostaje. Dlatego widok jest odtwarzany w etapie views (run_pipeline.py) po każdej przebudowie gold
+-- oraz na końcu gold_dim_skin_scd2.sql (wklejony tam 1:1). Bez tabeli historii (SCD2 jeszcze nie uruchomione) nic nie robi.
+
+DO $$
+BEGIN
+    IF TO_REGCLASS('gold.dim_skin_history') IS NULL THEN
+        RAISE NOTICE 'Brak gold.dim_skin_history - pomijam gold.fact_sales_skin_version';
+        RETURN;
+    END IF;
+
+    CREATE OR REPLACE VIEW gold.fact_sales_skin_version AS
+    SELECT
+        f.sale_key,
+        f.transaction_id,
+        f.player_key,
+        f.skin_key,
+        f.date_key,
+        f.price_rp,
+        f.quantity,
+        f.total_rp,
+        h.skin_version_key,
+        h.price_rp AS version_price_rp,
+        h.rarity AS version_rarity,
+        h.valid_from,
+        h.valid_to
+    FROM gold.fact_sales f
+    JOIN gold.dim_skin s ON f.skin_key = s.skin_key
+    JOIN gold.dim_date d ON f.date_key = d.date_key
+    LEFT JOIN gold.dim_skin_history h
+        ON h.skin_id = s.skin_id
+       AND d.date BETWEEN h.valid_from AND h.valid_to;
+
+    COMMENT ON VIEW gold.fact_sales_skin_version IS 'Fakty z wersją skina (SCD2) obowiązującą w dniu zakupu';
+END
+$$;
@@ -0,0 +1,518 @@
+-- GOLD SALES AGGREGATES - tabele podsumowań za widokami z sql/view_results/gold_view.sql
+--
+-- Kolejność: gold_clean_data.sql -> gold_view.sql -> ten skrypt (po każdej pełnej przebudowie gold).
+-- Każdy INSERT do gold.fact_sales (jeden batch = jedno polecenie) jest dokładany do tabel agg_*
+-- przez trigger FOR EACH STATEMENT z tabelą przejściową - sumy i liczniki są dodawane, a COUNT(DISTINCT)
+-- liczony przez tabele obecności (miesiąc, gracz) i (skin, gracz): nowy gracz = nowy wiersz obecności.
+-- UPDATE / DELETE / TRUNCATE na fakcie przeliczają agregaty od zera (gold.refresh_sales_aggregates()).
+-- Obok tabel obecności (ścieżka dokładna, do audytu) każdy (segment, miesiąc) i skin ma szkic HyperLogLog
+-- graczy: szkice się sumują (GREATEST rejestrów), więc unikalni gracze dla dowolnego zakresu miesięcy
+-- albo zbioru skinów to suma kilku szkiców zamiast COUNT(DISTINCT) po fakcie. Błąd: gold.agg_hll_settings.
+-- Dashboard czyta gold.agg_* zamiast widoków; zgodność: sql/view_results/gold_aggregates_check.sql
+
+DROP TABLE IF EXISTS gold.agg_revenue_by_segment_month CASCADE;
+DROP TABLE IF EXISTS gold.agg_top_selling_skins CASCADE;
+DROP TABLE IF EXISTS gold.agg_weekend_vs_weekday_sales CASCADE;
+DROP TABLE IF EXISTS gold.agg_player_lifetime_value CASCADE;
+DROP TABLE IF EXISTS gold.agg_revenue_trends CASCADE;
+DROP TABLE IF EXISTS gold.agg_month_player CASCADE;
+DROP TABLE IF EXISTS gold.agg_skin_player CASCADE;
+DROP TABLE IF EXISTS gold.agg_month_player_hll CASCADE;
+DROP TABLE IF EXISTS gold.agg_skin_player_hll CASCADE;
+
+-- TABELE OBECNOŚCI (do COUNT DISTINCT)
+
+CREATE TABLE gold.agg_month_player (
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    player_key INTEGER NOT NULL,
+    PRIMARY KEY (year, month, player_key)
+);
+
+CREATE TABLE gold.agg_skin_player (
+    skin_id INTEGER NOT NULL,
+    player_key INTEGER NOT NULL,
+    PRIMARY KEY (skin_id, player_key)
+);
+
+-- SZKICE HYPERLOGLOG (przybliżony COUNT DISTINCT)
+-- Szkic = SMALLINT[] z 2^hll_precision rejestrów; rejestr trzyma największą rangę (pozycję pierwszej
+-- jedynki w haszu) graczy, którzy do niego trafili. Błąd względny ~ 1.04 / sqrt(2^hll_precision).
+
+-- Precyzja nie jest kasowana przy przebudowie; zmiana: SELECT gold.set_hll_precision(14)
+CREATE TABLE IF NOT EXISTS gold.agg_hll_settings (
+    singleton BOOLEAN PRIMARY KEY DEFAULT TRUE,
+    hll_precision INTEGER NOT NULL DEFAULT 12,
+    relative_error NUMERIC GENERATED ALWAYS AS (ROUND((1.04 / SQRT(2 ^ hll_precision))::NUMERIC, 4)) STORED,
+    CONSTRAINT chk_hll_singleton CHECK (singleton),
+    CONSTRAINT chk_hll_precision CHECK (hll_precision BETWEEN 7 AND 16)
+);
+
+INSERT INTO gold.agg_hll_settings DEFAULT VALUES ON CONFLICT DO NOTHING;
+
+COMMENT ON TABLE gold.agg_hll_settings IS 'Precyzja szkiców HLL (12 = 4096 rejestrów, błąd ~1.6%)';
+
+CREATE TABLE gold.agg_month_player_hll (
+    player_segment VARCHAR(20) NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    sketch SMALLINT[] NOT NULL,
+    PRIMARY KEY (player_segment, year, month)
+);
+
+COMMENT ON TABLE gold.agg_month_player_hll IS 'Szkic HLL graczy (segment, miesiąc) - miesiąc = suma segmentów';
+
+CREATE TABLE gold.agg_skin_player_hll (
+    skin_id INTEGER PRIMARY KEY,
+    sketch SMALLINT[] NOT NULL
+);
+
+COMMENT ON TABLE gold.agg_skin_player_hll IS 'Szkic HLL kupujących skin';
+
+-- Rejestr i ranga klucza: 32 bity md5 -> numer rejestru, kolejne 64 bity -> pozycja pierwszej jedynki
+CREATE OR REPLACE FUNCTION gold.hll_register(key BIGINT, hll_precision INTEGER, OUT register INTEGER, OUT rank SMALLINT)
+LANGUAGE sql
+IMMUTABLE STRICT
+AS $fn$
+    SELECT ('x' || SUBSTR(h, 1, 8))::BIT(32)::INTEGER & ((1 << hll_precision) - 1),
+           COALESCE(NULLIF(POSITION('1' IN ('x' || SUBSTR(h, 9, 16))::BIT(64)::TEXT), 0), 65)::SMALLINT
+    FROM MD5(key::TEXT) AS h;
+$fn$;
+
+-- Szkic z par (rejestr, ranga) - pozostałe rejestry 0
+CREATE OR REPLACE FUNCTION gold.hll_sketch(registers INTEGER[], ranks SMALLINT[], hll_precision INTEGER)
+RETURNS SMALLINT[]
+LANGUAGE plpgsql
+IMMUTABLE
+AS $fn$
+DECLARE
+    sketch SMALLINT[] := ARRAY_FILL(0::SMALLINT, ARRAY[1 << hll_precision]);
+BEGIN
+    FOR i IN 1 .. COALESCE(CARDINALITY(registers), 0) LOOP
+        sketch[registers[i] + 1] := GREATEST(sketch[registers[i] + 1], ranks[i]);
+    END LOOP;
+    RETURN sketch;
+END;
+$fn$;
+
+-- Suma zbiorów = maksimum rejestrów (szkice muszą mieć tę samą precyzję)
+CREATE OR REPLACE FUNCTION gold.hll_union(a SMALLINT[], b SMALLINT[])
+RETURNS SMALLINT[]
+LANGUAGE plpgsql
+IMMUTABLE STRICT
+AS $fn$
+BEGIN
+    IF CARDINALITY(a) <> CARDINALITY(b) THEN
+        RAISE EXCEPTION 'Szkice HLL o różnej precyzji (% i % rejestrów)', CARDINALITY(a), CARDINALITY(b);
+    END IF;
+    RETURN ARRAY(SELECT GREATEST(x, y) FROM UNNEST(a, b) AS r(x, y));
+END;
+$fn$;
+
+CREATE OR REPLACE AGGREGATE gold.hll_union_agg(SMALLINT[]) (
+    SFUNC = gold.hll_union,
+    STYPE = SMALLINT[]
+);
+
+-- Estymator HLL; dla małych liczności (puste rejestry, wynik <= 2.5 m) liczenie liniowe
+CREATE OR REPLACE FUNCTION gold.hll_cardinality(sketch SMALLINT[])
+RETURNS BIGINT
+LANGUAGE sql
+IMMUTABLE STRICT
+AS $fn$
+    SELECT ROUND(CASE WHEN raw_estimate <= 2.5 * m AND zeros > 0 THEN m * LN(m / zeros) ELSE raw_estimate END)::BIGINT
+    FROM (
+        SELECT m, zeros, 0.7213 / (1 + 1.079 / m) * m * m / harmonic AS raw_estimate
+        FROM (
+            SELECT COUNT(*)::DOUBLE PRECISION AS m,
+                   SUM(POWER(2::DOUBLE PRECISION, -rank)) AS harmonic,
+                   COUNT(*) FILTER (WHERE rank = 0) AS zeros
+            FROM UNNEST(sketch) AS rank
+        ) registers
+    ) estimate;
+$fn$;
+
+-- Unikalni gracze w zakresie miesięcy (opcjonalnie jednego segmentu) - tylko szkice, bez faktu
+CREATE OR REPLACE FUNCTION gold.unique_players_estimate(from_month DATE, to_month DATE, segment TEXT DEFAULT NULL)
+RETURNS BIGINT
+LANGUAGE sql
+STABLE
+AS $fn$
+    SELECT COALESCE(gold.hll_cardinality(gold.hll_union_agg(sketch)), 0)
+    FROM gold.agg_month_player_hll
+    WHERE MAKE_DATE(year, month, 1) BETWEEN DATE_TRUNC('month', from_month) AND to_month
+      AND (segment IS NULL OR player_segment = segment);
+$fn$;
+
+-- To samo dokładnie (audyt): COUNT(DISTINCT) po fakcie
+CREATE OR REPLACE FUNCTION gold.unique_players_exact(from_month DATE, to_month DATE, segment TEXT DEFAULT NULL)
+RETURNS BIGINT
+LANGUAGE sql
+STABLE
+AS $fn$
+    SELECT COUNT(DISTINCT f.player_key)
+    FROM gold.fact_sales f
+    JOIN gold.dim_player p ON f.player_key = p.player_key
+    JOIN gold.dim_date d ON f.date_key = d.date_key
+    WHERE d.date BETWEEN DATE_TRUNC('month', from_month) AND (DATE_TRUNC('month', to_month) + INTERVAL '1 month - 1 day')
+      AND (segment IS NULL OR p.player_segment = segment);
+$fn$;
+
+-- Unikalni kupujący dowolnego zbioru skinów (np. wszystkich skinów championa)
+CREATE OR REPLACE FUNCTION gold.unique_buyers_estimate(skin_ids INTEGER[])
+RETURNS BIGINT
+LANGUAGE sql
+STABLE
+AS $fn$
+    SELECT COALESCE(gold.hll_cardinality(gold.hll_union_agg(sketch)), 0)
+    FROM gold.agg_skin_player_hll
+    WHERE skin_id = ANY(skin_ids);
+$fn$;
+
+CREATE OR REPLACE FUNCTION gold.unique_buyers_exact(skin_ids INTEGER[])
+RETURNS BIGINT
+LANGUAGE sql
+STABLE
+AS $fn$
+    SELECT COUNT(DISTINCT f.player_key)
+    FROM gold.fact_sales f
+    JOIN gold.dim_skin s ON f.skin_key = s.skin_key
+    WHERE s.skin_id = ANY(skin_ids);
+$fn$;
+
+-- TABELE PODSUMOWAŃ (kolumny i typy jak w widokach; NULLIF, bo kolumny generowane liczą się
+-- także dla wiersza-kandydata w ON CONFLICT, np. miesiąc bez nowych graczy)
+
+CREATE TABLE gold.agg_revenue_by_segment_month (
+    player_segment VARCHAR(20) NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    month_name VARCHAR(20) NOT NULL,
+    transaction_count BIGINT NOT NULL,
+    total_revenue BIGINT NOT NULL,
+    avg_transaction NUMERIC GENERATED ALWAYS AS (total_revenue::NUMERIC / NULLIF(transaction_count, 0)) STORED,
+    unique_players BIGINT NOT NULL,
+    PRIMARY KEY (player_segment, year, month)
+);
+
+COMMENT ON TABLE gold.agg_revenue_by_segment_month IS 'Inkrementalny revenue_by_segment_month';
+
+CREATE TABLE gold.agg_top_selling_skins (
+    skin_id INTEGER PRIMARY KEY,
+    champion_name VARCHAR(100) NOT NULL,
+    skin_name VARCHAR(200) NOT NULL,
+    rarity VARCHAR(50) NOT NULL,
+    price_rp INTEGER NOT NULL,
+    times_purchased BIGINT NOT NULL,
+    total_revenue BIGINT NOT NULL,
+    unique_buyers BIGINT NOT NULL
+);
+
+CREATE INDEX idx_agg_top_skins_revenue ON gold.agg_top_selling_skins(total_revenue DESC);
+
+COMMENT ON TABLE gold.agg_top_selling_skins IS 'Inkrementalny top_selling_skins';
+
+CREATE TABLE gold.agg_weekend_vs_weekday_sales (
+    is_weekend BOOLEAN PRIMARY KEY,
+    day_type TEXT GENERATED ALWAYS AS (CASE WHEN is_weekend THEN 'Weekend' ELSE 'Weekday' END) STORED,
+    transaction_count BIGINT NOT NULL,
+    total_revenue BIGINT NOT NULL,
+    avg_transaction NUMERIC GENERATED ALWAYS AS (total_revenue::NUMERIC / NULLIF(transaction_count, 0)) STORED
+);
+
+COMMENT ON TABLE gold.agg_weekend_vs_weekday_sales IS 'Inkrementalny weekend_vs_weekday_sales';
+
+CREATE TABLE gold.agg_player_lifetime_value (
+    player_key INTEGER PRIMARY KEY,
+    player_id INTEGER NOT NULL,
+    player_segment VARCHAR(20) NOT NULL,
+    region VARCHAR(10) NOT NULL,
+    total_purchases BIGINT NOT NULL,
+    lifetime_value BIGINT NOT NULL,
+    avg_purchase_value NUMERIC GENERATED ALWAYS AS (lifetime_value::NUMERIC / NULLIF(total_purchases, 0)) STORED,
+    first_purchase_date DATE NOT NULL,
+    last_purchase_date DATE NOT NULL,
+    purchase_span_days INTEGER GENERATED ALWAYS AS (last_purchase_date - first_purchase_date) STORED
+);
+
+CREATE INDEX idx_agg_ltv_value ON gold.agg_player_lifetime_value(lifetime_value DESC);
+
+COMMENT ON TABLE gold.agg_player_lifetime_value IS 'Inkrementalny player_lifetime_value';
+
+CREATE TABLE gold.agg_revenue_trends (
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    month_name VARCHAR(20) NOT NULL,
+    transactions BIGINT NOT NULL,
+    revenue BIGINT NOT NULL,
+    avg_transaction NUMERIC GENERATED ALWAYS AS (revenue::NUMERIC / NULLIF(transactions, 0)) STORED,
+    active_players BIGINT NOT NULL,
+    revenue_per_player NUMERIC GENERATED ALWAYS AS (ROUND(revenue::NUMERIC / NULLIF(active_players, 0), 2)) STORED,
+    PRIMARY KEY (year, month)
+);
+
+COMMENT ON TABLE gold.agg_revenue_trends IS 'Inkrementalny revenue_trends';
+
+-- DELTA: polecenia dokładające wiersze z relacji `source` (tabela przejściowa albo cały gold.fact_sales)
+
+CREATE OR REPLACE FUNCTION gold.sales_delta_statements(source TEXT)
+RETURNS SETOF TEXT
+LANGUAGE plpgsql
+AS $fn$
+BEGIN
+    -- Miesiące: revenue_by_segment_month + revenue_trends (gracz ma jeden segment, więc wspólna obecność)
+    RETURN NEXT format($sql$
+        WITH batch AS (
+            SELECT d.year, d.month, d.month_name, p.player_segment, f.player_key, f.total_rp
+            FROM %1$s f
+            JOIN gold.dim_player p ON f.player_key = p.player_key
+            JOIN gold.dim_date d ON f.date_key = d.date_key
+        ),
+        new_pairs AS (
+            INSERT INTO gold.agg_month_player (year, month, player_key)
+            SELECT DISTINCT year, month, player_key FROM batch
+            ON CONFLICT DO NOTHING
+            RETURNING year, month, player_key
+        ),
+        new_players AS (
+            SELECT n.year, n.month, p.player_segment, COUNT(*) AS players
+            FROM new_pairs n
+            JOIN gold.dim_player p ON n.player_key = p.player_key
+            GROUP BY n.year, n.month, p.player_segment
+        ),
+        segment_delta AS (
+            SELECT player_segment, year, month, month_name, COUNT(*) AS cnt, SUM(total_rp) AS revenue
+            FROM batch
+            GROUP BY player_segment, year, month, month_name
+        ),
+        segment_merge AS (
+            INSERT INTO gold.agg_revenue_by_segment_month AS a (
+                player_segment, year, month, month_name, transaction_count, total_revenue, unique_players
+            )
+            SELECT s.player_segment, s.year, s.month, s.month_name, s.cnt, s.revenue, COALESCE(n.players, 0)
+            FROM segment_delta s
+            LEFT JOIN new_players n
+                ON n.year = s.year AND n.month = s.month AND n.player_segment = s.player_segment
+            ON CONFLICT (player_segment, year, month) DO UPDATE SET
+                transaction_count = a.transaction_count + EXCLUDED.transaction_count,
+                total_revenue = a.total_revenue + EXCLUDED.total_revenue,
+                unique_players = a.unique_players + EXCLUDED.unique_players
+        )
+        INSERT INTO gold.agg_revenue_trends AS a (year, month, month_name, transactions, revenue, active_players)
+        SELECT s.year, s.month, MIN(s.month_name), SUM(s.cnt), SUM(s.revenue), COALESCE(SUM(n.players), 0)
+        FROM segment_delta s
+        LEFT JOIN new_players n
+            ON n.year = s.year AND n.month = s.month AND n.player_segment = s.player_segment
+        GROUP BY s.year, s.month
+        ON CONFLICT (year, month) DO UPDATE SET
+            transactions = a.transactions + EXCLUDED.transactions,
+            revenue = a.revenue + EXCLUDED.revenue,
+            active_players = a.active_players + EXCLUDED.active_players
+    $sql$, source);
+
+    -- Skiny: top_selling_skins
+    RETURN NEXT format($sql$
+        WITH batch AS (
+            SELECT s.skin_id, s.champion_name, s.skin_name, s.rarity, s.price_rp, f.player_key, f.total_rp
+            FROM %1$s f
+            JOIN gold.dim_skin s ON f.skin_key = s.skin_key
+        ),
+        new_pairs AS (
+            INSERT INTO gold.agg_skin_player (skin_id, player_key)
+            SELECT DISTINCT skin_id, player_key FROM batch
+            ON CONFLICT DO NOTHING
+            RETURNING skin_id
+        ),
+        new_buyers AS (
+            SELECT skin_id, COUNT(*) AS buyers FROM new_pairs GROUP BY skin_id
+        )
+        INSERT INTO gold.agg_top_selling_skins AS a (
+            skin_id, champion_name, skin_name, rarity, price_rp, times_purchased, total_revenue, unique_buyers
+        )
+        SELECT b.skin_id, b.champion_name, b.skin_name, b.rarity, b.price_rp,
+               b.cnt, b.revenue, COALESCE(n.buyers, 0)
+        FROM (
+            SELECT skin_id, champion_name, skin_name, rarity, price_rp, COUNT(*) AS cnt, SUM(total_rp) AS revenue
+            FROM batch
+            GROUP BY skin_id, champion_name, skin_name, rarity, price_rp
+        ) b
+        LEFT JOIN new_buyers n ON n.skin_id = b.skin_id
+        ON CONFLICT (skin_id) DO UPDATE SET
+            champion_name = EXCLUDED.champion_name,
+            skin_name = EXCLUDED.skin_name,
+            rarity = EXCLUDED.rarity,
+            price_rp = EXCLUDED.price_rp,
+            times_purchased = a.times_purchased + EXCLUDED.times_purchased,
+            total_revenue = a.total_revenue + EXCLUDED.total_revenue,
+            unique_buyers = a.unique_buyers + EXCLUDED.unique_buyers
+    $sql$, source);
+
+    -- Weekend vs dzień roboczy
+    RETURN NEXT format($sql$
+        INSERT INTO gold.agg_weekend_vs_weekday_sales AS a (is_weekend, transaction_count, total_revenue)
+        SELECT d.is_weekend, COUNT(*), SUM(f.total_rp)
+        FROM %1$s f
+        JOIN gold.dim_date d ON f.date_key = d.date_key
+        GROUP BY d.is_weekend
+        ON CONFLICT (is_weekend) DO UPDATE SET
+            transaction_count = a.transaction_count + EXCLUDED.transaction_count,
+            total_revenue = a.total_revenue + EXCLUDED.total_revenue
+    $sql$, source);
+
+    -- Gracze: player_lifetime_value (min/max dat scalane przez LEAST/GREATEST)
+    RETURN NEXT format($sql$
+        INSERT INTO gold.agg_player_lifetime_value AS a (
+            player_key, player_id, player_segment, region,
+            total_purchases, lifetime_value, first_purchase_date, last_purchase_date
+        )
+        SELECT p.player_key, p.player_id, p.player_segment, p.region,
+               COUNT(*), SUM(f.total_rp), MIN(d.date), MAX(d.date)
+        FROM %1$s f
+        JOIN gold.dim_player p ON f.player_key = p.player_key
+        JOIN gold.dim_date d ON f.date_key = d.date_key
+        GROUP BY p.player_key, p.player_id, p.player_segment, p.region
+        ON CONFLICT (player_key) DO UPDATE SET
+            player_segment = EXCLUDED.player_segment,
+            region = EXCLUDED.region,
+            total_purchases = a.total_purchases + EXCLUDED.total_purchases,
+            lifetime_value = a.lifetime_value + EXCLUDED.lifetime_value,
+            first_purchase_date = LEAST(a.first_purchase_date, EXCLUDED.first_purchase_date),
+            last_purchase_date = GREATEST(a.last_purchase_date, EXCLUDED.last_purchase_date)
+    $sql$, source);
+
+    -- Szkice HLL (segment, miesiąc): szkic partii scalany z zapisanym
+    RETURN NEXT format($sql$
+        WITH pairs AS (
+            SELECT DISTINCT p.player_segment, d.year, d.month, f.player_key
+            FROM %1$s f
+            JOIN gold.dim_player p ON f.player_key = p.player_key
+            JOIN gold.dim_date d ON f.date_key = d.date_key
+        ),
+        registers AS (
+            SELECT pairs.player_segment, pairs.year, pairs.month, s.hll_precision, r.register, MAX(r.rank) AS rank
+            FROM pairs
+            CROSS JOIN gold.agg_hll_settings s
+            CROSS JOIN LATERAL gold.hll_register(pairs.player_key, s.hll_precision) r
+            GROUP BY pairs.player_segment, pairs.year, pairs.month, s.hll_precision, r.register
+        )
+        INSERT INTO gold.agg_month_player_hll AS a (player_segment, year, month, sketch)
+        SELECT player_segment, year, month, gold.hll_sketch(ARRAY_AGG(register), ARRAY_AGG(rank), hll_precision)
+        FROM registers
+        GROUP BY player_segment, year, month, hll_precision
+        ON CONFLICT (player_segment, year, month) DO UPDATE SET
+            sketch = gold.hll_union(a.sketch, EXCLUDED.sketch)
+    $sql$, source);
+
+    -- Szkice HLL skinów
+    RETURN NEXT format($sql$
+        WITH pairs AS (
+            SELECT DISTINCT s.skin_id, f.player_key
+            FROM %1$s f
+            JOIN gold.dim_skin s ON f.skin_key = s.skin_key
+        ),
+        registers AS (
+            SELECT pairs.skin_id, s.hll_precision, r.register, MAX(r.rank) AS rank
+            FROM pairs
+            CROSS JOIN gold.agg_hll_settings s
+            CROSS JOIN LATERAL gold.hll_register(pairs.player_key, s.hll_precision) r
+            GROUP BY pairs.skin_id, s.hll_precision, r.register
+        )
+        INSERT INTO gold.agg_skin_player_hll AS a (skin_id, sketch)
+        SELECT skin_id, gold.hll_sketch(ARRAY_AGG(register), ARRAY_AGG(rank), hll_precision)
+        FROM registers
+        GROUP BY skin_id, hll_precision
+        ON CONFLICT (skin_id) DO UPDATE SET
+            sketch = gold.hll_union(a.sketch, EXCLUDED.sketch)
+    $sql$, source);
+END;
+$fn$;
+
+-- PEŁNE PRZELICZENIE (pierwsze zasilenie i po UPDATE / DELETE)
+
+CREATE OR REPLACE FUNCTION gold.refresh_sales_aggregates()
+RETURNS VOID
+LANGUAGE plpgsql
+AS $fn$
+DECLARE
+    v_statement TEXT;
+BEGIN
+    TRUNCATE gold.agg_revenue_by_segment_month, gold.agg_top_selling_skins,
+             gold.agg_weekend_vs_weekday_sales, gold.agg_player_lifetime_value,
+             gold.agg_revenue_trends, gold.agg_month_player, gold.agg_skin_player,
+             gold.agg_month_player_hll, gold.agg_skin_player_hll;
+    FOR v_statement IN SELECT gold.sales_delta_statements('gold.fact_sales') LOOP
+        EXECUTE v_statement;
+    END LOOP;
+END;
+$fn$;
+
+-- Nowa precyzja szkiców -> przeliczenie od zera; zwraca nowy błąd względny
+CREATE OR REPLACE FUNCTION gold.set_hll_precision(new_precision INTEGER)
+RETURNS NUMERIC
+LANGUAGE plpgsql
+AS $fn$
+BEGIN
+    UPDATE gold.agg_hll_settings SET hll_precision = new_precision;
+    PERFORM gold.refresh_sales_aggregates();
+    RETURN (SELECT relative_error FROM gold.agg_hll_settings);
+END;
+$fn$;
+
+-- TRIGGERY NA FAKCIE
+-- Tabela przejściowa jest widoczna tylko w funkcji triggera, dlatego EXECUTE jest tutaj.
+
+CREATE OR REPLACE FUNCTION gold.merge_sales_delta()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $fn$
+DECLARE
+    v_statement TEXT;
+BEGIN
+    FOR v_statement IN SELECT gold.sales_delta_statements('new_rows') LOOP
+        EXECUTE v_statement;
+    END LOOP;
+    RETURN NULL;
+END;
+$fn$;
+
+CREATE OR REPLACE FUNCTION gold.refresh_sales_aggregates_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $fn$
+BEGIN
+    RAISE NOTICE 'gold.fact_sales: % - pełne przeliczenie agregatów', TG_OP;
+    PERFORM gold.refresh_sales_aggregates();
+    RETURN NULL;
+END;
+$fn$;
+
+DROP TRIGGER IF EXISTS trg_fact_sales_aggregates_insert ON gold.fact_sales;
+CREATE TRIGGER trg_fact_sales_aggregates_insert
+    AFTER INSERT ON gold.fact_sales
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION gold.merge_sales_delta();
+
+DROP TRIGGER IF EXISTS trg_fact_sales_aggregates_refresh ON gold.fact_sales;
+CREATE TRIGGER trg_fact_sales_aggregates_refresh
+    AFTER UPDATE OR DELETE OR TRUNCATE ON gold.fact_sales
+    FOR EACH STATEMENT EXECUTE FUNCTION gold.refresh_sales_aggregates_trigger();
+
+-- PIERWSZE ZASILENIE
+
+SELECT gold.refresh_sales_aggregates();
+
+-- RAPORT
+
+SELECT 'agg_revenue_by_segment_month' AS table_name, COUNT(*) AS row_count FROM gold.agg_revenue_by_segment_month
+UNION ALL
+SELECT 'agg_top_selling_skins', COUNT(*) FROM gold.agg_top_selling_skins
+UNION ALL
+SELECT 'agg_weekend_vs_weekday_sales', COUNT(*) FROM gold.agg_weekend_vs_weekday_sales
+UNION ALL
+SELECT 'agg_player_lifetime_value', COUNT(*) FROM gold.agg_player_lifetime_value
+UNION ALL
+SELECT 'agg_revenue_trends', COUNT(*) FROM gold.agg_revenue_trends
+UNION ALL
+SELECT 'agg_month_player_hll', COUNT(*) FROM gold.agg_month_player_hll
+UNION ALL
+SELECT 'agg_skin_player_hll', COUNT(*) FROM gold.agg_skin_player_hll;
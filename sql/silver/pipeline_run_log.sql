@@ -0,0 +1,49 @@
+-- PIPELINE RUN LOG - metryki etapów pipeline'u (data/src_data/stage_metrics.py, run_pipeline.py)
+-- Jeden wiersz = jeden krok etapu (skrypt Pythona albo plik SQL) w jednym przebiegu (run_id).
+-- Obok silver.data_quality_log, ale jak silver.load_control nie jest kasowana przy przebudowie silver.
+-- Skrypt jest idempotentny - stage_metrics.py uruchamia go przed każdym zapisem.
+
+CREATE SCHEMA IF NOT EXISTS silver;
+
+CREATE TABLE IF NOT EXISTS silver.pipeline_run_log (
+    run_id VARCHAR(40) NOT NULL,
+    stage VARCHAR(20) NOT NULL,
+    step VARCHAR(100) NOT NULL,
+    kind VARCHAR(10) NOT NULL,
+    status VARCHAR(10) NOT NULL,
+    started_at TIMESTAMP NOT NULL,
+    finished_at TIMESTAMP NOT NULL,
+    wall_seconds NUMERIC(12,3) NOT NULL,
+    cpu_seconds NUMERIC(12,3),           -- Python: proces + procesy potomne; SQL: NULL (CPU serwera)
+    peak_rss_mb NUMERIC(10,1),
+    peak_traced_mb NUMERIC(10,1),        -- tylko z PIPELINE_TRACEMALLOC=1
+    rows_in BIGINT,
+    rows_out BIGINT,
+    bytes_read BIGINT,                   -- SQL: rozmiar tabel wejściowych
+    bytes_written BIGINT,                -- SQL: rozmiar tabel wynikowych
+    profile_path TEXT,
+    error TEXT,
+    host VARCHAR(100),
+    logged_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (run_id, stage, step),
+    CONSTRAINT chk_run_log_kind CHECK (kind IN ('python', 'sql')),
+    CONSTRAINT chk_run_log_status CHECK (status IN ('ok', 'error'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_pipeline_run_log_started ON silver.pipeline_run_log(started_at);
+
+-- Przebieg w jednym wierszu: czas od startu pierwszego do końca ostatniego kroku
+CREATE OR REPLACE VIEW silver.pipeline_run_summary AS
+SELECT
+    run_id,
+    MIN(started_at) AS started_at,
+    MAX(finished_at) AS finished_at,
+    ROUND(EXTRACT(EPOCH FROM MAX(finished_at) - MIN(started_at))::NUMERIC, 3) AS wall_seconds,
+    SUM(wall_seconds) AS step_seconds,
+    COUNT(*) AS steps,
+    COUNT(*) FILTER (WHERE status = 'error') AS failed_steps,
+    MAX(peak_rss_mb) AS peak_rss_mb,
+    SUM(rows_out) AS rows_out,
+    SUM(bytes_written) AS bytes_written
+FROM silver.pipeline_run_log
+GROUP BY run_id;
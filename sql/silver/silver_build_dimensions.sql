@@ -0,0 +1,207 @@
+-- SILVER BUILD - wspólny początek pełnej przebudowy (silver_clean_data.sql i silver_clean_data_single_scan.sql)
+-- Tabele, load_control, wymiary i pusta silver.fact_sale. Fakty i kwarantannę wypełnia skrypt budowy.
+-- silver_clean_data.sql ma ten plik wklejony (działa w DataGrip/pgAdmin), single scan dołącza go przez \ir.
+
+-- Drop existing
+DROP TABLE IF EXISTS silver.fact_sale CASCADE;
+DROP TABLE IF EXISTS silver.dim_player CASCADE;
+DROP TABLE IF EXISTS silver.dim_skin CASCADE;
+DROP TABLE IF EXISTS silver.dim_date CASCADE;
+DROP TABLE IF EXISTS silver.fact_sale_quarantine CASCADE;
+DROP TABLE IF EXISTS silver.data_quality_log CASCADE;
+
+-- LOAD CONTROL (watermark bronze.loaded_at - nie jest kasowana, patrz silver_incremental_load.sql)
+
+CREATE TABLE IF NOT EXISTS silver.load_control (
+    load_id SERIAL PRIMARY KEY,
+    source_table VARCHAR(100) NOT NULL,
+    load_mode VARCHAR(20) NOT NULL,
+    watermark_from TIMESTAMP,
+    watermark_to TIMESTAMP NOT NULL,
+    rows_read INTEGER,
+    rows_upserted INTEGER,
+    rows_quarantined INTEGER,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP DEFAULT CLOCK_TIMESTAMP(),
+    CONSTRAINT chk_load_mode CHECK (load_mode IN ('full', 'incremental'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_load_control_source ON silver.load_control(source_table, watermark_to);
+
+-- Granica watermarku (wspólna z silver_incremental_load.sql): start najstarszej otwartej transakcji
+-- innej sesji. COPY, które wystartowało wcześniej i zatwierdzi się później, ma starsze loaded_at -
+-- watermark poniżej tej granicy nie przeskoczy jego wierszy.
+CREATE OR REPLACE FUNCTION silver.load_cutoff()
+RETURNS TIMESTAMP
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT COALESCE(MIN(xact_start)::TIMESTAMP, 'infinity'::TIMESTAMP)
+    FROM pg_stat_activity
+    WHERE datname = current_database()
+      AND pid <> pg_backend_pid()
+      AND backend_type = 'client backend'
+      AND xact_start IS NOT NULL
+$$;
+
+-- Granica z chwili startu, zanim przebudowa czyta bronze: wiersze starsze od niej są już zatwierdzone,
+-- więc przebudowa je widzi. Późniejsze (także z COPY zatwierdzonego w trakcie) bierze przebieg przyrostowy -
+-- każdy odczyt bronze w przebudowie filtruje loaded_at < full_load_cutoff (psql: osobny snapshot na instrukcję).
+DROP TABLE IF EXISTS pg_temp.full_load_cutoff;
+CREATE TEMP TABLE full_load_cutoff AS
+SELECT LEAST(silver.load_cutoff(), CLOCK_TIMESTAMP()::TIMESTAMP) AS ts;
+
+-- QUARANTINE & AUDIT
+
+CREATE TABLE silver.data_quality_log (
+    log_id SERIAL PRIMARY KEY,
+    load_id INTEGER,
+    run_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    table_name VARCHAR(100),
+    issue_type VARCHAR(100),
+    issue_count INTEGER,
+    issue_pct NUMERIC(5,2),
+    threshold_pct NUMERIC(5,2),
+    alert_triggered BOOLEAN DEFAULT FALSE
+);
+
+CREATE TABLE silver.fact_sale_quarantine (
+    quarantine_id SERIAL PRIMARY KEY,
+    transaction_id INTEGER,
+    player_id INTEGER,
+    skin_id INTEGER,
+    purchase_date DATE,
+    price_rp INTEGER,
+    quantity INTEGER,
+    rejection_reason VARCHAR(200),
+    rejection_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- DIM_DATE
+
+CREATE TABLE silver.dim_date (
+    date_key INTEGER PRIMARY KEY,
+    date DATE NOT NULL UNIQUE,
+    year INTEGER NOT NULL,
+    quarter INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    month_name VARCHAR(20) NOT NULL,
+    week INTEGER NOT NULL,
+    day_of_month INTEGER NOT NULL,
+    day_of_week INTEGER NOT NULL,
+    day_name VARCHAR(20) NOT NULL,
+    is_weekend BOOLEAN NOT NULL,
+    is_month_start BOOLEAN NOT NULL,
+    is_month_end BOOLEAN NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO silver.dim_date (
+    date_key, date, year, quarter, month, month_name,
+    week, day_of_month, day_of_week, day_name,
+    is_weekend, is_month_start, is_month_end
+)
+SELECT
+    TO_CHAR(d, 'YYYYMMDD')::INTEGER,
+    d::DATE,
+    EXTRACT(YEAR FROM d)::INTEGER,
+    EXTRACT(QUARTER FROM d)::INTEGER,
+    EXTRACT(MONTH FROM d)::INTEGER,
+    TRIM(TO_CHAR(d, 'Month')),
+    EXTRACT(WEEK FROM d)::INTEGER,
+    EXTRACT(DAY FROM d)::INTEGER,
+    EXTRACT(DOW FROM d)::INTEGER,
+    TRIM(TO_CHAR(d, 'Day')),
+    EXTRACT(DOW FROM d) IN (0, 6),
+    EXTRACT(DAY FROM d) = 1,
+    d = (DATE_TRUNC('month', d) + INTERVAL '1 month' - INTERVAL '1 day')::DATE
+FROM generate_series('2010-01-01'::DATE, '2030-12-31'::DATE, '1 day'::INTERVAL) d;
+
+SELECT 'dim_date created' as status, COUNT(*) as days FROM silver.dim_date;
+
+-- DIM_SKIN
+
+CREATE TABLE silver.dim_skin (
+    skin_key SERIAL PRIMARY KEY,
+    skin_id INTEGER NOT NULL UNIQUE,
+    champion_name VARCHAR(100) NOT NULL,
+    skin_name VARCHAR(200) NOT NULL,
+    rarity VARCHAR(50) NOT NULL,
+    price_rp INTEGER NOT NULL,
+    release_date DATE,
+    champion_id VARCHAR(100),
+    skin_num INTEGER,
+    is_valid BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT chk_price_positive CHECK (price_rp >= 0),
+    CONSTRAINT chk_rarity_valid CHECK (rarity IN ('Default', 'Legacy', 'Epic', 'Legendary', 'Ultimate'))
+);
+
+INSERT INTO silver.dim_skin (
+    skin_id, champion_name, skin_name, rarity, price_rp,
+    release_date, champion_id, skin_num, is_valid
+)
+SELECT
+    skin_id, TRIM(champion_name), TRIM(skin_name), rarity, price_rp,
+    release_date, champion_id, skin_num,
+    CASE
+        WHEN champion_name IS NULL OR TRIM(champion_name) = '' THEN FALSE
+        WHEN skin_name IS NULL OR TRIM(skin_name) = '' THEN FALSE
+        WHEN price_rp < 0 THEN FALSE
+        WHEN rarity NOT IN ('Default', 'Legacy', 'Epic', 'Legendary', 'Ultimate') THEN FALSE
+        ELSE TRUE
+    END
+FROM bronze.stg_skins
+WHERE skin_id IS NOT NULL
+  AND loaded_at < (SELECT ts FROM full_load_cutoff);
+
+SELECT 'dim_skin created' as status, COUNT(*) as skins FROM silver.dim_skin;
+
+-- DIM_PLAYER
+
+CREATE TABLE silver.dim_player (
+    player_key SERIAL PRIMARY KEY,
+    player_id INTEGER NOT NULL UNIQUE,
+    region VARCHAR(10) NOT NULL,
+    account_created_date DATE NOT NULL,
+    player_segment VARCHAR(20) NOT NULL,
+    account_age_days INTEGER,
+    is_valid BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT chk_region_valid CHECK (region IN ('EUW', 'EUNE', 'NA', 'KR')),
+    CONSTRAINT chk_segment_valid CHECK (player_segment IN ('casual', 'core', 'whale'))
+);
+
+INSERT INTO silver.dim_player (
+    player_id, region, account_created_date, player_segment, account_age_days, is_valid
+)
+SELECT
+    player_id, UPPER(TRIM(region)), account_created_date, LOWER(TRIM(player_segment)),
+    CURRENT_DATE - account_created_date,
+    CASE
+        WHEN player_id IS NULL THEN FALSE
+        WHEN region NOT IN ('EUW', 'EUNE', 'NA', 'KR') THEN FALSE
+        WHEN player_segment NOT IN ('casual', 'core', 'whale') THEN FALSE
+        WHEN account_created_date > CURRENT_DATE THEN FALSE
+        ELSE TRUE
+    END
+FROM bronze.stg_players
+WHERE player_id IS NOT NULL
+  AND loaded_at < (SELECT ts FROM full_load_cutoff);
+
+SELECT 'dim_player created' as status, COUNT(*) as players FROM silver.dim_player;
+-- FACT_SALE (tabela; wiersze wstawia skrypt budowy)
+
+CREATE TABLE silver.fact_sale (
+    sale_key SERIAL PRIMARY KEY,
+    transaction_id NUMERIC,
+    player_key INTEGER,
+    skin_key INTEGER,
+    date_key INTEGER,
+    price_rp NUMERIC,
+    quantity NUMERIC,
+    total_rp NUMERIC,
+    is_valid BOOLEAN DEFAULT FALSE,
+    dq_issues TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,89 @@
+-- SILVER BUILD - wspólny koniec pełnej przebudowy: watermark, load_id w data_quality_log,
+-- duplikaty z bronze.stg_sales_quarantine, raporty
+-- Po wypełnieniu fact_sale i kwarantanny oraz po monitoringu skryptu budowy.
+-- silver_clean_data.sql ma ten plik wklejony, single scan dołącza go przez \ir.
+
+-- WATERMARK (kolejne przebiegi: silver_incremental_load.sql od tego miejsca)
+
+INSERT INTO silver.load_control (source_table, load_mode, watermark_to, rows_read, rows_upserted, rows_quarantined)
+SELECT 'stg_skins', 'full', MAX(loaded_at) FILTER (WHERE loaded_at < c.ts), COUNT(*) FILTER (WHERE loaded_at < c.ts),
+       (SELECT COUNT(*) FROM silver.dim_skin), 0
+FROM bronze.stg_skins, full_load_cutoff c
+HAVING MAX(loaded_at) FILTER (WHERE loaded_at < c.ts) IS NOT NULL
+UNION ALL
+SELECT 'stg_players', 'full', MAX(loaded_at) FILTER (WHERE loaded_at < c.ts), COUNT(*) FILTER (WHERE loaded_at < c.ts),
+       (SELECT COUNT(*) FROM silver.dim_player), 0
+FROM bronze.stg_players, full_load_cutoff c
+HAVING MAX(loaded_at) FILTER (WHERE loaded_at < c.ts) IS NOT NULL
+UNION ALL
+SELECT 'stg_sales', 'full', MAX(loaded_at) FILTER (WHERE loaded_at < c.ts), COUNT(*) FILTER (WHERE loaded_at < c.ts),
+       (SELECT COUNT(*) FROM silver.fact_sale), (SELECT COUNT(*) FROM silver.fact_sale_quarantine)
+FROM bronze.stg_sales, full_load_cutoff c
+HAVING MAX(loaded_at) FILTER (WHERE loaded_at < c.ts) IS NOT NULL
+UNION ALL
+SELECT 'stg_sales_quarantine', 'full', MAX(loaded_at) FILTER (WHERE loaded_at < c.ts),
+       COUNT(*) FILTER (WHERE loaded_at < c.ts), 0, COUNT(*) FILTER (WHERE loaded_at < c.ts)
+FROM bronze.stg_sales_quarantine, full_load_cutoff c
+HAVING MAX(loaded_at) FILTER (WHERE loaded_at < c.ts) IS NOT NULL;
+
+UPDATE silver.data_quality_log
+SET load_id = (SELECT MAX(load_id) FROM silver.load_control WHERE source_table = 'stg_sales')
+WHERE load_id IS NULL;
+
+-- KWARANTANNA SPRZED BRONZE: duplikaty z dedupe_sales.py (bronze.stg_sales_quarantine).
+-- Tylko do watermarku - nowsze wiersze dopisze silver_incremental_load.sql. Po watermarku,
+-- żeby rows_quarantined dla stg_sales liczyło tylko odrzuty z walidacji Silver.
+
+INSERT INTO silver.fact_sale_quarantine (
+    transaction_id, player_id, skin_id, purchase_date,
+    price_rp, quantity, rejection_reason
+)
+SELECT
+    q.transaction_id::INTEGER,
+    q.player_id::INTEGER,
+    q.skin_id::INTEGER,
+    CASE
+        WHEN q.purchase_date ~ '^\d{4}-\d{2}-\d{2}$'
+        THEN q.purchase_date::DATE
+        ELSE NULL
+    END,
+    q.price_rp::INTEGER,
+    q.quantity::INTEGER,
+    q.rejection_reason
+FROM bronze.stg_sales_quarantine q, full_load_cutoff c
+WHERE q.loaded_at < c.ts;
+
+-- REPORTS
+
+SELECT
+    issue_type as "Check",
+    issue_count as "Count",
+    issue_pct as "% Error",
+    CASE WHEN alert_triggered THEN 'ALERT!' ELSE '✓ OK' END as "Status"
+FROM silver.data_quality_log
+ORDER BY issue_pct DESC;
+
+
+SELECT
+    COUNT(*) as total_sales,
+    COUNT(*) FILTER (WHERE is_valid = TRUE) as valid_sales,
+    COUNT(*) FILTER (WHERE is_valid = FALSE) as invalid_sales,
+    ROUND(COUNT(*) FILTER (WHERE is_valid = FALSE)::NUMERIC / COUNT(*) * 100, 2) as error_pct,
+    SUM(total_rp) FILTER (WHERE is_valid = TRUE) as total_revenue
+FROM silver.fact_sale;
+
+SELECT
+    rejection_reason,
+    COUNT(*) as count
+FROM silver.fact_sale_quarantine
+GROUP BY rejection_reason
+ORDER BY count DESC
+LIMIT 10;
+
+SELECT
+    issue_type,
+    issue_pct,
+    'THRESHOLD EXCEEDED!' as message
+FROM silver.data_quality_log
+WHERE alert_triggered = TRUE
+ORDER BY issue_pct DESC;
@@ -1,4 +1,12 @@
 -- SILVER LAYER - SIMPLIFIED
+-- Tabele, wymiary i pusta fact_sale: silver_build_dimensions.sql; watermark i raporty: silver_build_finish.sql.
+-- Oba pliki są tu wklejone, żeby skrypt działał bez psql (DataGrip, pgAdmin) - zmiany wprowadzaj w nich.
+
+-- >>> silver_build_dimensions.sql (wklejony 1:1, zgodność sprawdza tests/test_sql_inlined.py)
+-- SILVER BUILD - wspólny początek pełnej przebudowy (silver_clean_data.sql i silver_clean_data_single_scan.sql)
+-- Tabele, load_control, wymiary i pusta silver.fact_sale. Fakty i kwarantannę wypełnia skrypt budowy.
+-- silver_clean_data.sql ma ten plik wklejony (działa w DataGrip/pgAdmin), single scan dołącza go przez \ir.
+
 -- Drop existing
 DROP TABLE IF EXISTS silver.fact_sale CASCADE;
 DROP TABLE IF EXISTS silver.dim_player CASCADE;
@@ -7,10 +15,52 @@ DROP TABLE IF EXISTS silver.dim_date CASCADE;
 DROP TABLE IF EXISTS silver.fact_sale_quarantine CASCADE;
 DROP TABLE IF EXISTS silver.data_quality_log CASCADE;
 
+-- LOAD CONTROL (watermark bronze.loaded_at - nie jest kasowana, patrz silver_incremental_load.sql)
+
+CREATE TABLE IF NOT EXISTS silver.load_control (
+    load_id SERIAL PRIMARY KEY,
+    source_table VARCHAR(100) NOT NULL,
+    load_mode VARCHAR(20) NOT NULL,
+    watermark_from TIMESTAMP,
+    watermark_to TIMESTAMP NOT NULL,
+    rows_read INTEGER,
+    rows_upserted INTEGER,
+    rows_quarantined INTEGER,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP DEFAULT CLOCK_TIMESTAMP(),
+    CONSTRAINT chk_load_mode CHECK (load_mode IN ('full', 'incremental'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_load_control_source ON silver.load_control(source_table, watermark_to);
+
+-- Granica watermarku (wspólna z silver_incremental_load.sql): start najstarszej otwartej transakcji
+-- innej sesji. COPY, które wystartowało wcześniej i zatwierdzi się później, ma starsze loaded_at -
+-- watermark poniżej tej granicy nie przeskoczy jego wierszy.
+CREATE OR REPLACE FUNCTION silver.load_cutoff()
+RETURNS TIMESTAMP
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT COALESCE(MIN(xact_start)::TIMESTAMP, 'infinity'::TIMESTAMP)
+    FROM pg_stat_activity
+    WHERE datname = current_database()
+      AND pid <> pg_backend_pid()
+      AND backend_type = 'client backend'
+      AND xact_start IS NOT NULL
+$$;
+
+-- Granica z chwili startu, zanim przebudowa czyta bronze: wiersze starsze od niej są już zatwierdzone,
+-- więc przebudowa je widzi. Późniejsze (także z COPY zatwierdzonego w trakcie) bierze przebieg przyrostowy -
+-- każdy odczyt bronze w przebudowie filtruje loaded_at < full_load_cutoff (psql: osobny snapshot na instrukcję).
+DROP TABLE IF EXISTS pg_temp.full_load_cutoff;
+CREATE TEMP TABLE full_load_cutoff AS
+SELECT LEAST(silver.load_cutoff(), CLOCK_TIMESTAMP()::TIMESTAMP) AS ts;
+
 -- QUARANTINE & AUDIT
 
 CREATE TABLE silver.data_quality_log (
     log_id SERIAL PRIMARY KEY,
+    load_id INTEGER,
     run_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     table_name VARCHAR(100),
     issue_type VARCHAR(100),
@@ -107,7 +157,8 @@ SELECT
         ELSE TRUE
     END
 FROM bronze.stg_skins
-WHERE skin_id IS NOT NULL;
+WHERE skin_id IS NOT NULL
+  AND loaded_at < (SELECT ts FROM full_load_cutoff);
 
 SELECT 'dim_skin created' as status, COUNT(*) as skins FROM silver.dim_skin;
 
@@ -140,11 +191,11 @@ SELECT
         ELSE TRUE
     END
 FROM bronze.stg_players
-WHERE player_id IS NOT NULL;
+WHERE player_id IS NOT NULL
+  AND loaded_at < (SELECT ts FROM full_load_cutoff);
 
 SELECT 'dim_player created' as status, COUNT(*) as players FROM silver.dim_player;
-
--- FACT_SALE
+-- FACT_SALE (tabela; wiersze wstawia skrypt budowy)
 
 CREATE TABLE silver.fact_sale (
     sale_key SERIAL PRIMARY KEY,
@@ -159,6 +210,9 @@ CREATE TABLE silver.fact_sale (
     dq_issues TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+-- <<< silver_build_dimensions.sql
+
+-- FACT_SALE
 
 INSERT INTO silver.fact_sale (
     transaction_id, player_key, skin_key, date_key,
@@ -185,7 +239,8 @@ SELECT
 FROM bronze.stg_sales sale
 LEFT JOIN silver.dim_player p ON sale.player_id::INTEGER = p.player_id
 LEFT JOIN silver.dim_skin s ON sale.skin_id::INTEGER = s.skin_id
-WHERE sale.transaction_id IS NOT NULL;
+WHERE sale.transaction_id IS NOT NULL
+  AND sale.loaded_at < (SELECT ts FROM full_load_cutoff);
 
 SELECT 'fact_sale loaded' as status, COUNT(*) as sales FROM silver.fact_sale;
 
@@ -255,7 +310,8 @@ SELECT
     f.dq_issues
 FROM silver.fact_sale f
 JOIN bronze.stg_sales s ON f.transaction_id = s.transaction_id
-WHERE f.is_valid = FALSE;
+WHERE f.is_valid = FALSE
+  AND s.loaded_at < (SELECT ts FROM full_load_cutoff);
 
 -- MONITORING (bezpośrednio, bez procedure)
 
@@ -299,6 +355,62 @@ BEGIN
     VALUES ('fact_sale', 'total_invalid', v_count, v_pct, v_threshold, v_pct > v_threshold);
 END $$;
 
+-- >>> silver_build_finish.sql (wklejony 1:1, zgodność sprawdza tests/test_sql_inlined.py)
+-- SILVER BUILD - wspólny koniec pełnej przebudowy: watermark, load_id w data_quality_log,
+-- duplikaty z bronze.stg_sales_quarantine, raporty
+-- Po wypełnieniu fact_sale i kwarantanny oraz po monitoringu skryptu budowy.
+-- silver_clean_data.sql ma ten plik wklejony, single scan dołącza go przez \ir.
+
+-- WATERMARK (kolejne przebiegi: silver_incremental_load.sql od tego miejsca)
+
+INSERT INTO silver.load_control (source_table, load_mode, watermark_to, rows_read, rows_upserted, rows_quarantined)
+SELECT 'stg_skins', 'full', MAX(loaded_at) FILTER (WHERE loaded_at < c.ts), COUNT(*) FILTER (WHERE loaded_at < c.ts),
+       (SELECT COUNT(*) FROM silver.dim_skin), 0
+FROM bronze.stg_skins, full_load_cutoff c
+HAVING MAX(loaded_at) FILTER (WHERE loaded_at < c.ts) IS NOT NULL
+UNION ALL
+SELECT 'stg_players', 'full', MAX(loaded_at) FILTER (WHERE loaded_at < c.ts), COUNT(*) FILTER (WHERE loaded_at < c.ts),
+       (SELECT COUNT(*) FROM silver.dim_player), 0
+FROM bronze.stg_players, full_load_cutoff c
+HAVING MAX(loaded_at) FILTER (WHERE loaded_at < c.ts) IS NOT NULL
+UNION ALL
+SELECT 'stg_sales', 'full', MAX(loaded_at) FILTER (WHERE loaded_at < c.ts), COUNT(*) FILTER (WHERE loaded_at < c.ts),
+       (SELECT COUNT(*) FROM silver.fact_sale), (SELECT COUNT(*) FROM silver.fact_sale_quarantine)
+FROM bronze.stg_sales, full_load_cutoff c
+HAVING MAX(loaded_at) FILTER (WHERE loaded_at < c.ts) IS NOT NULL
+UNION ALL
+SELECT 'stg_sales_quarantine', 'full', MAX(loaded_at) FILTER (WHERE loaded_at < c.ts),
+       COUNT(*) FILTER (WHERE loaded_at < c.ts), 0, COUNT(*) FILTER (WHERE loaded_at < c.ts)
+FROM bronze.stg_sales_quarantine, full_load_cutoff c
+HAVING MAX(loaded_at) FILTER (WHERE loaded_at < c.ts) IS NOT NULL;
+
+UPDATE silver.data_quality_log
+SET load_id = (SELECT MAX(load_id) FROM silver.load_control WHERE source_table = 'stg_sales')
+WHERE load_id IS NULL;
+
+-- KWARANTANNA SPRZED BRONZE: duplikaty z dedupe_sales.py (bronze.stg_sales_quarantine).
+-- Tylko do watermarku - nowsze wiersze dopisze silver_incremental_load.sql. Po watermarku,
+-- żeby rows_quarantined dla stg_sales liczyło tylko odrzuty z walidacji Silver.
+
+INSERT INTO silver.fact_sale_quarantine (
+    transaction_id, player_id, skin_id, purchase_date,
+    price_rp, quantity, rejection_reason
+)
+SELECT
+    q.transaction_id::INTEGER,
+    q.player_id::INTEGER,
+    q.skin_id::INTEGER,
+    CASE
+        WHEN q.purchase_date ~ '^\d{4}-\d{2}-\d{2}$'
+        THEN q.purchase_date::DATE
+        ELSE NULL
+    END,
+    q.price_rp::INTEGER,
+    q.quantity::INTEGER,
+    q.rejection_reason
+FROM bronze.stg_sales_quarantine q, full_load_cutoff c
+WHERE q.loaded_at < c.ts;
+
 -- REPORTS
 
 SELECT
@@ -332,4 +444,5 @@ SELECT
     'THRESHOLD EXCEEDED!' as message
 FROM silver.data_quality_log
 WHERE alert_triggered = TRUE
-ORDER BY issue_pct DESC;
\ No newline at end of file
+ORDER BY issue_pct DESC;
+-- <<< silver_build_finish.sql
@@ -0,0 +1,137 @@
+-- SILVER LAYER - SINGLE SCAN
+-- Alternatywa dla silver_clean_data.sql: te same tabele i te same wiersze, ale fact_sale i kwarantanna
+-- powstają w jednym INSERT ... SELECT po bronze.stg_sales (bez Step 1-4 jako UPDATE całej tabeli).
+-- Porównanie czasów i wyników: python data/src_data/benchmark_silver_build.py
+-- Tabele, wymiary, watermark i raporty - te same pliki co silver_clean_data.sql.
+
+\ir silver_build_dimensions.sql
+
+-- FACT_SALE + QUARANTINE - jeden przebieg po bronze.stg_sales
+-- Cena naprawiona z dim_skin, total_rp, dq_issues i is_valid liczone w jednym SELECT (te same reguły
+-- co Step 1-5 w silver_clean_data.sql), dim_date przez LEFT JOIN zamiast NOT IN, kwarantanna z tej
+-- samej CTE - bez UPDATE-ów przepisujących całą tabelę.
+
+WITH src AS (
+    SELECT
+        sale.transaction_id,
+        sale.player_id,
+        sale.skin_id,
+        sale.price_rp AS raw_price_rp,
+        sale.quantity,
+        p.player_key,
+        s.skin_key,
+        s.price_rp AS skin_price_rp,
+        CASE
+            WHEN sale.purchase_date ~ '^\d{4}-\d{2}-\d{2}$'
+            THEN sale.purchase_date::DATE
+            ELSE NULL
+        END AS purchase_date
+    FROM bronze.stg_sales sale
+    LEFT JOIN silver.dim_player p ON sale.player_id::INTEGER = p.player_id
+    LEFT JOIN silver.dim_skin s ON sale.skin_id::INTEGER = s.skin_id
+    WHERE sale.transaction_id IS NOT NULL
+      AND sale.loaded_at < (SELECT ts FROM full_load_cutoff)
+),
+keyed AS (
+    SELECT
+        src.*,
+        COALESCE(d.date_key, TO_CHAR(src.purchase_date, 'YYYYMMDD')::INTEGER) AS date_key,
+        d.date_key IS NOT NULL AS date_known,
+        -- Step 1: brakująca cena z dim_skin
+        (src.raw_price_rp IS NULL AND src.quantity > 0 AND src.skin_price_rp > 0) AS price_fixed
+    FROM src
+    LEFT JOIN silver.dim_date d ON d.date = src.purchase_date
+),
+priced AS (
+    SELECT
+        keyed.*,
+        CASE WHEN price_fixed THEN skin_price_rp ELSE raw_price_rp END AS price_rp
+    FROM keyed
+),
+built AS (
+    SELECT
+        priced.*,
+        -- Step 2: total zawsze z ceny i ilości
+        price_rp * quantity AS total_rp,
+        -- Step 4
+        (player_key IS NOT NULL AND skin_key IS NOT NULL AND price_rp > 0 AND quantity > 0 AND date_known) AS is_valid,
+        -- Step 3 (po naprawie ceny zostaje samo 'price_fixed')
+        CASE
+            WHEN price_fixed THEN 'price_fixed'
+            ELSE TRIM(BOTH ',' FROM
+                CASE WHEN player_key IS NULL THEN 'missing_player,' ELSE '' END ||
+                CASE WHEN skin_key IS NULL THEN 'missing_skin,' ELSE '' END ||
+                CASE WHEN price_rp IS NULL THEN 'missing_price,' ELSE '' END ||
+                CASE WHEN price_rp < 0 THEN 'negative_price,' ELSE '' END ||
+                CASE WHEN quantity IS NULL THEN 'missing_quantity,' ELSE '' END ||
+                CASE WHEN quantity <= 0 THEN 'invalid_quantity,' ELSE '' END ||
+                CASE WHEN date_key IS NOT NULL AND NOT date_known THEN 'invalid_date,' ELSE '' END
+            )
+        END AS dq_issues
+    FROM priced
+),
+loaded AS (
+    INSERT INTO silver.fact_sale (
+        transaction_id, player_key, skin_key, date_key,
+        price_rp, quantity, total_rp, is_valid, dq_issues
+    )
+    SELECT
+        transaction_id, player_key, skin_key, date_key,
+        price_rp, quantity, total_rp, is_valid, dq_issues
+    FROM built
+)
+-- Step 5: Quarantine (surowe wartości z bronze)
+INSERT INTO silver.fact_sale_quarantine (
+    transaction_id, player_id, skin_id, purchase_date,
+    price_rp, quantity, rejection_reason
+)
+SELECT
+    transaction_id::INTEGER,
+    player_id::INTEGER,
+    skin_id::INTEGER,
+    purchase_date,
+    raw_price_rp::INTEGER,
+    quantity::INTEGER,
+    dq_issues
+FROM built
+WHERE is_valid = FALSE;
+
+SELECT 'fact_sale loaded' as status, COUNT(*) as sales FROM silver.fact_sale;
+
+-- MONITORING (jeden przebieg po fact_sale zamiast pięciu COUNT)
+
+DO $$
+DECLARE
+    v_stats RECORD;
+    v_check RECORD;
+    v_pct NUMERIC;
+    v_threshold NUMERIC := 5.0;
+BEGIN
+    SELECT
+        COUNT(*) AS total,
+        COUNT(*) FILTER (WHERE player_key IS NULL) AS missing_player,
+        COUNT(*) FILTER (WHERE skin_key IS NULL) AS missing_skin,
+        COUNT(*) FILTER (WHERE price_rp <= 0 OR price_rp IS NULL) AS invalid_price,
+        COUNT(*) FILTER (WHERE quantity <= 0 OR quantity IS NULL) AS invalid_quantity,
+        COUNT(*) FILTER (WHERE is_valid = FALSE) AS total_invalid
+    INTO v_stats
+    FROM silver.fact_sale;
+
+    FOR v_check IN
+        SELECT *
+        FROM (VALUES
+            (1, 'missing_player', v_stats.missing_player),
+            (2, 'missing_skin', v_stats.missing_skin),
+            (3, 'invalid_price', v_stats.invalid_price),
+            (4, 'invalid_quantity', v_stats.invalid_quantity),
+            (5, 'total_invalid', v_stats.total_invalid)
+        ) AS checks(ord, issue_type, issue_count)
+        ORDER BY ord
+    LOOP
+        v_pct := ROUND((v_check.issue_count::NUMERIC / NULLIF(v_stats.total, 0) * 100), 2);
+        INSERT INTO silver.data_quality_log (table_name, issue_type, issue_count, issue_pct, threshold_pct, alert_triggered)
+        VALUES ('fact_sale', v_check.issue_type, v_check.issue_count, v_pct, v_threshold, v_pct > v_threshold);
+    END LOOP;
+END $$;
+
+\ir silver_build_finish.sql
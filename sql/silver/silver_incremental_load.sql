@@ -0,0 +1,374 @@
+-- SILVER LAYER - INCREMENTAL LOAD (watermark bronze.*.loaded_at)
+--
+-- Kolejność: silver_clean_data.sql raz (pełna przebudowa + pierwszy watermark), potem każdy dzienny
+-- load_bronze.py BEZ --truncate -> ten skrypt. Przetwarzane są tylko wiersze bronze z loaded_at
+-- nowszym niż watermark ostatniego udanego przebiegu (silver.load_control), więc czas rośnie
+-- z dziennym wolumenem, a nie z całą historią.
+--  - dim_skin / dim_player: upsert po skin_id / player_id (skin_key / player_key bez zmian)
+--  - fact_sale: upsert po transaction_id, te same reguły czyszczenia co silver_clean_data.sql
+--  - fact_sale_quarantine i data_quality_log: tylko dopisywanie (historia zostaje), w kwarantannie także
+--    duplikaty z bronze.stg_sales_quarantine (dedupe_sales.py) z własnym watermarkiem
+-- Całość w jednej transakcji: błąd = brak wiersza w load_control = ten sam batch w następnym przebiegu.
+-- Fakty odrzucone wcześniej (np. brak gracza) nie są przeliczane, gdy gracz dojdzie później - do tego
+-- służy pełna przebudowa.
+
+-- STRUKTURY (idempotentnie, także dla bazy zbudowanej przed load_control)
+
+CREATE TABLE IF NOT EXISTS silver.load_control (
+    load_id SERIAL PRIMARY KEY,
+    source_table VARCHAR(100) NOT NULL,
+    load_mode VARCHAR(20) NOT NULL,
+    watermark_from TIMESTAMP,
+    watermark_to TIMESTAMP NOT NULL,
+    rows_read INTEGER,
+    rows_upserted INTEGER,
+    rows_quarantined INTEGER,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP DEFAULT CLOCK_TIMESTAMP(),
+    CONSTRAINT chk_load_mode CHECK (load_mode IN ('full', 'incremental'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_load_control_source ON silver.load_control(source_table, watermark_to);
+
+ALTER TABLE silver.data_quality_log ADD COLUMN IF NOT EXISTS load_id INTEGER;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_fact_sale_transaction ON silver.fact_sale(transaction_id);
+CREATE INDEX IF NOT EXISTS idx_stg_sales_loaded_at ON bronze.stg_sales(loaded_at);
+CREATE INDEX IF NOT EXISTS idx_stg_sales_quarantine_loaded_at ON bronze.stg_sales_quarantine(loaded_at);
+
+DO $$
+BEGIN
+    IF TO_REGPROCEDURE('silver.load_cutoff()') IS NULL THEN
+        RAISE EXCEPTION 'Brak silver.load_cutoff - uruchom raz silver_clean_data.sql';
+    END IF;
+END
+$$;
+
+BEGIN;
+
+-- WATERMARKI
+-- watermark_to nie sięga dalej niż silver.load_cutoff() (silver_clean_data.sql): start najstarszej
+-- otwartej transakcji innej sesji - COPY, które zatwierdzi się później, ma starsze loaded_at.
+
+CREATE TEMP TABLE load_window ON COMMIT DROP AS
+WITH cutoff AS (
+    SELECT silver.load_cutoff() AS ts
+),
+src AS (
+    SELECT 'stg_skins' AS source_table,
+           (SELECT MAX(loaded_at) FROM bronze.stg_skins, cutoff WHERE loaded_at < cutoff.ts) AS watermark_to
+    UNION ALL
+    SELECT 'stg_players',
+           (SELECT MAX(loaded_at) FROM bronze.stg_players, cutoff WHERE loaded_at < cutoff.ts)
+    UNION ALL
+    SELECT 'stg_sales',
+           (SELECT MAX(loaded_at) FROM bronze.stg_sales, cutoff WHERE loaded_at < cutoff.ts)
+    UNION ALL
+    SELECT 'stg_sales_quarantine',
+           (SELECT MAX(loaded_at) FROM bronze.stg_sales_quarantine, cutoff WHERE loaded_at < cutoff.ts)
+)
+SELECT
+    src.source_table,
+    COALESCE(last.watermark_to, '-infinity'::TIMESTAMP) AS watermark_from,
+    src.watermark_to
+FROM src
+LEFT JOIN LATERAL (
+    SELECT MAX(c.watermark_to) AS watermark_to
+    FROM silver.load_control c
+    WHERE c.source_table = src.source_table
+) last ON TRUE
+WHERE src.watermark_to > COALESCE(last.watermark_to, '-infinity'::TIMESTAMP);
+
+SELECT source_table, watermark_from, watermark_to FROM load_window ORDER BY source_table;
+
+-- DIM_SKIN (upsert, najnowsza wersja skina z okna)
+
+INSERT INTO silver.dim_skin (
+    skin_id, champion_name, skin_name, rarity, price_rp,
+    release_date, champion_id, skin_num, is_valid
+)
+SELECT DISTINCT ON (skin_id)
+    skin_id, TRIM(champion_name), TRIM(skin_name), rarity, price_rp,
+    release_date, champion_id, skin_num,
+    CASE
+        WHEN champion_name IS NULL OR TRIM(champion_name) = '' THEN FALSE
+        WHEN skin_name IS NULL OR TRIM(skin_name) = '' THEN FALSE
+        WHEN price_rp < 0 THEN FALSE
+        WHEN rarity NOT IN ('Default', 'Legacy', 'Epic', 'Legendary', 'Ultimate') THEN FALSE
+        ELSE TRUE
+    END
+FROM bronze.stg_skins
+WHERE skin_id IS NOT NULL
+  AND loaded_at > (SELECT watermark_from FROM load_window WHERE source_table = 'stg_skins')
+  AND loaded_at <= (SELECT watermark_to FROM load_window WHERE source_table = 'stg_skins')
+ORDER BY skin_id, loaded_at DESC
+ON CONFLICT (skin_id) DO UPDATE SET
+    champion_name = EXCLUDED.champion_name,
+    skin_name = EXCLUDED.skin_name,
+    rarity = EXCLUDED.rarity,
+    price_rp = EXCLUDED.price_rp,
+    release_date = EXCLUDED.release_date,
+    champion_id = EXCLUDED.champion_id,
+    skin_num = EXCLUDED.skin_num,
+    is_valid = EXCLUDED.is_valid;
+
+-- DIM_PLAYER (upsert)
+
+INSERT INTO silver.dim_player (
+    player_id, region, account_created_date, player_segment, account_age_days, is_valid
+)
+SELECT DISTINCT ON (player_id)
+    player_id, UPPER(TRIM(region)), account_created_date, LOWER(TRIM(player_segment)),
+    CURRENT_DATE - account_created_date,
+    CASE
+        WHEN player_id IS NULL THEN FALSE
+        WHEN region NOT IN ('EUW', 'EUNE', 'NA', 'KR') THEN FALSE
+        WHEN player_segment NOT IN ('casual', 'core', 'whale') THEN FALSE
+        WHEN account_created_date > CURRENT_DATE THEN FALSE
+        ELSE TRUE
+    END
+FROM bronze.stg_players
+WHERE player_id IS NOT NULL
+  AND loaded_at > (SELECT watermark_from FROM load_window WHERE source_table = 'stg_players')
+  AND loaded_at <= (SELECT watermark_to FROM load_window WHERE source_table = 'stg_players')
+ORDER BY player_id, loaded_at DESC
+ON CONFLICT (player_id) DO UPDATE SET
+    region = EXCLUDED.region,
+    account_created_date = EXCLUDED.account_created_date,
+    player_segment = EXCLUDED.player_segment,
+    account_age_days = EXCLUDED.account_age_days,
+    is_valid = EXCLUDED.is_valid;
+
+-- FACT_SALE BATCH
+-- Jeden SELECT zamiast Step 1-4 z silver_clean_data.sql (price_fixed, total, dq_issues, is_valid).
+
+CREATE TEMP TABLE sale_batch ON COMMIT DROP AS
+WITH src AS (
+    SELECT DISTINCT ON (transaction_id)
+        transaction_id, player_id, skin_id, purchase_date, price_rp, quantity
+    FROM bronze.stg_sales
+    WHERE transaction_id IS NOT NULL
+      AND loaded_at > (SELECT watermark_from FROM load_window WHERE source_table = 'stg_sales')
+      AND loaded_at <= (SELECT watermark_to FROM load_window WHERE source_table = 'stg_sales')
+    ORDER BY transaction_id, loaded_at DESC
+),
+joined AS (
+    SELECT
+        src.*,
+        p.player_key,
+        s.skin_key,
+        CASE
+            WHEN src.purchase_date ~ '^\d{4}-\d{2}-\d{2}$'
+            THEN TO_CHAR(src.purchase_date::DATE, 'YYYYMMDD')::INTEGER
+            ELSE NULL
+        END AS date_key,
+        -- Step 1: brakująca cena z dim_skin
+        (src.price_rp IS NULL AND src.quantity > 0 AND s.price_rp > 0) AS price_fixed,
+        COALESCE(src.price_rp, CASE WHEN src.quantity > 0 AND s.price_rp > 0 THEN s.price_rp END) AS clean_price_rp
+    FROM src
+    LEFT JOIN silver.dim_player p ON src.player_id::INTEGER = p.player_id
+    LEFT JOIN silver.dim_skin s ON src.skin_id::INTEGER = s.skin_id
+),
+checked AS (
+    SELECT
+        j.*,
+        j.clean_price_rp * j.quantity AS total_rp,
+        EXISTS (SELECT 1 FROM silver.dim_date d WHERE d.date_key = j.date_key) AS date_known
+    FROM joined j
+)
+SELECT
+    transaction_id,
+    player_id AS raw_player_id,
+    skin_id AS raw_skin_id,
+    purchase_date AS raw_purchase_date,
+    price_rp AS raw_price_rp,
+    quantity AS raw_quantity,
+    player_key,
+    skin_key,
+    date_key,
+    clean_price_rp AS price_rp,
+    quantity,
+    total_rp,
+    -- Step 4
+    (player_key IS NOT NULL AND skin_key IS NOT NULL AND clean_price_rp > 0 AND quantity > 0
+     AND total_rp = clean_price_rp * quantity AND date_known) AS is_valid,
+    -- Step 3 (pomijany po naprawie ceny, jak w pełnej przebudowie)
+    CASE
+        WHEN price_fixed THEN 'price_fixed'
+        ELSE TRIM(BOTH ',' FROM
+            CASE WHEN player_key IS NULL THEN 'missing_player,' ELSE '' END ||
+            CASE WHEN skin_key IS NULL THEN 'missing_skin,' ELSE '' END ||
+            CASE WHEN clean_price_rp IS NULL THEN 'missing_price,' ELSE '' END ||
+            CASE WHEN clean_price_rp < 0 THEN 'negative_price,' ELSE '' END ||
+            CASE WHEN quantity IS NULL THEN 'missing_quantity,' ELSE '' END ||
+            CASE WHEN quantity <= 0 THEN 'invalid_quantity,' ELSE '' END ||
+            CASE WHEN date_key IS NOT NULL AND NOT date_known THEN 'invalid_date,' ELSE '' END
+        )
+    END AS dq_issues
+FROM checked;
+
+-- FACT_SALE (upsert po transaction_id)
+
+INSERT INTO silver.fact_sale (
+    transaction_id, player_key, skin_key, date_key,
+    price_rp, quantity, total_rp, is_valid, dq_issues
+)
+SELECT
+    transaction_id, player_key, skin_key, date_key,
+    price_rp, quantity, total_rp, is_valid, dq_issues
+FROM sale_batch
+ON CONFLICT (transaction_id) DO UPDATE SET
+    player_key = EXCLUDED.player_key,
+    skin_key = EXCLUDED.skin_key,
+    date_key = EXCLUDED.date_key,
+    price_rp = EXCLUDED.price_rp,
+    quantity = EXCLUDED.quantity,
+    total_rp = EXCLUDED.total_rp,
+    is_valid = EXCLUDED.is_valid,
+    dq_issues = EXCLUDED.dq_issues;
+
+-- QUARANTINE (dopisywanie)
+
+INSERT INTO silver.fact_sale_quarantine (
+    transaction_id, player_id, skin_id, purchase_date,
+    price_rp, quantity, rejection_reason
+)
+SELECT
+    transaction_id::INTEGER,
+    raw_player_id::INTEGER,
+    raw_skin_id::INTEGER,
+    CASE
+        WHEN raw_purchase_date ~ '^\d{4}-\d{2}-\d{2}$'
+        THEN raw_purchase_date::DATE
+        ELSE NULL
+    END,
+    raw_price_rp::INTEGER,
+    raw_quantity::INTEGER,
+    dq_issues
+FROM sale_batch
+WHERE is_valid = FALSE;
+
+-- Duplikaty odrzucone przed bronze (dedupe_sales.py) z okna stg_sales_quarantine
+INSERT INTO silver.fact_sale_quarantine (
+    transaction_id, player_id, skin_id, purchase_date,
+    price_rp, quantity, rejection_reason
+)
+SELECT
+    transaction_id::INTEGER,
+    player_id::INTEGER,
+    skin_id::INTEGER,
+    CASE
+        WHEN purchase_date ~ '^\d{4}-\d{2}-\d{2}$'
+        THEN purchase_date::DATE
+        ELSE NULL
+    END,
+    price_rp::INTEGER,
+    quantity::INTEGER,
+    rejection_reason
+FROM bronze.stg_sales_quarantine
+WHERE loaded_at > (SELECT watermark_from FROM load_window WHERE source_table = 'stg_sales_quarantine')
+  AND loaded_at <= (SELECT watermark_to FROM load_window WHERE source_table = 'stg_sales_quarantine');
+
+-- LOAD CONTROL + MONITORING (procenty liczone dla batcha, wiersze log z load_id)
+
+INSERT INTO silver.load_control (source_table, load_mode, watermark_from, watermark_to, rows_read, rows_upserted, rows_quarantined)
+SELECT
+    w.source_table,
+    'incremental',
+    NULLIF(w.watermark_from, '-infinity'::TIMESTAMP),
+    w.watermark_to,
+    CASE w.source_table
+        WHEN 'stg_skins' THEN (SELECT COUNT(*) FROM bronze.stg_skins
+                               WHERE loaded_at > w.watermark_from AND loaded_at <= w.watermark_to)
+        WHEN 'stg_players' THEN (SELECT COUNT(*) FROM bronze.stg_players
+                                 WHERE loaded_at > w.watermark_from AND loaded_at <= w.watermark_to)
+        WHEN 'stg_sales_quarantine' THEN (SELECT COUNT(*) FROM bronze.stg_sales_quarantine
+                                          WHERE loaded_at > w.watermark_from AND loaded_at <= w.watermark_to)
+    END,
+    CASE w.source_table
+        WHEN 'stg_skins' THEN (SELECT COUNT(DISTINCT skin_id) FROM bronze.stg_skins
+                               WHERE loaded_at > w.watermark_from AND loaded_at <= w.watermark_to)
+        WHEN 'stg_players' THEN (SELECT COUNT(DISTINCT player_id) FROM bronze.stg_players
+                                 WHERE loaded_at > w.watermark_from AND loaded_at <= w.watermark_to)
+        WHEN 'stg_sales_quarantine' THEN 0
+    END,
+    CASE w.source_table
+        WHEN 'stg_sales_quarantine' THEN (SELECT COUNT(*) FROM bronze.stg_sales_quarantine
+                                          WHERE loaded_at > w.watermark_from AND loaded_at <= w.watermark_to)
+        ELSE 0
+    END
+FROM load_window w
+WHERE w.source_table IN ('stg_skins', 'stg_players', 'stg_sales_quarantine');
+
+DO $$
+DECLARE
+    v_load_id INTEGER;
+    v_total INTEGER;
+    v_count INTEGER;
+    v_pct NUMERIC;
+    v_threshold NUMERIC := 5.0;
+    v_check RECORD;
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM load_window WHERE source_table = 'stg_sales') THEN
+        RAISE NOTICE 'stg_sales: brak nowych wierszy od ostatniego watermarku';
+        RETURN;
+    END IF;
+
+    SELECT COUNT(*) INTO v_total FROM sale_batch;
+
+    INSERT INTO silver.load_control (source_table, load_mode, watermark_from, watermark_to,
+                                     rows_read, rows_upserted, rows_quarantined)
+    SELECT
+        'stg_sales', 'incremental', NULLIF(w.watermark_from, '-infinity'::TIMESTAMP), w.watermark_to,
+        (SELECT COUNT(*) FROM bronze.stg_sales
+         WHERE loaded_at > w.watermark_from AND loaded_at <= w.watermark_to),
+        v_total,
+        (SELECT COUNT(*) FROM sale_batch WHERE is_valid = FALSE)
+    FROM load_window w
+    WHERE w.source_table = 'stg_sales'
+    RETURNING load_id INTO v_load_id;
+
+    FOR v_check IN
+        SELECT 'missing_player' AS issue_type, COUNT(*) FILTER (WHERE player_key IS NULL) AS cnt FROM sale_batch
+        UNION ALL
+        SELECT 'missing_skin', COUNT(*) FILTER (WHERE skin_key IS NULL) FROM sale_batch
+        UNION ALL
+        SELECT 'invalid_price', COUNT(*) FILTER (WHERE price_rp <= 0 OR price_rp IS NULL) FROM sale_batch
+        UNION ALL
+        SELECT 'invalid_quantity', COUNT(*) FILTER (WHERE quantity <= 0 OR quantity IS NULL) FROM sale_batch
+        UNION ALL
+        SELECT 'total_invalid', COUNT(*) FILTER (WHERE is_valid = FALSE) FROM sale_batch
+    LOOP
+        v_count := v_check.cnt;
+        v_pct := ROUND((v_count::NUMERIC / NULLIF(v_total, 0) * 100), 2);
+        INSERT INTO silver.data_quality_log (load_id, table_name, issue_type, issue_count, issue_pct, threshold_pct, alert_triggered)
+        VALUES (v_load_id, 'fact_sale', v_check.issue_type, v_count, v_pct, v_threshold, v_pct > v_threshold);
+    END LOOP;
+END $$;
+
+COMMIT;
+
+-- REPORTS
+
+SELECT
+    load_id,
+    source_table,
+    load_mode,
+    watermark_from,
+    watermark_to,
+    rows_read,
+    rows_upserted,
+    rows_quarantined,
+    finished_at - started_at AS duration
+FROM silver.load_control
+ORDER BY load_id DESC
+LIMIT 6;
+
+SELECT
+    issue_type as "Check",
+    issue_count as "Count",
+    issue_pct as "% Error",
+    CASE WHEN alert_triggered THEN 'ALERT!' ELSE '✓ OK' END as "Status"
+FROM silver.data_quality_log
+WHERE load_id = (SELECT MAX(load_id) FROM silver.load_control WHERE source_table = 'stg_sales')
+ORDER BY issue_pct DESC;
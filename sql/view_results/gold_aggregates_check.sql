@@ -0,0 +1,79 @@
+-- GOLD AGGREGATES CHECK - tabele gold.agg_* vs widoki z gold_view.sql
+-- Dla każdej pary: wiersze tylko w widoku / tylko w tabeli (oba 0 = zgodne).
+
+WITH
+segment_live AS (
+    SELECT player_segment, year, month, month_name, transaction_count, total_revenue, avg_transaction, unique_players
+    FROM gold.revenue_by_segment_month
+),
+segment_agg AS (
+    SELECT player_segment, year, month, month_name, transaction_count, total_revenue, avg_transaction, unique_players
+    FROM gold.agg_revenue_by_segment_month
+),
+skins_live AS (
+    SELECT skin_id, champion_name, skin_name, rarity, price_rp, times_purchased, total_revenue, unique_buyers
+    FROM gold.top_selling_skins
+),
+skins_agg AS (
+    SELECT skin_id, champion_name, skin_name, rarity, price_rp, times_purchased, total_revenue, unique_buyers
+    FROM gold.agg_top_selling_skins
+),
+weekend_live AS (
+    SELECT day_type, transaction_count, total_revenue, avg_transaction
+    FROM gold.weekend_vs_weekday_sales
+),
+weekend_agg AS (
+    SELECT day_type, transaction_count, total_revenue, avg_transaction
+    FROM gold.agg_weekend_vs_weekday_sales
+),
+ltv_live AS (
+    SELECT player_key, player_id, player_segment, region, total_purchases, lifetime_value, avg_purchase_value,
+           first_purchase_date, last_purchase_date, purchase_span_days
+    FROM gold.player_lifetime_value
+),
+ltv_agg AS (
+    SELECT player_key, player_id, player_segment, region, total_purchases, lifetime_value, avg_purchase_value,
+           first_purchase_date, last_purchase_date, purchase_span_days
+    FROM gold.agg_player_lifetime_value
+),
+trends_live AS (
+    SELECT year, month, month_name, transactions, revenue, avg_transaction, active_players, revenue_per_player
+    FROM gold.revenue_trends
+),
+trends_agg AS (
+    SELECT year, month, month_name, transactions, revenue, avg_transaction, active_players, revenue_per_player
+    FROM gold.agg_revenue_trends
+),
+checks AS (
+    SELECT 'revenue_by_segment_month' AS view_name,
+           (SELECT COUNT(*) FROM segment_live) AS live_rows,
+           (SELECT COUNT(*) FROM (SELECT * FROM segment_live EXCEPT ALL SELECT * FROM segment_agg) x) AS only_in_view,
+           (SELECT COUNT(*) FROM (SELECT * FROM segment_agg EXCEPT ALL SELECT * FROM segment_live) x) AS only_in_agg
+    UNION ALL
+    SELECT 'top_selling_skins',
+           (SELECT COUNT(*) FROM skins_live),
+           (SELECT COUNT(*) FROM (SELECT * FROM skins_live EXCEPT ALL SELECT * FROM skins_agg) x),
+           (SELECT COUNT(*) FROM (SELECT * FROM skins_agg EXCEPT ALL SELECT * FROM skins_live) x)
+    UNION ALL
+    SELECT 'weekend_vs_weekday_sales',
+           (SELECT COUNT(*) FROM weekend_live),
+           (SELECT COUNT(*) FROM (SELECT * FROM weekend_live EXCEPT ALL SELECT * FROM weekend_agg) x),
+           (SELECT COUNT(*) FROM (SELECT * FROM weekend_agg EXCEPT ALL SELECT * FROM weekend_live) x)
+    UNION ALL
+    SELECT 'player_lifetime_value',
+           (SELECT COUNT(*) FROM ltv_live),
+           (SELECT COUNT(*) FROM (SELECT * FROM ltv_live EXCEPT ALL SELECT * FROM ltv_agg) x),
+           (SELECT COUNT(*) FROM (SELECT * FROM ltv_agg EXCEPT ALL SELECT * FROM ltv_live) x)
+    UNION ALL
+    SELECT 'revenue_trends',
+           (SELECT COUNT(*) FROM trends_live),
+           (SELECT COUNT(*) FROM (SELECT * FROM trends_live EXCEPT ALL SELECT * FROM trends_agg) x),
+           (SELECT COUNT(*) FROM (SELECT * FROM trends_agg EXCEPT ALL SELECT * FROM trends_live) x)
+)
+SELECT
+    view_name,
+    live_rows,
+    only_in_view,
+    only_in_agg,
+    CASE WHEN only_in_view = 0 AND only_in_agg = 0 THEN '✓ OK' ELSE 'MISMATCH!' END AS status
+FROM checks;
@@ -0,0 +1,117 @@
+-- GOLD SKETCH CHECK - szkice HLL (gold_sales_aggregates.sql) vs dokładne COUNT(DISTINCT) z widoków
+-- Dla każdej grupy: liczba porównań, średni i największy błąd względny vs oczekiwany (1.04 / sqrt(m)
+-- z gold.agg_hll_settings). Skrypt kończy się błędem (RAISE EXCEPTION), gdy:
+--   - któraś różnica przekracza 3x oczekiwany błąd (rozkład błędu HLL jest w przybliżeniu normalny)
+--     plus 2 graczy: przy kilkunastu graczach kolizja dwóch w jednym rejestrze to już kilka procent,
+--   - średni błąd względny wszystkich porównań przekracza oczekiwany błąd (szkic systematycznie
+--     zawyża albo zaniża - pojedyncze różnice mogą się jeszcze mieścić w 3x).
+
+DROP TABLE IF EXISTS pg_temp.hll_sketch_check;
+
+CREATE TEMP TABLE hll_sketch_check AS
+WITH
+settings AS (
+    SELECT hll_precision, relative_error FROM gold.agg_hll_settings
+),
+segment_month AS (
+    SELECT FORMAT('%s %s-%s', v.player_segment, v.year, LPAD(v.month::TEXT, 2, '0')) AS item,
+           v.unique_players AS exact, gold.hll_cardinality(h.sketch) AS estimate
+    FROM gold.revenue_by_segment_month v
+    JOIN gold.agg_month_player_hll h
+        ON h.player_segment = v.player_segment AND h.year = v.year AND h.month = v.month
+),
+month AS (
+    SELECT FORMAT('%s-%s', v.year, LPAD(v.month::TEXT, 2, '0')) AS item, v.active_players AS exact, h.estimate
+    FROM gold.revenue_trends v
+    JOIN (
+        SELECT year, month, gold.hll_cardinality(gold.hll_union_agg(sketch)) AS estimate
+        FROM gold.agg_month_player_hll
+        GROUP BY year, month
+    ) h ON h.year = v.year AND h.month = v.month
+),
+skin AS (
+    SELECT FORMAT('skin_id %s', v.skin_id) AS item, v.unique_buyers AS exact, gold.hll_cardinality(h.sketch) AS estimate
+    FROM gold.top_selling_skins v
+    JOIN gold.agg_skin_player_hll h ON h.skin_id = v.skin_id
+),
+-- Zakresy: każdy rok i cały okres (suma szkiców miesięcy)
+year_range AS (
+    SELECT FORMAT('%s .. %s', first_month, last_month) AS item,
+           gold.unique_players_exact(first_month, last_month) AS exact,
+           gold.unique_players_estimate(first_month, last_month) AS estimate
+    FROM (
+        SELECT MAKE_DATE(year, 1, 1) AS first_month, MAKE_DATE(year, 12, 1) AS last_month
+        FROM gold.agg_revenue_trends
+        GROUP BY year
+        UNION ALL
+        SELECT MIN(MAKE_DATE(year, month, 1)), MAX(MAKE_DATE(year, month, 1))
+        FROM gold.agg_revenue_trends
+    ) ranges
+),
+champion AS (
+    SELECT champion_name AS item,
+           gold.unique_buyers_exact(ARRAY_AGG(skin_id)) AS exact,
+           gold.unique_buyers_estimate(ARRAY_AGG(skin_id)) AS estimate
+    FROM gold.dim_skin
+    GROUP BY champion_name
+),
+checks AS (
+    SELECT 'segment x month' AS check_name, item, exact, estimate FROM segment_month
+    UNION ALL SELECT 'month (union of segments)', item, exact, estimate FROM month
+    UNION ALL SELECT 'skin', item, exact, estimate FROM skin
+    UNION ALL SELECT 'year / whole range', item, exact, estimate FROM year_range
+    UNION ALL SELECT 'champion (union of skins)', item, exact, estimate FROM champion
+)
+SELECT
+    c.check_name,
+    c.item,
+    c.exact,
+    c.estimate,
+    ABS(c.estimate - c.exact)::NUMERIC / NULLIF(c.exact, 0) AS relative_error,
+    s.relative_error AS expected_error,
+    ABS(c.estimate - c.exact) <= 3 * s.relative_error * c.exact + 2 AS within_bound
+FROM checks c
+CROSS JOIN settings s;
+
+SELECT
+    check_name,
+    COUNT(*) AS compared,
+    ROUND(AVG(relative_error) * 100, 2) AS mean_error_pct,
+    ROUND(MAX(relative_error) * 100, 2) AS max_error_pct,
+    ROUND(MAX(expected_error) * 100, 2) AS expected_error_pct,
+    CASE WHEN BOOL_AND(within_bound) THEN '✓ OK' ELSE 'ERROR ABOVE BOUND!' END AS status
+FROM hll_sketch_check
+GROUP BY check_name
+ORDER BY check_name;
+
+DO $$
+DECLARE
+    expected NUMERIC;
+    mean_error NUMERIC;
+    outside_bound INTEGER;
+    worst RECORD;
+BEGIN
+    SELECT MAX(expected_error), AVG(relative_error), COUNT(*) FILTER (WHERE NOT within_bound)
+    INTO expected, mean_error, outside_bound
+    FROM hll_sketch_check;
+
+    IF expected IS NULL THEN
+        RAISE EXCEPTION 'Szkice HLL: brak porównań - najpierw gold_sales_aggregates.sql';
+    END IF;
+    IF outside_bound > 0 THEN
+        SELECT check_name, item, exact, estimate INTO worst
+        FROM hll_sketch_check
+        WHERE NOT within_bound
+        ORDER BY relative_error DESC NULLS LAST
+        LIMIT 1;
+        RAISE EXCEPTION 'Szkice HLL: % porównań poza 3x błędem % %% (najgorsze: % %, dokładnie %, szkic %)',
+            outside_bound, ROUND(expected * 100, 2), worst.check_name, worst.item, worst.exact, worst.estimate;
+    END IF;
+    IF mean_error > expected THEN
+        RAISE EXCEPTION 'Szkice HLL: średni błąd względny % %% > oczekiwany % %%',
+            ROUND(mean_error * 100, 2), ROUND(expected * 100, 2);
+    END IF;
+    RAISE NOTICE 'Szkice HLL: błąd w granicach (średni % %%, oczekiwany % %%)',
+        ROUND(mean_error * 100, 2), ROUND(expected * 100, 2);
+END;
+$$;
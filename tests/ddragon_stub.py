@@ -0,0 +1,157 @@
+"""
+Lokalny stub Data Dragon z nagranymi odpowiedziami (tests/fixtures/ddragon).
+
+Serwuje /api/versions.json oraz /cdn/<wersja>/data/en_US/... - pliki z fixtures
+z polem "version" podmienionym na wersję z adresu, tak jak robi to prawdziwy
+Data Dragon przy każdym patchu. Odpowiada ETagiem (304 przy If-None-Match),
+liczy zapytania per ścieżka i potrafi zwrócić 503 zadaną liczbę razy.
+
+Ręcznie (np. dla fetch_ddragon_skins.py --base-url http://127.0.0.1:8000):
+    python tests/ddragon_stub.py --port 8000 --version 14.1.1
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "ddragon")
+
+CDN_PATH = re.compile(r"^/cdn/(?P<version>[^/]+)/data/en_US/(?P<name>[A-Za-z0-9_/]+)\.json$")
+
+
+class DDragonStub:
+    """Serwer w wątku w tle; `url` to adres bazowy dla DataDragonClient."""
+
+    def __init__(self, version=None, fixtures_dir=FIXTURES_DIR, port=0):
+        self.fixtures_dir = fixtures_dir
+        with open(os.path.join(fixtures_dir, "versions.json"), encoding="utf-8") as f:
+            self.versions = json.load(f)
+        if version:
+            self.release(version)
+
+        self.requests = Counter()   # ścieżka -> liczba zapytań
+        self.failures = Counter()   # ścieżka -> ile razy jeszcze odpowiedzieć 503
+        self.payloads = {}          # nazwa pliku -> podmieniony payload (zmiana championa)
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def release(self, version):
+        """Nowy patch - wersja trafia na początek versions.json."""
+        if version in self.versions:
+            self.versions.remove(version)
+        self.versions.insert(0, version)
+
+    def fail(self, path, times):
+        """Następne `times` zapytań o `path` dostaje 503."""
+        with self._lock:
+            self.failures[path] += times
+
+    def count(self, prefix=""):
+        with self._lock:
+            return sum(n for path, n in self.requests.items() if path.startswith(prefix))
+
+    def fixture(self, name):
+        if name in self.payloads:
+            return json.loads(json.dumps(self.payloads[name]))
+        path = os.path.join(self.fixtures_dir, f"{name}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _body(self, path):
+        if path == "/api/versions.json":
+            return self.versions
+
+        match = CDN_PATH.match(path)
+        if not match or match["version"] not in self.versions:
+            return None
+        payload = self.fixture(match["name"])
+        if payload is None:
+            return None
+
+        version = match["version"]
+        payload["version"] = version
+        for champ_data in payload["data"].values():
+            if "version" in champ_data:
+                champ_data["version"] = version
+        return payload
+
+    def _handle(self, handler):
+        path = handler.path
+        with self._lock:
+            self.requests[path] += 1
+            failing = self.failures[path] > 0
+            if failing:
+                self.failures[path] -= 1
+
+        if failing:
+            handler.send_response(503)
+            handler.send_header("Content-Length", "0")
+            handler.end_headers()
+            return
+
+        payload = self._body(path)
+        if payload is None:
+            handler.send_response(404)
+            handler.send_header("Content-Length", "0")
+            handler.end_headers()
+            return
+
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if handler.headers.get("If-None-Match") == etag:
+            handler.send_response(304)
+            handler.send_header("ETag", etag)
+            handler.end_headers()
+            return
+
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.send_header("ETag", etag)
+        handler.end_headers()
+        handler.wfile.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lokalny stub Data Dragon z nagranymi odpowiedziami")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--version", default=None,
+                        help="Bieżąca wersja w versions.json (domyślnie z fixtures)")
+    args = parser.parse_args()
+
+    with DDragonStub(args.version, port=args.port) as stub:
+        print(f"Data Dragon stub: {stub.url} (wersja {stub.versions[0]})")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+dedupe_sales.py: tryby exact i partitioned na małym fixture z kilkoma shardami.
+
+    python -m pytest -q tests
+"""
+import filecmp
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(TESTS_DIR), "data", "src_data")
+sys.path.insert(0, SRC_DIR)
+
+from dedupe_sales import BUSINESS_COLUMNS, DUPLICATE_REASON   # noqa: E402
+
+SHARDS = 3
+ROWS_PER_SHARD = 300
+DUPLICATES_PER_SHARD = 20
+OUTPUT_FILES = [f"fact_sales_part-{index:04d}.csv" for index in range(SHARDS)] + ["fact_sales_quarantine.csv"]
+
+
+def make_shards(seed=7):
+    """
+    Shardy fact_sales_part-NNNN: unikalne sprzedaże + wstrzyknięte duplikaty (nowy transaction_id)
+    wcześniejszych wierszy z tego samego lub poprzednich shardów. Zwraca (shardy, id duplikatów).
+    """
+    rng = np.random.default_rng(seed)
+    shards, injected = [], []
+    next_id = 1
+    for shard in range(SHARDS):
+        base = pd.DataFrame({
+            "transaction_id": np.arange(next_id, next_id + ROWS_PER_SHARD),
+            "player_id": rng.integers(1, 50, ROWS_PER_SHARD),
+            "skin_id": shard * ROWS_PER_SHARD + np.arange(ROWS_PER_SHARD),   # sprzedaże różne
+            "purchase_date": pd.date_range("2024-01-01", periods=ROWS_PER_SHARD).strftime("%Y-%m-%d"),
+            "price_rp": rng.choice([520, 975, 1350], ROWS_PER_SHARD).astype(float),
+            "quantity": 1,
+        })
+        base.loc[::50, "price_rp"] = np.nan      # puste wartości też są częścią odcisku
+        base.loc[::70, "purchase_date"] = None
+        next_id += ROWS_PER_SHARD
+
+        earlier = pd.concat(shards + [base], ignore_index=True)
+        copies = earlier.iloc[rng.choice(len(earlier), DUPLICATES_PER_SHARD, replace=False)].copy()
+        copies["transaction_id"] = np.arange(next_id, next_id + DUPLICATES_PER_SHARD)
+        next_id += DUPLICATES_PER_SHARD
+        injected.extend(copies["transaction_id"])
+
+        shards.append(pd.concat([base, copies], ignore_index=True))
+    return shards, injected
+
+
+def run_dedupe(input_dir, output_dir, mode):
+    command = [sys.executable, os.path.join(SRC_DIR, "dedupe_sales.py"), "--mode", mode,
+               "--input-dir", input_dir, "--output-dir", output_dir, "--partitions", "4", "--workers", "2"]
+    env = dict(os.environ, PIPELINE_METRICS=os.path.join(output_dir, "metrics.jsonl"))
+    subprocess.run(command, check=True, capture_output=True, env=env)
+
+
+class DedupeModesTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.input_dir = os.path.join(cls.tmp.name, "raw")
+        os.makedirs(cls.input_dir)
+        cls.shards, cls.injected = make_shards()
+        for index, shard in enumerate(cls.shards):
+            shard.to_csv(os.path.join(cls.input_dir, f"fact_sales_part-{index:04d}.csv"), index=False)
+
+        cls.output_dirs = {}
+        for mode in ["exact", "partitioned"]:
+            cls.output_dirs[mode] = os.path.join(cls.tmp.name, mode)
+            run_dedupe(cls.input_dir, cls.output_dirs[mode], mode)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_modes_identical(self):
+        for name in OUTPUT_FILES:
+            with self.subTest(name=name):
+                self.assertTrue(filecmp.cmp(os.path.join(self.output_dirs["exact"], name),
+                                            os.path.join(self.output_dirs["partitioned"], name), shallow=False))
+
+    def test_injected_duplicates_caught(self):
+        for mode, output_dir in self.output_dirs.items():
+            with self.subTest(mode=mode):
+                quarantine = pd.read_csv(os.path.join(output_dir, "fact_sales_quarantine.csv"))
+                self.assertEqual(sorted(quarantine["transaction_id"]), sorted(self.injected))
+                self.assertTrue((quarantine["rejection_reason"] == DUPLICATE_REASON).all())
+
+    def test_first_occurrence_kept(self):
+        everything = pd.concat(self.shards, ignore_index=True)
+        first = everything[~everything.duplicated(BUSINESS_COLUMNS)]
+        for mode, output_dir in self.output_dirs.items():
+            with self.subTest(mode=mode):
+                clean = pd.concat([
+                    pd.read_csv(os.path.join(output_dir, f"fact_sales_part-{index:04d}.csv"))
+                    for index in range(SHARDS)
+                ], ignore_index=True)
+                self.assertEqual(clean["transaction_id"].tolist(), first["transaction_id"].tolist())
+                self.assertFalse(clean.duplicated(BUSINESS_COLUMNS).any())
+
+
+if __name__ == "__main__":
+    unittest.main()
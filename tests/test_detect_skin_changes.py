@@ -0,0 +1,108 @@
+"""
+detect_skin_changes.py: row-hash diff i zatwierdzanie snapshotu.
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), "data", "src_data"))
+
+from detect_skin_changes import commit_snapshot, detect_changes, write_snapshot   # noqa: E402
+
+AS_OF = "2026-01-01"
+
+
+def skins(rows):
+    return pd.DataFrame(rows, columns=['skin_id', 'champion_name', 'skin_name', 'rarity', 'price_rp',
+                                       'release_date', 'champion_id', 'skin_num'])
+
+
+BASE = skins([
+    (1, "Aatrox", "Aatrox", "Default", 0, "2013-06-12", "Aatrox", 0),
+    (2, "Aatrox", "Justicar Aatrox", "Legacy", 975, "2013-06-12", "Aatrox", 1),
+    (3, "Ahri", "Popstar Ahri", "Epic", 1350, None, "Ahri", 1),
+])
+
+
+class DetectChangesTest(unittest.TestCase):
+
+    def setUp(self):
+        _, self.snapshot = detect_changes(BASE, pd.DataFrame(columns=['skin_id', 'row_hash']), AS_OF)
+
+    def by_type(self, changes):
+        return {change_type: sorted(group['skin_id'].tolist())
+                for change_type, group in changes.groupby('change_type')}
+
+    def test_first_run_inserts_everything(self):
+        changes, snapshot = detect_changes(BASE, pd.DataFrame(columns=['skin_id', 'row_hash']), AS_OF)
+        self.assertEqual(self.by_type(changes), {'insert': [1, 2, 3]})
+        self.assertEqual(snapshot['skin_id'].tolist(), [1, 2, 3])
+        self.assertTrue((changes['effective_date'] == AS_OF).all())
+
+    def test_unchanged(self):
+        changes, snapshot = detect_changes(BASE.iloc[::-1], self.snapshot, AS_OF)
+        self.assertTrue(changes.empty)
+        pd.testing.assert_frame_equal(snapshot, self.snapshot)
+
+    def test_insert_update_retire(self):
+        current = BASE[BASE['skin_id'] != 3].copy()
+        current.loc[current['skin_id'] == 2, 'price_rp'] = 750
+        current = pd.concat([current, skins([(4, "Ahri", "Arcade Ahri", "Legendary", 1820, None, "Ahri", 2)])])
+
+        changes, snapshot = detect_changes(current, self.snapshot, AS_OF)
+
+        self.assertEqual(self.by_type(changes), {'insert': [4], 'retire': [3], 'update': [2]})
+        update = changes[changes['skin_id'] == 2].iloc[0]
+        self.assertEqual(update['price_rp'], 750)
+        self.assertNotEqual(update['row_hash'], self.snapshot.set_index('skin_id').loc[2, 'row_hash'])
+        retire = changes[changes['skin_id'] == 3].iloc[0]
+        self.assertTrue(pd.isna(retire['skin_name']))
+        self.assertEqual(retire['row_hash'], self.snapshot.set_index('skin_id').loc[3, 'row_hash'])
+        self.assertEqual(snapshot['skin_id'].tolist(), [1, 2, 4])
+
+    def test_hash_ignores_non_hashed_columns(self):
+        current = BASE.copy()
+        current['champion_id'] = current['champion_id'].str.upper()
+        changes, _ = detect_changes(current, self.snapshot, AS_OF)
+        self.assertTrue(changes.empty)
+
+    def test_full(self):
+        changes, snapshot = detect_changes(BASE, self.snapshot, AS_OF, full=True)
+        self.assertEqual(self.by_type(changes), {'insert': [1, 2, 3]})
+        pd.testing.assert_frame_equal(snapshot, self.snapshot)
+
+
+class SnapshotCommitTest(unittest.TestCase):
+
+    def test_pending_snapshot_until_commit(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "dim_skins_snapshot.csv")
+            pending_path = os.path.join(tmp_dir, "dim_skins_snapshot.pending.csv")
+            _, applied = detect_changes(BASE, pd.DataFrame(columns=['skin_id', 'row_hash']), AS_OF)
+            write_snapshot(applied, path)
+
+            current = BASE.copy()
+            current.loc[current['skin_id'] == 1, 'rarity'] = 'Legacy'
+            changes, snapshot = detect_changes(current, pd.read_csv(path, dtype={'row_hash': str}), AS_OF)
+            write_snapshot(snapshot, pending_path)
+
+            # Load / SCD2 padł: ponowna detekcja liczy od nałożonego snapshotu, delta wraca
+            again, _ = detect_changes(current, pd.read_csv(path, dtype={'row_hash': str}), AS_OF)
+            pd.testing.assert_frame_equal(again, changes)
+            self.assertEqual(again['skin_id'].tolist(), [1])
+
+            self.assertTrue(commit_snapshot(pending_path, path))
+            self.assertFalse(os.path.exists(pending_path))
+            after, _ = detect_changes(current, pd.read_csv(path, dtype={'row_hash': str}), AS_OF)
+            self.assertTrue(after.empty)
+            self.assertFalse(commit_snapshot(pending_path, path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+fetch_ddragon_skins.py na lokalnym stubie Data Dragon (tests/ddragon_stub.py).
+
+    python -m pytest -q tests
+"""
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+import requests
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, TESTS_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), "data", "src_data"))
+
+from ddragon_stub import DDragonStub   # noqa: E402
+from fetch_ddragon_skins import (   # noqa: E402
+    DataDragonClient, DDragonCache, fetch_skins_bulk, fetch_skins_cached, fetch_skins_concurrent,
+    fetch_version_cached,
+)
+
+VERSION = "14.1.1"
+CDN = f"/cdn/{VERSION}/data/en_US"
+
+
+class FetchDDragonSkinsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.stub = DDragonStub().__enter__()
+        self.addCleanup(self.stub.__exit__, None, None, None)
+
+    def client(self, **kwargs):
+        # Bez backoffu - ponowienia w testach nie czekają
+        return DataDragonClient(self.stub.url, concurrency=4, timeout=5, backoff_factor=0, **kwargs)
+
+    def test_concurrent(self):
+        client = self.client()
+        version = client.version()
+        champion_ids = client.champion_ids(version)
+        rows = fetch_skins_concurrent(client, version, champion_ids, concurrency=4)
+
+        self.assertEqual(version, VERSION)
+        self.assertEqual(champion_ids, ["Aatrox", "Ahri"])
+        self.assertEqual(len(rows), 9)
+        self.assertEqual(rows[0], {"champion_id": "Aatrox", "champion_name": "Aatrox",
+                                   "skin_num": 0, "skin_name": "default"})
+        self.assertEqual(rows[-1]["skin_name"], "Popstar Ahri")
+        self.assertEqual(self.stub.count(f"{CDN}/champion/"), 2)
+        self.assertGreater(client.bytes_downloaded, 0)
+
+    def test_bulk(self):
+        client = self.client()
+        champion_ids = client.champion_ids(VERSION)
+        expected = fetch_skins_concurrent(client, VERSION, champion_ids)
+
+        rows = fetch_skins_bulk(client, VERSION)
+
+        self.assertEqual(rows, expected)
+        self.assertEqual(self.stub.count(f"{CDN}/championFull.json"), 1)
+        self.assertEqual(self.stub.count(f"{CDN}/champion/"), 2)   # tylko z expected
+
+    def test_retry_on_5xx(self):
+        self.stub.fail(f"{CDN}/champion/Ahri.json", 2)
+        client = self.client(max_retries=3)
+
+        rows = fetch_skins_concurrent(client, VERSION, ["Aatrox", "Ahri"])
+
+        self.assertEqual(len(rows), 9)
+        self.assertEqual(self.stub.count(f"{CDN}/champion/Ahri.json"), 3)
+        self.assertEqual(self.stub.count(f"{CDN}/champion/Aatrox.json"), 1)
+
+    def test_retry_exhausted(self):
+        self.stub.fail(f"{CDN}/championFull.json", 10)
+        client = self.client(max_retries=2)
+
+        with self.assertRaises(requests.exceptions.RetryError):
+            fetch_skins_bulk(client, VERSION)
+        self.assertEqual(self.stub.count(f"{CDN}/championFull.json"), 3)
+
+
+class DDragonCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.stub = DDragonStub().__enter__()
+        self.addCleanup(self.stub.__exit__, None, None, None)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_dir = tmp.name
+        self.client = DataDragonClient(self.stub.url, concurrency=4, timeout=5, backoff_factor=0)
+
+    def refresh(self, **kwargs):
+        cache = DDragonCache(self.cache_dir)
+        version = fetch_version_cached(self.client, cache)
+        before = self.stub.count()
+        rows, counters = fetch_skins_cached(self.client, cache, version, concurrency=4, **kwargs)
+        return version, rows, counters, self.stub.count() - before
+
+    def test_same_version_served_from_cache(self):
+        version, rows, counters, _ = self.refresh()
+        self.assertEqual(counters, {"cached": 0, "unchanged": 0, "changed": 2})
+        self.assertEqual(self.stub.count(f"/cdn/{version}/data/en_US/champion/"), 2)
+
+        _, cached_rows, counters, requests_made = self.refresh()
+        self.assertEqual(counters, {"cached": 2, "unchanged": 0, "changed": 0})
+        self.assertEqual(requests_made, 0)
+        self.assertEqual(cached_rows, rows)
+
+    def test_new_patch_only_changed_champions(self):
+        _, rows, _, _ = self.refresh()
+
+        # Nowy patch z identycznymi skinami: jeden championFull.json, nic do zapisania
+        self.stub.release("14.2.1")
+        version, patch_rows, counters, requests_made = self.refresh()
+        self.assertEqual(version, "14.2.1")
+        self.assertEqual(counters, {"cached": 0, "unchanged": 2, "changed": 0})
+        self.assertEqual(requests_made, 2)   # champion.json + championFull.json
+        self.assertEqual(self.stub.count("/cdn/14.2.1/data/en_US/champion/"), 0)
+        self.assertEqual(patch_rows, rows)
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, "14.2.1", "champion")))
+
+        # Kolejny patch: Ahri dostaje nowego skina
+        full = self.stub.fixture("championFull")
+        full["data"]["Ahri"]["skins"].append({"id": "103005", "num": 5, "name": "Arcade Ahri", "chromas": False})
+        self.stub.payloads["championFull"] = full
+        self.stub.release("14.3.1")
+        _, patch_rows, counters, _ = self.refresh()
+        self.assertEqual(counters, {"cached": 0, "unchanged": 1, "changed": 1})
+        self.assertEqual(patch_rows[-1]["skin_name"], "Arcade Ahri")
+        self.assertEqual(os.listdir(os.path.join(self.cache_dir, "14.3.1", "champion")), ["Ahri.json"])
+
+        with open(os.path.join(self.cache_dir, "index.json"), encoding="utf-8") as f:
+            index = json.load(f)
+        self.assertEqual(index["champions"]["Aatrox"]["version"], "14.1.1")
+        self.assertEqual(index["champions"]["Aatrox"]["checked"], "14.3.1")
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, "14.2.1")))
+
+    def test_revalidate_not_modified(self):
+        self.refresh()
+        _, _, counters, requests_made = self.refresh(revalidate=True)
+        self.assertEqual(counters, {"cached": 0, "unchanged": 2, "changed": 0})
+        self.assertEqual(requests_made, 2)   # 2 x 304
+
+
+if __name__ == "__main__":
+    unittest.main()
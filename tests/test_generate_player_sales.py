@@ -0,0 +1,181 @@
+"""
+generate_player_sales.py: losowanie skinów po dacie premiery (SkinSamplingIndex)
+i deterministyczne shardy fact_sales (ten sam seed i liczba shardów = te same pliki).
+
+    python -m pytest -q tests
+"""
+import filecmp
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), "data", "src_data"))
+
+import generate_player_sales   # noqa: E402
+from generate_player_sales import (   # noqa: E402
+    PRIMARY_BUCKET, SEGMENT_BUCKET_WEIGHTS, SEGMENTS, SkinSamplingIndex, generate_fact_sales, price_buckets,
+)
+
+SAMPLES = 200_000
+
+
+def days(values):
+    return np.asarray(values, dtype="datetime64[D]")
+
+
+def catalog(rng, size, undated):
+    """Losowy katalog: ceny z trzech koszyków, premiery 2012-2025, `undated` skinów bez daty."""
+    prices = rng.choice([520, 750, 975, 1350, 1820, 3250], size)
+    release = np.datetime64("2012-01-01") + rng.integers(0, 14 * 365, size)
+    release_dates = release.astype(str).astype(object)
+    release_dates[rng.choice(size, undated, replace=False)] = None
+    return prices, release_dates
+
+
+class SkinSamplingIndexTest(unittest.TestCase):
+
+    def sample(self, index, purchase_dates, seed=0):
+        segment_code = np.arange(len(purchase_dates)) % len(SEGMENTS)
+        return index.sample(np.random.default_rng(seed), segment_code, purchase_dates)
+
+    def test_never_before_release(self):
+        rng = np.random.default_rng(1)
+        for undated in [0, 5]:
+            with self.subTest(undated=undated):
+                prices, release_dates = catalog(rng, 500, undated)
+                index = SkinSamplingIndex(prices, release_dates)
+                release = release_dates.astype("datetime64[D]")
+
+                # Od pierwszej premiery wzwyż (wcześniejsze daty - test niżej)
+                purchase = np.nanmin(release) + rng.integers(0, 15 * 365, 20_000)
+                skin_idx = self.sample(index, purchase)
+                sampled = release[skin_idx]
+                self.assertFalse((sampled > purchase).any())
+                if undated:
+                    self.assertTrue(np.isnat(sampled).any())
+
+    def test_released_on_purchase_day(self):
+        index = SkinSamplingIndex([975, 975, 975], ["2020-01-01", "2020-01-02", "2020-01-03"])
+        skin_idx = self.sample(index, days(["2020-01-02"] * 1000))
+        self.assertEqual(set(skin_idx.tolist()), {0, 1})
+
+    def test_before_first_release_only_undated(self):
+        prices = [520, 975, 1820, 1350, 750]
+        release_dates = ["2015-05-01", None, "2013-01-01", None, "2013-01-01"]
+        index = SkinSamplingIndex(prices, release_dates)
+
+        skin_idx = self.sample(index, days(["2012-12-31", "2000-01-01"] * 3000))
+        self.assertEqual(set(skin_idx.tolist()), {1, 3})
+
+    def test_before_first_release_clamped_without_undated(self):
+        prices = [520, 975, 1820, 1350]
+        release_dates = ["2015-05-01", "2013-01-01", "2013-01-01", "2014-01-01"]
+        index = SkinSamplingIndex(prices, release_dates)
+
+        # Tylko skiny z dnia pierwszej premiery, nigdy jeszcze niewydane
+        skin_idx = self.sample(index, days(["2012-12-31", "2000-01-01"] * 3000))
+        self.assertEqual(set(skin_idx.tolist()), {1, 2})
+
+    def test_segment_weights(self):
+        # Po jednym skinie na koszyk, wszystkie wydane: udział = waga koszyka segmentu
+        prices = np.array([520, 975, 1820])
+        index = SkinSamplingIndex(prices, ["2013-01-01"] * 3)
+        purchase = days(["2020-01-01"] * SAMPLES)
+        for code, segment in enumerate(SEGMENTS):
+            with self.subTest(segment=segment):
+                skin_idx = index.sample(np.random.default_rng(code), np.full(SAMPLES, code), purchase)
+                shares = np.bincount(price_buckets(prices[skin_idx]), minlength=3) / SAMPLES
+                weights = np.asarray(SEGMENT_BUCKET_WEIGHTS[segment], dtype=np.float64)
+                np.testing.assert_allclose(shares, weights / weights.sum(), atol=0.01)
+
+    def test_segment_weights_per_skin(self):
+        # Waga koszyka jest na skin: koszyk z trzema skinami ma trzy razy większy udział
+        prices = np.array([520, 520, 520, 975, 1820])
+        index = SkinSamplingIndex(prices, [None] * 5)
+        code = SEGMENTS.index("whale")
+        skin_idx = index.sample(np.random.default_rng(3), np.full(SAMPLES, code), days(["2020-01-01"] * SAMPLES))
+
+        weights = np.asarray(SEGMENT_BUCKET_WEIGHTS["whale"], dtype=np.float64)[price_buckets(prices)]
+        np.testing.assert_allclose(np.bincount(skin_idx, minlength=5) / SAMPLES, weights / weights.sum(),
+                                   atol=0.01)
+
+    def test_missing_primary_bucket_uniform(self):
+        # Whale bez drogich skinów: wszystkie skiny po równo; casual (tanie są) - wagi koszyków
+        prices = np.array([520, 975])
+        self.assertEqual(PRIMARY_BUCKET["whale"], 2)
+        index = SkinSamplingIndex(prices, [None, None])
+        purchase = days(["2020-01-01"] * SAMPLES)
+
+        whale = index.sample(np.random.default_rng(4), np.full(SAMPLES, SEGMENTS.index("whale")), purchase)
+        np.testing.assert_allclose(np.bincount(whale, minlength=2) / SAMPLES, [0.5, 0.5], atol=0.01)
+
+        casual = index.sample(np.random.default_rng(5), np.full(SAMPLES, SEGMENTS.index("casual")), purchase)
+        np.testing.assert_allclose(np.bincount(casual, minlength=2) / SAMPLES, [5 / 9, 4 / 9], atol=0.01)
+
+
+class ShardDeterminismTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp_dir = tmp.name
+
+        rng = np.random.default_rng(11)
+        prices, release_dates = catalog(rng, 80, undated=3)
+        num_players = 300
+        self.context = {
+            "player_ids": np.arange(1, num_players + 1),
+            "player_segment_codes": rng.integers(0, len(SEGMENTS), num_players).astype(np.int8),
+            "skin_ids": np.arange(1, len(prices) + 1),
+            "skin_prices": prices,
+            "skin_release_dates": release_dates,
+            "today": np.datetime64("2025-06-30"),
+            "chunk_size": 700,          # kilka paczek na shard
+            "output_format": "both",
+            "copy_to_bronze": False,
+        }
+
+    def generate(self, name, seed, workers, shards=2):
+        raw_dir = os.path.join(self.tmp_dir, name)
+        os.makedirs(raw_dir)
+        with mock.patch.object(generate_player_sales, "DATA_RAW_DIR", raw_dir):
+            stats = generate_fact_sales(np.random.SeedSequence(seed), 5_000, shards, workers, self.context)
+        return raw_dir, stats
+
+    def test_same_files_for_any_workers(self):
+        one_dir, one_stats = self.generate("workers-1", seed=42, workers=1)
+        two_dir, two_stats = self.generate("workers-2", seed=42, workers=2)
+
+        names = sorted(os.listdir(one_dir))
+        self.assertEqual(names, [f"fact_sales_part-{i:04d}.{ext}" for i in range(2) for ext in ["csv", "parquet"]])
+        self.assertEqual(sorted(os.listdir(two_dir)), names)
+        _, mismatch, errors = filecmp.cmpfiles(one_dir, two_dir, names, shallow=False)
+        self.assertEqual((mismatch, errors), ([], []))
+
+        self.assertEqual(one_stats.rows, 5_000 + 50)
+        self.assertEqual((two_stats.rows, two_stats.error_log, two_stats.price_counts),
+                         (one_stats.rows, one_stats.error_log, one_stats.price_counts))
+
+    def test_shards_cover_transaction_ids(self):
+        raw_dir, _ = self.generate("ids", seed=42, workers=2)
+        ids = np.concatenate([
+            np.loadtxt(os.path.join(raw_dir, f"fact_sales_part-{i:04d}.csv"), delimiter=",", skiprows=1,
+                       usecols=0, dtype=np.int64)
+            for i in range(2)
+        ])
+        np.testing.assert_array_equal(np.sort(ids), np.arange(1, 5_000 + 50 + 1))
+
+    def test_other_seed_other_files(self):
+        first_dir, _ = self.generate("seed-42", seed=42, workers=2)
+        other_dir, _ = self.generate("seed-43", seed=43, workers=2)
+        self.assertFalse(filecmp.cmp(os.path.join(first_dir, "fact_sales_part-0000.csv"),
+                                     os.path.join(other_dir, "fact_sales_part-0000.csv"), shallow=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
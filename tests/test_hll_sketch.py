@@ -0,0 +1,147 @@
+"""
+Szkice HLL z gold_sales_aggregates.sql odtworzone w Pythonie: rejestr i ranga z md5
+(gold.hll_register), estymator (gold.hll_cardinality) i granica błędu, którą sprawdza
+sql/view_results/gold_sketch_check.sql. Porównanie z funkcją w Postgresie tylko z TEST_DSN.
+
+    python -m pytest -q tests
+"""
+import hashlib
+import math
+import os
+import re
+import unittest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AGGREGATES_SQL = os.path.join(REPO_DIR, "sql", "gold", "gold_sales_aggregates.sql")
+
+TEST_DSN = os.environ.get("TEST_DSN")
+DEFAULT_PRECISION = 12
+
+HLL_REGISTER = re.compile(r"CREATE OR REPLACE FUNCTION gold\.hll_register\(.*?\n\$fn\$;\n", re.DOTALL)
+
+
+def hll_register(key, hll_precision):
+    """gold.hll_register: 32 bity md5 -> rejestr, kolejne 64 bity -> pozycja pierwszej jedynki (65 = same zera)."""
+    h = hashlib.md5(str(key).encode()).hexdigest()
+    bits = int(h[8:24], 16)
+    return int(h[:8], 16) & ((1 << hll_precision) - 1), 65 - bits.bit_length() if bits else 65
+
+
+def hll_sketch(keys, hll_precision):
+    sketch = [0] * (1 << hll_precision)
+    for key in keys:
+        register, rank = hll_register(key, hll_precision)
+        sketch[register] = max(sketch[register], rank)
+    return sketch
+
+
+def hll_cardinality(sketch):
+    """gold.hll_cardinality: estymator HLL, liczenie liniowe dla wyniku <= 2.5 m przy pustych rejestrach."""
+    m = len(sketch)
+    zeros = sketch.count(0)
+    raw_estimate = 0.7213 / (1 + 1.079 / m) * m * m / sum(2.0 ** -rank for rank in sketch)
+    if raw_estimate <= 2.5 * m and zeros > 0:
+        return round(m * math.log(m / zeros))
+    return round(raw_estimate)
+
+
+def relative_error(hll_precision):
+    """gold.agg_hll_settings.relative_error"""
+    return round(1.04 / math.sqrt(2 ** hll_precision), 4)
+
+
+def read_register_sql():
+    with open(AGGREGATES_SQL, encoding="utf-8") as f:
+        return HLL_REGISTER.search(f.read()).group(0)
+
+
+class HllRegisterTest(unittest.TestCase):
+
+    def test_mirrors_sql(self):
+        # Zmiana haszu w SQL musi pójść w parze z hll_register powyżej
+        sql = read_register_sql()
+        for expression in ["MD5(key::TEXT)", "SUBSTR(h, 1, 8))::BIT(32)::INTEGER & ((1 << hll_precision) - 1)",
+                           "SUBSTR(h, 9, 16))::BIT(64)::TEXT), 0), 65)"]:
+            self.assertIn(expression, sql)
+
+    def test_known_key(self):
+        # md5('1') = c4ca4238 a0b92382 0dcc509a 6f75849b
+        self.assertEqual(hll_register(1, 12), (0x238, 1))
+        self.assertEqual(hll_register(1, 16), (0x4238, 1))
+
+    def test_registers_and_ranks(self):
+        for hll_precision in [7, DEFAULT_PRECISION, 16]:
+            with self.subTest(hll_precision=hll_precision):
+                pairs = [hll_register(key, hll_precision) for key in range(1, 20_001)]
+                registers = {register for register, _ in pairs}
+                self.assertTrue(all(0 <= register < 1 << hll_precision for register in registers))
+                if hll_precision == 7:
+                    self.assertEqual(len(registers), 1 << hll_precision)
+
+                # Ranga ~ rozkład geometryczny: połowa kluczy 1, ćwiartka 2, ...
+                ranks = [rank for _, rank in pairs]
+                self.assertTrue(all(1 <= rank <= 65 for rank in ranks))
+                for rank in [1, 2, 3]:
+                    share = ranks.count(rank) / len(ranks)
+                    self.assertAlmostEqual(share, 0.5 ** rank, delta=0.02)
+
+    def test_register_independent_of_precision(self):
+        # Wyższa precyzja = te same młodsze bity plus kolejne
+        for key in range(1, 200):
+            self.assertEqual(hll_register(key, 16)[0] & 0xFFF, hll_register(key, 12)[0])
+            self.assertEqual(hll_register(key, 16)[1], hll_register(key, 12)[1])
+
+
+class HllErrorBoundTest(unittest.TestCase):
+    """Granice z gold_sketch_check.sql przy domyślnej precyzji."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.results = []
+        first_key = 1
+        for size in [10, 50, 200, 1_000, 3_000, 8_000, 15_000, 30_000]:
+            for _ in range(2):
+                keys = range(first_key, first_key + size)
+                cls.results.append((size, hll_cardinality(hll_sketch(keys, DEFAULT_PRECISION))))
+                first_key += size
+
+    def test_each_estimate_within_bound(self):
+        expected = relative_error(DEFAULT_PRECISION)
+        for exact, estimate in self.results:
+            with self.subTest(exact=exact):
+                self.assertLessEqual(abs(estimate - exact), 3 * expected * exact + 2)
+
+    def test_mean_error_below_expected(self):
+        mean_error = sum(abs(estimate - exact) / exact for exact, estimate in self.results) / len(self.results)
+        self.assertLess(mean_error, relative_error(DEFAULT_PRECISION))
+
+    def test_union_is_register_max(self):
+        left = hll_sketch(range(1, 3_001), DEFAULT_PRECISION)
+        right = hll_sketch(range(2_001, 6_001), DEFAULT_PRECISION)
+        union = [max(a, b) for a, b in zip(left, right)]
+        self.assertEqual(union, hll_sketch(range(1, 6_001), DEFAULT_PRECISION))
+
+    def test_empty_sketch(self):
+        self.assertEqual(hll_cardinality([0] * (1 << DEFAULT_PRECISION)), 0)
+
+
+@unittest.skipUnless(TEST_DSN, "ustaw TEST_DSN (jednorazowa baza Postgres)")
+class HllRegisterPostgresTest(unittest.TestCase):
+
+    def test_same_as_sql(self):
+        import psycopg
+
+        keys = [1, 2, 42, 5_000, 123_456_789, 2**40 + 7]
+        with psycopg.connect(TEST_DSN) as conn:
+            conn.execute("CREATE SCHEMA IF NOT EXISTS gold")
+            conn.execute(read_register_sql())
+            for hll_precision in [7, DEFAULT_PRECISION, 16]:
+                rows = conn.execute(
+                    "SELECT (gold.hll_register(key, %s)).* FROM UNNEST(%s::BIGINT[]) AS key",
+                    (hll_precision, keys),
+                ).fetchall()
+                self.assertEqual(rows, [hll_register(key, hll_precision) for key in keys])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+"""
+load_bronze.py: rozwijanie \\ir (bez bazy) i COPY do bronze (wymaga Postgresa).
+
+Testy z bazą są pomijane bez zmiennej TEST_DSN. Baza musi być jednorazowa -
+setUpClass odtwarza w niej tabele bronze z sql/bronze/create_tables_for_raw_data.sql.
+
+    TEST_DSN="postgresql://postgres@localhost/lol_dw_test" python -m pytest -q tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, "data", "src_data"))
+
+from load_bronze import BronzeCopyWriter, connect, copy_file, load_bronze, read_sql, sql_files   # noqa: E402
+from raw_writers import write_frame   # noqa: E402
+
+TEST_DSN = os.environ.get("TEST_DSN")
+BRONZE_DDL = os.path.join(REPO_DIR, "sql", "bronze", "create_tables_for_raw_data.sql")
+
+PLAYERS = pd.DataFrame({
+    "player_id": [1, 2, 3],
+    "region": ["EUW", "NA", "EUW"],
+    "account_created_date": ["2020-01-01", "2021-06-15", None],
+    "player_segment": ["whale", "casual", "casual"],
+})
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+class ReadSqlTest(unittest.TestCase):
+
+    def test_includes_inlined_recursively(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            main = os.path.join(tmp_dir, "main.sql")
+            write(main, "SELECT 1;\n\\ir part.sql\nSELECT 3;\n")
+            write(os.path.join(tmp_dir, "part.sql"), "SELECT 2;\n\\ir sub/leaf.sql\n")
+            write(os.path.join(tmp_dir, "sub", "leaf.sql"), "SELECT 'leaf';")
+
+            self.assertEqual(read_sql(main), "SELECT 1;\nSELECT 2;\nSELECT 'leaf';\nSELECT 3;\n")
+            self.assertEqual(sql_files(main), [
+                main, os.path.join(tmp_dir, "part.sql"), os.path.join(tmp_dir, "sub", "leaf.sql"),
+            ])
+
+    def test_only_whole_line_includes(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            main = os.path.join(tmp_dir, "main.sql")
+            write(main, "-- \\ir part.sql w komentarzu zostaje\nSELECT '\\ir x';\n")
+            self.assertEqual(read_sql(main), "-- \\ir part.sql w komentarzu zostaje\nSELECT '\\ir x';\n")
+
+    def test_single_scan_inlined(self):
+        path = os.path.join(REPO_DIR, "sql", "silver", "silver_clean_data_single_scan.sql")
+        sql = read_sql(path)
+        self.assertNotRegex(sql, r"(?m)^\\ir\s")
+        for name in ["silver_build_dimensions.sql", "silver_build_finish.sql"]:
+            with open(os.path.join(os.path.dirname(path), name), encoding="utf-8") as f:
+                self.assertIn(f.read(), sql)
+
+
+@unittest.skipUnless(TEST_DSN, "ustaw TEST_DSN (jednorazowa baza Postgres)")
+class CopyToBronzeTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with connect(TEST_DSN) as conn:
+            conn.execute("CREATE SCHEMA IF NOT EXISTS bronze")
+            conn.execute(read_sql(BRONZE_DDL))
+
+    def setUp(self):
+        self.truncate()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.raw_dir = tmp.name
+        self.paths = write_frame(PLAYERS, os.path.join(self.raw_dir, "dim_player"), "dim_player", "both")
+
+    def truncate(self):
+        with connect(TEST_DSN) as conn:
+            conn.execute("TRUNCATE bronze.stg_players")
+
+    def count(self):
+        with connect(TEST_DSN) as conn:
+            return conn.execute("SELECT COUNT(*) FROM bronze.stg_players").fetchone()[0]
+
+    def test_copy_file_rows(self):
+        for path in self.paths:
+            with self.subTest(path=os.path.basename(path)):
+                self.truncate()
+                table, copied_path, rows, started, finished = copy_file("stg_players", path, TEST_DSN)
+                self.assertEqual((table, copied_path, rows), ("stg_players", path, len(PLAYERS)))
+                self.assertLessEqual(started, finished)
+                self.assertEqual(self.count(), len(PLAYERS))
+
+    def test_csv_and_parquet_load_same_rows(self):
+        query = ("SELECT player_id, region, account_created_date, player_segment "
+                 "FROM bronze.stg_players ORDER BY player_id")
+        loaded = []
+        for path in self.paths:
+            self.truncate()
+            copy_file("stg_players", path, TEST_DSN)
+            with connect(TEST_DSN) as conn:
+                loaded.append(conn.execute(query).fetchall())
+        self.assertEqual(loaded[0], loaded[1])
+        self.assertIsNone(loaded[0][2][2])
+
+    def test_truncate(self):
+        for input_format in ["csv", "parquet"]:
+            with self.subTest(input_format=input_format):
+                load_bronze(["stg_players"], input_format, jobs=1, truncate=True,
+                            dsn=TEST_DSN, raw_dir=self.raw_dir)
+                summary = load_bronze(["stg_players"], input_format, jobs=1, truncate=True,
+                                      dsn=TEST_DSN, raw_dir=self.raw_dir)
+                self.assertEqual(summary["stg_players"][0], len(PLAYERS))
+                self.assertEqual(self.count(), len(PLAYERS))
+
+        load_bronze(["stg_players"], "csv", jobs=1, dsn=TEST_DSN, raw_dir=self.raw_dir)
+        self.assertEqual(self.count(), 2 * len(PLAYERS))
+
+    def test_writer_close_commits(self):
+        with BronzeCopyWriter("stg_players", TEST_DSN) as writer:
+            writer.write(PLAYERS)
+            writer.write(PLAYERS.iloc[:1])
+        self.assertEqual(writer.rows, len(PLAYERS) + 1)
+        self.assertEqual(self.count(), len(PLAYERS) + 1)
+
+    def test_writer_abort_rolls_back(self):
+        with self.assertRaises(ValueError):
+            with BronzeCopyWriter("stg_players", TEST_DSN) as writer:
+                writer.write(PLAYERS)
+                raise ValueError("generator padł w połowie")
+        self.assertEqual(writer.rows, len(PLAYERS))
+        self.assertEqual(self.count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+lua_table.py na małych literałach Lua (format Module:SkinData).
+
+    python -m pytest -q tests
+"""
+import gc
+import os
+import sys
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), "data", "src_data"))
+
+import lua_table   # noqa: E402
+from lua_table import LuaParseError   # noqa: E402
+
+SKINDATA = b"""-- <pre>
+return {
+  ["Aatrox"] = {
+    ["id"] = 266,
+    ["skins"] = {
+      ["Original"] = {
+        ["id"] = 0,
+        ["cost"] = 880,
+        ["release"] = "2013-06-12",
+        ["voiceactor"] = {"Ramon Tikaram"},
+        ["chromas"] = {
+          ["Ruby"] = {["id"] = 1, ["availability"] = "Available"},
+        },
+      },
+      ["Justicar"] = {
+        ["id"] = 1,
+        ["cost"] = "N/A",\t--just a filler value
+        --["set"] = {"Legacy"},
+        ["filter"] = true,
+        ["ratio"] = -0.5,
+        ["removed"] = nil,
+      },
+    },
+  },
+}
+-- </pre>
+"""
+
+
+class LuaTableTest(unittest.TestCase):
+
+    def test_nested_tables(self):
+        tree = lua_table.parse(SKINDATA)
+        original = tree["Aatrox"]["skins"]["Original"]
+
+        self.assertEqual(tree["Aatrox"]["id"], 266)
+        self.assertEqual(original["voiceactor"], ["Ramon Tikaram"])
+        self.assertEqual(original["chromas"], {"Ruby": {"id": 1, "availability": "Available"}})
+        self.assertEqual(tree["Aatrox"]["skins"]["Justicar"],
+                         {"id": 1, "cost": "N/A", "filter": True, "ratio": -0.5, "removed": None})
+
+    def test_chunk_boundaries(self):
+        expected = lua_table.parse(SKINDATA)
+        for chunk_size in (1, 7, 64):
+            with self.subTest(chunk_size=chunk_size):
+                tokens = lua_table.tokenize(SKINDATA, chunk_size=chunk_size)
+                self.assertEqual(lua_table._parse_tokens(tokens), expected)
+
+    def test_escapes(self):
+        tree = lua_table.parse(rb'return { ["a \"b\""] = "line\nnext \\ \"q\" \'s\'", ["c"] = "" }')
+        self.assertEqual(tree, {'a "b"': "line\nnext \\ \"q\" 's'", "c": ""})
+
+    def test_comments(self):
+        tree = lua_table.parse(b'-- header\nreturn { -- after brace\n  a = 1, -- trailing\n  --b = 2,\n}\n-- footer')
+        self.assertEqual(tree, {"a": 1})
+
+    def test_lists_and_mixed_tables(self):
+        self.assertEqual(lua_table.parse(b'{"a", "b"; 3}'), ["a", "b", 3])
+        self.assertEqual(lua_table.parse(b'{}'), {})
+        self.assertEqual(lua_table.parse(b'{"x", name = "y", "z"}'), {"name": "y", 1: "x", 2: "z"})
+        self.assertEqual(lua_table.parse(b'{{1}, {2, {}}}'), [[1], [2, {}]])
+
+    def test_identifier_values(self):
+        # Identyfikator kończący się cyfrą to nie liczba
+        for source in [b'return { a = abc1 }', b'return { ["x"] = v2 }', b'return { ["x"] = _ }']:
+            with self.subTest(source=source):
+                with self.assertRaises(LuaParseError):
+                    lua_table.parse(source)
+
+    def test_truncated_input(self):
+        for source in [SKINDATA[:len(SKINDATA) // 2], b'return { ["a"] = ', b'return {', b'return', b'']:
+            with self.subTest(source=source[-20:]):
+                with self.assertRaises(LuaParseError):
+                    lua_table.parse(source)
+
+    def test_invalid_input(self):
+        for source in [b'{ a = 1 } }', b'{ a = 1 } x', b'{ ["a"] }', b'{ @ }', b'"a"']:
+            with self.subTest(source=source):
+                with self.assertRaises(LuaParseError):
+                    lua_table.parse(source)
+
+    def test_gc_restored(self):
+        frozen = gc.get_freeze_count()
+        lua_table.parse(SKINDATA)
+        self.assertTrue(gc.isenabled())
+        self.assertEqual(gc.get_freeze_count(), frozen)
+
+
+if __name__ == "__main__":
+    unittest.main()
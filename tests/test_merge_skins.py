@@ -0,0 +1,193 @@
+"""
+merge_skins.py: fuzzy dopasowanie Data Dragon -> Wiki (próg, przewaga, konflikty)
+i trwałe skin_id z SkinIdRegistry.
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), "data", "src_data"))
+
+from merge_skins import SkinIdRegistry, fuzzy_match   # noqa: E402
+
+# Niedopasowane skiny Data Dragon (jak po dokładnym merge po nazwie)
+UNMATCHED = pd.DataFrame([
+    ("Braum", 1, "Braum Lionheart"),      # champion w środku nazwy -> 100
+    ("Braum", 2, "Pool Party Braum"),     # nic podobnego na Wiki
+    ("Braum", 3, "Dragon Slayer Braum"),  # 96 vs 92 - dwóch podobnych kandydatów
+    ("Jax", 1, "Mecha Kingdoms Jax"),     # 100
+    ("Jax", 2, "Mecha Kingdom Jax"),      # 96, ale ten sam wiersz Wiki co wyżej
+    ("Zed", 1, "Project Zed"),            # championa nie ma na Wiki
+], columns=["champion_name", "skin_num", "skin_name"], index=[10, 11, 12, 13, 14, 15])
+
+# Wolne wiersze Wiki
+CANDIDATES = pd.DataFrame([
+    ("Braum", "Lionheart Braum"),
+    ("Braum", "Santa Braum"),
+    ("Braum", "Dragonslayer Braum"),
+    ("Braum", "Dragonslayers Braum"),
+    ("Jax", "Mecha Kingdoms Jax"),
+], columns=["champion", "skin_name"], index=[100, 101, 102, 103, 104])
+
+
+def reasons(audit):
+    """(champion, skin_num) -> powód odrzucenia albo 'accepted'."""
+    reason = audit["reason"].where(audit["decision"] == "rejected", "accepted")
+    return dict(zip(zip(audit["champion_name"], audit["skin_num"]), reason))
+
+
+class FuzzyMatchTest(unittest.TestCase):
+
+    def test_default_threshold_and_margin(self):
+        matches, audit = fuzzy_match(UNMATCHED, CANDIDATES)
+
+        self.assertEqual(matches, {10: 100, 13: 104})
+        self.assertEqual(reasons(audit), {
+            ("Braum", 1): "accepted",
+            ("Braum", 2): "below_threshold",
+            ("Braum", 3): "ambiguous",
+            ("Jax", 1): "accepted",
+            ("Jax", 2): "conflict",
+            ("Zed", 1): "no_candidates",
+        })
+        ambiguous = audit[audit["skin_num"].eq(3) & audit["champion_name"].eq("Braum")].iloc[0]
+        self.assertEqual(ambiguous["wiki_skin_name"], "Dragonslayer Braum")
+        self.assertGreaterEqual(ambiguous["score"], 85)
+        self.assertLess(ambiguous["score"] - ambiguous["second_score"], 10)
+
+    def test_smaller_margin_accepts(self):
+        matches, audit = fuzzy_match(UNMATCHED, CANDIDATES, margin=3.0)
+        self.assertEqual(matches, {10: 100, 12: 102, 13: 104})
+        self.assertEqual(reasons(audit)[("Braum", 3)], "accepted")
+
+    def test_higher_threshold_rejects(self):
+        matches, audit = fuzzy_match(UNMATCHED, CANDIDATES, threshold=97.0, margin=0.0)
+        self.assertEqual(matches, {10: 100, 13: 104})
+        self.assertEqual(reasons(audit)[("Braum", 3)], "below_threshold")
+        self.assertEqual(reasons(audit)[("Jax", 2)], "below_threshold")
+
+    def test_wiki_row_matched_once(self):
+        # Wszystkie warianty celują w jeden wiersz Wiki - dostaje go tylko najlepszy wynik
+        unmatched = pd.DataFrame([
+            ("Jax", 2, "Mecha Kingdom Jax"),
+            ("Jax", 3, "Mecha Kingdoms Jax"),
+            ("Jax", 4, "Mecha Kingdomz Jax"),
+        ], columns=["champion_name", "skin_num", "skin_name"])
+        matches, audit = fuzzy_match(unmatched, CANDIDATES, threshold=80.0, margin=0.0)
+
+        self.assertEqual(matches, {1: 104})
+        self.assertEqual(sorted(audit["reason"].dropna()), ["conflict", "conflict"])
+        self.assertEqual(len(set(matches.values())), len(matches))
+
+    def test_every_row_audited(self):
+        _, audit = fuzzy_match(UNMATCHED, CANDIDATES)
+        self.assertEqual(len(audit), len(UNMATCHED))
+        self.assertEqual(audit["decision"].value_counts().to_dict(), {"rejected": 4, "accepted": 2})
+
+
+def catalog(rows):
+    return pd.DataFrame(rows, columns=["champion_id", "skin_num", "skin_name_norm"])
+
+
+CATALOG = catalog([
+    ("Aatrox", 1, "justicaraatrox"),
+    ("Aatrox", 2, "mechaaatrox"),
+    ("Ahri", 1, "dynastyahri"),
+    ("Ahri", 2, "midnightahri"),
+])
+
+
+def ids_by_key(df, skin_ids):
+    return dict(zip(zip(df["champion_id"], df["skin_num"]), skin_ids))
+
+
+class SkinIdRegistryTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "skin_id_registry.csv")
+        self.bootstrap_path = os.path.join(tmp.name, "dim_skins_final.csv")
+
+    def merge(self, df, today):
+        """Jeden przebieg merge_skins.py: rejestr z pliku, assign, zapis."""
+        registry = SkinIdRegistry(self.path, self.bootstrap_path)
+        skin_ids = registry.assign(df, today=today)
+        registry.save()
+        return ids_by_key(df, skin_ids), registry
+
+    def test_first_merge_numbers_in_order(self):
+        ids, registry = self.merge(CATALOG, "2026-01-01")
+        self.assertEqual(list(ids.values()), [1, 2, 3, 4])
+        self.assertEqual(registry.stats, {"kept": 0, "renamed": 0, "new": 4, "retired": 0})
+
+    def test_stable_when_reordered(self):
+        first, _ = self.merge(CATALOG, "2026-01-01")
+        second, registry = self.merge(CATALOG.iloc[::-1].reset_index(drop=True), "2026-01-02")
+        self.assertEqual(second, first)
+        self.assertEqual(registry.stats["kept"], 4)
+        self.assertTrue((registry.df["last_seen"] == "2026-01-02").all())
+        self.assertTrue((registry.df["first_seen"] == "2026-01-01").all())
+
+    def test_stable_when_extended(self):
+        first, _ = self.merge(CATALOG, "2026-01-01")
+        # Nowy skin w środku katalogu (Riot dodał skina championowi ze środka alfabetu)
+        extended = pd.concat([CATALOG.iloc[:2], catalog([("Akali", 1, "stingeraakali")]), CATALOG.iloc[2:]],
+                             ignore_index=True)
+        second, registry = self.merge(extended, "2026-01-02")
+
+        self.assertEqual({key: second[key] for key in first}, first)
+        self.assertEqual(second[("Akali", 1)], 5)
+        self.assertEqual(registry.stats, {"kept": 4, "renamed": 0, "new": 1, "retired": 0})
+
+    def test_renumbered_skin_keeps_id_by_name(self):
+        first, _ = self.merge(CATALOG, "2026-01-01")
+        renumbered = CATALOG.copy()
+        renumbered.loc[renumbered["skin_name_norm"] == "midnightahri", "skin_num"] = 7
+        second, registry = self.merge(renumbered, "2026-01-02")
+
+        self.assertEqual(second[("Ahri", 7)], first[("Ahri", 2)])
+        self.assertEqual(registry.stats["renamed"], 1)
+        row = registry.df[registry.df["skin_id"] == first[("Ahri", 2)]].iloc[0]
+        self.assertEqual(row["skin_num"], 7)
+
+    def test_retired_skin(self):
+        first, _ = self.merge(CATALOG, "2026-01-01")
+        without = CATALOG[CATALOG["skin_name_norm"] != "mechaaatrox"].reset_index(drop=True)
+        second, registry = self.merge(without, "2026-01-02")
+
+        retired_id = first[("Aatrox", 2)]
+        self.assertEqual(second, {key: skin_id for key, skin_id in first.items() if key != ("Aatrox", 2)})
+        retired = registry.df.set_index("skin_id").loc[retired_id]
+        self.assertEqual((retired["retired_date"], retired["last_seen"]), ("2026-01-02", "2026-01-01"))
+        self.assertEqual(registry.stats["retired"], 1)
+
+        # Kolejny przebieg bez skina nie przesuwa retired_date; nowy skin nie dostaje jego id
+        added = pd.concat([without, catalog([("Ahri", 3, "arcadeahri")])], ignore_index=True)
+        third, registry = self.merge(added, "2026-01-03")
+        self.assertEqual(registry.df.set_index("skin_id").loc[retired_id, "retired_date"], "2026-01-02")
+        self.assertEqual(third[("Ahri", 3)], 5)
+
+        # Powrót skina: to samo id, retired_date znika
+        fourth, registry = self.merge(CATALOG, "2026-01-04")
+        self.assertEqual(fourth[("Aatrox", 2)], retired_id)
+        self.assertTrue(pd.isna(registry.df.set_index("skin_id").loc[retired_id, "retired_date"]))
+        self.assertEqual(registry.stats["retired"], 1)   # Ahri 3 zniknął
+
+    def test_bootstrap_from_dim_skins_final(self):
+        final = CATALOG.assign(skin_id=[40, 41, 42, 43])
+        final.to_csv(self.bootstrap_path, index=False)
+
+        ids, _ = self.merge(CATALOG.iloc[::-1], "2026-01-01")
+        self.assertEqual(ids, ids_by_key(final, final["skin_id"]))
+        self.assertTrue(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+"""
+Pliki SQL wklejone 1:1 do skryptów uruchamianych bez psql (DataGrip, pgAdmin nie znają \\ir).
+
+Blok między "-- >>> <plik>" a "-- <<< <plik>" musi być identyczny z plikiem obok.
+
+    python -m pytest -q tests
+"""
+import os
+import re
+import unittest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SQL_DIR = os.path.join(REPO_DIR, "sql")
+
+INLINED = re.compile(r"^-- >>> (\S+)[^\n]*\n(.*?)\n-- <<< \1$", re.MULTILINE | re.DOTALL)
+
+# Skrypt -> pliki, które ma wklejone
+SCRIPTS = {
+    os.path.join("silver", "silver_clean_data.sql"): ["silver_build_dimensions.sql", "silver_build_finish.sql"],
+    os.path.join("gold", "gold_dim_skin_scd2.sql"): ["gold_fact_sales_skin_version.sql"],
+}
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+class SqlInlinedTest(unittest.TestCase):
+
+    def test_inlined_blocks_match_files(self):
+        for script, names in SCRIPTS.items():
+            path = os.path.join(SQL_DIR, script)
+            sql = read(path)
+            blocks = dict(INLINED.findall(sql))
+            self.assertEqual(sorted(blocks), sorted(names), script)
+            for name, block in blocks.items():
+                with self.subTest(script=script, included=name):
+                    expected = read(os.path.join(os.path.dirname(path), name)).rstrip("\n")
+                    self.assertEqual(block, expected, f"{script}: wklej ponownie {name}")
+
+    def test_no_psql_includes(self):
+        for script in SCRIPTS:
+            sql = read(os.path.join(SQL_DIR, script))
+            self.assertNotRegex(sql, r"(?m)^\\ir\s", script)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+"""
+validate_sales.py: maski reguł na małych ramkach, progi i kod wyjścia --report-only.
+
+    python -m pytest -q tests
+"""
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), "data", "src_data"))
+
+import validate_sales   # noqa: E402
+from validate_sales import RULES, build_report, validate_chunk   # noqa: E402
+
+PLAYER_IDS = np.array([1.0, 2.0])
+SKIN_INDEX = pd.Index([10.0, 11.0, 12.0])
+SKIN_PRICES = np.array([975.0, 1350.0, np.nan])   # skin 12 bez ceny w dim_skin
+
+
+def sales(rows):
+    return pd.DataFrame(rows, columns=["transaction_id", "player_id", "skin_id", "purchase_date",
+                                       "price_rp", "quantity"])
+
+
+def validate(df):
+    return validate_chunk(df, PLAYER_IDS, SKIN_INDEX, SKIN_PRICES)
+
+
+class ValidateChunkTest(unittest.TestCase):
+
+    def test_rule_masks(self):
+        df = sales([
+            (1, 1, 10, "2024-01-01", 975, 1),      # poprawny
+            (2, 9, 10, "2024-01-01", 975, 1),      # missing_player
+            (3, 1, 99, "2024-01-01", 975, 1),      # missing_skin
+            (4, 1, 10, "2024-01-01", -5, 1),       # invalid_price
+            (5, 1, 10, "2024-01-01", 975, 0),      # invalid_quantity
+            (6, 1, 10, "2009-12-31", 975, 1),      # invalid_date (przed dim_date)
+            (7, 1, 10, "2024-13-01", 975, 1),      # invalid_date (nie da się sparsować)
+            (None, 1, 10, "2024-01-01", 975, 1),   # brak transaction_id: tylko total_invalid
+            (9, None, 10, "2030-12-31", 0, None),  # kilka reguł naraz
+        ])
+        valid, reasons, counts = validate(df)
+
+        self.assertEqual(valid.tolist(), [True] + [False] * 8)
+        self.assertEqual(counts, {
+            "missing_player": 2, "missing_skin": 1, "invalid_price": 2, "invalid_quantity": 2,
+            "invalid_date": 2, "total_invalid": 8, "price_fixed": 0,
+        })
+        self.assertEqual(reasons.index.tolist(), list(range(1, 9)))
+        self.assertEqual(reasons.tolist(), [
+            "missing_player", "missing_skin", "negative_price", "invalid_quantity", "invalid_date",
+            "invalid_date", "missing_transaction_id", "missing_player,zero_price,missing_quantity",
+        ])
+
+    def test_price_fixed(self):
+        df = sales([
+            (1, 1, 11, "2024-01-01", None, 2),   # cena z dim_skin -> poprawny
+            (2, 1, 11, "2024-01-01", None, 0),   # ilość 0: Silver nie uzupełnia
+            (3, 1, 12, "2024-01-01", None, 1),   # dim_skin też bez ceny
+            (4, 1, 99, "2024-01-01", None, 1),   # skina nie ma
+        ])
+        valid, reasons, counts = validate(df)
+
+        self.assertEqual(valid.tolist(), [True, False, False, False])
+        self.assertEqual(counts["price_fixed"], 1)
+        self.assertEqual(counts["invalid_price"], 3)
+        self.assertEqual(reasons.tolist(), [
+            "missing_price,invalid_quantity", "missing_price", "missing_skin,missing_price",
+        ])
+
+    def test_parquet_types(self):
+        # Parquet: Int64 z pd.NA i daty jako obiekty date - te same maski co z CSV
+        csv = sales([(1, 1, 10, "2024-01-01", 975, 1), (2, 1, 11, "2024-01-02", None, 1)])
+        parquet = csv.astype({"transaction_id": "Int64", "player_id": "Int64", "skin_id": "Int64",
+                              "price_rp": "Int64", "quantity": "Int64"})
+        parquet["purchase_date"] = pd.to_datetime(parquet["purchase_date"]).dt.date
+        for left, right in zip(validate(csv), validate(parquet)):
+            if isinstance(left, dict):
+                self.assertEqual(left, right)
+            else:
+                np.testing.assert_array_equal(np.asarray(left), np.asarray(right))
+
+
+class BuildReportTest(unittest.TestCase):
+
+    def totals(self, **counts):
+        return {rule: counts.get(rule, 0) for rule in RULES}
+
+    def alerts(self, checks):
+        return [check["issue_type"] for check in checks if check["alert_triggered"]]
+
+    def test_total_invalid_threshold_separate(self):
+        # 4 reguły po 4% = 16% odrzuconych: żadna reguła nie przekracza 5%, total_invalid przekracza 15%
+        totals = self.totals(missing_player=4, missing_skin=4, invalid_price=4, invalid_quantity=4,
+                             total_invalid=16)
+        checks = build_report(100, totals, threshold=5.0, total_threshold=15.0)
+        self.assertEqual(self.alerts(checks), ["total_invalid"])
+        self.assertEqual([check["threshold_pct"] for check in checks], [5.0] * 5 + [15.0])
+
+        self.assertEqual(self.alerts(build_report(100, totals, threshold=5.0, total_threshold=20.0)), [])
+
+    def test_rule_threshold(self):
+        checks = build_report(100, self.totals(invalid_date=6, total_invalid=6), threshold=5.0)
+        self.assertEqual(self.alerts(checks), ["invalid_date"])
+
+    def test_no_rows(self):
+        checks = build_report(0, self.totals(), threshold=5.0)
+        self.assertEqual(self.alerts(checks), [])
+        self.assertTrue(all(check["issue_pct"] == 0.0 for check in checks))
+
+
+class ReportOnlyTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.input_dir = os.path.join(tmp.name, "deduped")
+        self.output_dir = os.path.join(tmp.name, "validated")
+        os.makedirs(self.input_dir)
+
+        players_path = os.path.join(tmp.name, "dim_player.csv")
+        skins_path = os.path.join(tmp.name, "dim_skins_final.csv")
+        pd.DataFrame({"player_id": [1, 2]}).to_csv(players_path, index=False)
+        pd.DataFrame({"skin_id": [10, 11], "price_rp": [975, 1350]}).to_csv(skins_path, index=False)
+        for patcher in [mock.patch.object(validate_sales, "dim_player_path", players_path),
+                        mock.patch.object(validate_sales, "skins_path", skins_path),
+                        mock.patch.dict(os.environ, {"PIPELINE_METRICS": os.path.join(tmp.name, "m.jsonl")})]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_main(self, bad_rows):
+        rows = [(i, 1, 10, "2024-01-01", 975, 1) for i in range(100 - bad_rows)]
+        rows += [(1000 + i, 1, 10, "2024-01-01", 975, 0) for i in range(bad_rows)]
+        sales(rows).to_csv(os.path.join(self.input_dir, "fact_sales.csv"), index=False)
+
+        argv = ["validate_sales.py", "--input-dir", self.input_dir, "--output-dir", self.output_dir,
+                "--report-only", "--workers", "1"]
+        with mock.patch.object(sys, "argv", argv), mock.patch("sys.stdout"):
+            try:
+                validate_sales.main()
+            except SystemExit as e:
+                code = e.code
+            else:
+                code = 0
+        with open(os.path.join(self.output_dir, "dq_report.json"), encoding="utf-8") as f:
+            return code, json.load(f)
+
+    def test_accepted(self):
+        code, report = self.run_main(bad_rows=3)
+        self.assertEqual(code, 0)
+        self.assertEqual(report["status"], "accepted")
+        self.assertEqual(report["valid_rows"], 97)
+        self.assertEqual(sorted(os.listdir(self.output_dir)), ["dq_report.json"])
+
+    def test_rejected(self):
+        code, report = self.run_main(bad_rows=6)
+        self.assertEqual(code, 1)
+        self.assertEqual(report["status"], "rejected")
+        self.assertEqual(sorted(os.listdir(self.output_dir)), ["dq_report.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+parse_skins_from_wiki.py: WikiParseCache - trafienie tylko przy tym samym pliku .lua, regułach i parserze.
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), "data", "src_data"))
+
+import parse_skins_from_wiki   # noqa: E402
+from parse_skins_from_wiki import WikiParseCache, rules_fingerprint   # noqa: E402
+
+SKINDATA = 'return {\n  ["Aatrox"] = {\n    ["skins"] = {\n      ["Justicar"] = {["cost"] = 975},\n    },\n  },\n}\n'
+
+TABLE = pd.DataFrame({
+    "skin_name": ["Justicar Aatrox"],
+    "price_rp": [975],
+    "rarity": ["Legacy"],
+    "champion": ["Aatrox"],
+    "release_date": [None],
+    "skin_name_norm": ["justicar aatrox"],
+})
+
+
+def classify_rarity(cost, skin_name):
+    """Inna reguła: 975 RP to już nie Legacy."""
+    return "Epic" if cost == 975 else parse_skins_from_wiki.classify_rarity(cost, skin_name)
+
+
+class WikiParseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_dir = os.path.join(tmp.name, "cache")
+        self.lua_path = os.path.join(tmp.name, "skindata_raw.lua")
+        self.write_lua(SKINDATA)
+
+    def write_lua(self, text):
+        with open(self.lua_path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def key(self, parser_name="lua_table"):
+        return WikiParseCache.make_key(self.lua_path, parser_name)
+
+    def test_unchanged_hits(self):
+        key = self.key()
+        WikiParseCache(self.cache_dir).save(key, TABLE)
+
+        # Nowa instancja (kolejne uruchomienie) czyta index.json z dysku
+        self.assertEqual(self.key(), key)
+        pd.testing.assert_frame_equal(WikiParseCache(self.cache_dir).load(self.key()), TABLE)
+
+    def test_changed_input_misses(self):
+        WikiParseCache(self.cache_dir).save(self.key(), TABLE)
+        self.write_lua(SKINDATA.replace("975", "1350"))
+        self.assertIsNone(WikiParseCache(self.cache_dir).load(self.key()))
+
+    def test_changed_rules_miss(self):
+        key = self.key()
+        WikiParseCache(self.cache_dir).save(key, TABLE)
+        fingerprint = rules_fingerprint()
+
+        changes = [
+            mock.patch.object(parse_skins_from_wiki, "classify_rarity", classify_rarity),
+            mock.patch.object(parse_skins_from_wiki, "LEGACY_COSTS", parse_skins_from_wiki.LEGACY_COSTS + [1050]),
+            mock.patch.object(parse_skins_from_wiki, "PARSER_VERSION", parse_skins_from_wiki.PARSER_VERSION + 1),
+        ]
+        for change in changes:
+            with self.subTest(change=change.attribute), change:
+                self.assertNotEqual(rules_fingerprint(), fingerprint)
+                self.assertNotEqual(self.key(), key)
+                self.assertIsNone(WikiParseCache(self.cache_dir).load(self.key()))
+
+        # Po cofnięciu zmian - znowu trafienie
+        self.assertIsNotNone(WikiParseCache(self.cache_dir).load(self.key()))
+
+    def test_parser_is_part_of_key(self):
+        WikiParseCache(self.cache_dir).save(self.key("lua_table"), TABLE)
+        self.assertNotEqual(self.key("regex"), self.key("lua_table"))
+        self.assertIsNone(WikiParseCache(self.cache_dir).load(self.key("regex")))
+
+    def test_only_last_entry_kept(self):
+        cache = WikiParseCache(self.cache_dir)
+        old_key = self.key()
+        cache.save(old_key, TABLE)
+        self.write_lua(SKINDATA + "-- nowa wersja\n")
+        cache.save(self.key(), TABLE.assign(price_rp=1350))
+
+        self.assertEqual(sorted(name for name in os.listdir(self.cache_dir) if name.endswith(".pkl")),
+                         [f"{self.key()}.pkl"])
+        self.assertIsNone(WikiParseCache(self.cache_dir).load(old_key))
+        self.assertEqual(WikiParseCache(self.cache_dir).load(self.key())["price_rp"].tolist(), [1350])
+
+    def test_outputs_current(self):
+        key = self.key()
+        cache = WikiParseCache(self.cache_dir)
+        cache.save(key, TABLE)
+        output_path = os.path.join(os.path.dirname(self.cache_dir), "wiki_skins_clean.csv")
+        TABLE.to_csv(output_path, index=False)
+
+        self.assertFalse(cache.outputs_current(key, [output_path]))   # jeszcze nie zapisany z tego wpisu
+        cache.record_outputs(key, [output_path])
+        self.assertTrue(WikiParseCache(self.cache_dir).outputs_current(key, [output_path]))
+        self.assertFalse(cache.outputs_current("inny-klucz", [output_path]))
+
+        TABLE.assign(price_rp=1).to_csv(output_path, index=False)
+        self.assertFalse(cache.outputs_current(key, [output_path]))
+        os.remove(output_path)
+        self.assertFalse(cache.outputs_current(key, [output_path]))
+
+
+if __name__ == "__main__":
+    unittest.main()